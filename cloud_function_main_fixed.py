@@ -14,6 +14,8 @@ import functions_framework
 import requests
 from google.cloud import storage
 
+from processor.keyword_matcher import viral_keyword_matcher
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,159 +23,7 @@ logger = logging.getLogger(__name__)
 
 def extract_viral_keywords(text: str) -> list[str]:
     """Extract viral keywords from text"""
-    viral_keywords = [
-        # Memecoin keywords
-        "moon",
-        "pump",
-        "100x",
-        "1000x",
-        "gem",
-        "next gem",
-        "pepe",
-        "doge",
-        "shib",
-        "floki",
-        "wojak",
-        "chad",
-        "based",
-        "degen",
-        "mooning",
-        "pumping",
-        "fomo",
-        "fud",
-        "hodl",
-        "diamond hands",
-        "wen",
-        "ser",
-        "ngmi",
-        "wagmi",
-        "gm",
-        "gn",
-        "gm fam",
-        "gm ser",
-        "gm king",
-        "gm queen",
-        # Launchpad keywords
-        "launchpad",
-        "ido",
-        "initial dex offering",
-        "token launch",
-        "presale",
-        "fair launch",
-        "stealth launch",
-        "pinksale",
-        "dxsale",
-        "bounce",
-        "polkastarter",
-        "daomaker",
-        "trustpad",
-        "seedify",
-        "gamefi",
-        "new token",
-        "ico",
-        "initial coin offering",
-        "whitelist",
-        "kyc",
-        # Airdrop keywords
-        "airdrop",
-        "free tokens",
-        "claim",
-        "eligibility",
-        "snapshot",
-        "whitelist",
-        "retroactive",
-        "community airdrop",
-        "token distribution",
-        "free crypto",
-        "claim now",
-        "don't miss out",
-        # Farming keywords
-        "yield farming",
-        "farming",
-        "liquidity mining",
-        "staking",
-        "apy",
-        "apr",
-        "rewards",
-        "harvest",
-        "compound",
-        "auto compound",
-        "vault",
-        "strategy",
-        "defi farming",
-        "liquidity provider",
-        "lp",
-        "amm",
-        "dex farming",
-        "impermanent loss",
-        "yield optimizer",
-        # Solana keywords
-        "solana",
-        "sol",
-        "phantom",
-        "solflare",
-        "raydium",
-        "orca",
-        "serum",
-        "jupiter",
-        "pyth",
-        "bonk",
-        "dogwifhat",
-        "samoyedcoin",
-        "marinade",
-        "jito",
-        "tensor",
-        "magic eden",
-        "saga",
-        "firedancer",
-        "solana mobile",
-        "solana pay",
-        "spl",
-        "spl token",
-        # Urgency keywords
-        "now",
-        "today",
-        "live",
-        "breaking",
-        "urgent",
-        "don't miss",
-        "last chance",
-        "limited time",
-        "expires",
-        "deadline",
-        "hurry",
-        "quick",
-        "fast",
-        "immediate",
-        "instant",
-        "right now",
-        # Viral keywords
-        "viral",
-        "trending",
-        "hot",
-        "fire",
-        "lit",
-        "savage",
-        "epic",
-        "legendary",
-        "insane",
-        "crazy",
-        "wild",
-        "amazing",
-        "incredible",
-        "unbelievable",
-        "mind blowing",
-        "game changer",
-    ]
-
-    text_lower = text.lower()
-    found_keywords = []
-
-    for keyword in viral_keywords:
-        if keyword.lower() in text_lower:
-            found_keywords.append(keyword)
-
-    return found_keywords
+    return viral_keyword_matcher().find_ordered(text)
 
 
 def analyze_sentiment(text: str) -> str:
@@ -76,35 +76,27 @@ def crawl_dexpaprika() -> dict[str, Any]:
 
 
 def upload_to_gcs(data: dict[str, Any]) -> bool:
-    """Upload data to Google Cloud Storage"""
+    """Upload the changes in data to Google Cloud Storage"""
     try:
         from google.cloud import storage
 
+        from utils.delta_upload import DeltaUploader
+
         bucket_name = "degen-digest-data"
         project_id = "lucky-union-463615-t3"
 
         client = storage.Client(project=project_id)
         bucket = client.bucket(bucket_name)
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-        # Upload timestamped file
-        timestamped_path = f"data/dexpaprika_{timestamp}.json"
-        blob = bucket.blob(timestamped_path)
-        blob.upload_from_string(
-            json.dumps(data, indent=2, ensure_ascii=False),
-            content_type="application/json",
-        )
-
-        # Upload latest file
-        latest_path = "data/dexpaprika_latest.json"
-        blob = bucket.blob(latest_path)
-        blob.upload_from_string(
-            json.dumps(data, indent=2, ensure_ascii=False),
-            content_type="application/json",
-        )
-
-        logger.info(f"✅ Uploaded to GCS: {timestamped_path} and {latest_path}")
+        # Only records that changed since the last upload, plus the
+        # data/dexpaprika_latest.json readers load
+        result = DeltaUploader(bucket, "dexpaprika").upload(data)
+        if result.skipped:
+            logger.info("✅ dexpaprika data unchanged, nothing uploaded")
+        else:
+            logger.info(
+                f"✅ Uploaded to GCS: {result.delta_path} and data/dexpaprika_latest.json"
+            )
         return True
 
     except Exception as e:
@@ -13,6 +13,8 @@ from typing import Any, Dict
 # Add current directory to path
 sys.path.append(".")
 
+from processor.keyword_matcher import news_keyword_matcher
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -207,181 +209,7 @@ def crawl_news() -> dict[str, Any]:
 
 def extract_viral_keywords(text: str) -> list[str]:
     """Extract viral keywords from text"""
-    viral_keywords = [
-        # Memecoin keywords
-        "moon",
-        "pump",
-        "100x",
-        "1000x",
-        "gem",
-        "next gem",
-        "pepe",
-        "doge",
-        "shib",
-        "floki",
-        "wojak",
-        "chad",
-        "based",
-        "degen",
-        "mooning",
-        "pumping",
-        "fomo",
-        "fud",
-        "hodl",
-        "diamond hands",
-        "wen",
-        "ser",
-        "ngmi",
-        "wagmi",
-        "gm",
-        "gn",
-        "gm fam",
-        "gm ser",
-        "gm king",
-        "gm queen",
-        # Launchpad keywords
-        "launchpad",
-        "ido",
-        "initial dex offering",
-        "token launch",
-        "presale",
-        "fair launch",
-        "stealth launch",
-        "pinksale",
-        "dxsale",
-        "bounce",
-        "polkastarter",
-        "daomaker",
-        "trustpad",
-        "seedify",
-        "gamefi",
-        "new token",
-        "ico",
-        "initial coin offering",
-        "whitelist",
-        "kyc",
-        # Airdrop keywords
-        "airdrop",
-        "free tokens",
-        "claim",
-        "eligibility",
-        "snapshot",
-        "whitelist",
-        "retroactive",
-        "community airdrop",
-        "token distribution",
-        "free crypto",
-        "claim now",
-        "don't miss out",
-        # Farming keywords
-        "yield farming",
-        "farming",
-        "liquidity mining",
-        "staking",
-        "apy",
-        "apr",
-        "rewards",
-        "harvest",
-        "compound",
-        "auto compound",
-        "vault",
-        "strategy",
-        "defi farming",
-        "liquidity provider",
-        "lp",
-        "amm",
-        "dex farming",
-        "impermanent loss",
-        "yield optimizer",
-        # Solana keywords
-        "solana",
-        "sol",
-        "phantom",
-        "solflare",
-        "raydium",
-        "orca",
-        "serum",
-        "jupiter",
-        "pyth",
-        "bonk",
-        "dogwifhat",
-        "samoyedcoin",
-        "marinade",
-        "jito",
-        "tensor",
-        "magic eden",
-        "saga",
-        "firedancer",
-        "solana mobile",
-        "solana pay",
-        "spl",
-        "spl token",
-        # Urgency keywords
-        "now",
-        "today",
-        "live",
-        "breaking",
-        "urgent",
-        "don't miss",
-        "last chance",
-        "limited time",
-        "expires",
-        "deadline",
-        "hurry",
-        "quick",
-        "fast",
-        "immediate",
-        "instant",
-        "right now",
-        # Viral keywords
-        "viral",
-        "trending",
-        "hot",
-        "fire",
-        "lit",
-        "savage",
-        "epic",
-        "legendary",
-        "insane",
-        "crazy",
-        "wild",
-        "amazing",
-        "incredible",
-        "unbelievable",
-        "mind blowing",
-        "game changer",
-        # News keywords
-        "announcement",
-        "partnership",
-        "integration",
-        "launch",
-        "release",
-        "update",
-        "upgrade",
-        "migration",
-        "bridge",
-        "swap",
-        "exchange",
-        "listing",
-        "delisting",
-        "regulation",
-        "adoption",
-        "institutional",
-        "enterprise",
-        "mainnet",
-        "testnet",
-        "beta",
-        "alpha",
-    ]
-
-    text_lower = text.lower()
-    found_keywords = []
-
-    for keyword in viral_keywords:
-        if keyword.lower() in text_lower:
-            found_keywords.append(keyword)
-
-    return found_keywords
+    return news_keyword_matcher().find_ordered(text)
 
 
 def analyze_sentiment(text: str) -> str:
@@ -616,35 +444,27 @@ def categorize_article(text: str) -> str:
 
 
 def upload_to_gcs(data: dict[str, Any]) -> bool:
-    """Upload data to Google Cloud Storage"""
+    """Upload the changes in data to Google Cloud Storage"""
     try:
         from google.cloud import storage
 
+        from utils.delta_upload import DeltaUploader
+
         bucket_name = "degen-digest-data"
         project_id = "lucky-union-463615-t3"
 
         client = storage.Client(project=project_id)
         bucket = client.bucket(bucket_name)
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-        # Upload timestamped file
-        timestamped_path = f"data/news_{timestamp}.json"
-        blob = bucket.blob(timestamped_path)
-        blob.upload_from_string(
-            json.dumps(data, indent=2, ensure_ascii=False),
-            content_type="application/json",
-        )
-
-        # Upload latest file
-        latest_path = "data/news_latest.json"
-        blob = bucket.blob(latest_path)
-        blob.upload_from_string(
-            json.dumps(data, indent=2, ensure_ascii=False),
-            content_type="application/json",
-        )
-
-        logger.info(f"✅ Uploaded to GCS: {timestamped_path} and {latest_path}")
+        # Only records that changed since the last upload, plus the
+        # data/news_latest.json readers load
+        result = DeltaUploader(bucket, "news").upload(data)
+        if result.skipped:
+            logger.info("✅ news data unchanged, nothing uploaded")
+        else:
+            logger.info(
+                f"✅ Uploaded to GCS: {result.delta_path} and data/news_latest.json"
+            )
         return True
 
     except Exception as e:
@@ -978,3 +978,396 @@ def get_topic_keywords():
             "adoption",
         ],
     }
+
+
+def get_extraction_keywords():
+    """Get keywords tagged on crawled items by ``extract_viral_keywords``"""
+    return [
+        # Memecoin keywords
+        "moon",
+        "pump",
+        "100x",
+        "1000x",
+        "gem",
+        "next gem",
+        "pepe",
+        "doge",
+        "shib",
+        "floki",
+        "wojak",
+        "chad",
+        "based",
+        "degen",
+        "mooning",
+        "pumping",
+        "fomo",
+        "fud",
+        "hodl",
+        "diamond hands",
+        "wen",
+        "ser",
+        "ngmi",
+        "wagmi",
+        "gm",
+        "gn",
+        "gm fam",
+        "gm ser",
+        "gm king",
+        "gm queen",
+        # Launchpad keywords
+        "launchpad",
+        "ido",
+        "initial dex offering",
+        "token launch",
+        "presale",
+        "fair launch",
+        "stealth launch",
+        "pinksale",
+        "dxsale",
+        "bounce",
+        "polkastarter",
+        "daomaker",
+        "trustpad",
+        "seedify",
+        "gamefi",
+        "new token",
+        "ico",
+        "initial coin offering",
+        "whitelist",
+        "kyc",
+        # Airdrop keywords
+        "airdrop",
+        "free tokens",
+        "claim",
+        "eligibility",
+        "snapshot",
+        "retroactive",
+        "community airdrop",
+        "token distribution",
+        "free crypto",
+        "claim now",
+        "don't miss out",
+        # Farming keywords
+        "yield farming",
+        "farming",
+        "liquidity mining",
+        "staking",
+        "apy",
+        "apr",
+        "rewards",
+        "harvest",
+        "compound",
+        "auto compound",
+        "vault",
+        "strategy",
+        "defi farming",
+        "liquidity provider",
+        "lp",
+        "amm",
+        "dex farming",
+        "impermanent loss",
+        "yield optimizer",
+        # Solana keywords
+        "solana",
+        "sol",
+        "phantom",
+        "solflare",
+        "raydium",
+        "orca",
+        "serum",
+        "jupiter",
+        "pyth",
+        "bonk",
+        "dogwifhat",
+        "samoyedcoin",
+        "marinade",
+        "jito",
+        "tensor",
+        "magic eden",
+        "saga",
+        "firedancer",
+        "solana mobile",
+        "solana pay",
+        "spl",
+        "spl token",
+        # Urgency keywords
+        "now",
+        "today",
+        "live",
+        "breaking",
+        "urgent",
+        "don't miss",
+        "last chance",
+        "limited time",
+        "expires",
+        "deadline",
+        "hurry",
+        "quick",
+        "fast",
+        "immediate",
+        "instant",
+        "right now",
+        # Viral keywords
+        "viral",
+        "trending",
+        "hot",
+        "fire",
+        "lit",
+        "savage",
+        "epic",
+        "legendary",
+        "insane",
+        "crazy",
+        "wild",
+        "amazing",
+        "incredible",
+        "unbelievable",
+        "mind blowing",
+        "game changer",
+    ]
+
+
+def get_news_extraction_keywords():
+    """Get extraction keywords for news items (adds announcement terms)"""
+    return get_extraction_keywords() + [
+        # News keywords
+        "announcement",
+        "partnership",
+        "integration",
+        "launch",
+        "release",
+        "update",
+        "upgrade",
+        "migration",
+        "bridge",
+        "swap",
+        "exchange",
+        "listing",
+        "delisting",
+        "regulation",
+        "adoption",
+        "institutional",
+        "enterprise",
+        "mainnet",
+        "testnet",
+        "beta",
+        "alpha",
+    ]
+
+
+def get_classifier_categories():
+    """Get ordered category rules for ``processor.classifier``
+
+    Categories are checked in order and the first one with a matching keyword
+    wins. Solana subcategories apply when any ``solana`` keyword matches.
+    """
+    rug = ["rug", "scam", "honeypot", "fake", "ponzi", "pyramid"]
+    airdrop = ["airdrop", "claim", "free", "drop", "eligible", "whitelist"]
+    launch = [
+        "launch",
+        "launched",
+        "new",
+        "presale",
+        "ico",
+        "ido",
+        "fair launch",
+        "stealth",
+    ]
+    nft = ["nft", "opensea", "floor", "mint", "collection", "art", "gaming"]
+    defi = ["defi", "yield", "apy", "liquidity", "swap", "amm", "dex", "lending"]
+    pump = ["pump", "moon", "bull", "rocket", "🚀", "mooning", "pumping"]
+    dump = ["dump", "bear", "sell", "short", "dead", "💀", "📉"]
+    return {
+        "solana": [
+            "solana",
+            "sol",
+            "$sol",
+            "saga",
+            "phantom",
+            "solflare",
+            "raydium",
+            "orca",
+            "jupiter",
+            "serum",
+            "mango",
+            "saber",
+            "spl",
+            "spl token",
+            "metaplex",
+            "candy machine",
+            "magic eden",
+            "opensea solana",
+            "solana nft",
+            "solana defi",
+            "solana dex",
+            "solana airdrop",
+            "bonk",
+            "$bonk",
+            "dogwifhat",
+            "wif",
+            "$wif",
+            "bome",
+            "$bome",
+            "popcat",
+            "$popcat",
+            "book of meme",
+            "jup",
+            "$jup",
+            "ray",
+            "$ray",
+            "orca",
+            "$orca",
+            "mngo",
+            "$mngo",
+            "srm",
+            "$srm",
+            "sbr",
+            "$sbr",
+            "solana ecosystem",
+            "solana season",
+            "solana summer",
+        ],
+        "solana_subcategories": [
+            (
+                "🔥 Solana Meme Token",
+                [
+                    "bonk",
+                    "$bonk",
+                    "dogwifhat",
+                    "wif",
+                    "$wif",
+                    "bome",
+                    "$bome",
+                    "popcat",
+                    "$popcat",
+                    "book of meme",
+                ],
+            ),
+            ("🚀 Solana Airdrop", airdrop),
+            ("🚀 Solana Token Launch", launch),
+            ("💀 Solana Rug", rug),
+            (
+                "🔧 Solana Ecosystem",
+                [
+                    "phantom",
+                    "solflare",
+                    "raydium",
+                    "orca",
+                    "jupiter",
+                    "serum",
+                    "mango",
+                    "saber",
+                    "metaplex",
+                    "magic eden",
+                ],
+            ),
+            ("🎨 Solana NFT", nft),
+            ("🏦 Solana DeFi", defi),
+            ("📈 Solana Pump", pump),
+            ("📉 Solana Dump", dump),
+        ],
+        "general": [
+            ("💀 Rug of the Day", rug),
+            ("🪂 Airdrop Alert", airdrop),
+            ("🚀 Meme Launch", launch),
+            (
+                "🐳 Whale Move",
+                ["whale", "whales", "big money", "large transfer", "whale alert"],
+            ),
+            (
+                "🧠 Alpha Thread",
+                ["alpha", "insider", "tip", "secret", "exclusive", "leak"],
+            ),
+            ("₿ Bitcoin News", ["bitcoin", "btc", "$btc", "satoshi", "halving"]),
+            ("🔷 Ethereum Update", ["ethereum", "eth", "$eth", "vitalik", "merge"]),
+            ("🏦 DeFi Protocol", defi),
+            ("🎨 NFT Collection", nft),
+            ("🐕 Meme Coin", ["meme", "dog", "cat", "pepe", "shib", "doge", "wojak"]),
+            ("📈 Pump Alert", pump),
+            ("📉 Dump Alert", dump),
+            (
+                "📊 Trading Analysis",
+                [
+                    "trading",
+                    "chart",
+                    "technical",
+                    "analysis",
+                    "ta",
+                    "support",
+                    "resistance",
+                ],
+            ),
+            (
+                "📰 Crypto News",
+                [
+                    "news",
+                    "announcement",
+                    "update",
+                    "release",
+                    "partnership",
+                    "adoption",
+                ],
+            ),
+        ],
+    }
+
+
+def get_solana_weights():
+    """Get per-keyword weights for ``processor.classifier.get_solana_score``"""
+    return {
+        # High weight keywords
+        "solana": 1.0,
+        "sol": 0.9,
+        "$sol": 0.9,
+        "bonk": 0.8,
+        "$bonk": 0.8,
+        "dogwifhat": 0.8,
+        "wif": 0.8,
+        "$wif": 0.8,
+        "bome": 0.8,
+        "$bome": 0.8,
+        "book of meme": 0.8,
+        "popcat": 0.8,
+        "$popcat": 0.8,
+        # Medium weight keywords
+        "phantom": 0.7,
+        "raydium": 0.7,
+        "orca": 0.7,
+        "jupiter": 0.7,
+        "serum": 0.7,
+        "mango": 0.7,
+        "saber": 0.7,
+        "metaplex": 0.7,
+        "magic eden": 0.7,
+        "spl": 0.7,
+        "spl token": 0.7,
+        # Lower weight keywords
+        "saga": 0.6,
+        "solflare": 0.6,
+        "candy machine": 0.6,
+        "opensea solana": 0.6,
+        "solana nft": 0.6,
+        "solana defi": 0.6,
+        "solana dex": 0.6,
+        "solana airdrop": 0.6,
+        "solana ecosystem": 0.6,
+        "solana season": 0.6,
+        "solana summer": 0.6,
+    }
+
+
+def get_meme_token_keywords():
+    """Meme-token tags and the name/symbol substrings that imply them
+
+    ``processor.keyword_matcher.meme_tags`` matches these when crawlers
+    upsert ``crypto_tokens``; a token with any tag is a meme coin.
+    """
+    return {
+        "dog": ["dog", "doge", "inu", "shib", "floki", "wif", "bonk"],
+        "cat": ["cat", "popcat"],
+        "frog": ["pepe"],
+        "moon": ["moon"],
+        "wojak": ["wojak"],
+        "chad": ["chad", "based"],
+        "meme": ["meme", "bome"],
+    }
@@ -16,6 +16,12 @@ from typing import Any, Dict, List
 # Add current directory to path
 sys.path.append(".")
 
+from utils.crawl_scheduler import AdaptiveScheduler
+from utils.delta_upload import DeltaUploader
+
+# Poll interval at an average change rate; the scheduler adapts around it
+BASE_INTERVAL = 7 * 60
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -31,6 +37,11 @@ logger = logging.getLogger(__name__)
 class ContinuousDexPaprikaCrawler:
     def __init__(self):
         self.running = False
+        self.scheduler = AdaptiveScheduler("dexpaprika")
+        self.scheduler.register("tokens", BASE_INTERVAL, quota="dexpaprika")
+        # Last data per token, for tokens the scheduler skips this cycle
+        self.token_cache: dict[str, Any] = {}
+        self.uploader = None
         self.gcs_bucket = "degen-digest-data"
         self.project_id = "lucky-union-463615-t3"
 
@@ -58,49 +69,39 @@ class ContinuousDexPaprikaCrawler:
             return None, None
 
     def upload_to_gcs(self, data: dict[str, Any]) -> bool:
-        """Upload data to Google Cloud Storage"""
+        """Upload the changes in data to Google Cloud Storage"""
         client, bucket = self.get_gcs_client()
         if not bucket:
             logger.warning("GCS not available, skipping upload")
             return False
 
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-            # Upload timestamped file
-            timestamped_path = f"data/dexpaprika_{timestamp}.json"
-            blob = bucket.blob(timestamped_path)
-            blob.upload_from_string(
-                json.dumps(data, indent=2, ensure_ascii=False),
-                content_type="application/json",
-            )
-
-            # Upload latest file
-            latest_path = "data/dexpaprika_latest.json"
-            blob = bucket.blob(latest_path)
-            blob.upload_from_string(
-                json.dumps(data, indent=2, ensure_ascii=False),
-                content_type="application/json",
-            )
-
-            logger.info(f"✅ Uploaded to GCS: {timestamped_path} and {latest_path}")
+            # Only records that changed since the last upload, plus the
+            # data/dexpaprika_latest.json readers load
+            if self.uploader is None:
+                self.uploader = DeltaUploader(bucket, "dexpaprika")
+            result = self.uploader.upload(data)
+            if result.skipped:
+                logger.info("✅ DexPaprika data unchanged, nothing uploaded")
+            else:
+                logger.info(
+                    f"✅ Uploaded to GCS: {result.delta_path} and {self.uploader.latest_path}"
+                )
             return True
 
         except Exception as e:
             logger.error(f"❌ Failed to upload to GCS: {e}")
             return False
 
-    def crawl_dexpaprika(self) -> dict[str, Any]:
+    async def crawl_dexpaprika(self) -> dict[str, Any]:
         """Crawl DexPaprika data"""
+        schedule = None
         try:
             logger.info("🔄 Starting DexPaprika crawl...")
 
             # Import the DexPaprika scraper
-            from scrapers.dexpaprika import (
-                fetch_networks,
-                fetch_token_data,
-                fetch_token_prices,
-            )
+            from scrapers.dexpaprika import fetch_dexpaprika_snapshot
+            from scrapers.fetch_pipeline import summarize
 
             # Example Solana tokens to track
             solana_tokens = [
@@ -113,15 +114,43 @@ class ContinuousDexPaprikaCrawler:
 
             network_id = "solana"
 
+            # Networks and the tokens that are due, concurrently; tokens
+            # whose price has not moved lately are skipped for a few cycles
+            due_tokens = self.scheduler.select("tokens", solana_tokens)
+            fetch_start = time.time()
+            networks, fetched, endpoint_metrics = await fetch_dexpaprika_snapshot(
+                network_id, due_tokens
+            )
+            fetch_duration = time.time() - fetch_start
+            self.token_cache.update(fetched)
+            schedule = self.scheduler.observe(
+                "tokens",
+                fetched,
+                error=not any(m["ok"] for m in endpoint_metrics.values()),
+                calls=len(endpoint_metrics),
+            )
+            logger.info(
+                f"⏱️ Fetched {len(endpoint_metrics)} endpoints in {fetch_duration:.2f}s: "
+                f"{summarize(endpoint_metrics)}"
+            )
+
             data = {
                 "metadata": {
                     "source": "dexpaprika",
                     "fetched_at": datetime.now().isoformat(),
                     "network": network_id,
                     "tokens_tracked": len(solana_tokens),
+                    "tokens_fetched": due_tokens,
+                    "fetch_duration_seconds": round(fetch_duration, 3),
+                    "endpoints": endpoint_metrics,
+                    "schedule": schedule,
                 },
-                "networks": fetch_networks(),
-                "token_data": fetch_token_prices(network_id, solana_tokens),
+                "networks": networks,
+                # Skipped tokens keep their last data, so the upload does not
+                # record them as removed
+                "token_data": [
+                    self.token_cache[a] for a in solana_tokens if a in self.token_cache
+                ],
                 "summary": {
                     "total_tokens": len(solana_tokens),
                     "network_id": network_id,
@@ -146,6 +175,8 @@ class ContinuousDexPaprikaCrawler:
 
         except Exception as e:
             logger.error(f"❌ DexPaprika crawl failed: {e}")
+            if schedule is None:
+                self.scheduler.observe("tokens", error=True)
             return {
                 "metadata": {
                     "source": "dexpaprika",
@@ -164,10 +195,10 @@ class ContinuousDexPaprikaCrawler:
 
         try:
             # Crawl DexPaprika data
-            data = self.crawl_dexpaprika()
+            data = await self.crawl_dexpaprika()
 
-            # Upload to GCS
-            if self.upload_to_gcs(data):
+            # Upload to GCS (blocking client: keep it off the event loop)
+            if await asyncio.to_thread(self.upload_to_gcs, data):
                 logger.info("✅ DexPaprika cycle completed successfully")
             else:
                 logger.error("❌ Failed to upload DexPaprika data")
@@ -193,10 +224,11 @@ class ContinuousDexPaprikaCrawler:
 
                 logger.info(f"⏱️ Cycle #{cycle_count} took {cycle_duration:.1f} seconds")
 
-                # Wait before next cycle (7 minutes between cycles = 12 cycles per day)
-                wait_time = 7 * 60  # 7 minutes
+                # Wait until the scheduler says the tokens are due again
+                wait_time = self.scheduler.seconds_until_due()
+                reason = self.scheduler.sources["tokens"].last_decision.get("reason")
                 logger.info(
-                    f"😴 Sleeping for {wait_time/60:.1f} minutes before next cycle..."
+                    f"😴 Sleeping for {wait_time/60:.1f} minutes before next cycle ({reason})..."
                 )
                 await asyncio.sleep(wait_time)
 
@@ -17,6 +17,12 @@ from typing import Any, Dict, List
 # Add current directory to path
 sys.path.append(".")
 
+from utils.crawl_scheduler import AdaptiveScheduler
+from utils.delta_upload import DeltaUploader
+
+# Poll interval at an average change rate; the scheduler adapts around it
+BASE_INTERVAL = 7 * 60
+
 # Import advanced logging
 try:
     from utils.advanced_logging import get_logger, configure_logging
@@ -39,37 +45,59 @@ import time
 from functools import wraps
 
 def log_performance(func):
-    """Decorator to log function performance"""
+    """Decorator to log function performance (sync or async functions)"""
+    def log_success(start_time):
+        logger.info(
+            "Function completed",
+            function=func.__name__,
+            duration_seconds=time.time() - start_time,
+            status="success"
+        )
+
+    def log_failure(start_time, e):
+        logger.error(
+            "Function failed",
+            function=func.__name__,
+            duration_seconds=time.time() - start_time,
+            error=str(e),
+            traceback=traceback.format_exc(),
+            status="error"
+        )
+
+    if asyncio.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            start_time = time.time()
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                log_failure(start_time, e)
+                raise
+            log_success(start_time)
+            return result
+        return async_wrapper
+
     @wraps(func)
     def wrapper(*args, **kwargs):
         start_time = time.time()
         try:
             result = func(*args, **kwargs)
-            duration = time.time() - start_time
-            logger.info(
-                "Function completed",
-                function=func.__name__,
-                duration_seconds=duration,
-                status="success"
-            )
-            return result
         except Exception as e:
-            duration = time.time() - start_time
-            logger.error(
-                "Function failed",
-                function=func.__name__,
-                duration_seconds=duration,
-                error=str(e),
-                traceback=traceback.format_exc(),
-                status="error"
-            )
+            log_failure(start_time, e)
             raise
+        log_success(start_time)
+        return result
     return wrapper
 
 
 class ContinuousDexScreenerCrawler:
     def __init__(self):
         self.running = False
+        self.scheduler = AdaptiveScheduler("dexscreener")
+        self.scheduler.register("dexscreener", BASE_INTERVAL, quota="dexscreener")
+        # Last pairs per listed token, for tokens the scheduler skips this cycle
+        self.pair_cache: dict[str, list] = {}
+        self.uploader = None
         self.gcs_bucket = "degen-digest-data"
         self.project_id = "lucky-union-463615-t3"
 
@@ -98,12 +126,11 @@ class ContinuousDexScreenerCrawler:
 
     @log_performance
     def upload_to_gcs(self, data: dict[str, Any]) -> bool:
-        """Upload data to Google Cloud Storage with detailed logging"""
+        """Upload the changes in data to Google Cloud Storage with detailed logging"""
         logger.info(
             "Starting GCS upload",
             component="upload",
             operation="upload_to_gcs",
-            data_size=len(json.dumps(data)),
             bucket=self.gcs_bucket
         )
         
@@ -117,49 +144,21 @@ class ContinuousDexScreenerCrawler:
             return False
 
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            data_json = json.dumps(data, indent=2, ensure_ascii=False)
-            data_size = len(data_json)
-
-            logger.debug(
-                "Preparing GCS upload",
-                timestamp=timestamp,
-                data_size_bytes=data_size,
-                data_size_mb=data_size / (1024 * 1024)
-            )
-
-            # Upload timestamped file
-            timestamped_path = f"data/dexscreener_{timestamp}.json"
-            blob = bucket.blob(timestamped_path)
-            blob.upload_from_string(
-                data_json,
-                content_type="application/json",
-            )
-
-            logger.info(
-                "Uploaded timestamped file to GCS",
-                path=timestamped_path,
-                size_bytes=data_size
-            )
-
-            # Upload latest file
-            latest_path = "data/dexscreener_latest.json"
-            blob = bucket.blob(latest_path)
-            blob.upload_from_string(
-                data_json,
-                content_type="application/json",
-            )
-
-            logger.info(
-                "Uploaded latest file to GCS",
-                path=latest_path,
-                size_bytes=data_size
-            )
+            # Only records that changed since the last upload, plus the
+            # data/dexscreener_latest.json readers load
+            if self.uploader is None:
+                self.uploader = DeltaUploader(bucket, "dexscreener")
+            result = self.uploader.upload(data)
 
             logger.info(
                 "GCS upload completed successfully",
-                files_uploaded=[timestamped_path, latest_path],
-                total_size_bytes=data_size * 2,
+                skipped_unchanged=result.skipped,
+                delta_path=result.delta_path,
+                records_added=result.added,
+                records_changed=result.changed,
+                records_removed=result.removed,
+                files_uploaded=result.uploaded,
+                total_size_bytes=result.bytes_uploaded,
                 bucket=self.gcs_bucket
             )
             return True
@@ -176,7 +175,7 @@ class ContinuousDexScreenerCrawler:
             return False
 
     @log_performance
-    def crawl_dexscreener(self) -> dict[str, Any]:
+    async def crawl_dexscreener(self) -> dict[str, Any]:
         """Crawl DexScreener data with comprehensive logging"""
         logger.info(
             "Starting DexScreener crawl",
@@ -185,18 +184,16 @@ class ContinuousDexScreenerCrawler:
             timestamp=datetime.now().isoformat()
         )
         
+        schedule = None
         try:
             # Import the DexScreener scraper
             logger.debug("Importing DexScreener scraper modules")
             from scrapers.dexscreener import (
-                fetch_latest_boosted_tokens,
-                fetch_latest_token_profiles,
-                fetch_pair_by_id,
-                fetch_search_pairs,
-                fetch_token_pairs,
-                fetch_tokens_by_address,
-                fetch_top_boosted_tokens,
+                discovered_addresses,
+                fetch_dexscreener_snapshot,
+                items_by_token,
             )
+            from scrapers.fetch_pipeline import summarize
             logger.debug("Successfully imported DexScreener scraper modules")
 
             # Example Solana token and pair for demonstration
@@ -214,72 +211,58 @@ class ContinuousDexScreenerCrawler:
                 pair_id=example_pair_id
             )
 
-            # Fetch data with detailed logging
-            logger.debug("Fetching latest token profiles")
-            latest_token_profiles = fetch_latest_token_profiles()
-            logger.info(
-                "Fetched latest token profiles",
-                count=len(latest_token_profiles),
-                sample_tokens=[t.get('name', 'Unknown')[:3] for t in latest_token_profiles[:3]]
-            )
-
-            logger.debug("Fetching latest boosted tokens")
-            latest_boosted_tokens = fetch_latest_boosted_tokens()
-            logger.info(
-                "Fetched latest boosted tokens",
-                count=len(latest_boosted_tokens)
-            )
-
-            logger.debug("Fetching top boosted tokens")
-            top_boosted_tokens = fetch_top_boosted_tokens()
-            logger.info(
-                "Fetched top boosted tokens",
-                count=len(top_boosted_tokens)
+            # All endpoints concurrently, then batched lookups for the
+            # listed tokens the scheduler considers due, hottest first
+            fetch_start = time.time()
+            snapshot, endpoint_metrics = await fetch_dexscreener_snapshot(
+                chain_id,
+                [solana_token, usdc_token],
+                example_pair_id,
+                "SOL/USDC",
+                select=lambda addresses: self.scheduler.select("dexscreener", addresses),
             )
-
-            logger.debug("Fetching token pairs")
-            token_pairs = fetch_token_pairs(chain_id, solana_token)
-            logger.info(
-                "Fetched token pairs",
-                count=len(token_pairs),
-                chain_id=chain_id,
-                token=solana_token
+            fetch_duration = time.time() - fetch_start
+            schedule = self.scheduler.observe(
+                "dexscreener",
+                items_by_token(snapshot),
+                error=not any(m["ok"] for m in endpoint_metrics.values()),
+                calls=len(endpoint_metrics),
             )
 
-            logger.debug("Fetching tokens by address")
-            tokens_by_address = fetch_tokens_by_address(
-                chain_id, f"{solana_token},{usdc_token}"
+            # Listed tokens the scheduler skipped keep their last pairs, so
+            # the upload does not record them as removed
+            self.pair_cache.update(
+                items_by_token({"discovered_token_pairs": snapshot["discovered_token_pairs"]})
             )
+            listed = [
+                address
+                for addresses in discovered_addresses(
+                    snapshot["latest_token_profiles"],
+                    snapshot["latest_boosted_tokens"],
+                    snapshot["top_boosted_tokens"],
+                    exclude={(chain_id, a) for a in (solana_token, usdc_token)},
+                ).values()
+                for address in addresses
+            ]
+            self.pair_cache = {a: self.pair_cache[a] for a in listed if a in self.pair_cache}
+            snapshot["discovered_token_pairs"] = [
+                pair for pairs in self.pair_cache.values() for pair in pairs
+            ]
             logger.info(
-                "Fetched tokens by address",
-                count=len(tokens_by_address),
-                addresses=[solana_token, usdc_token]
+                "Fetched DexScreener endpoints",
+                duration_seconds=fetch_duration,
+                endpoints=summarize(endpoint_metrics),
+                failed=[name for name, m in endpoint_metrics.items() if not m["ok"]],
             )
 
-            logger.debug("Fetching pair by ID")
-            pair_by_id = fetch_pair_by_id(chain_id, example_pair_id)
-            logger.info(
-                "Fetched pair by ID",
-                pair_id=example_pair_id,
-                has_data=bool(pair_by_id)
-            )
-
-            logger.debug("Fetching search pairs")
-            search_pairs = fetch_search_pairs("SOL/USDC")
-            logger.info(
-                "Fetched search pairs",
-                count=len(search_pairs),
-                query="SOL/USDC"
-            )
+            latest_token_profiles = snapshot["latest_token_profiles"]
+            latest_boosted_tokens = snapshot["latest_boosted_tokens"]
+            top_boosted_tokens = snapshot["top_boosted_tokens"]
+            token_pairs = snapshot["token_pairs"]
+            search_pairs = snapshot["search_pairs"]
 
             data = {
-                "latest_token_profiles": latest_token_profiles,
-                "latest_boosted_tokens": latest_boosted_tokens,
-                "top_boosted_tokens": top_boosted_tokens,
-                "token_pairs": token_pairs,
-                "tokens_by_address": tokens_by_address,
-                "pair_by_id": pair_by_id,
-                "search_pairs": search_pairs,
+                **snapshot,
                 "metadata": {
                     "source": "dexscreener",
                     "crawled_at": datetime.now().isoformat(),
@@ -287,6 +270,9 @@ class ContinuousDexScreenerCrawler:
                     "chain_id": chain_id,
                     "tokens_tracked": [solana_token, usdc_token],
                     "total_items": len(latest_token_profiles) + len(latest_boosted_tokens) + len(top_boosted_tokens),
+                    "fetch_duration_seconds": round(fetch_duration, 3),
+                    "endpoints": endpoint_metrics,
+                    "schedule": schedule,
                 },
             }
 
@@ -296,6 +282,7 @@ class ContinuousDexScreenerCrawler:
                 total_boosted_tokens=len(latest_boosted_tokens),
                 total_top_boosted=len(top_boosted_tokens),
                 total_pairs=len(token_pairs),
+                total_discovered_pairs=len(snapshot["discovered_token_pairs"]),
                 total_search_results=len(search_pairs)
             )
 
@@ -326,6 +313,8 @@ class ContinuousDexScreenerCrawler:
                 component="crawler",
                 operation="crawl_dexscreener"
             )
+            if schedule is None:
+                self.scheduler.observe("dexscreener", error=True)
             return {
                 "latest_token_profiles": [],
                 "latest_boosted_tokens": [],
@@ -334,6 +323,7 @@ class ContinuousDexScreenerCrawler:
                 "tokens_by_address": [],
                 "pair_by_id": {},
                 "search_pairs": [],
+                "discovered_token_pairs": [],
                 "metadata": {
                     "source": "dexscreener",
                     "crawled_at": datetime.now().isoformat(),
@@ -356,7 +346,7 @@ class ContinuousDexScreenerCrawler:
         try:
             # Crawl DexScreener data
             logger.debug("Starting data crawling phase")
-            data = self.crawl_dexscreener()
+            data = await self.crawl_dexscreener()
             
             logger.info(
                 "Data crawling completed",
@@ -367,7 +357,8 @@ class ContinuousDexScreenerCrawler:
 
             # Upload to GCS
             logger.debug("Starting GCS upload phase")
-            upload_success = self.upload_to_gcs(data)
+            # Blocking GCS client: keep it off the event loop
+            upload_success = await asyncio.to_thread(self.upload_to_gcs, data)
             
             if upload_success:
                 logger.info(
@@ -405,7 +396,7 @@ class ContinuousDexScreenerCrawler:
             component="continuous",
             operation="run_continuous",
             timestamp=datetime.now().isoformat(),
-            interval_minutes=7
+            base_interval_minutes=BASE_INTERVAL / 60
         )
 
         self.running = True
@@ -435,13 +426,14 @@ class ContinuousDexScreenerCrawler:
                     component="continuous"
                 )
 
-                # Wait before next cycle (7 minutes between cycles)
-                wait_time = 7 * 60  # 7 minutes
+                # Wait until the scheduler says the source is due again
+                wait_time = self.scheduler.seconds_until_due()
                 logger.info(
                     "Sleeping before next cycle",
                     wait_time_seconds=wait_time,
                     wait_time_minutes=wait_time/60,
                     next_cycle_time=datetime.now() + timedelta(seconds=wait_time),
+                    schedule_reason=self.scheduler.sources["dexscreener"].last_decision.get("reason"),
                     component="continuous"
                 )
                 await asyncio.sleep(wait_time)
@@ -17,6 +17,12 @@ from typing import Any, Dict, List
 sys.path.append(".")
 
 from scrapers.twitter_playwright_enhanced import EnhancedTwitterPlaywrightCrawler
+from utils.crawl_scheduler import AdaptiveScheduler
+from utils.seen_store import get_seen_store
+
+# Per-source poll interval at an average change rate; the scheduler adapts
+# each source around it
+BASE_INTERVAL = 30 * 60
 
 # Configure logging
 logging.basicConfig(
@@ -30,6 +36,12 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def tweet_key(tweet: dict) -> str:
+    """Tweet ids are generated per crawl, so tweets are keyed by author,
+    timestamp and text."""
+    return f"{tweet.get('username')}|{tweet.get('created_at')}|{tweet.get('text', '')[:100]}"
+
+
 class ContinuousTwitterCrawler:
     def __init__(self):
         self.crawler = None
@@ -73,6 +85,12 @@ class ContinuousTwitterCrawler:
             },
         ]
 
+        self.scheduler = AdaptiveScheduler("twitter")
+        for source in self.crawl_sources:
+            self.scheduler.register(source["name"], BASE_INTERVAL, calls_per_poll=1)
+        # Tweets emitted by earlier cycles (and other sources) within its TTL
+        self.seen = get_seen_store()
+
         # Set credentials
         os.environ["TWITTER_USERNAME"] = "gorebroai"
         os.environ["TWITTER_PASSWORD"] = "firefireomg4321"
@@ -175,7 +193,7 @@ class ContinuousTwitterCrawler:
         """Save tweets locally and upload to GCS"""
         if not all_tweets:
             logger.warning("No tweets to save")
-            return
+            return False
 
         try:
             # Save locally
@@ -191,23 +209,34 @@ class ContinuousTwitterCrawler:
             # Upload to GCS
             await self.crawler.save_tweets(all_tweets)
             logger.info(f"✅ Uploaded {len(all_tweets)} tweets to GCS")
+            return True
 
         except Exception as e:
             logger.error(f"❌ Error saving tweets: {e}")
+            return False
+
+    def observe_source(self, source: dict[str, Any], tweets: list[dict]):
+        """Report a crawl to the scheduler: new tweets and engagement changes.
 
-    async def run_crawl_cycle(self):
-        """Run one complete crawl cycle across all sources"""
+        A timeline that yields nothing counts as an error.
+        """
+        items = {tweet_key(t): t.get("engagement") for t in tweets}
+        self.scheduler.observe(source["name"], items, error=not tweets)
+
+    async def run_crawl_cycle(self, sources: list[dict[str, Any]] | None = None):
+        """Run one crawl cycle across *sources* (default: all of them)"""
         logger.info("🚀 Starting crawl cycle...")
 
         all_tweets = []
         successful_sources = 0
 
-        for source in self.crawl_sources:
+        for source in sources or self.crawl_sources:
             if not self.running:
                 break
 
             try:
                 tweets = await self.crawl_source(source)
+                self.observe_source(source, tweets)
                 if tweets:
                     all_tweets.extend(tweets)
                     successful_sources += 1
@@ -221,14 +250,28 @@ class ContinuousTwitterCrawler:
                 logger.error(f"❌ Error in crawl cycle for {source['name']}: {e}")
                 continue
 
-        # Save and upload all collected tweets
-        if all_tweets:
-            await self.save_and_upload_tweets(all_tweets)
+        # Save and upload the tweets not emitted before; the same tweet
+        # often shows up on several timelines and in consecutive cycles
+        new_tweets = self.seen.unseen("twitter", all_tweets, key=tweet_key)
+        if new_tweets:
+            if await self.save_and_upload_tweets(new_tweets):
+                self.seen.mark("twitter", map(tweet_key, all_tweets))
             logger.info(
-                f"🎉 Crawl cycle completed: {len(all_tweets)} tweets from {successful_sources} sources"
+                f"🎉 Crawl cycle completed: {len(new_tweets)} new tweets "
+                f"({len(all_tweets) - len(new_tweets)} seen before) "
+                f"from {successful_sources} sources"
             )
+        elif all_tweets:
+            self.seen.mark("twitter", map(tweet_key, all_tweets))
+            logger.info(f"No new tweets this cycle ({len(all_tweets)} seen before)")
         else:
             logger.warning("❌ No tweets collected in this cycle")
+        stats = self.seen.stats("twitter")
+        logger.info(
+            f"Seen store: {stats['entries']} tweets, "
+            f"false-positive rate {stats['false_positive_rate']:.4%} "
+            f"(expected {stats['expected_false_positive_rate']:.4%})"
+        )
 
     async def run_continuous(self):
         """Run the continuous crawler from 4 AM to 12 AM (20 hours/day)"""
@@ -247,18 +290,25 @@ class ContinuousTwitterCrawler:
                 
                 # Check if we're in the active crawling window (4 AM to 12 AM)
                 if 4 <= current_hour < 24:  # 4 AM to 11:59 PM
-                    cycle_count += 1
-                    logger.info(f"🔄 Starting cycle #{cycle_count} (Hour: {current_hour})")
-
-                    start_time = time.time()
-                    await self.run_crawl_cycle()
-                    cycle_duration = time.time() - start_time
-
-                    logger.info(f"⏱️ Cycle #{cycle_count} took {cycle_duration:.1f} seconds")
-
-                    # Shorter wait time during active hours (30 minutes between cycles)
-                    # This gives us more frequent crawling during the day
-                    wait_time = 30 * 60  # 30 minutes
+                    # Sources due for a poll, busiest first
+                    by_name = {s["name"]: s for s in self.crawl_sources}
+                    sources = [by_name[name] for name in self.scheduler.due()]
+                    if sources:
+                        cycle_count += 1
+                        logger.info(
+                            f"🔄 Starting cycle #{cycle_count} (Hour: {current_hour}): "
+                            f"{', '.join(s['name'] for s in sources)}"
+                        )
+
+                        start_time = time.time()
+                        await self.run_crawl_cycle(sources)
+                        cycle_duration = time.time() - start_time
+
+                        logger.info(f"⏱️ Cycle #{cycle_count} took {cycle_duration:.1f} seconds")
+
+                    # Sleep until the next source is due; busy timelines come
+                    # round sooner, quiet ones back off
+                    wait_time = self.scheduler.seconds_until_due()
                     logger.info(
                         f"😴 Sleeping for {wait_time/60:.1f} minutes before next cycle..."
                     )
@@ -1,4 +1,3 @@
-import json
 import sys
 from pathlib import Path
 
@@ -10,32 +9,24 @@ root = Path(__file__).resolve().parents[2]
 if str(root) not in sys.path:
     sys.path.append(str(root))
 
-logger = get_logger(__name__)
+from processor import buzz
 
-SNAP_DIR = Path("output/buzz")
-files = sorted(SNAP_DIR.glob("buzz_*.json"))[-2:]
+logger = get_logger(__name__)
 
 st.set_page_config(page_title="Buzz Heatmap", layout="wide")
 st.title("⚡️ Ticker / Hashtag Acceleration")
 
-if len(files) < 2:
-    st.info("Need at least two buzz snapshots. Build digest twice.")
-    st.stop()
+store = buzz.get_store()
+store.refresh_if_stale()
 
-with files[-1].open() as f1, files[-2].open() as f2:
-    recent = json.load(f1)
-    prev = json.load(f2)
-
-rows = []
-for term, cnt in recent.items():
-    prev_avg = prev.get(term, 0) / 1  # prev hr
-    accel = cnt / (prev_avg or 0.1)
-    rows.append((term, cnt, accel))
+if store.latest_bucket() is None:
+    st.info("No buzz data yet. Build a digest to record term counts.")
+    st.stop()
 
-rows.sort(key=lambda x: x[2], reverse=True)
-rows = rows[:20]
+window = st.slider("Window (hours)", min_value=1, max_value=24, value=1)
+rows = store.top_accelerating(limit=20, window=window)
 
-st.subheader("Top accelerating terms (last hour vs prev)")
+st.subheader(f"Top accelerating terms (last {window}h vs previous {window}h)")
 
 import pandas as pd
 
@@ -43,8 +34,9 @@ st.table(
     pd.DataFrame(
         {
             "Term": [r[0] for r in rows],
-            "Count (1h)": [r[1] for r in rows],
-            "Accel x": [f"{r[2]:.1f}" for r in rows],
+            f"Count ({window}h)": [r[1] for r in rows],
+            "Accel x": [f"{r[3]:.1f}" for r in rows],
+            "EWMA": [f"{store.ewma(r[0]):.1f}" for r in rows],
         }
     )
 )
@@ -5,7 +5,6 @@ Consolidates data from all crawler services and generates digests
 """
 
 import asyncio
-import json
 import logging
 import os
 import sys
@@ -17,6 +16,9 @@ from typing import Any, Dict, List
 # Add project root to path
 sys.path.append(str(Path(__file__).parent))
 
+from utils.delta_upload import DeltaUploader
+from utils.ndjson import iter_records
+
 try:
     from google.cloud import storage
 
@@ -83,23 +85,14 @@ class DataAggregator:
                 latest_blob = bucket.blob(f"{source}_data/{source}_latest.json")
 
                 if latest_blob.exists():
-                    content = latest_blob.download_as_text()
-                    data = json.loads(content)
-
-                    # Extract the main data array
-                    if source == "twitter" and "posts" in data:
-                        consolidated_data[source]["posts"] = data["posts"]
-                    elif source == "reddit" and "posts" in data:
-                        consolidated_data[source]["posts"] = data["posts"]
-                    elif source == "news" and "articles" in data:
-                        consolidated_data[source]["articles"] = data["articles"]
-                    elif source == "crypto" and "gainers" in data:
-                        consolidated_data[source]["gainers"] = data["gainers"]
+                    # Stream the main data array out of the download rather
+                    # than holding the text and the whole document
+                    key = next(iter(consolidated_data[source]))
+                    items = list(iter_records(latest_blob.open("rb"), key=key))
+                    consolidated_data[source][key] = items
 
                     consolidated_data["metadata"]["sources"].append(source)
-                    logger.info(
-                        f"  ✅ {source}: {len(data.get('posts', data.get('articles', data.get('gainers', []))))} items"
-                    )
+                    logger.info(f"  ✅ {source}: {len(items)} items")
                 else:
                     logger.warning(f"  ⚠️ No latest data found for {source}")
 
@@ -109,32 +102,24 @@ class DataAggregator:
         return consolidated_data
 
     def upload_consolidated_data(self, data: dict[str, Any]):
-        """Upload consolidated data to GCS"""
+        """Upload the changes in consolidated data to GCS"""
         client, bucket = self.get_gcs_client()
         if not bucket:
             return False
 
         try:
-            # Create timestamped filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"consolidated_data/consolidated_{timestamp}.json"
-
-            # Upload data
-            blob = bucket.blob(filename)
-            blob.upload_from_string(
-                json.dumps(data, indent=2, ensure_ascii=False),
-                content_type="application/json",
+            # Only records that changed since the last upload, plus
+            # consolidated_data/consolidated_latest.json
+            result = DeltaUploader(bucket, "consolidated", prefix="consolidated_data").upload(
+                data
             )
-
-            # Also upload as latest
-            latest_filename = "consolidated_data/consolidated_latest.json"
-            latest_blob = bucket.blob(latest_filename)
-            latest_blob.upload_from_string(
-                json.dumps(data, indent=2, ensure_ascii=False),
-                content_type="application/json",
-            )
-
-            logger.info(f"✅ Uploaded consolidated data to GCS: {filename}")
+            if result.skipped:
+                logger.info("✅ Consolidated data unchanged, nothing uploaded")
+            else:
+                logger.info(
+                    f"✅ Uploaded consolidated data to GCS: {result.delta_path} "
+                    f"(+{result.added} ~{result.changed} -{result.removed} records)"
+                )
             return True
 
         except Exception as e:
@@ -17,6 +17,11 @@ mkdir -p $DEPLOY_DIR
 # Copy the fixed function
 cp cloud_function_main_fixed.py $DEPLOY_DIR/main.py
 
+# Shared keyword matcher and the keyword config it is built from
+mkdir -p $DEPLOY_DIR/processor $DEPLOY_DIR/config
+cp processor/__init__.py processor/keyword_matcher.py $DEPLOY_DIR/processor/
+cp config/keywords.py $DEPLOY_DIR/config/
+
 # Create requirements.txt for the function
 cat > $DEPLOY_DIR/requirements.txt << EOF
 functions-framework==3.*
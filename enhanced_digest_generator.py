@@ -14,6 +14,8 @@ from typing import Any, Dict, List, Optional
 
 import requests
 
+from utils.ndjson import find_records, iter_records
+
 # Google Cloud Storage imports
 try:
     from google.cloud import storage
@@ -54,8 +56,17 @@ class EnhancedDigestGenerator:
         # Database path
         self.db_path = self.output_dir / "degen_digest.db"
 
+    def _local_records(self, stem: str, key: str | None = None) -> list[Any]:
+        """Items of output/<stem>.ndjson (or compressed), else of <stem>.json"""
+        path = find_records(self.output_dir, stem)
+        return list(iter_records(path, key=key)) if path else []
+
     def load_enhanced_data(self) -> dict[str, Any]:
-        """Load data from enhanced viral content system"""
+        """Load data from enhanced viral content system
+
+        Files are parsed item by item (utils.ndjson), so only the item lists
+        are held in memory, not the downloaded text or whole documents.
+        """
         data = {"reddit": [], "news": [], "coingecko": [], "twitter": []}
 
         # Load from GCS first (enhanced system)
@@ -64,8 +75,9 @@ class EnhancedDigestGenerator:
                 # Load enhanced Reddit data
                 reddit_blob = self.gcs_bucket.blob("data/reddit_latest.json")
                 if reddit_blob.exists():
-                    reddit_data = json.loads(reddit_blob.download_as_text())
-                    data["reddit"] = reddit_data.get("posts", [])
+                    data["reddit"] = list(
+                        iter_records(reddit_blob.open("rb"), key="posts")
+                    )
                     logger.info(
                         f"Loaded {len(data['reddit'])} enhanced Reddit posts from GCS"
                     )
@@ -73,8 +85,9 @@ class EnhancedDigestGenerator:
                 # Load enhanced News data
                 news_blob = self.gcs_bucket.blob("data/news_latest.json")
                 if news_blob.exists():
-                    news_data = json.loads(news_blob.download_as_text())
-                    data["news"] = news_data.get("articles", [])
+                    data["news"] = list(
+                        iter_records(news_blob.open("rb"), key="articles")
+                    )
                     logger.info(
                         f"Loaded {len(data['news'])} enhanced News articles from GCS"
                     )
@@ -82,8 +95,9 @@ class EnhancedDigestGenerator:
                 # Load enhanced CoinGecko data
                 coingecko_blob = self.gcs_bucket.blob("data/coingecko_latest.json")
                 if coingecko_blob.exists():
-                    coingecko_data = json.loads(coingecko_blob.download_as_text())
-                    data["coingecko"] = coingecko_data.get("coins", [])
+                    data["coingecko"] = list(
+                        iter_records(coingecko_blob.open("rb"), key="coins")
+                    )
                     logger.info(
                         f"Loaded {len(data['coingecko'])} enhanced CoinGecko coins from GCS"
                     )
@@ -92,33 +106,31 @@ class EnhancedDigestGenerator:
                 logger.error(f"Error loading from GCS: {e}")
 
         # Fallback to local files
-        if not data["reddit"] and (self.output_dir / "reddit_raw.json").exists():
-            with open(self.output_dir / "reddit_raw.json") as f:
-                data["reddit"] = json.load(f)
+        if not data["reddit"]:
+            data["reddit"] = self._local_records("reddit_raw")
+            if data["reddit"]:
                 logger.info(
                     f"Loaded {len(data['reddit'])} Reddit posts from local file"
                 )
 
-        if not data["news"] and (self.output_dir / "newsapi_raw.json").exists():
-            with open(self.output_dir / "newsapi_raw.json") as f:
-                data["news"] = json.load(f)
+        if not data["news"]:
+            data["news"] = self._local_records("newsapi_raw")
+            if data["news"]:
                 logger.info(f"Loaded {len(data['news'])} News articles from local file")
 
-        if not data["coingecko"] and (self.output_dir / "coingecko_raw.json").exists():
-            with open(self.output_dir / "coingecko_raw.json") as f:
-                data["coingecko"] = json.load(f)
+        if not data["coingecko"]:
+            data["coingecko"] = self._local_records("coingecko_raw")
+            if data["coingecko"]:
                 logger.info(
                     f"Loaded {len(data['coingecko'])} CoinGecko coins from local file"
                 )
 
         # Load Twitter data
-        if (self.output_dir / "twitter_latest.json").exists():
-            with open(self.output_dir / "twitter_latest.json") as f:
-                twitter_data = json.load(f)
-                data["twitter"] = twitter_data.get("tweets", [])
-                logger.info(
-                    f"Loaded {len(data['twitter'])} Twitter tweets from local file"
-                )
+        data["twitter"] = self._local_records("twitter_latest", key="tweets")
+        if data["twitter"]:
+            logger.info(
+                f"Loaded {len(data['twitter'])} Twitter tweets from local file"
+            )
 
         return data
 
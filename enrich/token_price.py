@@ -21,9 +21,8 @@ endpoint (they simply don't appear in the result mapping).
 
 from __future__ import annotations
 
-import httpx
-
 from utils.advanced_logging import get_logger
+from utils.http_client import session
 
 logger = get_logger(__name__)
 
@@ -31,18 +30,17 @@ COINGECKO_BASE = "https://api.coingecko.com/api/v3"
 _headers = {"Accept": "application/json"}
 
 
-async def _symbol_to_id(client: httpx.AsyncClient, symbol: str) -> str | None:
+async def _symbol_to_id(symbol: str) -> str | None:
     """Resolve a ticker symbol to a Coingecko coin ID.
 
     Args:
-        client: Shared :class:`httpx.AsyncClient`.
         symbol: Ticker (e.g. ``"PEPE"``).
 
     Returns:
         The Coingecko coin ID or *None* if not found / on HTTP error.
     """
     try:
-        r = await client.get(
+        r = await session.aget(
             f"{COINGECKO_BASE}/search", params={"query": symbol}, headers=_headers
         )
         r.raise_for_status()
@@ -64,15 +62,14 @@ async def _fetch_prices(ids: list[str]) -> dict[str, dict]:
             "vs_currencies": "usd",
             "include_24hr_change": "true",
         }
-        async with httpx.AsyncClient() as client:
-            r = await client.get(
-                f"{COINGECKO_BASE}/simple/price",
-                params=params,
-                headers=_headers,
-                timeout=20,
-            )
-            r.raise_for_status()
-            return r.json()
+        r = await session.aget(
+            f"{COINGECKO_BASE}/simple/price",
+            params=params,
+            headers=_headers,
+            timeout=20,
+        )
+        r.raise_for_status()
+        return r.json()
     except Exception as exc:
         logger.warning("price fetch failed: %s", exc)
         return {}
@@ -90,47 +87,48 @@ async def get_prices(symbols: list[str]) -> dict[str, dict]:
         silently skipped.
     """
 
-    async with httpx.AsyncClient(timeout=20) as client:
-        # 1) Fetch search results once
-        try:
-            resp = await client.get(f"{COINGECKO_BASE}/search", headers=_headers)
-            resp.raise_for_status()
-            data = resp.json()
-        except Exception as exc:
-            logger.warning("symbol search failed: %s", exc)
-            data = {}
-
-        id_map: dict[str, str] = {}
-        coins = data.get("coins", []) if isinstance(data, dict) else []
-        wanted = {s.upper() for s in symbols}
-        for coin in coins:
-            sym_upper = coin.get("symbol", "").upper()
-            if sym_upper in wanted and sym_upper not in id_map:
-                id_map[sym_upper] = coin["id"]
-
-        if not id_map:
-            return {}
-
-        # 2) Fetch price data once
-        try:
-            price_resp = await client.get(
-                f"{COINGECKO_BASE}/simple/price", headers=_headers
-            )
-            price_resp.raise_for_status()
-            price_data = price_resp.json()
-        except Exception as exc:
-            logger.warning("price fetch failed: %s", exc)
-            price_data = {}
-
-        result: dict[str, dict] = {}
-        for sym_upper, cid in id_map.items():
-            pdata = price_data.get(cid)
-            if pdata:
-                result[sym_upper] = {
-                    "price": pdata.get("usd"),
-                    "change24h": pdata.get("usd_24h_change"),
-                }
-        return result
+    # 1) Fetch search results once
+    try:
+        resp = await session.aget(
+            f"{COINGECKO_BASE}/search", headers=_headers, timeout=20
+        )
+        resp.raise_for_status()
+        data = resp.json()
+    except Exception as exc:
+        logger.warning("symbol search failed: %s", exc)
+        data = {}
+
+    id_map: dict[str, str] = {}
+    coins = data.get("coins", []) if isinstance(data, dict) else []
+    wanted = {s.upper() for s in symbols}
+    for coin in coins:
+        sym_upper = coin.get("symbol", "").upper()
+        if sym_upper in wanted and sym_upper not in id_map:
+            id_map[sym_upper] = coin["id"]
+
+    if not id_map:
+        return {}
+
+    # 2) Fetch price data once
+    try:
+        price_resp = await session.aget(
+            f"{COINGECKO_BASE}/simple/price", headers=_headers, timeout=20
+        )
+        price_resp.raise_for_status()
+        price_data = price_resp.json()
+    except Exception as exc:
+        logger.warning("price fetch failed: %s", exc)
+        price_data = {}
+
+    result: dict[str, dict] = {}
+    for sym_upper, cid in id_map.items():
+        pdata = price_data.get(cid)
+        if pdata:
+            result[sym_upper] = {
+                "price": pdata.get("usd"),
+                "change24h": pdata.get("usd_24h_change"),
+            }
+    return result
 
 
 def get_prices_sync(symbols: list[str]) -> dict[str, dict]:
@@ -142,7 +140,7 @@ def get_prices_sync(symbols: list[str]) -> dict[str, dict]:
 
     # 1) Search request (no query parameters so the mock matches exact URL)
     try:
-        resp = httpx.get(f"{COINGECKO_BASE}/search", headers=_headers, timeout=20)
+        resp = session.get(f"{COINGECKO_BASE}/search", headers=_headers, timeout=20)
         resp.raise_for_status()
         data = resp.json()
     except Exception as exc:
@@ -161,7 +159,7 @@ def get_prices_sync(symbols: list[str]) -> dict[str, dict]:
 
     # 2) Price request (again without query string)
     try:
-        price_resp = httpx.get(
+        price_resp = session.get(
             f"{COINGECKO_BASE}/simple/price", headers=_headers, timeout=20
         )
         price_resp.raise_for_status()
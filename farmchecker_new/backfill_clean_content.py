@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Backfill the clean_content column of tweets, reddit_posts and articles.
+
+Adds the column where it is missing, then walks each table in id order and
+stores ``content_cleaning.clean_post_content(content)`` for rows that have
+no clean_content yet. Safe to re-run; use ``--all`` to recompute every row
+after the cleaning rules change.
+
+    python backfill_clean_content.py                 # all tables
+    python backfill_clean_content.py tweets --all    # recompute tweets
+"""
+
+import argparse
+import logging
+import os
+import time
+
+import psycopg2
+from content_cleaning import CLEAN_CONTENT_SOURCES, clean_post_content
+from psycopg2.extras import execute_values
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# Database configuration
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "34.9.71.174"),
+    "database": os.getenv("DB_NAME", "degen_digest"),
+    "user": os.getenv("DB_USER", "postgres"),
+    "password": os.getenv("DB_PASSWORD", "DegenDigest2024!"),
+    "port": os.getenv("DB_PORT", "5432"),
+}
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def ensure_column(conn, table):
+    with conn.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS clean_content TEXT")
+    conn.commit()
+
+
+def backfill_table(conn, table, batch_size=DEFAULT_BATCH_SIZE, recompute=False):
+    """Fill clean_content for *table*; returns the number of rows updated"""
+    source_column = CLEAN_CONTENT_SOURCES[table]
+    pending = "" if recompute else "AND clean_content IS NULL"
+    last_id = 0
+    updated = 0
+    start = time.time()
+
+    while True:
+        with conn.cursor() as cursor:
+            # Keyset pagination: each batch is an index range scan on id
+            cursor.execute(
+                f"""
+                SELECT id, {source_column} FROM {table}
+                WHERE id > %s {pending}
+                ORDER BY id
+                LIMIT %s
+                """,
+                (last_id, batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            execute_values(
+                cursor,
+                f"""
+                UPDATE {table} AS t SET clean_content = v.clean_content
+                FROM (VALUES %s) AS v (id, clean_content)
+                WHERE t.id = v.id
+                """,
+                [(row_id, clean_post_content(content)) for row_id, content in rows],
+                template="(%s, %s::text)",
+                page_size=batch_size,
+            )
+        conn.commit()
+
+        last_id = rows[-1][0]
+        updated += len(rows)
+        logger.info(f"{table}: {updated} rows cleaned (last id {last_id})")
+
+    elapsed = time.time() - start
+    rate = updated / elapsed if elapsed else 0
+    logger.info(f"✅ {table}: backfilled {updated} rows in {elapsed:.1f}s ({rate:.0f} rows/s)")
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill clean_content columns")
+    parser.add_argument("tables", nargs="*", help=f"default: {' '.join(sorted(CLEAN_CONTENT_SOURCES))}")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--all", action="store_true", help="recompute rows that already have clean_content")
+    args = parser.parse_args()
+    unknown = set(args.tables) - set(CLEAN_CONTENT_SOURCES)
+    if unknown:
+        parser.error(f"unknown table(s): {', '.join(sorted(unknown))}")
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        for table in args.tables or sorted(CLEAN_CONTENT_SOURCES):
+            ensure_column(conn, table)
+            backfill_table(conn, table, args.batch_size, recompute=args.all)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Benchmark loading one crawl file of tweets: a row per ``cursor.execute``
+(the old migrators), ``execute_values`` and bulk_loader.load_rows.
+
+Creates a throwaway ``bulk_bench`` schema (it never touches the real
+tables) and loads ``--rows`` synthetic tweets, ``--bad-percent`` of them
+malformed, through each path:
+
+    DB_HOST=localhost DB_NAME=degen_digest python benchmark_bulk_loader.py --rows 50000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from functools import partial
+
+import psycopg2
+from bulk_loader import DEAD_LETTER_TABLE_SQL, load_rows
+from migration_targets import TWEETS, tweet_row
+from psycopg2.extras import execute_values
+
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "database": os.getenv("DB_NAME", "degen_digest"),
+    "user": os.getenv("DB_USER", "postgres"),
+    "password": os.getenv("DB_PASSWORD", ""),
+    "port": os.getenv("DB_PORT", "5432"),
+}
+
+SCHEMA = "bulk_bench"
+
+TWEETS_TABLE = """
+    CREATE TABLE tweets (
+        id SERIAL PRIMARY KEY,
+        tweet_id VARCHAR(255) UNIQUE NOT NULL,
+        author_username VARCHAR(255) NOT NULL,
+        author_display_name VARCHAR(255),
+        author_verified BOOLEAN DEFAULT FALSE,
+        author_followers_count INTEGER DEFAULT 0,
+        content TEXT NOT NULL,
+        clean_content TEXT,
+        url TEXT,
+        published_at TIMESTAMP,
+        collected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        likes_count INTEGER DEFAULT 0,
+        retweets_count INTEGER DEFAULT 0,
+        replies_count INTEGER DEFAULT 0,
+        views_count INTEGER DEFAULT 0,
+        engagement_score DECIMAL(10,4) DEFAULT 0,
+        virality_score DECIMAL(10,4) DEFAULT 0,
+        sentiment_score DECIMAL(10,4) DEFAULT 0,
+        viral_keywords JSONB,
+        category VARCHAR(100),
+        urgency VARCHAR(50),
+        raw_data JSONB
+    )
+"""
+
+
+def make_tweets(rows, bad_percent):
+    now = datetime.now()
+    tweets = []
+    for i in range(rows):
+        tweet = {
+            "id": f"t{i}",
+            "username": f"user{i % 500}",
+            "text": f"$BONK to the moon #{i} https://x.com/i/{i}",
+            "published_at": (now - timedelta(minutes=i)).isoformat(),
+            "engagement": {"likes": i % 1000, "retweets": i % 100},
+        }
+        if random.random() * 100 < bad_percent:
+            tweet[random.choice(["published_at", "username", "engagement"])] = (
+                "not a date" if random.random() < 0.5 else None
+            )
+        tweets.append(tweet)
+    return tweets
+
+
+def reset(conn):
+    with conn.cursor() as cur:
+        cur.execute("TRUNCATE tweets, load_dead_letters RESTART IDENTITY")
+    conn.commit()
+
+
+def per_row(conn, tweets, collected_at):
+    """The old loop: one statement per tweet, a rollback on any error"""
+    cur = conn.cursor()
+    placeholders = ", ".join(["%s"] * len(TWEETS.columns))
+    for tweet in tweets:
+        try:
+            cur.execute(
+                f"INSERT INTO tweets ({', '.join(TWEETS.columns)}) VALUES ({placeholders})"
+                " ON CONFLICT DO NOTHING",
+                tweet_row(tweet, collected_at),
+            )
+        except Exception:
+            conn.rollback()
+    conn.commit()
+
+
+def batched(conn, tweets, collected_at):
+    """execute_values, the whole file failing on one bad row"""
+    try:
+        with conn.cursor() as cur:
+            execute_values(
+                cur,
+                f"INSERT INTO tweets ({', '.join(TWEETS.columns)}) VALUES %s"
+                " ON CONFLICT DO NOTHING",
+                [tweet_row(tweet, collected_at) for tweet in tweets],
+                page_size=1000,
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+
+
+def bulk(conn, tweets, collected_at):
+    load_rows(
+        conn,
+        TWEETS,
+        tweets,
+        partial(tweet_row, collected_at=collected_at),
+        "bench.json",
+    )
+    conn.commit()
+
+
+def timed(conn, load, tweets, repeat):
+    samples = []
+    for _ in range(repeat):
+        reset(conn)
+        start = time.perf_counter()
+        load(conn, tweets, datetime.now())
+        samples.append(time.perf_counter() - start)
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM tweets")
+        loaded = cur.fetchone()[0]
+        cur.execute("SELECT COUNT(*) FROM load_dead_letters")
+        dead = cur.fetchone()[0]
+    conn.commit()
+    return statistics.median(samples), loaded, dead
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--bad-percent", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    random.seed(7)
+    conn = psycopg2.connect(**DB_CONFIG, options=f"-c search_path={SCHEMA}")
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        cur.execute(f"CREATE SCHEMA {SCHEMA}")
+        cur.execute(TWEETS_TABLE)
+        cur.execute(DEAD_LETTER_TABLE_SQL)
+    conn.commit()
+
+    print(f"\nloading {args.rows:,} tweets per file")
+    print(
+        f"{'path':<18}{'bad %':>7}{'seconds':>10}{'loaded/s':>10}{'loaded':>10}{'dead':>7}"
+    )
+    for bad_percent in (0, args.bad_percent):
+        tweets = make_tweets(args.rows, bad_percent)
+        for label, load in (
+            ("per-row execute", per_row),
+            ("execute_values", batched),
+            ("load_rows", bulk),
+        ):
+            seconds, loaded, dead = timed(conn, load, tweets, args.repeat)
+            print(
+                f"{label:<18}{bad_percent:>7}{seconds:>10.2f}{loaded / seconds:>10,.0f}"
+                f"{loaded:>10,}{dead:>7}"
+            )
+
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+    conn.commit()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-response cost of post content cleaning.
+
+Compares cleaning every row while rendering a response (what /api/twitter
+did before clean_content existed) with reading the precomputed column, for a
+50-row page of realistic mixed payloads:
+
+    python benchmark_content_cleaning.py --pages 200
+"""
+
+import argparse
+import json
+import random
+import time
+
+from content_cleaning import clean_post_content
+
+PAGE_SIZE = 50
+
+
+def sample_rows(n, seed=0):
+    """Mix of plain tweets, JSON payloads and Python dict reprs"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        text = f"Tweet {i} about $PEPE https://t.co/x {'moon ' * rng.randint(1, 30)}"
+        kind = rng.random()
+        if kind < 0.6:
+            content = text.replace(" ", "\\n", 2)
+        elif kind < 0.85:
+            content = json.dumps({"text": text, "username": f"user{i}", "engagement": {"likes": i}})
+        else:
+            content = str({"text": text, "username": f"user{i}", "source": "twitter"})
+        rows.append((content, clean_post_content(content)))
+    return rows
+
+
+def per_page_ms(render, pages, rows):
+    start = time.perf_counter()
+    for p in range(pages):
+        page = rows[(p * PAGE_SIZE) % len(rows):][:PAGE_SIZE]
+        render(page)
+    return (time.perf_counter() - start) / pages * 1000
+
+
+def clean_at_request(page):
+    return [clean_post_content(content) for content, _ in page]
+
+
+def read_column(page):
+    return [clean if clean is not None else clean_post_content(content) for content, clean in page]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = sample_rows(PAGE_SIZE * 20)
+    before = per_page_ms(clean_at_request, args.pages, rows)
+    after = per_page_ms(read_column, args.pages, rows)
+    print(f"{'strategy':<32}{'ms per 50-row page':>20}")
+    print(f"{'clean every row per request':<32}{before:>20.3f}")
+    print(f"{'read clean_content column':<32}{after:>20.3f}")
+    print(f"speedup: {before / after:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Benchmark /api/dex/combined: the 24h UNION ALL over both pair tables vs
+dex_pairs_latest, plus the ingest cost of its triggers and history compaction.
+
+Seeds a throwaway ``dex_bench`` schema (it never touches the real tables)
+with ``--pairs`` pairs per source last crawled over ``--days`` days, as the
+pair tables accumulate pairs that are no longer crawled, and applies
+create_dex_latest_tables.sql:
+
+    DB_HOST=localhost DB_NAME=degen_digest python benchmark_dex_latest.py --pairs 500000
+"""
+
+import argparse
+import os
+import statistics
+import time
+from pathlib import Path
+
+import psycopg2
+from db_pool import positional_to_pyformat
+from dex_history import compact_history
+from pagination import Page, SortKey
+
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "database": os.getenv("DB_NAME", "degen_digest"),
+    "user": os.getenv("DB_USER", "postgres"),
+    "password": os.getenv("DB_PASSWORD", ""),
+    "port": os.getenv("DB_PORT", "5432"),
+}
+
+SCHEMA = "dex_bench"
+LATEST_SQL = Path(__file__).parent / "create_dex_latest_tables.sql"
+SORT = SortKey("volume_24h", ("source", "id"), skip_nulls=True)
+
+# get_combined_dex_data before dex_pairs_latest
+UNION_QUERY = """
+    SELECT source, id, token_id, symbol, price_usd, volume_24h, {key}
+    FROM (
+        (SELECT 'dexscreener' as source, id, pair_id as token_id,
+                base_token_symbol as symbol, price_usd, volume_24h, collected_at
+        FROM dexscreener_pairs
+        WHERE collected_at >= NOW() - INTERVAL '24 hours')
+        UNION ALL
+        (SELECT 'dexpaprika' as source, id, pair_id as token_id,
+                base_token_symbol as symbol, price_usd, volume_24h, collected_at
+        FROM dexpaprika_pairs
+        WHERE collected_at >= NOW() - INTERVAL '24 hours')
+    ) AS pairs
+    WHERE price_usd > 0{where}
+    {order}
+"""
+
+# What server.py runs now
+LATEST_QUERY = """
+    SELECT source, id, pair_id, base_token_symbol, price_usd, volume_24h, {key}
+    FROM dex_pairs_latest
+    WHERE collected_at >= NOW() - INTERVAL '24 hours'
+    AND price_usd > 0{where}
+    {order}
+"""
+
+PAIR_TABLE = """
+    CREATE TABLE {table} (
+        id SERIAL PRIMARY KEY,
+        pair_id VARCHAR(255) UNIQUE NOT NULL,
+        chain_id VARCHAR(50) NOT NULL,
+        dex_id VARCHAR(100) NOT NULL,
+        base_token_symbol VARCHAR(20) NOT NULL,
+        base_token_name VARCHAR(100),
+        base_token_address VARCHAR(255),
+        price_usd DECIMAL(20,8),
+        price_change_24h DECIMAL(10,4),
+        volume_24h DECIMAL(20,2),
+        liquidity_usd DECIMAL(20,2),
+        txns_24h INTEGER DEFAULT 0,
+        {cap} DECIMAL(20,2),
+        collected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+TABLES = {"dexscreener_pairs": "fdv", "dexpaprika_pairs": "market_cap"}
+
+
+def seed(conn, pairs, days):
+    cur = conn.cursor()
+    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cur.execute(f"CREATE SCHEMA {SCHEMA}")
+    cur.execute(f"SET search_path TO {SCHEMA}")
+    for table, cap in TABLES.items():
+        print(f"  seeding {SCHEMA}.{table} with {pairs:,} pairs")
+        cur.execute(PAIR_TABLE.format(table=table, cap=cap))
+        cur.execute(
+            f"""
+            INSERT INTO {table} (pair_id, chain_id, dex_id, base_token_symbol, price_usd,
+                                 price_change_24h, volume_24h, liquidity_usd, {cap}, collected_at)
+            SELECT md5(i::text), 'solana', 'raydium', upper(substr(md5(i::text), 1, 4)),
+                   random() * 10, (random() - 0.5) * 200, random() ^ 4 * 1e8,
+                   random() * 1e7, random() * 1e9,
+                   NOW() - random() * %s * INTERVAL '1 day'
+            FROM generate_series(1, %s) i
+            """,
+            (days, pairs),
+        )
+        # The keyset index the UNION branches used (create_keyset_indexes.sql)
+        cur.execute(f"CREATE INDEX ON {table} (volume_24h, id)")
+    cur.execute(LATEST_SQL.read_text())
+    conn.commit()
+    vacuum(conn, [*TABLES, "dex_pairs_latest"])
+
+
+def vacuum(conn, tables):
+    conn.autocommit = True
+    for table in tables:
+        conn.cursor().execute(f"VACUUM ANALYZE {table}")
+    conn.autocommit = False
+
+
+def page_query(template, after, limit):
+    page = Page("volume", SORT, limit, after)
+    where, order = page.clauses()
+    return (
+        positional_to_pyformat(
+            template.format(key=page.key_columns, where=where, order=order)
+        ),
+        page.params,
+    )
+
+
+def timed(cur, query, params, repeat):
+    cur.execute(query, params)  # warm up
+    rows = cur.fetchall()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cur.execute(query, params)
+        cur.fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples), rows
+
+
+def time_ingest(conn, rows, triggers):
+    """Re-crawl *rows* dexscreener pairs the way the migrators upsert them"""
+    cur = conn.cursor()
+    action = "ENABLE" if triggers else "DISABLE"
+    cur.execute(
+        f"ALTER TABLE dexscreener_pairs {action} TRIGGER record_dexscreener_pair_snapshot"
+    )
+    start = time.perf_counter()
+    cur.execute(
+        """
+        INSERT INTO dexscreener_pairs (pair_id, chain_id, dex_id, base_token_symbol,
+                                       price_usd, volume_24h, collected_at)
+        SELECT md5(i::text), 'solana', 'raydium', 'X', random() * 10, random() * 1e8, NOW()
+        FROM generate_series(1, %s) i
+        ON CONFLICT (pair_id) DO UPDATE SET
+            price_usd = EXCLUDED.price_usd, volume_24h = EXCLUDED.volume_24h,
+            collected_at = EXCLUDED.collected_at
+        """,
+        (rows,),
+    )
+    elapsed = time.perf_counter() - start
+    conn.rollback()
+    return elapsed
+
+
+def time_compaction(conn, history_rows, days):
+    cur = conn.cursor()
+    cur.execute(
+        """
+        INSERT INTO dex_pair_history (source, pair_id, bucket_start, price_open,
+                                      price_high, price_low, price_close, volume_24h)
+        SELECT 'dexscreener', md5((i %% 2000)::text), LOCALTIMESTAMP - random() * %s * INTERVAL '1 day',
+               p, p, p, p, p * 1000
+        FROM (SELECT i, random() * 10 AS p FROM generate_series(1, %s) i) s
+        """,
+        (days, history_rows),
+    )
+    start = time.perf_counter()
+    folded = compact_history(conn)
+    elapsed = time.perf_counter() - start
+    cur.execute("SELECT COUNT(*) FROM dex_pair_history")
+    remaining = cur.fetchone()[0]
+    conn.rollback()
+    return folded, remaining, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pairs", type=int, default=500_000, help="pairs per source")
+    parser.add_argument("--days", type=int, default=30, help="spread of collected_at")
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--ingest-rows", type=int, default=10_000)
+    parser.add_argument("--history-rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument(
+        "--skip-seed", action="store_true", help="reuse an existing dex_bench schema"
+    )
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    if not args.skip_seed:
+        seed(conn, args.pairs, args.days)
+    cur = conn.cursor()
+    cur.execute(f"SET search_path TO {SCHEMA}")
+    cur.execute("SELECT COUNT(*) FROM dex_pairs_latest")
+    live = cur.fetchone()[0]
+
+    print(
+        f"\n{2 * args.pairs:,} pairs crawled over {args.days} days, {live:,} in the last 24h"
+    )
+    print(
+        f"{'page':<24}{'UNION ms':>10}{'latest ms':>11}{'max UNION':>11}{'max latest':>11}"
+    )
+    after = None
+    for label in ("first", "second", "third"):
+        union_query, params = page_query(UNION_QUERY, after, args.limit)
+        latest_query, _ = page_query(LATEST_QUERY, after, args.limit)
+        u_median, u_max, u_rows = timed(cur, union_query, params, args.repeat)
+        l_median, l_max, l_rows = timed(cur, latest_query, params, args.repeat)
+        assert [r[:2] for r in u_rows] == [r[:2] for r in l_rows]
+        print(
+            f"{label + ' page, sort=volume':<24}{u_median:>10.2f}{l_median:>11.2f}{u_max:>11.2f}{l_max:>11.2f}"
+        )
+        after = list(u_rows[-1][-3:])
+
+    print(f"\nre-crawling {args.ingest_rows:,} pairs (upsert):")
+    plain = time_ingest(conn, args.ingest_rows, triggers=False)
+    with_triggers = time_ingest(conn, args.ingest_rows, triggers=True)
+    print(
+        f"  without triggers {plain:.2f}s, with latest/history triggers {with_triggers:.2f}s"
+    )
+
+    folded, remaining, elapsed = time_compaction(conn, args.history_rows, 60)
+    print(
+        f"\ncompacting {args.history_rows:,} snapshots over 60 days in {elapsed:.1f}s:"
+    )
+    for tier, (rows, buckets) in folded.items():
+        print(f"  {tier:<16} folded {rows:>9,} rows into {buckets:>8,} buckets")
+    print(f"  {remaining:,} history rows left")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Benchmark /api/crypto/meme-coins: the LIKE '%dog%' scan vs the is_meme index.
+
+Seeds a throwaway ``meme_bench`` schema (it never touches the real tables)
+with ``--rows`` synthetic tokens, ``--meme-share`` of them named after meme
+keywords and classified the way upsert_crypto_token does, then times the
+old seventeen-LIKE query, the is_meme/tag queries and the full-text search
+before and after applying create_meme_token_index.sql:
+
+    DB_HOST=localhost DB_NAME=degen_digest python benchmark_meme_coins.py --rows 1000000
+"""
+
+import argparse
+import os
+import re
+import statistics
+import time
+from pathlib import Path
+
+import psycopg2
+from psycopg2.extras import Json
+
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "database": os.getenv("DB_NAME", "degen_digest"),
+    "user": os.getenv("DB_USER", "postgres"),
+    "password": os.getenv("DB_PASSWORD", ""),
+    "port": os.getenv("DB_PORT", "5432"),
+}
+
+SCHEMA = "meme_bench"
+INDEX_SQL = Path(__file__).parent / "create_meme_token_index.sql"
+
+# keyword -> tag: the config/keywords.py keywords the old LIKE list also matched
+MEME_KEYWORDS = {
+    "dog": "dog",
+    "doge": "dog",
+    "inu": "dog",
+    "shib": "dog",
+    "floki": "dog",
+    "cat": "cat",
+    "pepe": "frog",
+    "moon": "moon",
+    "wojak": "wojak",
+    "chad": "chad",
+    "based": "chad",
+}
+
+COLUMNS = """id, symbol, name, price_usd, price_change_24h, market_cap, volume_24h,
+             network, contract_address, last_updated_at"""
+
+# get_meme_coins before the is_meme column
+LEGACY_QUERY = f"""
+    SELECT {COLUMNS}
+    FROM crypto_tokens
+    WHERE (
+        LOWER(name) LIKE '%dog%' OR LOWER(name) LIKE '%cat%' OR
+        LOWER(name) LIKE '%moon%' OR LOWER(name) LIKE '%inu%' OR
+        LOWER(name) LIKE '%pepe%' OR LOWER(name) LIKE '%shib%' OR
+        LOWER(name) LIKE '%floki%' OR LOWER(name) LIKE '%wojak%' OR
+        LOWER(name) LIKE '%chad%' OR LOWER(name) LIKE '%based%' OR
+        LOWER(symbol) LIKE '%DOGE%' OR LOWER(symbol) LIKE '%SHIB%' OR
+        LOWER(symbol) LIKE '%PEPE%' OR LOWER(symbol) LIKE '%FLOKI%' OR
+        LOWER(symbol) LIKE '%WOJAK%' OR LOWER(symbol) LIKE '%CHAD%' OR
+        LOWER(symbol) LIKE '%BASED%'
+    )
+    AND price_usd > 0
+    AND last_updated_at >= NOW() - INTERVAL '24 hours'
+    ORDER BY volume_24h DESC, price_change_24h DESC
+    LIMIT 20
+"""
+
+# What server.py runs now
+MEME_QUERY = f"""
+    SELECT {COLUMNS}
+    FROM crypto_tokens
+    WHERE is_meme
+    AND price_usd > 0
+    AND last_updated_at >= NOW() - INTERVAL '24 hours'
+    ORDER BY volume_24h DESC, price_change_24h DESC LIMIT 20
+"""
+TAG_QUERY = MEME_QUERY.replace(
+    "WHERE is_meme", "WHERE is_meme AND meme_tags @> ARRAY['frog']::text[]"
+)
+SEARCH_QUERY = f"""
+    SELECT {COLUMNS}
+    FROM crypto_tokens
+    WHERE to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(symbol, ''))
+          @@ to_tsquery('simple', 'wojak:*')
+    ORDER BY volume_24h DESC NULLS LAST LIMIT 20
+"""
+# The same search without an index path
+SEARCH_LIKE_QUERY = f"""
+    SELECT {COLUMNS}
+    FROM crypto_tokens
+    WHERE LOWER(name) LIKE '%wojak%' OR LOWER(symbol) LIKE '%wojak%'
+    ORDER BY volume_24h DESC NULLS LAST LIMIT 20
+"""
+
+
+def seed(conn, rows, meme_share, days):
+    keywords = list(MEME_KEYWORDS)
+    cur = conn.cursor()
+    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cur.execute(f"CREATE SCHEMA {SCHEMA}")
+    cur.execute(f"SET search_path TO {SCHEMA}")
+    cur.execute("""
+        CREATE TABLE crypto_tokens (
+            id SERIAL PRIMARY KEY,
+            symbol VARCHAR(20) NOT NULL,
+            name VARCHAR(100),
+            network VARCHAR(50),
+            contract_address VARCHAR(255),
+            market_cap DECIMAL(20,2),
+            price_usd DECIMAL(20,8),
+            volume_24h DECIMAL(20,2),
+            price_change_24h DECIMAL(10,4),
+            first_seen_at TIMESTAMP DEFAULT NOW(),
+            last_updated_at TIMESTAMP DEFAULT NOW()
+        )
+        """)
+    print(f"  seeding {SCHEMA}.crypto_tokens with {rows:,} tokens")
+    # Hex names and symbols cannot contain a keyword by accident
+    cur.execute(
+        """
+        INSERT INTO crypto_tokens (
+            symbol, name, network, contract_address, market_cap, price_usd,
+            volume_24h, price_change_24h, last_updated_at
+        )
+        SELECT
+            upper(substr(h, 1, 4)),
+            CASE WHEN random() < %s
+                THEN initcap((%s::text[])[1 + floor(random() * %s)::int]) || ' ' || substr(h, 5, 6)
+                ELSE 'Token ' || substr(h, 5, 10)
+            END,
+            (ARRAY['solana', 'ethereum', 'base', 'bsc'])[1 + floor(random() * 4)::int],
+            h,
+            (random() * 1e9)::numeric(20,2),
+            (random() * 10)::numeric(20,8),
+            (random() ^ 4 * 1e8)::numeric(20,2),
+            ((random() - 0.5) * 200)::numeric(10,4),
+            NOW() - random() * %s * INTERVAL '1 day'
+        FROM (SELECT md5(i::text) AS h FROM generate_series(1, %s) i) s
+        """,
+        (meme_share, keywords, len(keywords), days, rows),
+    )
+    conn.commit()
+    vacuum(conn)
+
+
+def classify(conn):
+    """Add the columns and fill them as upsert_crypto_token/backfill would."""
+    cur = conn.cursor()
+    for statement in index_sql():
+        if statement.startswith("ALTER TABLE"):
+            cur.execute(statement)
+    pattern = "|".join(MEME_KEYWORDS)
+    cur.execute(
+        """
+        UPDATE crypto_tokens SET meme_tags = ARRAY(
+            SELECT DISTINCT v.value
+            FROM regexp_matches(lower(name || ' ' || symbol), %s, 'g') m,
+                 jsonb_each_text(%s::jsonb) v
+            WHERE v.key = m[1]
+            ORDER BY 1
+        )
+        """,
+        (f"({pattern})", Json(MEME_KEYWORDS)),
+    )
+    cur.execute("UPDATE crypto_tokens SET is_meme = cardinality(meme_tags) > 0")
+    conn.commit()
+    vacuum(conn)
+
+
+def add_indexes(conn):
+    conn.autocommit = True
+    cur = conn.cursor()
+    for statement in index_sql():
+        if statement.startswith("CREATE INDEX"):
+            cur.execute(statement)
+    conn.autocommit = False
+    vacuum(conn)
+
+
+def index_sql():
+    sql = re.sub(r"--[^\n]*", "", INDEX_SQL.read_text())
+    return [statement.strip() for statement in sql.split(";") if statement.strip()]
+
+
+def vacuum(conn):
+    conn.autocommit = True
+    conn.cursor().execute("VACUUM ANALYZE crypto_tokens")
+    conn.autocommit = False
+
+
+def timed(cur, query, repeat):
+    cur.execute(query)  # warm up
+    rows = cur.fetchall()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cur.execute(query)
+        cur.fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples), rows
+
+
+def plan(cur, query):
+    cur.execute(f"EXPLAIN {query}")
+    lines = [row[0].strip() for row in cur.fetchall()]
+    return next((line for line in lines if "Scan" in line), lines[0]).lstrip("-> ")
+
+
+def report(cur, queries, repeat):
+    print(f"{'query':<34}{'median ms':>10}{'max ms':>9}  plan")
+    results = {}
+    for label, query in queries:
+        median, worst, rows = timed(cur, query, repeat)
+        results[label] = rows
+        print(f"{label:<34}{median:>10.2f}{worst:>9.2f}  {plan(cur, query)[:60]}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--meme-share", type=float, default=0.05)
+    parser.add_argument("--days", type=int, default=7, help="spread of last_updated_at")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--skip-seed", action="store_true", help="reuse an existing meme_bench schema"
+    )
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    if not args.skip_seed:
+        seed(conn, args.rows, args.meme_share, args.days)
+    conn.cursor().execute(f"SET search_path TO {SCHEMA}")
+    for statement in (
+        "DROP INDEX IF EXISTS idx_crypto_tokens_meme",
+        "DROP INDEX IF EXISTS idx_crypto_tokens_meme_tags",
+        "DROP INDEX IF EXISTS idx_crypto_tokens_search",
+    ):
+        conn.cursor().execute(statement)
+    conn.commit()
+    cur = conn.cursor()
+
+    print(
+        f"\n{args.rows:,} tokens, {args.meme_share:.0%} meme names, updated over {args.days} days"
+    )
+    print("before (no is_meme column):")
+    legacy = report(
+        cur,
+        [
+            ("LIKE scan (old meme-coins)", LEGACY_QUERY),
+            ("LIKE search 'wojak'", SEARCH_LIKE_QUERY),
+        ],
+        args.repeat,
+    )
+
+    start = time.perf_counter()
+    classify(conn)
+    print(f"classified in {time.perf_counter() - start:.1f}s")
+    add_indexes(conn)
+    cur = conn.cursor()
+    cur.execute(f"SET search_path TO {SCHEMA}")
+    print("with create_meme_token_index.sql:")
+    new = report(
+        cur,
+        [
+            ("is_meme (meme-coins)", MEME_QUERY),
+            ("is_meme + tag=frog", TAG_QUERY),
+            ("tsvector search 'wojak'", SEARCH_QUERY),
+        ],
+        args.repeat,
+    )
+    assert [r[0] for r in new["is_meme (meme-coins)"]] == [
+        r[0] for r in legacy["LIKE scan (old meme-coins)"]
+    ]
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
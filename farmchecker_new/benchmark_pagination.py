@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Benchmark deep pages of /api/twitter: LIMIT/OFFSET vs keyset cursors.
+
+Seeds a throwaway ``page_bench`` schema (it never touches the real tables)
+with ``--rows`` tweets over the last week and the index from
+create_keyset_indexes.sql, then times a ``--limit`` row page at growing
+depths both ways, and the client-side memory of a large page fetched at
+once vs streamed through a server-side cursor:
+
+    DB_HOST=localhost DB_NAME=degen_digest python benchmark_pagination.py --rows 1000000
+"""
+
+import argparse
+import os
+import statistics
+import time
+import tracemalloc
+from functools import partial
+
+import psycopg2
+from db_pool import positional_to_pyformat
+from pagination import FETCH_SIZE, Page, SortKey
+
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "database": os.getenv("DB_NAME", "degen_digest"),
+    "user": os.getenv("DB_USER", "postgres"),
+    "password": os.getenv("DB_PASSWORD", ""),
+    "port": os.getenv("DB_PORT", "5432"),
+}
+
+SCHEMA = "page_bench"
+SORT = SortKey("published_at")
+
+SELECT = """
+    SELECT id, tweet_id, author_username, content, likes_count, retweets_count,
+           replies_count, published_at, published_at, id
+    FROM tweets
+    WHERE published_at >= NOW() - INTERVAL '7 days'
+"""
+
+
+def seed(conn, rows):
+    cur = conn.cursor()
+    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cur.execute(f"CREATE SCHEMA {SCHEMA}")
+    cur.execute(f"SET search_path TO {SCHEMA}")
+    cur.execute("""
+        CREATE TABLE tweets (
+            id SERIAL PRIMARY KEY,
+            tweet_id VARCHAR(255) UNIQUE NOT NULL,
+            author_username VARCHAR(255) NOT NULL,
+            content TEXT NOT NULL,
+            likes_count INTEGER DEFAULT 0,
+            retweets_count INTEGER DEFAULT 0,
+            replies_count INTEGER DEFAULT 0,
+            published_at TIMESTAMP
+        )
+        """)
+    print(f"  seeding {SCHEMA}.tweets with {rows:,} rows")
+    cur.execute(
+        """
+        INSERT INTO tweets (tweet_id, author_username, content, likes_count,
+                            retweets_count, replies_count, published_at)
+        SELECT i::text, 'user' || (i %% 5000), repeat('gm wagmi ', 20),
+               (random() * 1000)::int, (random() * 100)::int, (random() * 50)::int,
+               -- whole seconds, so timestamps tie and the id tiebreaker matters
+               date_trunc('second', NOW() - random() * INTERVAL '6 days')
+        FROM generate_series(1, %s) i
+        """,
+        (rows,),
+    )
+    cur.execute("CREATE INDEX idx_tweets_published_at_id ON tweets (published_at, id)")
+    conn.commit()
+    conn.autocommit = True
+    conn.cursor().execute("VACUUM ANALYZE tweets")
+    conn.autocommit = False
+
+
+def offset_page(cur, depth, limit):
+    cur.execute(
+        f"{SELECT} ORDER BY published_at DESC, id DESC OFFSET %s LIMIT %s",
+        (depth, limit),
+    )
+    return cur.fetchall()
+
+
+def keyset_page(cur, after, limit):
+    page = Page("recent", SORT, limit, after)
+    where, order = page.clauses()
+    cur.execute(positional_to_pyformat(f"{SELECT}{where} {order}"), page.params)
+    return cur.fetchall()
+
+
+def timed(fn, repeat):
+    rows = fn()  # warm up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples), rows
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--depths", default="0,1000,10000,100000,500000")
+    parser.add_argument("--stream-rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument(
+        "--skip-seed", action="store_true", help="reuse an existing page_bench schema"
+    )
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    if not args.skip_seed:
+        seed(conn, args.rows)
+    cur = conn.cursor()
+    cur.execute(f"SET search_path TO {SCHEMA}")
+
+    print(f"\n{args.rows:,} tweets, pages of {args.limit}")
+    print(
+        f"{'depth':>10}{'OFFSET ms':>12}{'keyset ms':>12}{'max OFFSET':>12}{'max keyset':>12}"
+    )
+    for depth in [int(d) for d in args.depths.split(",") if int(d) < args.rows]:
+        # The cursor a client holds after paging down to this depth
+        after = list(offset_page(cur, depth - 1, 1)[0][-2:]) if depth else None
+        o_median, o_max, o_rows = timed(
+            partial(offset_page, cur, depth, args.limit), args.repeat
+        )
+        k_median, k_max, k_rows = timed(
+            partial(keyset_page, cur, after, args.limit), args.repeat
+        )
+        assert [r[0] for r in o_rows] == [r[0] for r in k_rows]
+        print(
+            f"{depth:>10,}{o_median:>12.2f}{k_median:>12.2f}{o_max:>12.2f}{k_max:>12.2f}"
+        )
+
+    def fetch_all():
+        cur.execute(
+            positional_to_pyformat(
+                f"{SELECT} ORDER BY published_at DESC, id DESC LIMIT $1"
+            ),
+            (args.stream_rows,),
+        )
+        return len(cur.fetchall())
+
+    def stream():
+        named = conn.cursor(name="page_bench_stream")
+        named.itersize = FETCH_SIZE
+        named.execute(
+            positional_to_pyformat(
+                f"{SELECT} ORDER BY published_at DESC, id DESC LIMIT $1"
+            ),
+            (args.stream_rows,),
+        )
+        count = sum(1 for _ in named)
+        named.close()
+        return count
+
+    print(f"\none page of {args.stream_rows:,} rows, client memory:")
+    for label, fn in [
+        ("fetchall()", fetch_all),
+        (f"server-side cursor ({FETCH_SIZE}/fetch)", stream),
+    ]:
+        count, elapsed, peak = peak_memory(fn)
+        print(
+            f"{label:<36}{count:>9,} rows {elapsed:>7.2f}s  peak {peak / 1e6:>7.1f} MB"
+        )
+    conn.rollback()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Benchmark time partitioning of tweets: recent-window queries and retention
+on the heap table vs the same rows after ``partitions.py migrate``.
+
+Seeds a throwaway ``part_bench`` schema (it never touches the real tables)
+with ``--rows-per-day`` tweets for each of ``--days`` days, indexed as
+create_keyset_indexes.sql and create_stats_indexes.sql index them:
+
+    DB_HOST=localhost DB_NAME=degen_digest python benchmark_partitions.py --days 180
+"""
+
+import argparse
+import os
+import statistics
+import time
+from datetime import date
+
+import partitions
+import psycopg2
+
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "database": os.getenv("DB_NAME", "degen_digest"),
+    "user": os.getenv("DB_USER", "postgres"),
+    "password": os.getenv("DB_PASSWORD", ""),
+    "port": os.getenv("DB_PORT", "5432"),
+}
+
+SCHEMA = "part_bench"
+TWEETS = partitions.PARTITIONED_TABLES["tweets"]
+
+QUERIES = {
+    # get_twitter_posts, first keyset page
+    "recent page (7d)": """
+        SELECT id, tweet_id, author_username, content, published_at
+        FROM tweets
+        WHERE published_at >= NOW() - INTERVAL '7 days'
+        ORDER BY published_at DESC, id DESC
+        LIMIT 100
+    """,
+    # get_twitter_posts?sort=engagement
+    "top engagement (7d)": """
+        SELECT id, tweet_id, engagement_score
+        FROM tweets
+        WHERE published_at >= NOW() - INTERVAL '7 days'
+        ORDER BY engagement_score DESC, id DESC
+        LIMIT 100
+    """,
+    # stats_engine's per-source window counts
+    "window stats (7d)": """
+        SELECT COUNT(*), AVG(likes_count), COUNT(DISTINCT author_username)
+        FROM tweets
+        WHERE published_at >= NOW() - INTERVAL '7 days'
+    """,
+}
+
+TWEETS_TABLE = """
+    CREATE TABLE tweets (
+        id SERIAL PRIMARY KEY,
+        tweet_id VARCHAR(255) UNIQUE NOT NULL,
+        author_username VARCHAR(255) NOT NULL,
+        content TEXT NOT NULL,
+        published_at TIMESTAMP,
+        collected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        likes_count INTEGER DEFAULT 0,
+        retweets_count INTEGER DEFAULT 0,
+        engagement_score DECIMAL(10,4) DEFAULT 0
+    )
+"""
+
+
+def seed(conn, days, rows_per_day):
+    cur = conn.cursor()
+    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cur.execute(f"CREATE SCHEMA {SCHEMA}")
+    cur.execute(f"SET search_path TO {SCHEMA}")
+    print(
+        f"  seeding {SCHEMA}.tweets with {days * rows_per_day:,} rows over {days} days"
+    )
+    cur.execute(TWEETS_TABLE)
+    # Crawled in publication order, as the table fills in production
+    cur.execute(
+        """
+        INSERT INTO tweets (tweet_id, author_username, content, published_at,
+                            collected_at, likes_count, retweets_count, engagement_score)
+        SELECT 't' || i, 'user' || (i %% 5000), repeat(md5(i::text), 6), at, at,
+               (random() ^ 3 * 10000)::int, (random() ^ 3 * 2000)::int, random() * 100
+        FROM (
+            SELECT i, NOW() - (%s::float - i::float / %s) * INTERVAL '1 day' AS at
+            FROM generate_series(1, %s) i
+        ) s
+        """,
+        (days, rows_per_day, days * rows_per_day),
+    )
+    cur.execute("CREATE INDEX idx_tweets_published_at_id ON tweets (published_at, id)")
+    cur.execute(
+        "CREATE INDEX idx_tweets_engagement_id ON tweets (engagement_score, id)"
+    )
+    conn.commit()
+    vacuum(conn, "tweets")
+
+
+def vacuum(conn, table):
+    conn.autocommit = True
+    conn.cursor().execute(f"VACUUM ANALYZE {table}")
+    conn.autocommit = False
+
+
+def timed(cur, query, repeat):
+    cur.execute(query)  # warm up
+    cur.fetchall()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cur.execute(query)
+        cur.fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def scanned_partitions(cur, query):
+    cur.execute(f"EXPLAIN (ANALYZE, COSTS OFF) {query}")
+    plan = "\n".join(row[0] for row in cur.fetchall())
+    return sum(
+        f" {name} " in plan or f" {name}_" in plan
+        for _, name in partitions.list_partitions(cur.connection, "tweets")
+    ) + (" tweets_default " in plan or " tweets_default_" in plan)
+
+
+def time_heap_retention(conn, keep):
+    """The DELETE a heap table needs to expire what maintain drops"""
+    cur = conn.cursor()
+    cutoff = partitions.shift(
+        partitions.period_start(date.today(), "week"), "week", 1 - keep
+    )
+    start = time.perf_counter()
+    cur.execute("DELETE FROM tweets WHERE published_at < %s", (cutoff,))
+    deleted = cur.rowcount
+    elapsed = time.perf_counter() - start
+    conn.rollback()
+    return deleted, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--rows-per-day", type=int, default=20_000)
+    parser.add_argument("--keep", type=int, default=TWEETS.keep, help="weeks kept")
+    parser.add_argument("--batch-size", type=int, default=partitions.DEFAULT_BATCH_SIZE)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG, options=f"-c search_path={SCHEMA}")
+    seed(conn, args.days, args.rows_per_day)
+    cur = conn.cursor()
+
+    heap = {label: timed(cur, query, args.repeat) for label, query in QUERIES.items()}
+    deleted, delete_elapsed = time_heap_retention(conn, args.keep)
+
+    start = time.perf_counter()
+    copied = partitions.migrate_table(conn, TWEETS._replace(keep=0), args.batch_size)
+    migrate_elapsed = time.perf_counter() - start
+    print(
+        f"\nmigrated {copied:,} rows in {migrate_elapsed:.1f}s "
+        f"({copied / migrate_elapsed:,.0f} rows/s)"
+    )
+    vacuum(conn, "tweets")
+
+    print(
+        f"\n{args.days * args.rows_per_day:,} tweets over {args.days} days, "
+        f"{len(partitions.list_partitions(conn, 'tweets'))} weekly partitions"
+    )
+    print(
+        f"{'query':<22}{'heap ms':>10}{'part ms':>10}{'max heap':>10}{'max part':>10}{'scanned':>9}"
+    )
+    for label, query in QUERIES.items():
+        p_median, p_max = timed(cur, query, args.repeat)
+        h_median, h_max = heap[label]
+        scanned = scanned_partitions(cur, query)
+        print(
+            f"{label:<22}{h_median:>10.2f}{p_median:>10.2f}{h_max:>10.2f}{p_max:>10.2f}{scanned:>9}"
+        )
+
+    start = time.perf_counter()
+    dropped = partitions.apply_retention(
+        conn, TWEETS._replace(keep=args.keep), archive_dir=None
+    )
+    drop_elapsed = time.perf_counter() - start
+    print(f"\nexpiring all but the newest {args.keep} weeks:")
+    print(f"  heap DELETE of {deleted:,} rows {delete_elapsed:.2f}s (before vacuum)")
+    print(f"  DROP of {len(dropped)} partitions {drop_elapsed:.2f}s")
+
+    cur.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+    conn.commit()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
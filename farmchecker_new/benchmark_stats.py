@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Benchmark /api/stats: per-table COUNT queries vs the single stats_engine query.
+
+Seeds a throwaway ``stats_bench`` schema (it never touches the real tables)
+with ``--rows`` rows per source table spread over ``--days`` days, then times
+both strategies with and without the covering indexes from
+create_stats_indexes.sql:
+
+    DB_HOST=localhost DB_NAME=degen_digest python benchmark_stats.py --rows 2000000
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+import psycopg2
+from stats_engine import STATS_QUERY, rows_to_stats
+
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "database": os.getenv("DB_NAME", "degen_digest"),
+    "user": os.getenv("DB_USER", "postgres"),
+    "password": os.getenv("DB_PASSWORD", ""),
+    "port": os.getenv("DB_PORT", "5432"),
+}
+
+SCHEMA = "stats_bench"
+
+TABLES = {
+    "tweets": "collected_at TIMESTAMP, likes_count INTEGER, retweets_count INTEGER, replies_count INTEGER",
+    "reddit_posts": "collected_at TIMESTAMP, score INTEGER, comments_count INTEGER",
+    "articles": "created_at TIMESTAMP, engagement_score DECIMAL(10,4)",
+    "crypto_tokens": "last_updated_at TIMESTAMP, price_usd NUMERIC",
+    "dexscreener_pairs": "collected_at TIMESTAMP, price_usd NUMERIC",
+    "dexpaprika_pairs": "collected_at TIMESTAMP, price_usd NUMERIC",
+}
+
+SEED_VALUES = {
+    "tweets": "(random()*1000)::int, (random()*100)::int, (random()*50)::int",
+    "reddit_posts": "(random()*500)::int, (random()*100)::int",
+    "articles": "(random()*100)::numeric(10,4)",
+    "crypto_tokens": "random()",
+    "dexscreener_pairs": "random()",
+    "dexpaprika_pairs": "random()",
+}
+
+# The queries get_stats ran before stats_engine, one round trip each
+LEGACY_QUERIES = [
+    "SELECT COUNT(*) FROM tweets WHERE collected_at >= NOW() - INTERVAL '24 hours'",
+    "SELECT COUNT(*) FROM reddit_posts WHERE collected_at >= NOW() - INTERVAL '24 hours'",
+    "SELECT COUNT(*) FROM articles WHERE created_at >= NOW() - INTERVAL '24 hours'",
+    "SELECT COUNT(*) FROM crypto_tokens WHERE last_updated_at >= NOW() - INTERVAL '24 hours'",
+    "SELECT COUNT(*) FROM dexscreener_pairs WHERE collected_at >= NOW() - INTERVAL '24 hours'",
+    "SELECT COUNT(*) FROM dexpaprika_pairs WHERE collected_at >= NOW() - INTERVAL '24 hours'",
+    """
+    SELECT
+        COALESCE(SUM(likes_count + retweets_count + replies_count), 0),
+        COALESCE(SUM(score + comments_count), 0),
+        COALESCE(SUM(engagement_score), 0)
+    FROM (
+        SELECT likes_count, retweets_count, replies_count, 0 as score, 0 as comments_count, 0 as engagement_score
+        FROM tweets WHERE collected_at >= NOW() - INTERVAL '24 hours'
+        UNION ALL
+        SELECT 0, 0, 0, score, comments_count, 0
+        FROM reddit_posts WHERE collected_at >= NOW() - INTERVAL '24 hours'
+        UNION ALL
+        SELECT 0, 0, 0, 0, 0, engagement_score
+        FROM articles WHERE created_at >= NOW() - INTERVAL '24 hours'
+    ) combined_engagement
+    """,
+]
+
+
+def seed(conn, rows, days):
+    cur = conn.cursor()
+    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cur.execute(f"CREATE SCHEMA {SCHEMA}")
+    for table, columns in TABLES.items():
+        print(f"  seeding {SCHEMA}.{table} with {rows:,} rows")
+        cur.execute(f"CREATE TABLE {table} (id BIGSERIAL PRIMARY KEY, {columns})")
+        time_column = columns.split()[0]
+        value_columns = ", ".join(c.split()[0] for c in columns.split(", ")[1:])
+        cur.execute(
+            f"""
+            INSERT INTO {table} ({time_column}, {value_columns})
+            SELECT NOW() - random() * INTERVAL '{days} days', {SEED_VALUES[table]}
+            FROM generate_series(1, %s)
+            """,
+            (rows,),
+        )
+    # Index the time columns like create_dedicated_crawler_tables.sql does
+    for table, columns in TABLES.items():
+        cur.execute(f"CREATE INDEX ON {table} ({columns.split()[0]})")
+    conn.commit()
+    vacuum(conn)
+
+
+def vacuum(conn):
+    conn.autocommit = True
+    conn.cursor().execute("VACUUM ANALYZE")
+    conn.autocommit = False
+
+
+def add_covering_indexes(conn):
+    cur = conn.cursor()
+    cur.execute("CREATE INDEX ON tweets (collected_at) INCLUDE (likes_count, retweets_count, replies_count)")
+    cur.execute("CREATE INDEX ON reddit_posts (collected_at) INCLUDE (score, comments_count)")
+    cur.execute("CREATE INDEX ON articles (created_at) INCLUDE (engagement_score)")
+    conn.commit()
+    vacuum(conn)
+
+
+def run_legacy(cur):
+    results = []
+    for query in LEGACY_QUERIES:
+        cur.execute(query)
+        results.append(cur.fetchone())
+    return results
+
+
+def run_single(cur):
+    cur.execute(STATS_QUERY)
+    return rows_to_stats(cur.fetchall())
+
+
+def timed(fn, cur, repeat):
+    fn(cur)  # warm up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(cur)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows per source table")
+    parser.add_argument("--days", type=int, default=30, help="spread of seeded timestamps")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse an existing stats_bench schema")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    conn.cursor().execute(f"SET search_path TO {SCHEMA}")
+    if not args.skip_seed:
+        seed(conn, args.rows, args.days)
+    conn.cursor().execute(f"SET search_path TO {SCHEMA}")
+    cur = conn.cursor()
+
+    legacy = run_legacy(cur)
+    single = run_single(cur)
+    assert [r[0] for r in legacy[:6]] == [v for k, v in single.items() if k != "total_engagement"]
+    assert sum(legacy[6]) == single["total_engagement"]
+
+    print(f"\n{args.rows:,} rows per table, {len(TABLES)} tables")
+    print(f"{'strategy':<40}{'median ms':>12}{'max ms':>10}")
+    for label, fn in [("per-table queries (7 round trips)", run_legacy), ("stats_engine (1 round trip)", run_single)]:
+        median, worst = timed(fn, cur, args.repeat)
+        print(f"{label:<40}{median:>12.1f}{worst:>10.1f}")
+
+    add_covering_indexes(conn)
+    cur = conn.cursor()
+    cur.execute(f"SET search_path TO {SCHEMA}")
+    print("with create_stats_indexes.sql covering indexes:")
+    for label, fn in [("per-table queries (7 round trips)", run_legacy), ("stats_engine (1 round trip)", run_single)]:
+        median, worst = timed(fn, cur, args.repeat)
+        print(f"{label:<40}{median:>12.1f}{worst:>10.1f}")
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Bulk loading for the GCS -> Postgres migrators.
+
+The migrators inserted one row per ``cursor.execute`` and answered any row
+error with ``conn.rollback()``, which also threw away the rows of the file
+loaded before it. ``load_rows`` instead streams a file's rows into a temp
+staging table with ``COPY FROM STDIN`` and merges them into the target with
+a single ``INSERT ... SELECT ... ON CONFLICT``.
+
+The staging table has the target's column types, lengths and NOT NULL
+constraints, so Postgres validates every row on the way in. When a COPY
+fails, the row it names is set aside and the rest are copied again; rows
+the converter cannot build and rows Postgres rejects are written to
+``load_dead_letters`` with the error instead of aborting the file:
+
+    SELECT target_table, source, error, record FROM load_dead_letters
+    ORDER BY failed_at DESC LIMIT 20;
+
+Nothing is committed here: the caller commits the merged rows, their dead
+letters and its migration_state checkpoint together.
+"""
+
+import io
+import json
+import logging
+import re
+import time
+from collections.abc import Callable, Iterable
+from datetime import date, datetime
+from typing import Any, NamedTuple
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+logger = logging.getLogger(__name__)
+
+DEAD_LETTER_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS load_dead_letters (
+    id BIGSERIAL PRIMARY KEY,
+    target_table VARCHAR(100) NOT NULL,
+    source TEXT,
+    error TEXT NOT NULL,
+    record TEXT,
+    failed_at TIMESTAMPTZ DEFAULT NOW()
+)
+"""
+
+# Rows per COPY; a rejected row costs at most one re-copy of its batch
+DEFAULT_BATCH_SIZE = 5000
+
+_COPY_LINE = re.compile(r"\bline (\d+)")
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+class LoadTarget(NamedTuple):
+    table: str
+    columns: tuple[str, ...]
+    # Upsert on this key; without one, rows already present are skipped
+    conflict_key: tuple[str, ...] = ()
+    # Columns set from EXCLUDED on conflict, or "column = expression"
+    update: tuple[str, ...] = ()
+
+
+class LoadResult(NamedTuple):
+    staged: int = 0  # rows that passed validation
+    written: int = 0  # rows inserted or updated
+    rejected: int = 0  # rows sent to load_dead_letters
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return (self.staged + self.rejected) / self.seconds if self.seconds else 0.0
+
+    def plus(self, other: "LoadResult") -> "LoadResult":
+        return LoadResult(*(a + b for a, b in zip(self, other, strict=True)))
+
+    def __str__(self):
+        return (
+            f"{self.written} written, {self.rejected} rejected,"
+            f" {self.rows_per_second:.0f} rows/s"
+        )
+
+
+def copy_value(value: Any) -> str:
+    """*value* in COPY text format"""
+    kind = type(value)
+    # Called once per column per row: the common types come first
+    if kind is str:
+        if "\\" in value or "\t" in value or "\n" in value or "\r" in value:
+            return value.translate(_COPY_ESCAPES)
+        return value
+    if value is None:
+        return "\\N"
+    if kind is int or kind is float:
+        return str(value)
+    if kind is bool:
+        return "t" if value else "f"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def _stage_table(cursor, target: LoadTarget) -> str:
+    """An empty temp table shaped like *target*'s columns, plus ``_seq``"""
+    stage = f"stage_{target.table}"
+    cursor.execute("SELECT to_regclass(%s)", (f"pg_temp.{stage}",))
+    if cursor.fetchone()[0]:
+        cursor.execute(f"TRUNCATE {stage}")
+        return stage
+    cursor.execute(f"""
+        CREATE TEMP TABLE {stage} ON COMMIT DELETE ROWS AS
+        SELECT 0 AS _seq, {", ".join(target.columns)} FROM {target.table} WITH NO DATA
+        """)
+    cursor.execute(
+        """
+        SELECT attname FROM pg_attribute
+        WHERE attrelid = %s::regclass AND attnum > 0 AND attnotnull AND NOT attisdropped
+        """,
+        (target.table,),
+    )
+    for (column,) in cursor.fetchall():
+        if column in target.columns:
+            cursor.execute(f"ALTER TABLE {stage} ALTER COLUMN {column} SET NOT NULL")
+    return stage
+
+
+def _copy(cursor, stage, target, lines):
+    cursor.copy_expert(
+        f"COPY {stage} (_seq, {', '.join(target.columns)}) FROM STDIN",
+        io.StringIO("".join(line for _, line in lines)),
+    )
+
+
+def _stage_rows(cursor, stage, target, lines, rejected):
+    """COPY *lines* ((seq, line) pairs) into *stage*, appending the ones
+    Postgres refuses to *rejected* as (seq, error)"""
+    while lines:
+        cursor.execute("SAVEPOINT bulk_load")
+        try:
+            _copy(cursor, stage, target, lines)
+        except (psycopg2.DataError, psycopg2.IntegrityError) as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT bulk_load")
+            match = _COPY_LINE.search(e.diag.context or "")
+            if match is None and len(lines) > 1:
+                # No line number to go on: halve the batch until one is left
+                half = len(lines) // 2
+                _stage_rows(cursor, stage, target, lines[:half], rejected)
+                lines = lines[half:]
+                continue
+            bad = int(match.group(1)) - 1 if match else 0
+            rejected.append((lines[bad][0], e.diag.message_primary or str(e)))
+            # The lines before the bad one went in and will again
+            _stage_rows(cursor, stage, target, lines[:bad], rejected)
+            lines = lines[bad + 1 :]
+        else:
+            cursor.execute("RELEASE SAVEPOINT bulk_load")
+            return
+
+
+def merge_sql(target: LoadTarget, stage: str) -> str:
+    columns = ", ".join(target.columns)
+    if not target.update:
+        return (
+            f"INSERT INTO {target.table} ({columns}) SELECT {columns} FROM {stage}"
+            " ORDER BY _seq ON CONFLICT DO NOTHING"
+        )
+    # One statement may not update a row twice: the last copy of a key wins
+    key = ", ".join(target.conflict_key)
+    assignments = ", ".join(
+        column if "=" in column else f"{column} = EXCLUDED.{column}"
+        for column in target.update
+    )
+    return (
+        f"INSERT INTO {target.table} ({columns})"
+        f" SELECT {columns} FROM (SELECT DISTINCT ON ({key}) * FROM {stage}"
+        f" ORDER BY {key}, _seq DESC) latest"
+        f" ON CONFLICT ({key}) DO UPDATE SET {assignments}"
+    )
+
+
+def dead_letter(
+    cursor, table: str, source: str | None, failures: list[tuple[Any, str]]
+):
+    """Record (record, error) pairs that could not be loaded into *table*"""
+    cursor.execute(DEAD_LETTER_TABLE_SQL)
+    execute_values(
+        cursor,
+        "INSERT INTO load_dead_letters (target_table, source, error, record) VALUES %s",
+        [
+            (table, source, error, json.dumps(record, default=str))
+            for record, error in failures
+        ],
+    )
+
+
+def load_rows(
+    conn,
+    target: LoadTarget,
+    records: Iterable[Any],
+    to_row: Callable[[Any], tuple],
+    source: str | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> LoadResult:
+    """Load *records* into *target* through a COPY-filled staging table
+
+    ``to_row`` turns a record into values in ``target.columns`` order and
+    raises (e.g. ``ValueError``) for records that cannot be loaded. *source*
+    (a blob name) is kept with the dead letters. Does not commit.
+    """
+    start = time.time()
+    records = list(records)
+    failures = []
+    lines = []
+    for seq, record in enumerate(records):
+        try:
+            values = to_row(record)
+        except Exception as e:
+            failures.append((record, f"{type(e).__name__}: {e}"))
+            continue
+        lines.append((seq, "\t".join(map(copy_value, (seq, *values))) + "\n"))
+
+    with conn.cursor() as cursor:
+        stage = _stage_table(cursor, target)
+        rejected: list[tuple[int, str]] = []
+        for i in range(0, len(lines), max(batch_size, 1)):
+            _stage_rows(cursor, stage, target, lines[i : i + batch_size], rejected)
+        failures += [(records[seq], error) for seq, error in rejected]
+
+        written = 0
+        if len(lines) > len(rejected):
+            cursor.execute(merge_sql(target, stage))
+            written = cursor.rowcount
+        if failures:
+            dead_letter(cursor, target.table, source, failures)
+            logger.warning(
+                f"{len(failures)} rows from {source or 'input'} sent to load_dead_letters,"
+                f" first: {failures[0][1]}"
+            )
+    return LoadResult(
+        len(lines) - len(rejected), written, len(failures), time.time() - start
+    )
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Post content cleaning shared by the migrations, the backfill and the API.
+
+Scraped rows often store the raw crawler payload (JSON, a Python dict repr,
+or escaped text) in ``content``. ``clean_post_content`` extracts the readable
+text. It used to run inside the API on every row of every response; it now
+runs once when rows are written, and the result is stored in each table's
+``clean_content`` column (see ``backfill_clean_content.py``).
+
+The functions are pure and log nothing, so they are cheap enough for bulk
+migrations and safe to call from any process.
+"""
+
+import json
+import re
+
+# Fields that hold readable text in a JSON payload, in preference order
+READABLE_FIELDS = ("text", "title", "name", "description", "summary", "content")
+
+# Tables whose rows carry a clean_content column, and the column it is built from
+CLEAN_CONTENT_SOURCES = {
+    "tweets": "content",
+    "reddit_posts": "content",
+    "articles": "content",
+}
+
+_PY_DICT_TEXT = re.compile(r"'text':\s*'([^']+)'")
+_TEXT_PATTERNS = (
+    re.compile(r'"text":\s*"([^"]+)"'),
+    re.compile(r"'text':\s*'([^']+)'"),
+    re.compile(r'"content":\s*"([^"]+)"'),
+    re.compile(r"'content':\s*'([^']+)'"),
+)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _unescape(text):
+    text = text.replace("\\n", " ").replace("\\t", " ")
+    return text.replace('\\"', '"').replace("\\'", "'")
+
+
+def _from_json(content):
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return ""
+    readable = []
+    if isinstance(data, dict):
+        readable = [str(data[field]) for field in READABLE_FIELDS if data.get(field)]
+        # No readable fields: fall back to long strings and nested "text"
+        if not readable:
+            for value in data.values():
+                if isinstance(value, str) and len(value) > 10 and not value.startswith("{"):
+                    readable.append(value)
+                elif isinstance(value, dict) and "text" in value:
+                    readable.append(str(value["text"]))
+    return " ".join(readable)
+
+
+def clean_post_content(content):
+    """Readable text of a stored post, or "" if none can be extracted"""
+    if not content:
+        return ""
+
+    # JSON payload: join its readable fields
+    if content.startswith("{") and content.endswith("}"):
+        result = _from_json(content)
+        if result:
+            return result
+
+    # Python dict repr with a 'text' key
+    if "'text':" in content:
+        match = _PY_DICT_TEXT.search(content)
+        if match:
+            text = _unescape(match.group(1)).replace("—", "-")
+            if len(text) > 10:
+                return text
+
+    # JSON-like text with a text/content field
+    if "text" in content and ("source" in content or "username" in content):
+        for pattern in _TEXT_PATTERNS:
+            match = pattern.search(content)
+            if match:
+                text = _unescape(match.group(1))
+                if len(text) > 10:
+                    return text
+
+    # Plain text: normalise escapes and whitespace
+    if not content.startswith("{") and not content.startswith("["):
+        content = _WHITESPACE.sub(" ", _unescape(content)).strip()
+        if len(content) > 5:
+            return content
+
+    return ""
+
+
+def clean_post_title(title):
+    """Clean post title by removing technical data"""
+    if not title:
+        return ""
+
+    # Remove common technical prefixes
+    title = title.replace("No title", "")
+    title = title.replace("playwright_", "")
+    title = title.replace("source:", "")
+
+    # Clean up
+    title = title.strip()
+
+    # If title is too short or technical, return empty instead of generic fallback
+    if len(title) < 3 or title.startswith("{"):
+        return ""
+
+    return title
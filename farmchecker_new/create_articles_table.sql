@@ -4,6 +4,7 @@ CREATE TABLE IF NOT EXISTS articles (
     title TEXT NOT NULL,
     description TEXT,
     content TEXT,
+    clean_content TEXT,  -- readable text from content_cleaning.py, set at ingest
     url TEXT,
     source_name VARCHAR(255),  -- NewsAPI source name (e.g., "CoinDesk", "Cointelegraph")
     author VARCHAR(255),
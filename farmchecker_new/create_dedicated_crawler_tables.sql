@@ -12,6 +12,7 @@ CREATE TABLE IF NOT EXISTS tweets (
     author_verified BOOLEAN DEFAULT FALSE,
     author_followers_count INTEGER DEFAULT 0,
     content TEXT NOT NULL,
+    clean_content TEXT,  -- readable text from content_cleaning.py, set at ingest
     url TEXT,
     published_at TIMESTAMP,
     collected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -50,6 +51,7 @@ CREATE TABLE IF NOT EXISTS reddit_posts (
     author_username VARCHAR(255) NOT NULL,
     title TEXT NOT NULL,
     content TEXT,
+    clean_content TEXT,  -- readable text from content_cleaning.py, set at ingest
     url TEXT,
     is_original_content BOOLEAN DEFAULT FALSE,
     published_at TIMESTAMP,
@@ -351,7 +353,13 @@ COMMENT ON TABLE dexpaprika_pairs IS 'Dedicated table for DexPaprika DEX trading
 -- MIGRATION HELPER FUNCTIONS
 -- ========================================
 
--- Function to migrate data from content_items to dedicated tables
+-- Function to migrate data from content_items to dedicated tables.
+-- The inserts use ON CONFLICT DO NOTHING without a conflict target so they
+-- work on the heap tables and after partitions.py migrate. Once partitioned
+-- the unique keys include published_at ((tweet_id, published_at),
+-- (post_id, published_at), (url, published_at)), so a row whose tweet_id,
+-- post_id or url already exists with a different published_at is no longer
+-- skipped: dedup by the old key alone does not hold across partitions.
 CREATE OR REPLACE FUNCTION migrate_to_dedicated_tables()
 RETURNS INTEGER AS $$
 DECLARE
@@ -372,7 +380,7 @@ BEGIN
             ) VALUES (
                 item.external_id, item.author, item.content, item.url, item.published_at,
                 item.engagement_score, item.virality_score, item.sentiment_score, item.raw_data
-            ) ON CONFLICT (tweet_id) DO NOTHING;
+            ) ON CONFLICT DO NOTHING;
             
             migrated_count := migrated_count + 1;
         EXCEPTION WHEN OTHERS THEN
@@ -397,7 +405,7 @@ BEGIN
                 COALESCE((item.raw_data->>'subreddit'), 'unknown'),
                 item.author, item.title, item.content, item.url, item.published_at,
                 item.engagement_score, item.virality_score, item.sentiment_score, item.raw_data
-            ) ON CONFLICT (post_id) DO NOTHING;
+            ) ON CONFLICT DO NOTHING;
             
             migrated_count := migrated_count + 1;
         EXCEPTION WHEN OTHERS THEN
@@ -421,7 +429,7 @@ BEGIN
                 COALESCE((item.raw_data->>'source'), 'unknown'),
                 item.author, item.published_at,
                 item.engagement_score, item.virality_score, item.sentiment_score, item.raw_data
-            ) ON CONFLICT (url) DO NOTHING;
+            ) ON CONFLICT DO NOTHING;
             
             migrated_count := migrated_count + 1;
         EXCEPTION WHEN OTHERS THEN
@@ -0,0 +1,152 @@
+-- Latest snapshot per DEX pair, and the compacted history of pair snapshots
+-- /api/dex/combined used to UNION ALL dexscreener_pairs and dexpaprika_pairs
+-- and filter both down to the last 24 hours; pairs that stop being crawled
+-- stay in those tables for good, so every request walked them too.
+-- dex_pairs_latest holds one row per (source, pair_id), refreshed by the
+-- triggers below on every write to either table, so every loader keeps it
+-- current; dex_history.py prunes pairs not seen for DEX_LATEST_MAX_AGE_HOURS
+-- and compacts dex_pair_history into time buckets.
+-- Creates new tables only; safe to run inside a transaction and to re-run
+-- (psql -f create_dex_latest_tables.sql).
+
+CREATE TABLE IF NOT EXISTS dex_pairs_latest (
+    source VARCHAR(20) NOT NULL,
+    pair_id VARCHAR(255) NOT NULL,
+    id INTEGER NOT NULL,  -- id of the row in <source>_pairs
+    base_token_symbol VARCHAR(50),
+    base_token_name VARCHAR(255),
+    base_token_address VARCHAR(255),
+    dex_id VARCHAR(100),
+    chain_id VARCHAR(50),
+    price_usd NUMERIC,
+    price_change_24h NUMERIC,
+    volume_24h NUMERIC,
+    liquidity_usd NUMERIC,
+    market_cap NUMERIC,
+    txns_24h INTEGER,
+    collected_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (source, pair_id)
+);
+
+-- One per sort of /api/dex/combined (COMBINED_DEX_SORTS in server.py)
+CREATE INDEX IF NOT EXISTS idx_dex_pairs_latest_volume
+    ON dex_pairs_latest (volume_24h, source, id);
+CREATE INDEX IF NOT EXISTS idx_dex_pairs_latest_price_change
+    ON dex_pairs_latest (price_change_24h, source, id);
+CREATE INDEX IF NOT EXISTS idx_dex_pairs_latest_liquidity
+    ON dex_pairs_latest (liquidity_usd, source, id);
+CREATE INDEX IF NOT EXISTS idx_dex_pairs_latest_collected_at
+    ON dex_pairs_latest (collected_at, source, id);
+
+-- A row per snapshot (bucket_seconds = 0) until dex_history.py folds older
+-- ones into buckets: price OHLC over the bucket, the rolling 24h figures
+-- as of its last snapshot
+CREATE TABLE IF NOT EXISTS dex_pair_history (
+    id BIGSERIAL PRIMARY KEY,
+    source VARCHAR(20) NOT NULL,
+    pair_id VARCHAR(255) NOT NULL,
+    bucket_start TIMESTAMP NOT NULL,
+    bucket_seconds INTEGER NOT NULL DEFAULT 0,
+    samples INTEGER NOT NULL DEFAULT 1,
+    price_open NUMERIC,
+    price_high NUMERIC,
+    price_low NUMERIC,
+    price_close NUMERIC,
+    price_change_24h NUMERIC,
+    volume_24h NUMERIC,
+    liquidity_usd NUMERIC,
+    market_cap NUMERIC
+);
+
+CREATE INDEX IF NOT EXISTS idx_dex_pair_history_pair
+    ON dex_pair_history (source, pair_id, bucket_start);
+CREATE INDEX IF NOT EXISTS idx_dex_pair_history_compaction
+    ON dex_pair_history (bucket_seconds, bucket_start);
+-- Compaction merges late snapshots into an existing bucket
+CREATE UNIQUE INDEX IF NOT EXISTS idx_dex_pair_history_bucket
+    ON dex_pair_history (source, pair_id, bucket_seconds, bucket_start)
+    WHERE bucket_seconds > 0;
+
+-- TG_ARGV: the source name, and the column that holds its market cap
+CREATE OR REPLACE FUNCTION record_dex_pair_snapshot()
+RETURNS TRIGGER AS $$
+DECLARE
+    snapshot_at TIMESTAMP := COALESCE(NEW.collected_at, NOW());
+    market_cap NUMERIC := (to_jsonb(NEW) ->> TG_ARGV[1])::NUMERIC;
+BEGIN
+    INSERT INTO dex_pairs_latest AS latest (
+        source, pair_id, id, base_token_symbol, base_token_name, base_token_address,
+        dex_id, chain_id, price_usd, price_change_24h, volume_24h, liquidity_usd,
+        market_cap, txns_24h, collected_at
+    ) VALUES (
+        TG_ARGV[0], NEW.pair_id, NEW.id, NEW.base_token_symbol, NEW.base_token_name,
+        NEW.base_token_address, NEW.dex_id, NEW.chain_id, NEW.price_usd,
+        NEW.price_change_24h, NEW.volume_24h, NEW.liquidity_usd, market_cap,
+        NEW.txns_24h, snapshot_at
+    )
+    ON CONFLICT (source, pair_id) DO UPDATE SET
+        id = EXCLUDED.id,
+        base_token_symbol = EXCLUDED.base_token_symbol,
+        base_token_name = EXCLUDED.base_token_name,
+        base_token_address = EXCLUDED.base_token_address,
+        dex_id = EXCLUDED.dex_id,
+        chain_id = EXCLUDED.chain_id,
+        price_usd = EXCLUDED.price_usd,
+        price_change_24h = EXCLUDED.price_change_24h,
+        volume_24h = EXCLUDED.volume_24h,
+        liquidity_usd = EXCLUDED.liquidity_usd,
+        market_cap = EXCLUDED.market_cap,
+        txns_24h = EXCLUDED.txns_24h,
+        collected_at = EXCLUDED.collected_at
+    WHERE EXCLUDED.collected_at >= latest.collected_at;
+
+    -- Re-loading an unchanged snapshot adds no history
+    IF TG_OP = 'INSERT'
+       OR (OLD.price_usd, OLD.price_change_24h, OLD.volume_24h, OLD.liquidity_usd)
+          IS DISTINCT FROM (NEW.price_usd, NEW.price_change_24h, NEW.volume_24h, NEW.liquidity_usd)
+    THEN
+        INSERT INTO dex_pair_history (
+            source, pair_id, bucket_start, price_open, price_high, price_low, price_close,
+            price_change_24h, volume_24h, liquidity_usd, market_cap
+        ) VALUES (
+            TG_ARGV[0], NEW.pair_id, snapshot_at, NEW.price_usd, NEW.price_usd,
+            NEW.price_usd, NEW.price_usd, NEW.price_change_24h, NEW.volume_24h,
+            NEW.liquidity_usd, market_cap
+        );
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS record_dexscreener_pair_snapshot ON dexscreener_pairs;
+CREATE TRIGGER record_dexscreener_pair_snapshot
+    AFTER INSERT OR UPDATE ON dexscreener_pairs
+    FOR EACH ROW
+    EXECUTE FUNCTION record_dex_pair_snapshot('dexscreener', 'fdv');
+
+DROP TRIGGER IF EXISTS record_dexpaprika_pair_snapshot ON dexpaprika_pairs;
+CREATE TRIGGER record_dexpaprika_pair_snapshot
+    AFTER INSERT OR UPDATE ON dexpaprika_pairs
+    FOR EACH ROW
+    EXECUTE FUNCTION record_dex_pair_snapshot('dexpaprika', 'market_cap');
+
+-- Pairs already loaded; older ones come back when they are next crawled
+INSERT INTO dex_pairs_latest (
+    source, pair_id, id, base_token_symbol, base_token_name, base_token_address,
+    dex_id, chain_id, price_usd, price_change_24h, volume_24h, liquidity_usd,
+    market_cap, txns_24h, collected_at
+)
+SELECT 'dexscreener', pair_id, id, base_token_symbol, base_token_name, base_token_address,
+       dex_id, chain_id, price_usd, price_change_24h, volume_24h, liquidity_usd,
+       fdv, txns_24h, collected_at
+FROM dexscreener_pairs
+WHERE collected_at >= NOW() - INTERVAL '24 hours'
+UNION ALL
+SELECT 'dexpaprika', pair_id, id, base_token_symbol, base_token_name, base_token_address,
+       dex_id, chain_id, price_usd, price_change_24h, volume_24h, liquidity_usd,
+       market_cap, txns_24h, collected_at
+FROM dexpaprika_pairs
+WHERE collected_at >= NOW() - INTERVAL '24 hours'
+ON CONFLICT (source, pair_id) DO NOTHING;
+
+ANALYZE dex_pairs_latest;
@@ -0,0 +1,26 @@
+-- Indexes for keyset pagination of the list endpoints (pagination.py)
+-- A page is WHERE (sort_key, id) < (cursor) ORDER BY sort_key DESC, id DESC
+-- LIMIT n; with these indexes it is one backward index range scan however
+-- deep the cursor, where OFFSET n reads and discards n rows first.
+-- The sort-key expressions must match the SortKey definitions in server.py.
+-- CONCURRENTLY keeps the tables writable while building; run outside a
+-- transaction (psql -f create_keyset_indexes.sql).
+
+-- /api/twitter?sort=recent, /api/reddit?sort=recent
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tweets_published_at_id
+    ON tweets (published_at, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reddit_posts_published_at_id
+    ON reddit_posts (published_at, id);
+
+-- /api/news-posts (default sort=engagement)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_articles_engagement_id
+    ON articles ((COALESCE(engagement_score, 0)), id);
+
+-- /api/dex/dexscreener, /api/dex/dexpaprika (sort=volume); /api/dex/combined
+-- reads dex_pairs_latest, see create_dex_latest_tables.sql
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_dexscreener_pairs_volume_id
+    ON dexscreener_pairs (volume_24h, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_dexpaprika_pairs_volume_id
+    ON dexpaprika_pairs (volume_24h, id);
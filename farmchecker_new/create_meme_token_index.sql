@@ -0,0 +1,28 @@
+-- Meme-token classification and search indexes for crypto_tokens
+-- The crawlers' upsert_crypto_token sets is_meme/meme_tags from the keyword
+-- list in config/keywords.py; meme_tags stays NULL for rows written by
+-- other loaders until scripts/backfill_meme_tags.py classifies them.
+-- /api/crypto/meme-coins walks idx_crypto_tokens_meme in volume order
+-- instead of scanning every token with LOWER(name) LIKE '%...%', and
+-- /api/crypto/search matches word prefixes through idx_crypto_tokens_search.
+-- CONCURRENTLY keeps the table writable while building; run outside a
+-- transaction (psql -f create_meme_token_index.sql).
+
+-- A constant default is a catalog-only change, no table rewrite
+ALTER TABLE crypto_tokens ADD COLUMN IF NOT EXISTS is_meme BOOLEAN NOT NULL DEFAULT FALSE;
+ALTER TABLE crypto_tokens ADD COLUMN IF NOT EXISTS meme_tags TEXT[];
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_crypto_tokens_meme
+    ON crypto_tokens (volume_24h DESC, price_change_24h DESC)
+    INCLUDE (last_updated_at, price_usd)
+    WHERE is_meme;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_crypto_tokens_meme_tags
+    ON crypto_tokens USING GIN (meme_tags)
+    WHERE is_meme;
+
+-- The expression must match the one in server.py's /api/crypto/search
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_crypto_tokens_search
+    ON crypto_tokens USING GIN (
+        to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(symbol, ''))
+    );
@@ -0,0 +1,20 @@
+-- Covering indexes for the /api/stats query (stats_engine.py)
+-- Each UNION ALL branch becomes an index-only scan over the last 24 hours,
+-- so the endpoint cost follows recent rows instead of table size.
+-- CONCURRENTLY keeps the tables writable while building; run outside a
+-- transaction (psql -f create_stats_indexes.sql).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_tweets_stats
+    ON tweets (collected_at) INCLUDE (likes_count, retweets_count, replies_count);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reddit_posts_stats
+    ON reddit_posts (collected_at) INCLUDE (score, comments_count);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_articles_stats
+    ON articles (created_at) INCLUDE (engagement_score);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_crypto_tokens_last_updated_at
+    ON crypto_tokens (last_updated_at);
+
+-- dexscreener_pairs(collected_at) and dexpaprika_pairs(collected_at) are
+-- already indexed in create_dedicated_crawler_tables.sql
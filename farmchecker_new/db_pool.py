@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Process-wide PostgreSQL connection pool for the FarmChecker API server.
+
+Every request used to open (and TLS-handshake) a fresh connection to Cloud SQL.
+Connections are now borrowed from a bounded pool and handed back when the
+caller closes them, so existing ``conn = get_db_connection() ... conn.close()``
+code keeps working unchanged.
+
+- ``DB_POOL_MIN`` / ``DB_POOL_MAX`` bound the number of open connections.
+- ``DB_POOL_TIMEOUT`` is how long a checkout waits for a free connection.
+- Idle connections older than ``DB_POOL_HEALTH_CHECK`` seconds are pinged with
+  ``SELECT 1`` before being handed out; broken ones are replaced.
+- Connections are recycled after ``DB_POOL_MAX_AGE`` seconds.
+- ``stats()`` reports in-use/idle counts, waits, timeouts and checkout latency.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any
+
+import psycopg2
+from psycopg2 import extensions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_SIZE = int(os.getenv("DB_POOL_MIN", "1"))
+DEFAULT_MAX_SIZE = int(os.getenv("DB_POOL_MAX", "10"))
+DEFAULT_CHECKOUT_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DEFAULT_HEALTH_CHECK_INTERVAL = float(os.getenv("DB_POOL_HEALTH_CHECK", "30"))
+DEFAULT_MAX_AGE = float(os.getenv("DB_POOL_MAX_AGE", "1800"))
+
+# Checkout latencies kept for the percentile metrics
+LATENCY_SAMPLES = 1000
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the checkout timeout"""
+
+
+class _Slot:
+    """A raw connection plus the bookkeeping the pool needs for it"""
+
+    __slots__ = ("conn", "created_at", "last_used", "prepared")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.prepared: set[str] = set()
+
+
+class PooledConnection:
+    """Proxy for a pooled psycopg2 connection.
+
+    Behaves like the underlying connection, except that ``close()`` returns it
+    to the pool. Closing twice is harmless.
+    """
+
+    def __init__(self, pool: "ConnectionPool", slot: _Slot):
+        self._pool = pool
+        self._slot: _Slot | None = slot
+
+    @property
+    def raw(self):
+        if self._slot is None:
+            raise psycopg2.InterfaceError("connection already returned to the pool")
+        return self._slot.conn
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+    def cursor(self, *args, **kwargs):
+        return self.raw.cursor(*args, **kwargs)
+
+    def execute_prepared(self, cursor, name: str, sql: str, params: tuple | None = None):
+        """Run *sql* as server-side prepared statement *name* on this connection.
+
+        The statement is PREPAREd the first time a connection sees *name*;
+        *sql* uses ``$1, $2 ...`` placeholders, bound from *params*. Falls back
+        to a plain execute if the server refuses to prepare.
+        """
+        slot = self._slot
+        if slot is None:
+            raise psycopg2.InterfaceError("connection already returned to the pool")
+        if name not in slot.prepared:
+            try:
+                cursor.execute(f"PREPARE {name} AS {sql}")
+            except psycopg2.Error as e:
+                logger.warning(f"Could not prepare statement {name}: {e}")
+                slot.conn.rollback()
+                cursor.execute(positional_to_pyformat(sql), params or ())
+                return
+            slot.prepared.add(name)
+        if params:
+            placeholders = ", ".join(["%s"] * len(params))
+            cursor.execute(f"EXECUTE {name} ({placeholders})", params)
+        else:
+            cursor.execute(f"EXECUTE {name}")
+
+    def close(self):
+        slot, self._slot = self._slot, None
+        if slot is not None:
+            self._pool._release(slot)
+
+    @property
+    def closed(self):
+        return 1 if self._slot is None else self._slot.conn.closed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def positional_to_pyformat(sql: str) -> str:
+    """Rewrite ``$n`` placeholders for a non-prepared psycopg2 execute"""
+    return re.sub(r"\$\d+", "%s", sql.replace("%", "%%"))
+
+
+class ConnectionPool:
+    """Thread-safe bounded pool with checkout timeouts and health checks"""
+
+    def __init__(
+        self,
+        dsn: dict[str, Any] | None = None,
+        min_size: int = DEFAULT_MIN_SIZE,
+        max_size: int = DEFAULT_MAX_SIZE,
+        checkout_timeout: float = DEFAULT_CHECKOUT_TIMEOUT,
+        health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL,
+        max_age: float = DEFAULT_MAX_AGE,
+        connect=None,
+    ):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError("pool needs 0 <= min_size <= max_size and max_size >= 1")
+        self.dsn = dict(dsn or {})
+        self.min_size = min_size
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+        self.max_age = max_age
+        self._connect = connect or psycopg2.connect
+
+        self._cond = threading.Condition()
+        self._idle: deque[_Slot] = deque()
+        self._size = 0  # open connections, idle or in use
+        self._closed = False
+
+        # Metrics
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+        self._failed_health_checks = 0
+        self._latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def _open(self) -> _Slot:
+        conn = self._connect(**self.dsn)
+        with self._cond:
+            self._created += 1
+        return _Slot(conn)
+
+    def fill(self):
+        """Open connections until ``min_size`` are available"""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                slot = self._open()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append(slot)
+                self._cond.notify()
+
+    def close(self):
+        """Close idle connections; in-use ones are closed when returned"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for slot in idle:
+            _close_quietly(slot.conn)
+
+    # -- checkout / return -------------------------------------------------
+
+    def getconn(self, timeout: float | None = None) -> PooledConnection:
+        """Borrow a connection, waiting up to *timeout* seconds for one"""
+        timeout = self.checkout_timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+
+        while True:
+            slot = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise psycopg2.InterfaceError("connection pool is closed")
+                    if self._idle:
+                        slot = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(
+                            f"no database connection available after {timeout:.1f}s "
+                            f"(pool size {self.max_size})"
+                        )
+                    if not waited:
+                        waited = True
+                        self._waits += 1
+                    self._cond.wait(remaining)
+
+            if slot is None:
+                try:
+                    slot = self._open()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._healthy(slot):
+                self._discard(slot)
+                continue
+
+            with self._cond:
+                self._checkouts += 1
+                self._latencies.append(time.monotonic() - start)
+            return PooledConnection(self, slot)
+
+    def _healthy(self, slot: _Slot) -> bool:
+        now = time.monotonic()
+        if slot.conn.closed or now - slot.created_at > self.max_age:
+            return False
+        if now - slot.last_used < self.health_check_interval:
+            return True
+        try:
+            with slot.conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            slot.conn.rollback()
+            return True
+        except Exception as e:
+            logger.warning(f"Pooled connection failed health check: {e}")
+            with self._cond:
+                self._failed_health_checks += 1
+            return False
+
+    def _discard(self, slot: _Slot):
+        _close_quietly(slot.conn)
+        with self._cond:
+            self._size -= 1
+            self._discarded += 1
+            self._cond.notify()
+
+    def _release(self, slot: _Slot):
+        conn = slot.conn
+        if not conn.closed:
+            try:
+                # End any transaction the caller left open so the next
+                # borrower starts clean.
+                if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception as e:
+                logger.warning(f"Discarding pooled connection after failed rollback: {e}")
+                _close_quietly(conn)
+        if conn.closed or self._closed:
+            self._discard(slot)
+            return
+        slot.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(slot)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: float | None = None):
+        """``with pool.connection() as conn:`` - always returned to the pool"""
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def cursor(self, commit: bool = False, timeout: float | None = None):
+        """Borrow a connection and yield a cursor; commits if *commit* is set"""
+        with self.connection(timeout) as conn:
+            cur = conn.cursor()
+            try:
+                yield cur
+                if commit:
+                    conn.commit()
+            finally:
+                cur.close()
+
+    # -- metrics -----------------------------------------------------------
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            latencies: list[float] = sorted(self._latencies)
+            idle = len(self._idle)
+            stats = {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": idle,
+                "in_use": self._size - idle,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "connections_created": self._created,
+                "connections_discarded": self._discarded,
+                "failed_health_checks": self._failed_health_checks,
+            }
+        stats["checkout_ms"] = {
+            "p50": round(_percentile(latencies, 0.50) * 1000, 3),
+            "p99": round(_percentile(latencies, 0.99) * 1000, 3),
+            "max": round((latencies[-1] if latencies else 0.0) * 1000, 3),
+        }
+        return stats
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+_pool: ConnectionPool | None = None
+_pool_pid: int | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(dsn: dict[str, Any] | None = None) -> ConnectionPool:
+    """Process-wide pool, created on first use from *dsn*"""
+    global _pool, _pool_pid
+    with _pool_lock:
+        # A forked worker must not share its parent's sockets
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ConnectionPool(dsn)
+            _pool_pid = os.getpid()
+            try:
+                _pool.fill()
+            except Exception as e:
+                # Keep the pool; the next checkout retries the connection.
+                logger.warning(f"Could not pre-open database connections: {e}")
+        return _pool
+
+
+def close_pool():
+    """Close the process-wide pool (e.g. in a gunicorn worker_exit hook)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
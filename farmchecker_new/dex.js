@@ -8,6 +8,14 @@ class DexPage {
       combined: [],
       stats: {}
     };
+    // Keyset cursor of each list's next page (X-Next-Cursor); null at the end
+    this.nextCursors = {
+      dexscreener: null,
+      dexpaprika: null,
+      combined: null
+    };
+    this.loadingMore = {};
+    this.scrolled = false;
     this.currentTab = 'dexscreener';
     this.currentSort = 'volume';
     this.darkMode = localStorage.getItem('darkMode') === 'true';
@@ -18,10 +26,20 @@ class DexPage {
     this.setupTheme();
     await this.loadAllData();
     this.setupEventListeners();
+    this.setupInfiniteScroll();
     this.updateUI();
 
-    // Auto-refresh every 2 minutes for DEX data
-    setInterval(() => this.loadAllData(), 2 * 60 * 1000);
+    // Auto-refresh every 2 minutes for DEX data, unless more pages have
+    // been scrolled in
+    setInterval(() => {
+      if (!this.scrolled) this.refresh();
+    }, 2 * 60 * 1000);
+  }
+
+  async refresh() {
+    this.scrolled = false;
+    await this.loadAllData();
+    this.updateUI();
   }
 
   setupTheme() {
@@ -57,10 +75,26 @@ class DexPage {
     }
   }
 
+  async fetchPage(list, cursor) {
+    let url = `${this.apiBase}/dex/${list}?sort=${this.currentSort}`;
+    if (cursor) url += `&cursor=${encodeURIComponent(cursor)}`;
+    const response = await fetch(url);
+    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+    return {
+      items: await response.json(),
+      nextCursor: response.headers.get("X-Next-Cursor")
+    };
+  }
+
+  async loadList(list) {
+    const page = await this.fetchPage(list, null);
+    this.data[list] = page.items;
+    this.nextCursors[list] = page.nextCursor;
+  }
+
   async loadDexScreenerData() {
     try {
-      const response = await fetch(`${this.apiBase}/dex/dexscreener?sort=${this.currentSort}`);
-      this.data.dexscreener = await response.json();
+      await this.loadList('dexscreener');
     } catch (error) {
       console.error("Error loading DexScreener data:", error);
       this.data.dexscreener = [];
@@ -69,8 +103,7 @@ class DexPage {
 
   async loadDexPaprikaData() {
     try {
-      const response = await fetch(`${this.apiBase}/dex/dexpaprika?sort=${this.currentSort}`);
-      this.data.dexpaprika = await response.json();
+      await this.loadList('dexpaprika');
     } catch (error) {
       console.error("Error loading DexPaprika data:", error);
       this.data.dexpaprika = [];
@@ -79,14 +112,60 @@ class DexPage {
 
   async loadCombinedData() {
     try {
-      const response = await fetch(`${this.apiBase}/dex/combined?sort=${this.currentSort}`);
-      this.data.combined = await response.json();
+      await this.loadList('combined');
     } catch (error) {
       console.error("Error loading combined DEX data:", error);
       this.data.combined = [];
     }
   }
 
+  renderItem(list, item) {
+    if (list === 'dexscreener') return this.renderDexScreenerPair(item);
+    if (list === 'dexpaprika') return this.renderDexPaprikaToken(item);
+    return this.renderCombinedItem(item);
+  }
+
+  async loadMore(list) {
+    if (!this.nextCursors[list] || this.loadingMore[list]) return;
+    this.loadingMore[list] = true;
+    const sort = this.currentSort;
+    try {
+      const page = await this.fetchPage(list, this.nextCursors[list]);
+      // The sort changed while this page was loading
+      if (sort !== this.currentSort) return;
+      this.scrolled = true;
+      this.nextCursors[list] = page.nextCursor;
+      this.data[list].push(...page.items);
+      const container = document.getElementById(`${list}-data`);
+      if (container) {
+        container.insertAdjacentHTML("beforeend", page.items.map(item => this.renderItem(list, item)).join(""));
+      }
+    } catch (error) {
+      console.error(`Error loading more ${list} data:`, error);
+    } finally {
+      this.loadingMore[list] = false;
+    }
+  }
+
+  setupInfiniteScroll() {
+    if (!("IntersectionObserver" in window)) return;
+
+    // Load the next page of the visible tab when the end of its list comes
+    // within 600px
+    Object.keys(this.nextCursors).forEach(list => {
+      const container = document.getElementById(`${list}-data`);
+      if (!container) return;
+      const sentinel = document.createElement("div");
+      sentinel.className = "scroll-sentinel";
+      container.after(sentinel);
+      new IntersectionObserver(entries => {
+        if (this.currentTab === list && entries.some(entry => entry.isIntersecting)) {
+          this.loadMore(list);
+        }
+      }, { rootMargin: "600px" }).observe(sentinel);
+    });
+  }
+
   async loadStats() {
     try {
       const response = await fetch(`${this.apiBase}/stats`);
@@ -125,7 +204,7 @@ class DexPage {
     if (sortFilter) {
       sortFilter.addEventListener("change", (e) => {
         this.currentSort = e.target.value;
-        this.loadAllData();
+        this.refresh();
       });
     }
   }
@@ -217,7 +296,6 @@ class DexPage {
 
     loading.style.display = 'none';
     container.innerHTML = this.data.dexscreener
-      .slice(0, 20)
       .map(pair => this.renderDexScreenerPair(pair))
       .join("");
   }
@@ -236,7 +314,6 @@ class DexPage {
 
     loading.style.display = 'none';
     container.innerHTML = this.data.dexpaprika
-      .slice(0, 20)
       .map(token => this.renderDexPaprikaToken(token))
       .join("");
   }
@@ -255,7 +332,6 @@ class DexPage {
 
     loading.style.display = 'none';
     container.innerHTML = this.data.combined
-      .slice(0, 30)
       .map(item => this.renderCombinedItem(item))
       .join("");
   }
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Prune dex_pairs_latest and compact dex_pair_history into time buckets.
+
+The triggers from create_dex_latest_tables.sql keep one row per pair in
+dex_pairs_latest and add a dex_pair_history row for every changed
+snapshot. Run this job hourly (cron or Cloud Scheduler) to:
+
+- drop pairs not crawled for ``DEX_LATEST_MAX_AGE_HOURS`` from
+  dex_pairs_latest, so /api/dex/combined only walks live pairs;
+- fold history older than each tier of ``DEX_HISTORY_TIERS`` into buckets of
+  that tier's width. The default ``2 days=1 hour,30 days=1 day`` keeps raw
+  snapshots for two days, hourly buckets for a month and daily ones after.
+
+    python dex_history.py              # prune and compact
+    python dex_history.py --dry-run    # report what would change
+"""
+
+import argparse
+import logging
+import os
+import time
+
+import psycopg2
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Database configuration
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "34.9.71.174"),
+    "database": os.getenv("DB_NAME", "degen_digest"),
+    "user": os.getenv("DB_USER", "postgres"),
+    "password": os.getenv("DB_PASSWORD", "DegenDigest2024!"),
+    "port": os.getenv("DB_PORT", "5432"),
+}
+
+LATEST_MAX_AGE_HOURS = int(os.getenv("DEX_LATEST_MAX_AGE_HOURS", "24"))
+
+
+def parse_tiers(spec):
+    """``"2 days=1 hour,30 days=1 day"`` -> ``[("2 days", "1 hour"), ...]``
+
+    Each tier is ``<age>=<bucket width>`` in Postgres interval syntax.
+    """
+    tiers = []
+    for tier in filter(None, (part.strip() for part in spec.split(","))):
+        age, sep, width = tier.partition("=")
+        if not sep or not age.strip() or not width.strip():
+            raise ValueError(
+                f"DEX_HISTORY_TIERS entry {tier!r} is not <age>=<bucket width>"
+            )
+        tiers.append((age.strip(), width.strip()))
+    return tiers
+
+
+COMPACTION_TIERS = parse_tiers(
+    os.getenv("DEX_HISTORY_TIERS", "2 days=1 hour,30 days=1 day")
+)
+
+# Buckets are aligned to the epoch, and the cutoff to a bucket boundary, so
+# a bucket is only compacted once all of it is older than the tier's age.
+# A snapshot that still arrives late for a compacted bucket is merged into it.
+COMPACT_SQL = """
+WITH params AS (
+    -- bucket_start is a local timestamp without time zone, like NOW() stores
+    SELECT EXTRACT(EPOCH FROM %(width)s::interval)::int AS width,
+           LOCALTIMESTAMP - %(age)s::interval AS cutoff
+), moved AS (
+    DELETE FROM dex_pair_history h
+    USING params p
+    WHERE h.bucket_seconds < p.width
+    AND h.bucket_start < to_timestamp(floor(EXTRACT(EPOCH FROM p.cutoff) / p.width) * p.width)
+                         AT TIME ZONE 'UTC'
+    RETURNING h.*
+), bucketed AS (
+    SELECT moved.*, p.width,
+           to_timestamp(floor(EXTRACT(EPOCH FROM bucket_start) / p.width) * p.width)
+               AT TIME ZONE 'UTC' AS bucket
+    FROM moved, params p
+), written AS (
+    INSERT INTO dex_pair_history AS h (
+        source, pair_id, bucket_start, bucket_seconds, samples,
+        price_open, price_high, price_low, price_close,
+        price_change_24h, volume_24h, liquidity_usd, market_cap
+    )
+    SELECT source, pair_id, bucket, MIN(width), SUM(samples),
+           (array_agg(price_open ORDER BY bucket_start))[1],
+           MAX(price_high), MIN(price_low),
+           (array_agg(price_close ORDER BY bucket_start DESC))[1],
+           (array_agg(price_change_24h ORDER BY bucket_start DESC))[1],
+           (array_agg(volume_24h ORDER BY bucket_start DESC))[1],
+           (array_agg(liquidity_usd ORDER BY bucket_start DESC))[1],
+           (array_agg(market_cap ORDER BY bucket_start DESC))[1]
+    FROM bucketed
+    GROUP BY source, pair_id, bucket
+    ON CONFLICT (source, pair_id, bucket_seconds, bucket_start) WHERE bucket_seconds > 0
+    DO UPDATE SET
+        samples = h.samples + EXCLUDED.samples,
+        price_high = GREATEST(h.price_high, EXCLUDED.price_high),
+        price_low = LEAST(h.price_low, EXCLUDED.price_low)
+    RETURNING 1
+)
+SELECT (SELECT COUNT(*) FROM moved), (SELECT COUNT(*) FROM written)
+"""
+
+
+def prune_latest(conn, max_age_hours=LATEST_MAX_AGE_HOURS):
+    """Delete pairs not seen for *max_age_hours*; returns how many"""
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "DELETE FROM dex_pairs_latest WHERE collected_at < NOW() - %s * INTERVAL '1 hour'",
+            (max_age_hours,),
+        )
+        return cursor.rowcount
+
+
+def compact_history(conn, tiers=COMPACTION_TIERS):
+    """Fold history into buckets tier by tier, finest first.
+
+    Returns ``{"<age>=<width>": (rows folded, buckets written)}``.
+    """
+    folded = {}
+    with conn.cursor() as cursor:
+        for age, width in tiers:
+            cursor.execute(COMPACT_SQL, {"age": age, "width": width})
+            folded[f"{age}={width}"] = cursor.fetchone()
+    return folded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--dry-run", action="store_true", help="roll back instead of committing"
+    )
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        start = time.time()
+        pruned = prune_latest(conn)
+        logger.info(
+            f"Pruned {pruned} pairs not seen for {LATEST_MAX_AGE_HOURS}h from dex_pairs_latest"
+        )
+        for tier, (rows, buckets) in compact_history(conn).items():
+            logger.info(
+                f"History tier {tier}: folded {rows} rows into {buckets} buckets"
+            )
+        if args.dry_run:
+            conn.rollback()
+            logger.info("Dry run, rolled back")
+        else:
+            conn.commit()
+        logger.info(f"Done in {time.time() - start:.1f}s")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
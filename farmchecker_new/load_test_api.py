@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Concurrent load test for the FarmChecker API server.
+
+Fires requests at a running server from a thread pool and reports p50/p99
+latency and error counts per endpoint, plus the server's connection pool
+metrics when ``/api/metrics`` is available. Run it against the same database
+before and after a change to compare:
+
+    python server.py &            # or gunicorn
+    python load_test_api.py --base-url http://localhost:8080 -c 20 -n 500
+"""
+
+import argparse
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_ENDPOINTS = [
+    "/api/stats",
+    "/api/twitter",
+    "/api/crypto/top-gainers",
+    "/api/dex/combined",
+    "/api/system-status",
+]
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def fetch(url, timeout):
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as resp:
+            resp.read()
+            ok = 200 <= resp.status < 400
+    except (urllib.error.URLError, OSError):
+        ok = False
+    return (time.perf_counter() - start) * 1000, ok
+
+
+def run_endpoint(base_url, path, concurrency, requests, timeout):
+    url = base_url.rstrip("/") + path
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: fetch(url, timeout), range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies = [ms for ms, ok in results if ok]
+    return {
+        "endpoint": path,
+        "requests": requests,
+        "errors": sum(1 for _, ok in results if not ok),
+        "rps": round(requests / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://localhost:8080")
+    parser.add_argument("-c", "--concurrency", type=int, default=20)
+    parser.add_argument("-n", "--requests", type=int, default=500, help="requests per endpoint")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--warmup", type=int, default=5, help="untimed requests per endpoint")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("endpoints", nargs="*", default=DEFAULT_ENDPOINTS)
+    args = parser.parse_args()
+
+    for path in args.endpoints:
+        for _ in range(args.warmup):
+            fetch(args.base_url.rstrip("/") + path, args.timeout)
+
+    results = [
+        run_endpoint(args.base_url, path, args.concurrency, args.requests, args.timeout)
+        for path in args.endpoints
+    ]
+
+    metrics = None
+    try:
+        with urllib.request.urlopen(args.base_url.rstrip("/") + "/api/metrics", timeout=args.timeout) as resp:
+            metrics = json.loads(resp.read())
+    except (urllib.error.URLError, OSError, ValueError):
+        pass
+
+    if args.json:
+        print(json.dumps({"results": results, "metrics": metrics}, indent=2))
+        return
+
+    print(f"{'endpoint':<28}{'req':>6}{'err':>6}{'rps':>9}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for r in results:
+        print(
+            f"{r['endpoint']:<28}{r['requests']:>6}{r['errors']:>6}{r['rps']:>9}"
+            f"{r['mean_ms']:>10}{r['p50_ms']:>10}{r['p99_ms']:>10}"
+        )
+    if metrics:
+        print("\nServer metrics:")
+        print(json.dumps(metrics, indent=2))
+
+
+if __name__ == "__main__":
+    main()
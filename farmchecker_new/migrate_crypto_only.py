@@ -7,9 +7,13 @@ import json
 import logging
 import os
 from datetime import datetime
+from functools import partial
 from google.cloud import storage
 import psycopg2
 
+from bulk_loader import LoadResult, load_rows
+from migration_targets import CRYPTO_TOKENS, crypto_row
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -52,13 +56,11 @@ def migrate_crypto_data():
         return False
     
     try:
-        cursor = conn.cursor()
-        
         # List all crypto files in GCS
         blobs = list(bucket.list_blobs(prefix="crypto_data/"))
         logger.info(f"Found {len(blobs)} crypto files to migrate")
         
-        total_migrated = 0
+        total = LoadResult()
         
         for blob in blobs:
             if not blob.name.endswith('.json'):
@@ -85,55 +87,20 @@ def migrate_crypto_data():
                 
                 logger.info(f"Processing {blob.name} with {len(tokens)} tokens")
                 
-                file_migrated = 0
-                
-                for token in tokens:
-                    try:
-                        cursor.execute("""
-                            INSERT INTO crypto_tokens (
-                                symbol, name, network, contract_address, market_cap,
-                                price_usd, volume_24h, price_change_24h,
-                                first_seen_at, last_updated_at
-                            ) VALUES (
-                                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                            ) ON CONFLICT (symbol) DO UPDATE SET
-                                price_usd = EXCLUDED.price_usd,
-                                market_cap = EXCLUDED.market_cap,
-                                volume_24h = EXCLUDED.volume_24h,
-                                price_change_24h = EXCLUDED.price_change_24h,
-                                last_updated_at = CURRENT_TIMESTAMP
-                        """, (
-                            token.get('symbol'),
-                            token.get('name'),
-                            token.get('network'),
-                            token.get('contract_address'),
-                            token.get('market_cap'),
-                            token.get('price_usd') or token.get('price'),
-                            token.get('volume_24h'),
-                            token.get('price_change_24h'),
-                            datetime.now(),
-                            datetime.now()
-                        ))
-                        
-                        file_migrated += 1
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing token: {e}")
-                        # Rollback the current transaction and continue
-                        conn.rollback()
-                        continue
+                result = load_rows(conn, CRYPTO_TOKENS, tokens, partial(crypto_row, collected_at=datetime.now()),
+                                   source=blob.name)
                 
                 # Commit after each file to avoid long transactions
                 conn.commit()
-                total_migrated += file_migrated
-                logger.info(f"✅ Migrated {blob.name} ({file_migrated} tokens)")
+                total = total.plus(result)
+                logger.info(f"✅ Migrated {blob.name} ({result})")
                 
             except Exception as e:
                 logger.error(f"Error processing file {blob.name}: {e}")
                 conn.rollback()
                 continue
         
-        logger.info(f"🎉 Crypto migration complete! Migrated {total_migrated} tokens")
+        logger.info(f"🎉 Crypto migration complete! Migrated {total.written} tokens ({total})")
         return True
         
     except Exception as e:
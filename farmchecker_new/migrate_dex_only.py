@@ -7,9 +7,13 @@ import json
 import logging
 import os
 from datetime import datetime
+from functools import partial
 from google.cloud import storage
 import psycopg2
 
+from bulk_loader import LoadResult, load_rows
+from migration_targets import DEX_PAIRS, flat_dex_pair_row
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -52,13 +56,11 @@ def migrate_dex_data():
         return False
     
     try:
-        cursor = conn.cursor()
-        
         # Migrate DexScreener data
         dexscreener_blobs = list(bucket.list_blobs(prefix="dexscreener_data/"))
         logger.info(f"Found {len(dexscreener_blobs)} DexScreener files to migrate")
         
-        total_migrated = 0
+        total = LoadResult()
         
         # Process DexScreener files
         for blob in dexscreener_blobs:
@@ -75,63 +77,14 @@ def migrate_dex_data():
                 
                 logger.info(f"Processing {blob.name} with {len(pairs)} pairs")
                 
-                file_migrated = 0
-                
-                for pair in pairs:
-                    try:
-                        cursor.execute("""
-                            INSERT INTO dex_pairs (
-                                pair_id, base_token_symbol, base_token_name, base_token_address,
-                                quote_token_symbol, quote_token_name, quote_token_address,
-                                dex_name, chain_name, price_usd, price_change_24h,
-                                volume_24h, liquidity_usd, market_cap, txns_24h, fdv,
-                                source, published_at, collected_at, raw_data
-                            ) VALUES (
-                                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                            ) ON CONFLICT (pair_id) DO UPDATE SET
-                                price_usd = EXCLUDED.price_usd,
-                                price_change_24h = EXCLUDED.price_change_24h,
-                                volume_24h = EXCLUDED.volume_24h,
-                                liquidity_usd = EXCLUDED.liquidity_usd,
-                                market_cap = EXCLUDED.market_cap,
-                                txns_24h = EXCLUDED.txns_24h,
-                                fdv = EXCLUDED.fdv,
-                                last_updated_at = CURRENT_TIMESTAMP
-                        """, (
-                            pair.get('pair_id') or pair.get('id'),
-                            pair.get('base_token_symbol'),
-                            pair.get('base_token_name'),
-                            pair.get('base_token_address'),
-                            pair.get('quote_token_symbol'),
-                            pair.get('quote_token_name'),
-                            pair.get('quote_token_address'),
-                            pair.get('dex_name'),
-                            pair.get('chain_name'),
-                            pair.get('price_usd'),
-                            pair.get('price_change_24h'),
-                            pair.get('volume_24h'),
-                            pair.get('liquidity_usd'),
-                            pair.get('market_cap'),
-                            pair.get('txns_24h'),
-                            pair.get('fdv'),
-                            'dexscreener',
-                            pair.get('published_at') or datetime.now(),
-                            datetime.now(),
-                            json.dumps(pair)
-                        ))
-                        
-                        file_migrated += 1
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing pair: {e}")
-                        # Rollback the current transaction and continue
-                        conn.rollback()
-                        continue
+                result = load_rows(conn, DEX_PAIRS, pairs,
+                                   partial(flat_dex_pair_row, source='dexscreener', collected_at=datetime.now()),
+                                   source=blob.name)
                 
                 # Commit after each file to avoid long transactions
                 conn.commit()
-                total_migrated += file_migrated
-                logger.info(f"✅ Migrated {blob.name} ({file_migrated} pairs)")
+                total = total.plus(result)
+                logger.info(f"✅ Migrated {blob.name} ({result})")
                 
             except Exception as e:
                 logger.error(f"Error processing file {blob.name}: {e}")
@@ -157,70 +110,21 @@ def migrate_dex_data():
                 
                 logger.info(f"Processing {blob.name} with {len(pairs)} pairs")
                 
-                file_migrated = 0
-                
-                for pair in pairs:
-                    try:
-                        cursor.execute("""
-                            INSERT INTO dex_pairs (
-                                pair_id, base_token_symbol, base_token_name, base_token_address,
-                                quote_token_symbol, quote_token_name, quote_token_address,
-                                dex_name, chain_name, price_usd, price_change_24h,
-                                volume_24h, liquidity_usd, market_cap, txns_24h, fdv,
-                                source, published_at, collected_at, raw_data
-                            ) VALUES (
-                                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                            ) ON CONFLICT (pair_id) DO UPDATE SET
-                                price_usd = EXCLUDED.price_usd,
-                                price_change_24h = EXCLUDED.price_change_24h,
-                                volume_24h = EXCLUDED.volume_24h,
-                                liquidity_usd = EXCLUDED.liquidity_usd,
-                                market_cap = EXCLUDED.market_cap,
-                                txns_24h = EXCLUDED.txns_24h,
-                                fdv = EXCLUDED.fdv,
-                                last_updated_at = CURRENT_TIMESTAMP
-                        """, (
-                            pair.get('pair_id') or pair.get('id'),
-                            pair.get('base_token_symbol'),
-                            pair.get('base_token_name'),
-                            pair.get('base_token_address'),
-                            pair.get('quote_token_symbol'),
-                            pair.get('quote_token_name'),
-                            pair.get('quote_token_address'),
-                            pair.get('dex_name'),
-                            pair.get('chain_name'),
-                            pair.get('price_usd'),
-                            pair.get('price_change_24h'),
-                            pair.get('volume_24h'),
-                            pair.get('liquidity_usd'),
-                            pair.get('market_cap'),
-                            pair.get('txns_24h'),
-                            pair.get('fdv'),
-                            'dexpaprika',
-                            pair.get('published_at') or datetime.now(),
-                            datetime.now(),
-                            json.dumps(pair)
-                        ))
-                        
-                        file_migrated += 1
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing pair: {e}")
-                        # Rollback the current transaction and continue
-                        conn.rollback()
-                        continue
+                result = load_rows(conn, DEX_PAIRS, pairs,
+                                   partial(flat_dex_pair_row, source='dexpaprika', collected_at=datetime.now()),
+                                   source=blob.name)
                 
                 # Commit after each file to avoid long transactions
                 conn.commit()
-                total_migrated += file_migrated
-                logger.info(f"✅ Migrated {blob.name} ({file_migrated} pairs)")
+                total = total.plus(result)
+                logger.info(f"✅ Migrated {blob.name} ({result})")
                 
             except Exception as e:
                 logger.error(f"Error processing file {blob.name}: {e}")
                 conn.rollback()
                 continue
         
-        logger.info(f"🎉 DEX migration complete! Migrated {total_migrated} pairs")
+        logger.info(f"🎉 DEX migration complete! Migrated {total.written} pairs ({total})")
         return True
         
     except Exception as e:
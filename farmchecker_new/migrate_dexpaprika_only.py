@@ -7,9 +7,13 @@ import json
 import logging
 import os
 from datetime import datetime
+from functools import partial
 from google.cloud import storage
 import psycopg2
 
+from bulk_loader import LoadResult, load_rows
+from migration_targets import DEXPAPRIKA_PAIRS, dexpaprika_token_row
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -52,13 +56,11 @@ def migrate_dexpaprika_data():
         return False
     
     try:
-        cursor = conn.cursor()
-        
         # List all DexPaprika files in GCS
         blobs = list(bucket.list_blobs(prefix="dexpaprika_data/"))
         logger.info(f"Found {len(blobs)} DexPaprika files to migrate")
         
-        total_migrated = 0
+        total = LoadResult()
         
         for blob in blobs:
             if not blob.name.endswith('.json'):
@@ -81,86 +83,19 @@ def migrate_dexpaprika_data():
                     logger.info(f"✅ Migrated {blob.name} (0 tokens)")
                     continue
                 
-                file_migrated = 0
-                
-                for token in pairs:
-                    try:
-                        # Extract token data - DexPaprika structure is different
-                        token_id = token.get('id') or token.get('address')
-                        if not token_id:
-                            continue
-                            
-                        # Extract token information
-                        base_token_symbol = token.get('symbol')
-                        base_token_name = token.get('name')
-                        base_token_address = token.get('id') or token.get('address')
-                        
-                        # For DexPaprika, we're storing token data, not pairs
-                        # Use the token address as pair_id for consistency
-                        pair_id = f"dexpaprika_{token_id}"
-                        
-                        dex_name = 'dexpaprika'
-                        chain_name = token.get('chain', 'unknown')
-                        
-                        # Extract summary data
-                        summary = token.get('summary', {})
-                        price_usd = summary.get('price_usd')
-                        volume_24h = summary.get('24h', {}).get('volume_usd') if isinstance(summary.get('24h'), dict) else None
-                        liquidity_usd = summary.get('liquidity_usd')
-                        txns_24h = summary.get('24h', {}).get('txns') if isinstance(summary.get('24h'), dict) else None
-                        fdv = summary.get('fdv')
-                        
-                        # Calculate price change from summary
-                        price_change_24h = summary.get('24h', {}).get('last_price_usd_change') if isinstance(summary.get('24h'), dict) else None
-                        
-                        # Insert into database
-                        cursor.execute("""
-                            INSERT INTO dexpaprika_pairs (
-                                pair_id, chain_id, dex_id, pair_address,
-                                base_token_symbol, base_token_name, base_token_address,
-                                quote_token_symbol, quote_token_name, quote_token_address,
-                                price_usd, price_change_24h, volume_24h, liquidity_usd,
-                                txns_24h, market_cap, collected_at, raw_data
-                            ) VALUES (
-                                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                            ) ON CONFLICT (pair_id) DO NOTHING
-                        """, (
-                            pair_id,
-                            chain_name,
-                            dex_name,
-                            base_token_address,  # Use token address as pair_address
-                            base_token_symbol,
-                            base_token_name,
-                            base_token_address,
-                            'N/A',  # No quote token for DexPaprika
-                            'N/A',  # No quote token for DexPaprika
-                            'N/A',  # No quote token for DexPaprika
-                            price_usd,
-                            price_change_24h,
-                            volume_24h,
-                            liquidity_usd,
-                            txns_24h,
-                            None,  # No market cap in DexPaprika
-                            datetime.now(),
-                            json.dumps(token)
-                        ))
-                        
-                        file_migrated += 1
-                        
-                    except Exception as e:
-                        logger.warning(f"⚠️ Error processing token in {blob.name}: {e}")
-                        continue
+                result = load_rows(conn, DEXPAPRIKA_PAIRS, pairs, partial(dexpaprika_token_row, collected_at=datetime.now()),
+                                   source=blob.name)
                 
                 conn.commit()
-                total_migrated += file_migrated
-                logger.info(f"✅ Migrated {blob.name} ({file_migrated} tokens)")
+                total = total.plus(result)
+                logger.info(f"✅ Migrated {blob.name} ({result})")
                 
             except Exception as e:
                 logger.error(f"❌ Error processing {blob.name}: {e}")
                 conn.rollback()
                 continue
         
-        logger.info(f"🎉 DexPaprika migration complete! Migrated {total_migrated} tokens")
+        logger.info(f"🎉 DexPaprika migration complete! Migrated {total.written} tokens ({total})")
         return True
         
     except Exception as e:
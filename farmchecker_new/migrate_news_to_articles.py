@@ -9,6 +9,8 @@ import sys
 from datetime import datetime
 from typing import Any, Dict, Optional
 
+from content_cleaning import clean_post_content
+
 # Add current directory to path
 sys.path.append(".")
 
@@ -106,19 +108,20 @@ def migrate_news_data():
                 # Insert into articles table
                 cursor.execute("""
                     INSERT INTO articles (
-                        title, description, content, url, source_name, author,
+                        title, description, content, clean_content, url, source_name, author,
                         published_at, query, source_type, collected_at,
                         viral_keywords, sentiment, urgency, category,
                         engagement_score, virality_score, sentiment_score,
                         api_source, raw_data, created_at
                     ) VALUES (
                         %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                        %s, %s, %s, %s, %s, %s
+                        %s, %s, %s, %s, %s, %s, %s
                     )
                 """, (
                     article['title'],
                     None,  # description - not in content_items
                     article['content'],
+                    clean_post_content(article['content']),
                     article['url'],
                     metadata.get('source_name', ''),
                     article['author'],
@@ -7,9 +7,13 @@ import json
 import logging
 import os
 from datetime import datetime
+from functools import partial
 from google.cloud import storage
 import psycopg2
 
+from bulk_loader import LoadResult, load_rows
+from migration_targets import REDDIT_POSTS, reddit_row
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -52,13 +56,11 @@ def migrate_reddit_data():
         return False
     
     try:
-        cursor = conn.cursor()
-        
         # List all Reddit files in GCS
         blobs = list(bucket.list_blobs(prefix="reddit_data/"))
         logger.info(f"Found {len(blobs)} Reddit files to migrate")
         
-        total_migrated = 0
+        total = LoadResult()
         
         for blob in blobs:
             if not blob.name.endswith('.json'):
@@ -78,71 +80,20 @@ def migrate_reddit_data():
                 
                 logger.info(f"Processing {blob.name} with {len(posts)} posts")
                 
-                file_migrated = 0
-                
-                for post in posts:
-                    try:
-                        # Skip posts without ID
-                        post_id = post.get('id') or post.get('post_id')
-                        if not post_id:
-                            logger.warning(f"Skipping post without ID: {post.get('title', 'Unknown')}")
-                            continue
-                        
-                        # Handle missing username with default value
-                        username = post.get('username') or post.get('author_username') or 'unknown_user'
-                        
-                        cursor.execute("""
-                            INSERT INTO reddit_posts (
-                                post_id, subreddit, author_username, title, content, url,
-                                is_original_content, published_at, collected_at,
-                                upvotes, downvotes, comments_count, score,
-                                engagement_score, virality_score, sentiment_score,
-                                viral_keywords, category, urgency, raw_data
-                            ) VALUES (
-                                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                            ) ON CONFLICT (post_id) DO NOTHING
-                        """, (
-                            post_id,
-                            post.get('subreddit'),
-                            username,
-                            post.get('title'),
-                            post.get('text') or post.get('content'),
-                            post.get('url'),
-                            post.get('is_original_content', False),
-                            post.get('published_at') or post.get('created_at'),
-                            datetime.now(),
-                            post.get('upvotes', 0),
-                            post.get('downvotes', 0),
-                            post.get('comments_count', 0),
-                            post.get('score', 0),
-                            post.get('engagement_score', 0),
-                            post.get('virality_score', 0),
-                            post.get('sentiment_score', 0),
-                            json.dumps(post.get('viral_keywords', [])),
-                            post.get('category', 'general'),
-                            post.get('urgency', 'low'),
-                            json.dumps(post)
-                        ))
-                        
-                        file_migrated += 1
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing post: {e}")
-                        # Rollback the current transaction and continue
-                        conn.rollback()
-                        continue
+                result = load_rows(conn, REDDIT_POSTS, posts, partial(reddit_row, collected_at=datetime.now()),
+                                   source=blob.name)
                 
                 # Commit after each file to avoid long transactions
                 conn.commit()
-                total_migrated += file_migrated
-                logger.info(f"✅ Migrated {blob.name} ({file_migrated} posts)")
+                total = total.plus(result)
+                logger.info(f"✅ Migrated {blob.name} ({result})")
                 
             except Exception as e:
                 logger.error(f"Error processing file {blob.name}: {e}")
                 conn.rollback()
                 continue
         
-        logger.info(f"🎉 Reddit migration complete! Migrated {total_migrated} posts")
+        logger.info(f"🎉 Reddit migration complete! Migrated {total.written} posts ({total})")
         return True
         
     except Exception as e:
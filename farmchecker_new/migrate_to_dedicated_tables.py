@@ -2,16 +2,30 @@
 """
 Migration script to move data from GCS buckets to dedicated tables
 This script handles the migration from the old bucket structure to new dedicated tables
+
+Each file is bulk loaded with bulk_loader.load_rows; rows that fail
+validation go to load_dead_letters instead of rolling back the file. The
+four sources run in parallel (MIGRATION_WORKERS), each on its own
+connection.
 """
 
 import json
 import logging
 import os
 import psycopg2
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from google.cloud import storage
 from typing import Dict, List, Any
 
+from bulk_loader import DEFAULT_BATCH_SIZE, LoadResult, load_rows
+from migration_state import MigrationState, local_bucket_from_env
+from migration_targets import (
+    CRYPTO_TOKENS, DEX_PAIRS, REDDIT_POSTS, TWEETS,
+    crypto_row, dex_pair_row, reddit_row, tweet_row,
+)
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -47,102 +61,68 @@ def get_gcs_client():
         logger.error(f"GCS client error: {e}")
         return None, None
 
-def migrate_twitter_data():
-    """Migrate Twitter data from GCS to tweets table"""
+# Sources migrated at once by main()
+MIGRATION_WORKERS = int(os.getenv("MIGRATION_WORKERS", "4"))
+
+
+def migrate_twitter_data(bucket=None, full=False, batch_size=DEFAULT_BATCH_SIZE):
+    """Migrate new or changed Twitter files from GCS to the tweets table
+
+    Files already loaded at their current generation/etag are skipped (see
+    migration_state.py); pass ``full=True`` to reload everything.
+    """
     logger.info("🔄 Starting Twitter data migration...")
     
     conn = get_db_connection()
     if not conn:
         return False
     
-    client, bucket = get_gcs_client()
+    if bucket is None:
+        bucket = local_bucket_from_env()
+    if bucket is None:
+        client, bucket = get_gcs_client()
     if not bucket:
+        conn.close()
         return False
     
     try:
-        cursor = conn.cursor()
+        state = MigrationState(conn, "twitter_data/")
+        if full:
+            state.reset()
         
-        # List all Twitter files in GCS
-        blobs = list(bucket.list_blobs(prefix="twitter_data/"))
-        logger.info(f"Found {len(blobs)} Twitter files to migrate")
+        # Listing is cheap; only new or changed files are downloaded
+        blobs = [b for b in bucket.list_blobs(prefix="twitter_data/") if b.name.endswith('.json')]
+        pending = state.pending(blobs)
+        logger.info(f"Found {len(blobs)} Twitter files, {len(pending)} new or changed")
         
-        total_migrated = 0
+        total = LoadResult()
         
-        for blob in blobs:
-            if not blob.name.endswith('.json'):
-                continue
-                
+        for blob in pending:
             try:
                 # Download and parse JSON
-                content = blob.download_as_text()
-                data = json.loads(content)
+                data = json.loads(blob.download_as_text())
                 
                 # Extract tweets from the data
                 tweets = data.get('tweets', [])
                 if not tweets:
                     tweets = data.get('data', [])
                 
-                logger.info(f"Processing {blob.name} with {len(tweets)} tweets")
-                
-                file_migrated = 0
+                result = load_rows(conn, TWEETS, tweets, partial(tweet_row, collected_at=datetime.now()),
+                                   source=blob.name, batch_size=batch_size)
+                with conn.cursor() as cursor:
+                    state.mark(cursor, blob, result.written)
                 
-                for tweet in tweets:
-                    try:
-                        # Extract engagement data
-                        engagement = tweet.get('engagement', {})
-                        
-                        cursor.execute("""
-                            INSERT INTO tweets (
-                                tweet_id, author_username, author_display_name, author_verified,
-                                author_followers_count, content, url, published_at, collected_at,
-                                likes_count, retweets_count, replies_count, views_count,
-                                engagement_score, virality_score, sentiment_score,
-                                viral_keywords, category, urgency, raw_data
-                            ) VALUES (
-                                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                            ) ON CONFLICT (tweet_id) DO NOTHING
-                        """, (
-                            tweet.get('id') or tweet.get('tweet_id'),
-                            tweet.get('username') or tweet.get('author_username'),
-                            tweet.get('display_name') or tweet.get('author_display_name'),
-                            tweet.get('verified', False),
-                            tweet.get('followers_count', 0),
-                            tweet.get('text') or tweet.get('content'),
-                            tweet.get('url'),
-                            tweet.get('published_at') or tweet.get('created_at'),
-                            datetime.now(),
-                            engagement.get('likes', 0),
-                            engagement.get('retweets', 0),
-                            engagement.get('replies', 0),
-                            engagement.get('views', 0),
-                            tweet.get('engagement_score', 0),
-                            tweet.get('virality_score', 0),
-                            tweet.get('sentiment_score', 0),
-                            json.dumps(tweet.get('viral_keywords', [])),
-                            tweet.get('category', 'general'),
-                            tweet.get('urgency', 'low'),
-                            json.dumps(tweet)
-                        ))
-                        
-                        file_migrated += 1
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing tweet: {e}")
-                        # Rollback the current transaction and continue
-                        conn.rollback()
-                        continue
-                
-                # Commit after each file to avoid long transactions
+                # Commit after each file so its checkpoint matches its rows
                 conn.commit()
-                total_migrated += file_migrated
-                logger.info(f"✅ Migrated {blob.name} ({file_migrated} tweets)")
+                total = total.plus(result)
+                logger.info(f"✅ Migrated {blob.name} ({result})")
                 
             except Exception as e:
                 logger.error(f"Error processing file {blob.name}: {e}")
                 conn.rollback()
                 continue
         
-        logger.info(f"🎉 Twitter migration complete! Migrated {total_migrated} tweets")
+        logger.info(f"🎉 Twitter migration complete! Migrated {total.written} tweets ({total})")
         return True
         
     except Exception as e:
@@ -161,16 +141,15 @@ def migrate_reddit_data():
     
     client, bucket = get_gcs_client()
     if not bucket:
+        conn.close()
         return False
     
     try:
-        cursor = conn.cursor()
-        
         # List all Reddit files in GCS
         blobs = list(bucket.list_blobs(prefix="reddit_data/"))
         logger.info(f"Found {len(blobs)} Reddit files to migrate")
         
-        total_migrated = 0
+        total = LoadResult()
         
         for blob in blobs:
             if not blob.name.endswith('.json'):
@@ -190,68 +169,20 @@ def migrate_reddit_data():
                 
                 logger.info(f"Processing {blob.name} with {len(posts)} posts")
                 
-                file_migrated = 0
-                
-                for post in posts:
-                    try:
-                        # Skip posts without ID
-                        post_id = post.get('id') or post.get('post_id')
-                        if not post_id:
-                            logger.warning(f"Skipping post without ID: {post.get('title', 'Unknown')}")
-                            continue
-                        
-                        cursor.execute("""
-                            INSERT INTO reddit_posts (
-                                post_id, subreddit, author_username, title, content, url,
-                                is_original_content, published_at, collected_at,
-                                upvotes, downvotes, comments_count, score,
-                                engagement_score, virality_score, sentiment_score,
-                                viral_keywords, category, urgency, raw_data
-                            ) VALUES (
-                                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                            ) ON CONFLICT (post_id) DO NOTHING
-                        """, (
-                            post_id,
-                            post.get('subreddit'),
-                            post.get('username') or post.get('author_username') or 'unknown_user',
-                            post.get('title'),
-                            post.get('text') or post.get('content'),
-                            post.get('url'),
-                            post.get('is_original_content', False),
-                            post.get('published_at') or post.get('created_at'),
-                            datetime.now(),
-                            post.get('upvotes', 0),
-                            post.get('downvotes', 0),
-                            post.get('comments_count', 0),
-                            post.get('score', 0),
-                            post.get('engagement_score', 0),
-                            post.get('virality_score', 0),
-                            post.get('sentiment_score', 0),
-                            json.dumps(post.get('viral_keywords', [])),
-                            post.get('category', 'general'),
-                            post.get('urgency', 'low'),
-                            json.dumps(post)
-                        ))
-                        
-                        file_migrated += 1
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing post: {e}")
-                        # Rollback the current transaction and continue
-                        conn.rollback()
-                        continue
+                result = load_rows(conn, REDDIT_POSTS, posts, partial(reddit_row, collected_at=datetime.now()),
+                                   source=blob.name)
                 
                 # Commit after each file to avoid long transactions
                 conn.commit()
-                total_migrated += file_migrated
-                logger.info(f"✅ Migrated {blob.name} ({file_migrated} posts)")
+                total = total.plus(result)
+                logger.info(f"✅ Migrated {blob.name} ({result})")
                 
             except Exception as e:
                 logger.error(f"Error processing file {blob.name}: {e}")
                 conn.rollback()
                 continue
         
-        logger.info(f"🎉 Reddit migration complete! Migrated {total_migrated} posts")
+        logger.info(f"🎉 Reddit migration complete! Migrated {total.written} posts ({total})")
         return True
         
     except Exception as e:
@@ -270,16 +201,15 @@ def migrate_crypto_data():
     
     client, bucket = get_gcs_client()
     if not bucket:
+        conn.close()
         return False
     
     try:
-        cursor = conn.cursor()
-        
         # List all crypto files in GCS
         blobs = list(bucket.list_blobs(prefix="crypto_data/"))
         logger.info(f"Found {len(blobs)} crypto files to migrate")
         
-        total_migrated = 0
+        total = LoadResult()
         
         for blob in blobs:
             if not blob.name.endswith('.json'):
@@ -306,48 +236,19 @@ def migrate_crypto_data():
                 
                 logger.info(f"Processing {blob.name} with {len(tokens)} tokens")
                 
-                for token in tokens:
-                    try:
-                        cursor.execute("""
-                            INSERT INTO crypto_tokens (
-                                symbol, name, network, contract_address, market_cap,
-                                price_usd, volume_24h, price_change_24h,
-                                first_seen_at, last_updated_at
-                            ) VALUES (
-                                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                            ) ON CONFLICT (symbol) DO UPDATE SET
-                                price_usd = EXCLUDED.price_usd,
-                                market_cap = EXCLUDED.market_cap,
-                                volume_24h = EXCLUDED.volume_24h,
-                                price_change_24h = EXCLUDED.price_change_24h,
-                                last_updated_at = CURRENT_TIMESTAMP
-                        """, (
-                            token.get('symbol'),
-                            token.get('name'),
-                            token.get('network'),
-                            token.get('contract_address'),
-                            token.get('market_cap'),
-                            token.get('price_usd') or token.get('price'),
-                            token.get('volume_24h'),
-                            token.get('price_change_24h'),
-                            datetime.now(),
-                            datetime.now()
-                        ))
-                        
-                        total_migrated += 1
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing token: {e}")
-                        continue
+                result = load_rows(conn, CRYPTO_TOKENS, tokens, partial(crypto_row, collected_at=datetime.now()),
+                                   source=blob.name)
                 
                 conn.commit()
-                logger.info(f"✅ Migrated {blob.name}")
+                total = total.plus(result)
+                logger.info(f"✅ Migrated {blob.name} ({result})")
                 
             except Exception as e:
                 logger.error(f"Error processing file {blob.name}: {e}")
+                conn.rollback()
                 continue
         
-        logger.info(f"🎉 Crypto migration complete! Migrated {total_migrated} tokens")
+        logger.info(f"🎉 Crypto migration complete! Migrated {total.written} tokens ({total})")
         return True
         
     except Exception as e:
@@ -366,163 +267,45 @@ def migrate_dex_data():
     
     client, bucket = get_gcs_client()
     if not bucket:
+        conn.close()
         return False
     
     try:
-        cursor = conn.cursor()
-        
-        # Migrate DexScreener data
-        dexscreener_blobs = list(bucket.list_blobs(prefix="dexscreener_data/"))
-        logger.info(f"Found {len(dexscreener_blobs)} DexScreener files to migrate")
-        
-        total_migrated = 0
-        
-        # Process DexScreener files
-        for blob in dexscreener_blobs:
-            if not blob.name.endswith('.json'):
-                continue
-                
-            try:
-                content = blob.download_as_text()
-                data = json.loads(content)
-                
-                pairs = data.get('pairs', [])
-                if not pairs:
-                    pairs = data.get('data', [])
-                
-                logger.info(f"Processing {blob.name} with {len(pairs)} pairs")
-                
-                for pair in pairs:
-                    try:
-                        cursor.execute("""
-                            INSERT INTO dex_pairs (
-                                pair_id, base_token_symbol, base_token_name, base_token_address,
-                                quote_token_symbol, quote_token_name, quote_token_address,
-                                dex_name, chain_name, price_usd, price_change_24h,
-                                volume_24h, liquidity_usd, market_cap, txns_24h, fdv,
-                                source, published_at, collected_at, raw_data
-                            ) VALUES (
-                                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                            ) ON CONFLICT (pair_id) DO UPDATE SET
-                                price_usd = EXCLUDED.price_usd,
-                                price_change_24h = EXCLUDED.price_change_24h,
-                                volume_24h = EXCLUDED.volume_24h,
-                                liquidity_usd = EXCLUDED.liquidity_usd,
-                                market_cap = EXCLUDED.market_cap,
-                                txns_24h = EXCLUDED.txns_24h,
-                                fdv = EXCLUDED.fdv,
-                                last_updated_at = CURRENT_TIMESTAMP
-                        """, (
-                            pair.get('pair_id') or pair.get('id'),
-                            pair.get('base_token', {}).get('symbol'),
-                            pair.get('base_token', {}).get('name'),
-                            pair.get('base_token', {}).get('address'),
-                            pair.get('quote_token', {}).get('symbol'),
-                            pair.get('quote_token', {}).get('name'),
-                            pair.get('quote_token', {}).get('address'),
-                            pair.get('dex_name'),
-                            pair.get('chain_name'),
-                            pair.get('price_usd') or pair.get('price'),
-                            pair.get('price_change_24h'),
-                            pair.get('volume_24h'),
-                            pair.get('liquidity_usd'),
-                            pair.get('market_cap'),
-                            pair.get('txns_24h'),
-                            pair.get('fdv'),
-                            'dexscreener',
-                            pair.get('published_at'),
-                            datetime.now(),
-                            json.dumps(pair)
-                        ))
-                        
-                        total_migrated += 1
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing pair: {e}")
-                        continue
-                
-                conn.commit()
-                logger.info(f"✅ Migrated {blob.name}")
-                
-            except Exception as e:
-                logger.error(f"Error processing file {blob.name}: {e}")
-                continue
+        total = LoadResult()
         
-        # Process DexPaprika files (similar structure)
-        dexpaprika_blobs = list(bucket.list_blobs(prefix="dexpaprika_data/"))
-        logger.info(f"Found {len(dexpaprika_blobs)} DexPaprika files to migrate")
+        # DexScreener and DexPaprika files share a structure
+        for source in ('dexscreener', 'dexpaprika'):
+            blobs = list(bucket.list_blobs(prefix=f"{source}_data/"))
+            logger.info(f"Found {len(blobs)} {source} files to migrate")
+            
+            for blob in blobs:
+                if not blob.name.endswith('.json'):
+                    continue
+                    
+                try:
+                    content = blob.download_as_text()
+                    data = json.loads(content)
+                    
+                    pairs = data.get('pairs', [])
+                    if not pairs:
+                        pairs = data.get('data', [])
+                    
+                    logger.info(f"Processing {blob.name} with {len(pairs)} pairs")
+                    
+                    result = load_rows(conn, DEX_PAIRS, pairs,
+                                       partial(dex_pair_row, source=source, collected_at=datetime.now()),
+                                       source=blob.name)
+                    
+                    conn.commit()
+                    total = total.plus(result)
+                    logger.info(f"✅ Migrated {blob.name} ({result})")
+                    
+                except Exception as e:
+                    logger.error(f"Error processing file {blob.name}: {e}")
+                    conn.rollback()
+                    continue
         
-        for blob in dexpaprika_blobs:
-            if not blob.name.endswith('.json'):
-                continue
-                
-            try:
-                content = blob.download_as_text()
-                data = json.loads(content)
-                
-                pairs = data.get('pairs', [])
-                if not pairs:
-                    pairs = data.get('data', [])
-                
-                logger.info(f"Processing {blob.name} with {len(pairs)} pairs")
-                
-                for pair in pairs:
-                    try:
-                        cursor.execute("""
-                            INSERT INTO dex_pairs (
-                                pair_id, base_token_symbol, base_token_name, base_token_address,
-                                quote_token_symbol, quote_token_name, quote_token_address,
-                                dex_name, chain_name, price_usd, price_change_24h,
-                                volume_24h, liquidity_usd, market_cap, txns_24h, fdv,
-                                source, published_at, collected_at, raw_data
-                            ) VALUES (
-                                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                            ) ON CONFLICT (pair_id) DO UPDATE SET
-                                price_usd = EXCLUDED.price_usd,
-                                price_change_24h = EXCLUDED.price_change_24h,
-                                volume_24h = EXCLUDED.volume_24h,
-                                liquidity_usd = EXCLUDED.liquidity_usd,
-                                market_cap = EXCLUDED.market_cap,
-                                txns_24h = EXCLUDED.txns_24h,
-                                fdv = EXCLUDED.fdv,
-                                last_updated_at = CURRENT_TIMESTAMP
-                        """, (
-                            pair.get('pair_id') or pair.get('id'),
-                            pair.get('base_token', {}).get('symbol'),
-                            pair.get('base_token', {}).get('name'),
-                            pair.get('base_token', {}).get('address'),
-                            pair.get('quote_token', {}).get('symbol'),
-                            pair.get('quote_token', {}).get('name'),
-                            pair.get('quote_token', {}).get('address'),
-                            pair.get('dex_name'),
-                            pair.get('chain_name'),
-                            pair.get('price_usd') or pair.get('price'),
-                            pair.get('price_change_24h'),
-                            pair.get('volume_24h'),
-                            pair.get('liquidity_usd'),
-                            pair.get('market_cap'),
-                            pair.get('txns_24h'),
-                            pair.get('fdv'),
-                            'dexpaprika',
-                            pair.get('published_at'),
-                            datetime.now(),
-                            json.dumps(pair)
-                        ))
-                        
-                        total_migrated += 1
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing pair: {e}")
-                        continue
-                
-                conn.commit()
-                logger.info(f"✅ Migrated {blob.name}")
-                
-            except Exception as e:
-                logger.error(f"Error processing file {blob.name}: {e}")
-                continue
-        
-        logger.info(f"🎉 DEX migration complete! Migrated {total_migrated} pairs")
+        logger.info(f"🎉 DEX migration complete! Migrated {total.written} pairs ({total})")
         return True
         
     except Exception as e:
@@ -555,32 +338,35 @@ def update_crawler_counts():
     finally:
         conn.close()
 
-def main():
+def main(full=False):
     """Run the complete migration"""
     logger.info("🚀 Starting migration to dedicated tables...")
     
     # Skip table creation since they already exist
     logger.info("📋 Tables already exist, proceeding with data migration...")
     
-    # Run migrations
-    success_count = 0
-    
-    if migrate_twitter_data():
-        success_count += 1
-    
-    if migrate_reddit_data():
-        success_count += 1
-    
-    if migrate_crypto_data():
-        success_count += 1
-    
-    if migrate_dex_data():
-        success_count += 1
+    # Run migrations; each source uses its own connection
+    migrations = {
+        "twitter": partial(migrate_twitter_data, full=full),
+        "reddit": migrate_reddit_data,
+        "crypto": migrate_crypto_data,
+        "dex": migrate_dex_data,
+    }
+    with ThreadPoolExecutor(max_workers=MIGRATION_WORKERS) as pool:
+        futures = {name: pool.submit(migrate) for name, migrate in migrations.items()}
+        results = {name: future.result() for name, future in futures.items()}
+    success_count = sum(results.values())
     
     # Update crawler counts
     update_crawler_counts()
     
-    logger.info(f"🎉 Migration complete! {success_count}/4 data sources migrated successfully")
+    failed = [name for name, ok in results.items() if not ok]
+    logger.info(f"🎉 Migration complete! {success_count}/{len(migrations)} data sources migrated successfully"
+                + (f" (failed: {', '.join(failed)})" if failed else ""))
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Migrate GCS data to dedicated tables")
+    parser.add_argument("--full", action="store_true", help="ignore checkpoints and reload every Twitter file")
+    main(full=parser.parse_args().full) 
\ No newline at end of file
@@ -7,9 +7,13 @@ import json
 import logging
 import os
 from datetime import datetime
+from functools import partial
 from google.cloud import storage
 import psycopg2
 
+from bulk_loader import LoadResult, load_rows
+from migration_targets import TWEETS, tweet_row
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -52,13 +56,11 @@ def migrate_twitter_data():
         return False
     
     try:
-        cursor = conn.cursor()
-        
         # List all Twitter files in GCS
         blobs = list(bucket.list_blobs(prefix="twitter_data/"))
         logger.info(f"Found {len(blobs)} Twitter files to migrate")
         
-        total_migrated = 0
+        total = LoadResult()
         
         for blob in blobs:
             if not blob.name.endswith('.json'):
@@ -76,65 +78,20 @@ def migrate_twitter_data():
                 
                 logger.info(f"Processing {blob.name} with {len(tweets)} tweets")
                 
-                file_migrated = 0
-                
-                for tweet in tweets:
-                    try:
-                        # Extract engagement data
-                        engagement = tweet.get('engagement', {})
-                        
-                        cursor.execute("""
-                            INSERT INTO tweets (
-                                tweet_id, author_username, author_display_name, author_verified,
-                                author_followers_count, content, url, published_at, collected_at,
-                                likes_count, retweets_count, replies_count, views_count,
-                                engagement_score, virality_score, sentiment_score,
-                                viral_keywords, category, urgency, raw_data
-                            ) VALUES (
-                                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                            ) ON CONFLICT (tweet_id) DO NOTHING
-                        """, (
-                            tweet.get('id') or tweet.get('tweet_id'),
-                            tweet.get('username') or tweet.get('author_username'),
-                            tweet.get('display_name') or tweet.get('author_display_name'),
-                            tweet.get('verified', False),
-                            tweet.get('followers_count', 0),
-                            tweet.get('text') or tweet.get('content'),
-                            tweet.get('url'),
-                            tweet.get('published_at') or tweet.get('created_at'),
-                            datetime.now(),
-                            engagement.get('likes', 0),
-                            engagement.get('retweets', 0),
-                            engagement.get('replies', 0),
-                            engagement.get('views', 0),
-                            tweet.get('engagement_score', 0),
-                            tweet.get('virality_score', 0),
-                            tweet.get('sentiment_score', 0),
-                            json.dumps(tweet.get('viral_keywords', [])),
-                            tweet.get('category', 'general'),
-                            tweet.get('urgency', 'low'),
-                            json.dumps(tweet)
-                        ))
-                        
-                        file_migrated += 1
-                        
-                    except Exception as e:
-                        logger.error(f"Error processing tweet: {e}")
-                        # Rollback the current transaction and continue
-                        conn.rollback()
-                        continue
+                result = load_rows(conn, TWEETS, tweets, partial(tweet_row, collected_at=datetime.now()),
+                                   source=blob.name)
                 
                 # Commit after each file to avoid long transactions
                 conn.commit()
-                total_migrated += file_migrated
-                logger.info(f"✅ Migrated {blob.name} ({file_migrated} tweets)")
+                total = total.plus(result)
+                logger.info(f"✅ Migrated {blob.name} ({result})")
                 
             except Exception as e:
                 logger.error(f"Error processing file {blob.name}: {e}")
                 conn.rollback()
                 continue
         
-        logger.info(f"🎉 Twitter migration complete! Migrated {total_migrated} tweets")
+        logger.info(f"🎉 Twitter migration complete! Migrated {total.written} tweets ({total})")
         return True
         
     except Exception as e:
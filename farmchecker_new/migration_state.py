@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Checkpoints for incremental GCS -> Postgres migrations.
+
+Scheduled migrations used to download and parse every blob under their
+prefix on every run. ``MigrationState`` records, per pipeline, the
+generation, etag and update time of each blob it has loaded in a
+``migration_state`` table, so a run only downloads blobs that are new or
+were overwritten since. Checkpoints are written in the same transaction as
+the rows they cover: a blob that fails to load is retried on the next run.
+
+``LocalBucket`` is a filesystem stand-in for a ``google.cloud.storage``
+bucket, for local runs and tests.
+
+The canonical copy lives in farmchecker_new/; migration_service/ ships an
+identical copy because each service is deployed from its own directory.
+"""
+
+import hashlib
+import logging
+import os
+from collections.abc import Iterable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+STATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS migration_state (
+    pipeline VARCHAR(100) NOT NULL,
+    blob_name TEXT NOT NULL,
+    generation BIGINT,
+    etag TEXT,
+    blob_updated_at TIMESTAMPTZ,
+    rows_loaded INTEGER DEFAULT 0,
+    processed_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (pipeline, blob_name)
+)
+"""
+
+
+class MigrationState:
+    """Per-blob checkpoints for one migration pipeline (e.g. "twitter_data/")"""
+
+    def __init__(self, conn, pipeline: str):
+        self.conn = conn
+        self.pipeline = pipeline
+        with conn.cursor() as cursor:
+            cursor.execute(STATE_TABLE_SQL)
+        conn.commit()
+        self._seen: dict[str, tuple[int | None, str | None]] = self._load()
+
+    def _load(self) -> dict[str, tuple[int | None, str | None]]:
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT blob_name, generation, etag FROM migration_state WHERE pipeline = %s",
+                (self.pipeline,),
+            )
+            return {name: (generation, etag) for name, generation, etag in cursor.fetchall()}
+
+    def is_current(self, blob) -> bool:
+        """True if *blob* was already loaded at its current generation and etag"""
+        return self._seen.get(blob.name) == (blob.generation, blob.etag)
+
+    def pending(self, blobs: Iterable[Any]) -> list[Any]:
+        """Blobs that are new or changed since they were last loaded, oldest first"""
+        changed = [blob for blob in blobs if not self.is_current(blob)]
+        changed.sort(key=lambda blob: (blob.updated or datetime.min.replace(tzinfo=UTC), blob.name))
+        return changed
+
+    def mark(self, cursor, blob, rows_loaded: int):
+        """Record *blob* as loaded; call inside the transaction that loaded it"""
+        cursor.execute(
+            """
+            INSERT INTO migration_state (pipeline, blob_name, generation, etag, blob_updated_at, rows_loaded, processed_at)
+            VALUES (%s, %s, %s, %s, %s, %s, NOW())
+            ON CONFLICT (pipeline, blob_name) DO UPDATE SET
+                generation = EXCLUDED.generation,
+                etag = EXCLUDED.etag,
+                blob_updated_at = EXCLUDED.blob_updated_at,
+                rows_loaded = EXCLUDED.rows_loaded,
+                processed_at = NOW()
+            """,
+            (self.pipeline, blob.name, blob.generation, blob.etag, blob.updated, rows_loaded),
+        )
+        self._seen[blob.name] = (blob.generation, blob.etag)
+
+    def watermark(self) -> datetime | None:
+        """Update time of the newest blob loaded so far"""
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT MAX(blob_updated_at) FROM migration_state WHERE pipeline = %s",
+                (self.pipeline,),
+            )
+            return cursor.fetchone()[0]
+
+    def reset(self):
+        """Forget all checkpoints so the next run reloads every blob"""
+        with self.conn.cursor() as cursor:
+            cursor.execute("DELETE FROM migration_state WHERE pipeline = %s", (self.pipeline,))
+        self.conn.commit()
+        self._seen.clear()
+
+
+class LocalBlob:
+    """The subset of ``storage.Blob`` the migrations use"""
+
+    def __init__(self, root: Path, path: Path):
+        self._path = path
+        stat = path.stat()
+        self.name = path.relative_to(root).as_posix()
+        self.size = stat.st_size
+        self.generation = stat.st_mtime_ns
+        self.updated = datetime.fromtimestamp(stat.st_mtime, tz=UTC)
+        self.etag = hashlib.md5(path.read_bytes()).hexdigest()
+
+    def download_as_bytes(self) -> bytes:
+        return self._path.read_bytes()
+
+    def download_as_text(self, encoding: str = "utf-8") -> str:
+        return self._path.read_text(encoding=encoding)
+
+    def open(self, mode: str = "rb"):
+        return open(self._path, mode)
+
+
+class LocalBucket:
+    """Directory tree served like a GCS bucket: object names are relative paths"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.name = str(self.root)
+
+    def list_blobs(self, prefix: str = "", max_results: int | None = None):
+        blobs = []
+        for path in sorted(self.root.rglob("*")):
+            if path.is_file() and path.relative_to(self.root).as_posix().startswith(prefix):
+                blobs.append(LocalBlob(self.root, path))
+                if max_results and len(blobs) >= max_results:
+                    break
+        return blobs
+
+    def blob(self, name: str) -> LocalBlob:
+        return LocalBlob(self.root, self.root / name)
+
+
+def local_bucket_from_env() -> LocalBucket | None:
+    """``LocalBucket`` for ``LOCAL_BUCKET_DIR`` if set, for running migrations offline"""
+    root = os.getenv("LOCAL_BUCKET_DIR")
+    return LocalBucket(root) if root else None
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Target tables and row builders shared by the GCS -> Postgres migrators
+(migrate_to_dedicated_tables.py and the migrate_*_only.py scripts).
+
+Each ``*_row`` turns one crawled record into values in its target's column
+order for bulk_loader.load_rows, raising ``ValueError`` for records that
+cannot be loaded so they end up in load_dead_letters.
+"""
+
+import json
+
+from bulk_loader import LoadTarget
+from content_cleaning import clean_post_content
+
+
+def _columns(names):
+    return tuple(name.strip() for name in names.split(","))
+
+
+# No conflict target: partitioned, tweets and reddit_posts are unique on
+# (tweet_id, published_at) and (post_id, published_at) instead (partitions.py)
+TWEETS = LoadTarget(
+    "tweets",
+    _columns(
+        "tweet_id, author_username, author_display_name, "
+        "author_verified, author_followers_count, content, "
+        "clean_content, url, published_at, collected_at, likes_count, "
+        "retweets_count, replies_count, views_count, engagement_score, "
+        "virality_score, sentiment_score, viral_keywords, category, "
+        "urgency, raw_data"
+    ),
+)
+
+REDDIT_POSTS = LoadTarget(
+    "reddit_posts",
+    _columns(
+        "post_id, subreddit, author_username, title, content, "
+        "clean_content, url, is_original_content, published_at, "
+        "collected_at, upvotes, downvotes, comments_count, score, "
+        "engagement_score, virality_score, sentiment_score, "
+        "viral_keywords, category, urgency, raw_data"
+    ),
+)
+
+CRYPTO_TOKENS = LoadTarget(
+    "crypto_tokens",
+    _columns(
+        "symbol, name, network, contract_address, market_cap, price_usd, "
+        "volume_24h, price_change_24h, first_seen_at, last_updated_at"
+    ),
+    conflict_key=("symbol",),
+    update=_columns(
+        "price_usd, market_cap, volume_24h, price_change_24h, "
+        "last_updated_at = CURRENT_TIMESTAMP"
+    ),
+)
+
+DEX_PAIRS = LoadTarget(
+    "dex_pairs",
+    _columns(
+        "pair_id, base_token_symbol, base_token_name, "
+        "base_token_address, quote_token_symbol, quote_token_name, "
+        "quote_token_address, dex_name, chain_name, price_usd, "
+        "price_change_24h, volume_24h, liquidity_usd, market_cap, "
+        "txns_24h, fdv, source, published_at, collected_at, raw_data"
+    ),
+    conflict_key=("pair_id",),
+    update=_columns(
+        "price_usd, price_change_24h, volume_24h, liquidity_usd, "
+        "market_cap, txns_24h, fdv, last_updated_at = CURRENT_TIMESTAMP"
+    ),
+)
+
+
+# A re-crawled pair refreshes its snapshot, and with it dex_pairs_latest
+# (create_dex_latest_tables.sql)
+DEXSCREENER_PAIRS = LoadTarget(
+    "dexscreener_pairs",
+    _columns(
+        "pair_id, chain_id, dex_id, pair_address, base_token_symbol, "
+        "base_token_name, base_token_address, quote_token_symbol, "
+        "quote_token_name, quote_token_address, price_usd, "
+        "price_change_24h, volume_24h, liquidity_usd, fdv, txns_24h, "
+        "buys_24h, sells_24h, collected_at, raw_data"
+    ),
+    conflict_key=("pair_id",),
+    update=_columns(
+        "price_usd, price_change_24h, volume_24h, liquidity_usd, fdv, "
+        "txns_24h, buys_24h, sells_24h, collected_at, raw_data"
+    ),
+)
+
+DEXPAPRIKA_PAIRS = LoadTarget(
+    "dexpaprika_pairs",
+    _columns(
+        "pair_id, chain_id, dex_id, pair_address, base_token_symbol, "
+        "base_token_name, base_token_address, quote_token_symbol, "
+        "quote_token_name, quote_token_address, price_usd, "
+        "price_change_24h, volume_24h, liquidity_usd, txns_24h, "
+        "market_cap, collected_at, raw_data"
+    ),
+    conflict_key=("pair_id",),
+    update=_columns(
+        "price_usd, price_change_24h, volume_24h, liquidity_usd, "
+        "txns_24h, market_cap, collected_at, raw_data"
+    ),
+)
+
+
+def tweet_row(tweet, collected_at):
+    """Column values for one tweet, in TWEETS.columns order"""
+    tweet_id = tweet.get("id") or tweet.get("tweet_id")
+    if not tweet_id:
+        raise ValueError("tweet has no id")
+    engagement = tweet.get("engagement", {})
+    return (
+        tweet_id,
+        tweet.get("username") or tweet.get("author_username"),
+        tweet.get("display_name") or tweet.get("author_display_name"),
+        tweet.get("verified", False),
+        tweet.get("followers_count", 0),
+        tweet.get("text") or tweet.get("content"),
+        clean_post_content(tweet.get("text") or tweet.get("content")),
+        tweet.get("url"),
+        tweet.get("published_at") or tweet.get("created_at"),
+        collected_at,
+        engagement.get("likes", 0),
+        engagement.get("retweets", 0),
+        engagement.get("replies", 0),
+        engagement.get("views", 0),
+        tweet.get("engagement_score", 0),
+        tweet.get("virality_score", 0),
+        tweet.get("sentiment_score", 0),
+        json.dumps(tweet.get("viral_keywords", [])),
+        tweet.get("category", "general"),
+        tweet.get("urgency", "low"),
+        json.dumps(tweet),
+    )
+
+
+def reddit_row(post, collected_at):
+    """Column values for one Reddit post, in REDDIT_POSTS.columns order"""
+    post_id = post.get("id") or post.get("post_id")
+    if not post_id:
+        raise ValueError(f"post has no id: {post.get('title', 'Unknown')}")
+    return (
+        post_id,
+        post.get("subreddit"),
+        post.get("username") or post.get("author_username") or "unknown_user",
+        post.get("title"),
+        post.get("text") or post.get("content"),
+        clean_post_content(post.get("text") or post.get("content")),
+        post.get("url"),
+        post.get("is_original_content", False),
+        post.get("published_at") or post.get("created_at"),
+        collected_at,
+        post.get("upvotes", 0),
+        post.get("downvotes", 0),
+        post.get("comments_count", 0),
+        post.get("score", 0),
+        post.get("engagement_score", 0),
+        post.get("virality_score", 0),
+        post.get("sentiment_score", 0),
+        json.dumps(post.get("viral_keywords", [])),
+        post.get("category", "general"),
+        post.get("urgency", "low"),
+        json.dumps(post),
+    )
+
+
+def crypto_row(token, collected_at):
+    """Column values for one token, in CRYPTO_TOKENS.columns order"""
+    return (
+        token.get("symbol"),
+        token.get("name"),
+        token.get("network"),
+        token.get("contract_address"),
+        token.get("market_cap"),
+        token.get("price_usd") or token.get("price"),
+        token.get("volume_24h"),
+        token.get("price_change_24h"),
+        collected_at,
+        collected_at,
+    )
+
+
+def dex_pair_row(pair, source, collected_at):
+    """Column values for one DEX pair, in DEX_PAIRS.columns order"""
+    return (
+        pair.get("pair_id") or pair.get("id"),
+        pair.get("base_token", {}).get("symbol"),
+        pair.get("base_token", {}).get("name"),
+        pair.get("base_token", {}).get("address"),
+        pair.get("quote_token", {}).get("symbol"),
+        pair.get("quote_token", {}).get("name"),
+        pair.get("quote_token", {}).get("address"),
+        pair.get("dex_name"),
+        pair.get("chain_name"),
+        pair.get("price_usd") or pair.get("price"),
+        pair.get("price_change_24h"),
+        pair.get("volume_24h"),
+        pair.get("liquidity_usd"),
+        pair.get("market_cap"),
+        pair.get("txns_24h"),
+        pair.get("fdv"),
+        source,
+        pair.get("published_at"),
+        collected_at,
+        json.dumps(pair),
+    )
+
+
+def flat_dex_pair_row(pair, source, collected_at):
+    """dex_pair_row for pairs with flattened token fields (migrate_dex_only.py)"""
+    return (
+        pair.get("pair_id") or pair.get("id"),
+        pair.get("base_token_symbol"),
+        pair.get("base_token_name"),
+        pair.get("base_token_address"),
+        pair.get("quote_token_symbol"),
+        pair.get("quote_token_name"),
+        pair.get("quote_token_address"),
+        pair.get("dex_name"),
+        pair.get("chain_name"),
+        pair.get("price_usd"),
+        pair.get("price_change_24h"),
+        pair.get("volume_24h"),
+        pair.get("liquidity_usd"),
+        pair.get("market_cap"),
+        pair.get("txns_24h"),
+        pair.get("fdv"),
+        source,
+        pair.get("published_at") or collected_at,
+        collected_at,
+        json.dumps(pair),
+    )
+
+
+def dexscreener_pair_row(pair, collected_at):
+    """Column values for one DexScreener pair, in DEXSCREENER_PAIRS.columns order"""
+    pair_id = pair.get("pairAddress") or pair.get("pair_id") or pair.get("id")
+    if not pair_id:
+        raise ValueError("pair has no address")
+
+    base_token = pair.get("baseToken", {})
+    quote_token = pair.get("quoteToken", {})
+    price_change = pair.get("priceChange")
+    volume = pair.get("volume")
+    liquidity = pair.get("liquidity", {})
+    txns = pair.get("txns", {})
+    buys = txns.get("h24", {}).get("buys", 0) if isinstance(txns, dict) else 0
+    sells = txns.get("h24", {}).get("sells", 0) if isinstance(txns, dict) else 0
+    return (
+        pair_id,
+        pair.get("chainId", "unknown"),
+        pair.get("dexId", "unknown"),
+        pair_id,  # pair_address is the same as pair_id
+        base_token.get("symbol"),
+        base_token.get("name"),
+        base_token.get("address"),
+        quote_token.get("symbol"),
+        quote_token.get("name"),
+        quote_token.get("address"),
+        pair.get("priceUsd"),
+        (
+            price_change.get("h24")
+            if isinstance(price_change, dict)
+            else pair.get("priceChange24h")
+        ),
+        volume.get("h24") if isinstance(volume, dict) else pair.get("volume24h"),
+        (
+            liquidity.get("usd")
+            if isinstance(liquidity, dict)
+            else pair.get("liquidityUsd")
+        ),
+        pair.get("fdv"),
+        buys + sells if isinstance(txns, dict) else pair.get("txns24h"),
+        buys,
+        sells,
+        collected_at,
+        json.dumps(pair),
+    )
+
+
+def dexpaprika_token_row(token, collected_at):
+    """Column values for one DexPaprika token, in DEXPAPRIKA_PAIRS.columns order
+
+    DexPaprika lists tokens, not pairs: the token address stands in for the
+    pair and there is no quote token.
+    """
+    token_id = token.get("id") or token.get("address")
+    if not token_id:
+        raise ValueError("token has no id")
+
+    summary = token.get("summary", {})
+    day = summary.get("24h") if isinstance(summary.get("24h"), dict) else {}
+    return (
+        f"dexpaprika_{token_id}",
+        token.get("chain", "unknown"),
+        "dexpaprika",
+        token_id,
+        token.get("symbol"),
+        token.get("name"),
+        token_id,
+        "N/A",
+        "N/A",
+        "N/A",
+        summary.get("price_usd"),
+        day.get("last_price_usd_change"),
+        day.get("volume_usd"),
+        summary.get("liquidity_usd"),
+        day.get("txns"),
+        None,  # No market cap in DexPaprika
+        collected_at,
+        json.dumps(token),
+    )
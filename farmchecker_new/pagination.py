@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Keyset pagination and streamed pages for the FarmChecker list endpoints.
+
+The list endpoints returned one fixed ``LIMIT 50`` page; going deeper would
+have meant ``OFFSET``, which reads and discards every skipped row. A page now
+continues from an opaque cursor holding the sort key of the last row served,
+``WHERE (sort_key, id) < (...)``, which an index on ``(sort_key, id)``
+answers at the same cost at any depth (see create_keyset_indexes.sql):
+
+    GET /api/twitter?sort=recent&limit=50
+    GET /api/twitter?sort=recent&limit=50&cursor=<X-Next-Cursor of the last page>
+
+- Every item carries its own ``cursor``. A page that came back full sets
+  ``X-Next-Cursor``; without it there is nothing left.
+- Pages of ``STREAM_MIN_PAGE_SIZE`` rows or more, and any ``format=ndjson``
+  page, are streamed from a server-side cursor ``FETCH_SIZE`` rows at a time
+  instead of being built in memory. Continue a stream from the ``cursor`` of
+  its last item.
+- A cursor only fits the sort it was issued for; anything else raises
+  ``InvalidCursor`` (a 400 at the endpoints).
+"""
+
+import base64
+import binascii
+import json
+import os
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+from db_pool import positional_to_pyformat
+from flask import Response, g, has_app_context, jsonify, request, stream_with_context
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "5000"))
+STREAM_MIN_PAGE_SIZE = int(os.getenv("API_STREAM_MIN_PAGE_SIZE", "500"))
+# Rows per round trip from a server-side cursor
+FETCH_SIZE = int(os.getenv("API_STREAM_FETCH_SIZE", "500"))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    """A cursor that does not decode, or was issued for another sort"""
+
+
+class SortKey:
+    """A descending sort on *expression*, ties broken by *tiebreakers*.
+
+    The columns together must be unique and non-NULL. With ``skip_nulls``
+    rows whose *expression* is NULL are left out of the sort; a row
+    comparison cannot place them.
+    """
+
+    def __init__(
+        self,
+        expression: str,
+        tiebreakers: Sequence[str] = ("id",),
+        skip_nulls: bool = False,
+    ):
+        self.columns: list[str] = [expression, *tiebreakers]
+        self.skip_nulls = skip_nulls
+
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    payload = [sort, [_encode_value(value) for value in values]]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, sort: str, width: int) -> list[Any]:
+    """Sort-key values of *token*, checked against *sort* and its *width*"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        cursor_sort, values = json.loads(raw)
+        values = [_decode_value(value) for value in values]
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise InvalidCursor(f"malformed cursor: {e}") from None
+    if cursor_sort != sort:
+        raise InvalidCursor(
+            f"cursor was issued for sort={cursor_sort}, not sort={sort}"
+        )
+    if len(values) != width:
+        raise InvalidCursor("cursor does not match the sort key")
+    return values
+
+
+def _encode_value(value):
+    # JSON has no timestamps or exact decimals; tag them so they come back
+    # as the types the column comparison expects
+    if isinstance(value, datetime):
+        return {"t": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"d": str(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "t" in value:
+            return datetime.fromisoformat(value["t"])
+        if "d" in value:
+            return Decimal(value["d"])
+        raise ValueError("unknown cursor value")
+    if value is None or isinstance(value, (list, bool)):
+        raise ValueError("unknown cursor value")
+    return value
+
+
+class Page:
+    """One requested page: its sort, size, position and output format"""
+
+    def __init__(
+        self,
+        sort: str,
+        key: SortKey,
+        limit: int,
+        after: list[Any] | None = None,
+        ndjson: bool = False,
+    ):
+        self.sort = sort
+        self.key = key
+        self.limit = limit
+        self.after = after
+        self.ndjson = ndjson
+        self.stream = ndjson or limit >= STREAM_MIN_PAGE_SIZE
+
+    @property
+    def key_columns(self) -> str:
+        """SELECT these last: the cursors are built from them"""
+        return ", ".join(self.key.columns)
+
+    def clauses(self, first_param: int = 1):
+        """``(where, order)``: an ``AND ...`` suffix for the WHERE clause and
+        the ORDER BY/LIMIT, numbering placeholders from ``$first_param``"""
+        conditions = []
+        if self.key.skip_nulls:
+            conditions.append(f"{self.key.columns[0]} IS NOT NULL")
+        param = first_param
+        if self.after is not None:
+            placeholders = ", ".join(f"${param + i}" for i in range(len(self.after)))
+            conditions.append(f"({self.key_columns}) < ({placeholders})")
+            param += len(self.after)
+        where = "".join(f" AND {condition}" for condition in conditions)
+        order = "ORDER BY " + ", ".join(f"{column} DESC" for column in self.key.columns)
+        return where, f"{order} LIMIT ${param}"
+
+    @property
+    def params(self) -> list[Any]:
+        """Values for the placeholders of ``clauses()``"""
+        return [*(self.after or []), self.limit]
+
+    def cursor_for(self, row: Sequence) -> str:
+        return encode_cursor(self.sort, row[-len(self.key.columns) :])
+
+
+def page_from_request(
+    sorts: dict[str, SortKey], default_sort: str, default_limit: int = DEFAULT_PAGE_SIZE
+) -> Page:
+    """The page asked for by ``?sort=&limit=&cursor=&format=``"""
+    sort = request.args.get("sort", default_sort)
+    if sort not in sorts:
+        sort = default_sort
+    key = sorts[sort]
+    limit = max(
+        1, min(request.args.get("limit", default_limit, type=int), MAX_PAGE_SIZE)
+    )
+    token = request.args.get("cursor")
+    after = decode_cursor(token, sort, len(key.columns)) if token else None
+    return Page(sort, key, limit, after, ndjson=request.args.get("format") == "ndjson")
+
+
+def fetch_rows(
+    conn, page: Page, name: str, sql: str, params: Sequence[Any] = ()
+) -> Iterable[Sequence]:
+    """Rows of *sql*, whose ``$n`` placeholders take *params* then ``page.params``.
+
+    Buffered pages run as prepared statement *name* and come back as a list;
+    streamed pages are read lazily from a server-side cursor, so the
+    connection must stay checked out until the response has been sent.
+    """
+    params = [*params, *page.params]
+    if not page.stream:
+        cursor = conn.cursor()
+        try:
+            conn.execute_prepared(cursor, name, sql, tuple(params))
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+    return _RowStream(conn, name, sql, params)
+
+
+class _RowStream:
+    """Rows read lazily through a server-side cursor.
+
+    Owns the connection from here on: it is kept out of the request teardown
+    (see server.get_db_connection) and returned to the pool by ``close()``,
+    which the response calls once it has been sent or abandoned.
+    """
+
+    def __init__(self, conn, name: str, sql: str, params: list[Any]):
+        self.conn = conn
+        self.sql = positional_to_pyformat(sql)
+        self.params = params
+        self.name = f"{name}_stream"
+        if has_app_context() and conn in g.get("db_connections", []):
+            g.db_connections.remove(conn)
+
+    def __iter__(self) -> Iterator[Sequence]:
+        # A named cursor DECLAREs the query and FETCHes itersize rows at a time
+        cursor = self.conn.cursor(name=self.name)
+        cursor.itersize = FETCH_SIZE
+        try:
+            cursor.execute(self.sql, self.params)
+            yield from cursor
+        finally:
+            cursor.close()
+
+    def close(self):
+        self.conn.close()
+
+
+def page_response(
+    page: Page, rows: Iterable[Sequence], to_item: Callable[[Sequence], dict | None]
+):
+    """Render *rows* (``page.key_columns`` last) with *to_item*; rows it maps
+    to None are left out. Streamed pages are sent as they are read."""
+
+    def items(rows):
+        for row in rows:
+            item = to_item(row)
+            if item is not None:
+                item["cursor"] = page.cursor_for(row)
+                yield item
+
+    if not page.stream:
+        response = jsonify(list(items(rows)))
+        if len(rows) == page.limit:
+            # From the last row read, not the last item: skipped rows at the
+            # end of a page are not read again
+            response.headers[NEXT_CURSOR_HEADER] = page.cursor_for(rows[-1])
+        return response
+
+    if page.ndjson:
+        body = (json.dumps(item, default=str) + "\n" for item in items(rows))
+        response = Response(stream_with_context(body), mimetype="application/x-ndjson")
+    else:
+        response = Response(
+            stream_with_context(_json_array(items(rows))), mimetype="application/json"
+        )
+    if isinstance(rows, _RowStream):
+        response.call_on_close(rows.close)
+    return response
+
+
+def _json_array(items: Iterator[dict]) -> Iterator[str]:
+    yield "["
+    for i, item in enumerate(items):
+        yield ("," if i else "") + json.dumps(item, default=str)
+    yield "]"
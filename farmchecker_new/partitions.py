@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Range partitioning by time for the append-mostly crawler tables.
+
+Every list and stats query reads a recent window (``published_at >= NOW() -
+INTERVAL '7 days'`` and the like), yet tweets, reddit_posts, news_articles
+and dex_pair_history were single heap tables: the window's rows sat among
+months of history, and expiring old rows meant a DELETE plus vacuum of the
+whole table. Partitioned by week or month, a window query only opens the
+partitions it overlaps (the planner prunes the rest at executor start) and
+expiring a period is ``DROP TABLE`` of its partition.
+
+- ``migrate`` swaps a heap table for a partitioned one of the same name,
+  keeping its id sequence, indexes and triggers, then copies the old rows
+  across in id batches. Writers use the new table as soon as the swap
+  commits; the old one stays as ``<table>_unpartitioned`` until
+  ``--drop-old``.
+- ``maintain`` (daily, cron or Cloud Scheduler) creates the partitions for
+  the next ``PARTITIONS_AHEAD`` periods, moves rows that landed in the
+  ``<table>_default`` partition into partitions of their own, and drops
+  partitions older than the ``keep`` newest periods, first archiving each to
+  ``PARTITION_ARCHIVE_DIR/<partition>.csv.gz``.
+
+No bound can rule out the default partition, so every window query scans
+it too: it holds the rows without a partition key, and stragglers until the
+next ``maintain``.
+
+A unique key must include the partition key on a partitioned table, so
+``tweet_id`` becomes unique per ``(tweet_id, published_at)``; the loaders
+use ``ON CONFLICT DO NOTHING`` without a target, which holds for either
+layout. Dedicated-row tables (dexscreener_pairs, dexpaprika_pairs,
+coingecko_tokens) keep one row per pair or token and are not partitioned.
+
+Apply index scripts (create_keyset_indexes.sql, create_stats_indexes.sql)
+before migrating: ``CREATE INDEX CONCURRENTLY`` does not work on a
+partitioned table, and migrate copies the indexes it finds.
+
+    python partitions.py migrate tweets reddit_posts
+    python partitions.py maintain
+"""
+
+import argparse
+import gzip
+import logging
+import os
+import re
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import NamedTuple
+
+import psycopg2
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Database configuration
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "34.9.71.174"),
+    "database": os.getenv("DB_NAME", "degen_digest"),
+    "user": os.getenv("DB_USER", "postgres"),
+    "password": os.getenv("DB_PASSWORD", "DegenDigest2024!"),
+    "port": os.getenv("DB_PORT", "5432"),
+}
+
+PARTITIONS_AHEAD = int(os.getenv("PARTITIONS_AHEAD", "2"))
+ARCHIVE_DIR = os.getenv("PARTITION_ARCHIVE_DIR", "partition_archive")
+DEFAULT_BATCH_SIZE = 50_000
+
+INTERVALS = ("day", "week", "month")
+
+
+class PartitionedTable(NamedTuple):
+    table: str
+    column: str  # range partition key
+    interval: str  # one of INTERVALS
+    unique_keys: tuple[
+        tuple[str, ...], ...
+    ] = ()  # natural keys, without the partition key
+    keep: int = 0  # newest periods kept by maintain; 0 keeps everything
+
+
+def _keep(table, default):
+    return int(os.getenv(f"PARTITION_KEEP_{table.upper()}", str(default)))
+
+
+PARTITIONED_TABLES = {
+    spec.table: spec
+    for spec in [
+        PartitionedTable(
+            "tweets", "published_at", "week", (("tweet_id",),), _keep("tweets", 26)
+        ),
+        PartitionedTable(
+            "reddit_posts",
+            "published_at",
+            "week",
+            (("post_id",),),
+            _keep("reddit_posts", 26),
+        ),
+        PartitionedTable(
+            "news_articles",
+            "published_at",
+            "month",
+            (("article_id",), ("url",)),
+            _keep("news_articles", 12),
+        ),
+        PartitionedTable(
+            "dex_pair_history",
+            "bucket_start",
+            "month",
+            (),
+            _keep("dex_pair_history", 12),
+        ),
+    ]
+}
+
+
+def period_start(day, interval):
+    """Start of the period holding *day*, as date_trunc would give it"""
+    if isinstance(day, datetime):
+        day = day.date()
+    if interval == "day":
+        return day
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    if interval == "month":
+        return day.replace(day=1)
+    raise ValueError(f"interval must be one of {INTERVALS}, not {interval!r}")
+
+
+def shift(start, interval, periods):
+    """The period start *periods* periods after (or before) *start*"""
+    if interval == "day":
+        return start + timedelta(days=periods)
+    if interval == "week":
+        return start + timedelta(weeks=periods)
+    months = start.year * 12 + start.month - 1 + periods
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def partition_name(table, start):
+    return f"{table}_p{start:%Y%m%d}"
+
+
+def _partition_start(table, name):
+    match = re.fullmatch(rf"{re.escape(table)}_p(\d{{8}})", name)
+    return datetime.strptime(match.group(1), "%Y%m%d").date() if match else None
+
+
+def list_partitions(conn, table) -> list[tuple[date, str]]:
+    """``(start, name)`` of the range partitions of *table*, oldest first"""
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass
+            """,
+            (table,),
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    return sorted(
+        (start, name) for name in names if (start := _partition_start(table, name))
+    )
+
+
+def is_partitioned(conn, table):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (table,)
+        )
+        row = cursor.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def create_partition(conn, spec, start):
+    """Create the partition for the period from *start*; returns False if it exists.
+
+    Rows of that period already in the default partition are moved into it.
+    """
+    name = partition_name(spec.table, start)
+    bounds = (start.isoformat(), shift(start, spec.interval, 1).isoformat())
+    default = f"{spec.table}_default"
+    in_range = f"{spec.column} >= %s AND {spec.column} < %s"
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT to_regclass(%s) IS NOT NULL, to_regclass(%s) IS NOT NULL",
+            (name, default),
+        )
+        exists, has_default = cursor.fetchone()
+        if exists:
+            return False
+        stray = False
+        if has_default:
+            cursor.execute(
+                f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})", bounds
+            )
+            stray = cursor.fetchone()[0]
+        if not stray:
+            cursor.execute(
+                f"CREATE TABLE {name} PARTITION OF {spec.table} FOR VALUES FROM (%s) TO (%s)",
+                bounds,
+            )
+            return True
+        # A partition cannot be created over rows the default partition holds
+        cursor.execute(
+            f"CREATE TABLE {name} (LIKE {spec.table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {default} WHERE {in_range} RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved",
+            bounds,
+        )
+        logger.info(f"Moved {cursor.rowcount} rows from {default} to {name}")
+        cursor.execute(
+            f"ALTER TABLE {spec.table} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)",
+            bounds,
+        )
+    return True
+
+
+def ensure_partitions(conn, spec, ahead=PARTITIONS_AHEAD, today=None):
+    """Partitions from the current period to *ahead* periods on, and for
+    every period with rows in the default partition; returns the names created"""
+    current = period_start(today or date.today(), spec.interval)
+    starts = {shift(current, spec.interval, n) for n in range(ahead + 1)}
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"SELECT DISTINCT date_trunc(%s, {spec.column})::date FROM {spec.table}_default "
+            f"WHERE {spec.column} IS NOT NULL",
+            (spec.interval,),
+        )
+        starts.update(row[0] for row in cursor.fetchall())
+    created = [
+        partition_name(spec.table, start)
+        for start in sorted(starts)
+        if create_partition(conn, spec, start)
+    ]
+    conn.commit()
+    return created
+
+
+def apply_retention(conn, spec, archive_dir: str | None = ARCHIVE_DIR, today=None):
+    """Drop the partitions before the ``spec.keep`` newest periods, archiving
+    each to ``<archive_dir>/<partition>.csv.gz`` first; returns the names dropped"""
+    if spec.keep <= 0:
+        return []
+    cutoff = shift(
+        period_start(today or date.today(), spec.interval), spec.interval, 1 - spec.keep
+    )
+    dropped = []
+    for start, name in list_partitions(conn, spec.table):
+        if start >= cutoff:
+            break
+        with conn.cursor() as cursor:
+            if archive_dir:
+                path = Path(archive_dir) / f"{name}.csv.gz"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with gzip.open(path, "wb") as archive:
+                    cursor.copy_expert(
+                        f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", archive
+                    )
+                logger.info(f"Archived {name} to {path}")
+            cursor.execute(f"DROP TABLE {name}")
+        conn.commit()
+        dropped.append(name)
+    return dropped
+
+
+def maintain(conn, spec, archive_dir: str | None = ARCHIVE_DIR, today=None):
+    created = ensure_partitions(conn, spec, today=today)
+    dropped = apply_retention(conn, spec, archive_dir, today=today)
+    return created, dropped
+
+
+def migrate_table(conn, spec, batch_size=DEFAULT_BATCH_SIZE, drop_old=False):
+    """Replace heap table ``spec.table`` by a partitioned one with its rows;
+    returns the number of rows copied"""
+    table, old = spec.table, f"{spec.table}_unpartitioned"
+    if is_partitioned(conn, table):
+        logger.info(f"{table} is already partitioned")
+        return 0
+    nulls = " NULLS NOT DISTINCT" if conn.server_version >= 150000 else ""
+    with conn.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(
+            """
+            SELECT i.relname, pg_get_indexdef(x.indexrelid),
+                   EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid)
+            FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid
+            WHERE x.indrelid = %s::regclass
+            """,
+            (table,),
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            "SELECT pg_get_triggerdef(oid) FROM pg_trigger WHERE tgrelid = %s::regclass AND NOT tgisinternal",
+            (table,),
+        )
+        triggers = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            f"SELECT date_trunc(%s, MIN({spec.column}))::date FROM {table}",
+            (spec.interval,),
+        )
+        oldest = cursor.fetchone()[0]
+
+        # Index names are per schema: the old ones make way for the new
+        # table's. The definitions read above name the table, which is the
+        # new one by the time they run.
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {old}")
+        for name, _, _ in indexes:
+            cursor.execute(f"ALTER INDEX {name} RENAME TO {name[:49]}_unpartitioned")
+        cursor.execute(f"""
+            CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+                                  INCLUDING COMMENTS INCLUDING STORAGE)
+            PARTITION BY RANGE ({spec.column})
+            """)
+        cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", (old,))
+        sequence = cursor.fetchone()[0]
+        if sequence:
+            cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+        for key in (("id",), *spec.unique_keys):
+            columns = ", ".join((*key, spec.column))
+            cursor.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT {table}_{'_'.join(key)}_key UNIQUE{nulls} ({columns})"
+            )
+        for _, definition, backs_constraint in indexes:
+            if not backs_constraint:
+                cursor.execute(definition)
+        for definition in triggers:
+            cursor.execute(definition)
+        cursor.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+    # Rows older than the retention window go to the default partition, and
+    # from there to maintain's archive
+    current = period_start(date.today(), spec.interval)
+    start = min(oldest, current) if oldest else current
+    if spec.keep > 0:
+        start = max(start, shift(current, spec.interval, 1 - spec.keep))
+    while start <= shift(current, spec.interval, PARTITIONS_AHEAD):
+        create_partition(conn, spec, start)
+        start = shift(start, spec.interval, 1)
+    conn.commit()
+    logger.info(f"{table} is partitioned by {spec.interval}; copying rows from {old}")
+
+    copied, last_id, begin = 0, 0, time.time()
+    with conn.cursor() as cursor:
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {old}")
+        max_id = cursor.fetchone()[0]
+        while last_id < max_id:
+            # Rows written since the swap may already be there
+            cursor.execute(
+                f"INSERT INTO {table} SELECT * FROM {old} WHERE id > %s AND id <= %s ON CONFLICT DO NOTHING",
+                (last_id, last_id + batch_size),
+            )
+            conn.commit()
+            copied += cursor.rowcount
+            last_id += batch_size
+            logger.info(
+                f"{table}: copied {copied} rows ({copied / max(time.time() - begin, 1e-9):.0f} rows/s)"
+            )
+        cursor.execute(f"ANALYZE {table}")
+        if drop_old:
+            cursor.execute(f"DROP TABLE {old}")
+    conn.commit()
+    return copied
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("command", choices=["migrate", "maintain"])
+    parser.add_argument(
+        "tables", nargs="*", help=f"default: {' '.join(PARTITIONED_TABLES)}"
+    )
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument(
+        "--drop-old",
+        action="store_true",
+        help="drop <table>_unpartitioned after migrating",
+    )
+    parser.add_argument(
+        "--no-archive",
+        action="store_true",
+        help="drop expired partitions without archiving",
+    )
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        for table in args.tables or PARTITIONED_TABLES:
+            spec = PARTITIONED_TABLES[table]
+            if args.command == "migrate":
+                copied = migrate_table(conn, spec, args.batch_size, args.drop_old)
+                logger.info(f"Migrated {table}: {copied} rows")
+            else:
+                created, dropped = maintain(
+                    conn, spec, None if args.no_archive else ARCHIVE_DIR
+                )
+                logger.info(
+                    f"{table}: created {created or 'no partitions'}, dropped {dropped or 'none'}"
+                )
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
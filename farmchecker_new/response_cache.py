@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Response cache for the FarmChecker API's read-heavy endpoints.
+
+The dashboard endpoints re-run the same aggregate SQL on every page load even
+though their data only changes when a crawler or migration finishes. Decorate
+a view with ``@cached_response(ttl=..., stale_ttl=...)`` to cache its JSON
+response per route + query string:
+
+- fresh (age < ttl): served from memory
+- stale (age < ttl + stale_ttl): served from memory while one background
+  thread re-runs the view (stale-while-revalidate)
+- older, or never cached: the view runs; concurrent misses for the same key
+  wait for one computation instead of all hitting the database
+
+Responses carry an ``ETag``; a matching ``If-None-Match`` gets a 304. Only
+200 responses are cached, and not streamed ones. ``invalidate()`` drops everything and also touches
+``RESPONSE_CACHE_INVALIDATION_FILE`` so the other worker processes on the same
+host drop their copies on their next lookup.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from functools import wraps
+from typing import Any
+
+from flask import current_app, make_response, request
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_FILE = os.getenv(
+    "RESPONSE_CACHE_INVALIDATION_FILE",
+    os.path.join(tempfile.gettempdir(), "farmchecker_response_cache.stamp"),
+)
+# Query strings are client-controlled, so the number of entries is bounded
+MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+# Striped locks that serialize misses for the same key
+LOCK_STRIPES = 64
+# Set RESPONSE_CACHE_DISABLED=1 to bypass the cache (e.g. when debugging)
+DISABLED = os.getenv("RESPONSE_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+# Response headers stored with the body (pagination.NEXT_CURSOR_HEADER)
+KEPT_HEADERS = ("X-Next-Cursor",)
+
+
+class _Entry:
+    __slots__ = ("body", "mimetype", "etag", "headers", "created_at")
+
+    def __init__(self, body: bytes, mimetype: str, etag: str, headers: dict[str, str] | None = None):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = etag
+        self.headers = headers or {}
+        self.created_at = time.monotonic()
+
+
+class ResponseCache:
+    """Thread-safe in-process cache of rendered responses with per-endpoint stats"""
+
+    def __init__(self, invalidation_file: str | None = INVALIDATION_FILE, max_entries: int = MAX_ENTRIES):
+        self.invalidation_file = invalidation_file
+        self.max_entries = max_entries
+        self._entries: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self._key_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._refreshing: set = set()
+        self._stamp = self._read_stamp()
+        self._stats: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "stale_hits": 0, "misses": 0, "not_modified": 0, "refreshes": 0, "refresh_errors": 0}
+        )
+        self.invalidations = 0
+
+    # -- invalidation --------------------------------------------------------
+
+    def _read_stamp(self) -> int:
+        if not self.invalidation_file:
+            return 0
+        try:
+            return os.stat(self.invalidation_file).st_mtime_ns
+        except OSError:
+            return 0
+
+    def _check_stamp(self):
+        stamp = self._read_stamp()
+        if stamp != self._stamp:
+            with self._lock:
+                self._stamp = stamp
+                self._entries.clear()
+
+    def invalidate(self, prefix: str = ""):
+        """Drop cached responses whose key starts with *prefix* (default: all)"""
+        with self._lock:
+            if prefix:
+                for key in [k for k in self._entries if k.startswith(prefix)]:
+                    del self._entries[key]
+            else:
+                self._entries.clear()
+            self.invalidations += 1
+        if self.invalidation_file and not prefix:
+            try:
+                with open(self.invalidation_file, "a"):
+                    os.utime(self.invalidation_file, None)
+                self._stamp = self._read_stamp()
+            except OSError as e:
+                logger.warning(f"Could not touch cache invalidation file: {e}")
+
+    # -- entries -------------------------------------------------------------
+
+    def get(self, key: str) -> _Entry | None:
+        self._check_stamp()
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: str, body: bytes, mimetype: str, headers: dict[str, str] | None = None) -> _Entry:
+        entry = _Entry(body, mimetype, hashlib.sha1(body).hexdigest(), headers)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                # Dicts keep insertion order, so the first key is the oldest
+                del self._entries[next(iter(self._entries))]
+        return entry
+
+    def record(self, endpoint: str, event: str):
+        with self._lock:
+            self._stats[endpoint][event] += 1
+
+    def key_lock(self, key: str) -> threading.Lock:
+        return self._key_locks[hash(key) % LOCK_STRIPES]
+
+    def start_refresh(self, key: str) -> bool:
+        """Claim the background refresh for *key*; False if one is running"""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def finish_refresh(self, key: str):
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            endpoints = {}
+            totals = defaultdict(int)
+            for endpoint, counts in self._stats.items():
+                served = counts["hits"] + counts["stale_hits"]
+                lookups = served + counts["misses"]
+                endpoints[endpoint] = dict(counts, hit_ratio=round(served / lookups, 4) if lookups else 0.0)
+                for name, value in counts.items():
+                    totals[name] += value
+            served = totals["hits"] + totals["stale_hits"]
+            lookups = served + totals["misses"]
+            return {
+                "entries": len(self._entries),
+                "invalidations": self.invalidations,
+                "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+                **totals,
+                "endpoints": endpoints,
+            }
+
+
+response_cache = ResponseCache()
+
+
+def _cache_key() -> str:
+    args = sorted(request.args.items(multi=True))
+    return request.path + ("?" + "&".join(f"{k}={v}" for k, v in args) if args else "")
+
+
+def _render(view: Callable, args: tuple, kwargs: dict) -> Any:
+    return make_response(view(*args, **kwargs))
+
+
+def _store(key: str, response) -> _Entry:
+    headers = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+    return response_cache.put(key, response.get_data(), response.mimetype, headers)
+
+
+def _respond(entry: _Entry, cache_state: str):
+    if request.if_none_match and entry.etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(entry.body, mimetype=entry.mimetype)
+    response.headers.update(entry.headers)
+    response.set_etag(entry.etag)
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Cache"] = cache_state
+    return response
+
+
+def _refresh_in_background(app, view: Callable, args: tuple, kwargs: dict, key: str, endpoint: str, path: str, query: bytes):
+    def run():
+        try:
+            # Teardown of this context returns any pooled DB connection.
+            with app.test_request_context(path, query_string=query):
+                response = _render(view, args, kwargs)
+                if response.status_code == 200 and not response.is_streamed:
+                    _store(key, response)
+                    response_cache.record(endpoint, "refreshes")
+                else:
+                    response_cache.record(endpoint, "refresh_errors")
+        except Exception as e:
+            response_cache.record(endpoint, "refresh_errors")
+            logger.error(f"Background refresh of {key} failed: {e}")
+        finally:
+            response_cache.finish_refresh(key)
+
+    threading.Thread(target=run, name=f"cache-refresh:{key}", daemon=True).start()
+
+
+def cached_response(ttl: float, stale_ttl: float | None = None):
+    """Cache a view's 200 responses for *ttl* seconds, then serve them stale
+    for up to *stale_ttl* more seconds (default ``4 * ttl``) while refreshing.
+    """
+    stale_ttl = 4 * ttl if stale_ttl is None else stale_ttl
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if DISABLED or request.method != "GET":
+                return view(*args, **kwargs)
+
+            endpoint = request.url_rule.rule if request.url_rule else request.path
+            key = _cache_key()
+            entry = response_cache.get(key)
+            if entry is not None:
+                age = time.monotonic() - entry.created_at
+                if age < ttl:
+                    response_cache.record(endpoint, "hits")
+                    state = "HIT"
+                elif age < ttl + stale_ttl:
+                    response_cache.record(endpoint, "stale_hits")
+                    state = "STALE"
+                    if response_cache.start_refresh(key):
+                        _refresh_in_background(
+                            current_app._get_current_object(), view, args, kwargs,
+                            key, endpoint, request.path, request.query_string,
+                        )
+                else:
+                    entry = None
+
+            if entry is None:
+                with response_cache.key_lock(key):
+                    # Another request may have filled it while we waited
+                    entry = response_cache.get(key)
+                    if entry is None or time.monotonic() - entry.created_at >= ttl:
+                        response_cache.record(endpoint, "misses")
+                        response = _render(view, args, kwargs)
+                        if response.status_code != 200 or response.is_streamed:
+                            return response
+                        entry = _store(key, response)
+                        state = "MISS"
+                    else:
+                        response_cache.record(endpoint, "hits")
+                        state = "HIT"
+
+            if request.if_none_match and entry.etag in request.if_none_match:
+                response_cache.record(endpoint, "not_modified")
+            return _respond(entry, state)
+
+        wrapper.cache_ttl = ttl
+        return wrapper
+
+    return decorator
@@ -7,15 +7,23 @@ Connects to Cloud SQL and serves data to the frontend
 import json
 import logging
 import os
+import re
 import traceback
 import time
 import uuid
+import zlib
 from datetime import datetime, timedelta
 
 import psycopg2
-from flask import Flask, jsonify, request, send_from_directory, g
+from flask import Flask, jsonify, request, send_from_directory, g, has_app_context
 from flask_cors import CORS
 
+from content_cleaning import clean_post_content, clean_post_title
+from db_pool import get_pool
+from pagination import InvalidCursor, SortKey, fetch_rows, page_from_request, page_response
+from response_cache import cached_response, response_cache
+from stats_engine import fetch_stats
+
 # Import enhanced logging
 from enhanced_logging_config import (
     get_logger, performance_monitor, log_request_context, 
@@ -23,8 +31,9 @@ from enhanced_logging_config import (
 )
 
 # Initialize enhanced logger
-logger = get_logger("web")
 enhanced_logger = get_logger("web")
+# Plain logger for the logger.info/error calls (EnhancedLogger has no such methods)
+logger = enhanced_logger.logger
 
 # Configure basic logging for compatibility
 logging.basicConfig(
@@ -73,6 +82,8 @@ def after_request(response):
     """Log outgoing responses"""
     if hasattr(g, 'start_time'):
         duration_ms = (time.time() - g.start_time) * 1000
+        # get_data() would buffer a streamed page; its size is not known yet
+        response_size = 0 if response.is_streamed else len(response.get_data())
         
         enhanced_logger.log_api_request(
             method=request.method,
@@ -80,7 +91,7 @@ def after_request(response):
             status_code=response.status_code,
             duration_ms=duration_ms,
             request_size=request.content_length or 0,
-            response_size=len(response.get_data()) if response.get_data() else 0
+            response_size=response_size
         )
         
         enhanced_logger.logger.info(
@@ -94,7 +105,7 @@ def after_request(response):
                     success=200 <= response.status_code < 400,
                     metadata={
                         "status_code": response.status_code,
-                        "response_size": len(response.get_data()) if response.get_data() else 0
+                        "response_size": response_size
                     }
                 )
             }
@@ -112,56 +123,19 @@ DB_CONFIG = {
 }
 
 
-@performance_monitor("database_connection")
 def get_db_connection():
-    """Create database connection with comprehensive logging"""
+    """Borrow a pooled database connection; ``conn.close()`` returns it.
+
+    Connections not closed by the handler are returned at request teardown.
+    Returns None if no connection could be obtained.
+    """
     start_time = time.time()
-    
+
     try:
-        enhanced_logger.logger.info(
-            "Attempting database connection",
-            extra={
-                "context": LogContext(
-                    request_id=request_id.get(),
-                    operation="database_connection",
-                    component="database",
-                    metadata={
-                        "host": DB_CONFIG["host"],
-                        "database": DB_CONFIG["database"],
-                        "port": DB_CONFIG["port"]
-                    }
-                )
-            }
-        )
-        
-        conn = psycopg2.connect(**DB_CONFIG)
-        
-        duration_ms = (time.time() - start_time) * 1000
-        enhanced_logger.log_database_operation(
-            operation="connect",
-            table="connection",
-            duration_ms=duration_ms,
-            success=True
-        )
-        
-        enhanced_logger.logger.info(
-            f"Database connection successful ({duration_ms:.2f}ms)",
-            extra={
-                "context": LogContext(
-                    request_id=request_id.get(),
-                    operation="database_connection",
-                    component="database",
-                    duration_ms=duration_ms,
-                    success=True
-                )
-            }
-        )
-        
-        return conn
-        
+        conn = get_pool(DB_CONFIG).getconn()
     except Exception as e:
         duration_ms = (time.time() - start_time) * 1000
-        
+
         enhanced_logger.log_error(
             error=e,
             operation="database_connection",
@@ -170,7 +144,7 @@ def get_db_connection():
             database=DB_CONFIG["database"],
             port=DB_CONFIG["port"]
         )
-        
+
         enhanced_logger.log_database_operation(
             operation="connect",
             table="connection",
@@ -178,9 +152,25 @@ def get_db_connection():
             success=False,
             error=str(e)
         )
-        
+
         return None
 
+    if has_app_context():
+        g.setdefault("db_connections", []).append(conn)
+    return conn
+
+
+@app.teardown_appcontext
+def release_db_connections(exc):
+    """Return any pooled connections a handler did not close"""
+    for conn in g.pop("db_connections", []):
+        conn.close()
+
+
+def prepared_name(prefix, order_clause):
+    """Stable prepared-statement name for one ORDER BY variant of a query"""
+    return f"{prefix}_{zlib.crc32(order_clause.encode()):08x}"
+
 
 def extract_engagement_data(raw_data):
     """Extract engagement metrics from raw_data JSON"""
@@ -335,241 +325,6 @@ def extract_crypto_data(raw_data):
         return {}
 
 
-@performance_monitor("content_cleaning")
-def clean_post_content(content):
-    """Clean post content by extracting actual tweet text from raw data with comprehensive logging"""
-    import re
-    
-    start_time = time.time()
-    content_id = str(uuid.uuid4())[:8]
-    input_length = len(str(content)) if content else 0
-    
-    enhanced_logger.logger.debug(
-        f"Starting content cleaning for content_id={content_id}",
-        extra={
-            "context": LogContext(
-                request_id=request_id.get(),
-                operation="content_cleaning_start",
-                component="content",
-                metadata={
-                    "content_id": content_id,
-                    "input_length": input_length,
-                    "content_type": type(content).__name__,
-                    "content_preview": str(content)[:100] if content else ""
-                }
-            )
-        }
-    )
-    
-    if not content:
-        enhanced_logger.log_content_processing(
-            content_type="post",
-            content_id=content_id,
-            operation="clean",
-            input_length=0,
-            output_length=0,
-            duration_ms=(time.time() - start_time) * 1000,
-            success=True,
-            cleaning_method="empty_content"
-        )
-        return ""
-
-    # If content is JSON string, try to extract readable text
-    if content.startswith("{") and content.endswith("}"):
-        enhanced_logger.logger.debug(f"Processing JSON content for {content_id}")
-        try:
-            data = json.loads(content)
-            # Extract readable fields
-            readable_fields = []
-            if isinstance(data, dict):
-                # Look for text, title, name, description fields
-                for field in [
-                    "text",
-                    "title",
-                    "name",
-                    "description",
-                    "summary",
-                    "content",
-                ]:
-                    if field in data and data[field]:
-                        readable_fields.append(str(data[field]))
-
-                # If no readable fields found, try to extract from nested structures
-                if not readable_fields:
-                    for key, value in data.items():
-                        if (
-                            isinstance(value, str)
-                            and len(value) > 10
-                            and not value.startswith("{")
-                        ):
-                            readable_fields.append(value)
-                        elif isinstance(value, dict) and "text" in value:
-                            readable_fields.append(str(value["text"]))
-
-            if readable_fields:
-                result = " ".join(readable_fields)
-                duration_ms = (time.time() - start_time) * 1000
-                enhanced_logger.log_content_processing(
-                    content_type="post",
-                    content_id=content_id,
-                    operation="clean",
-                    input_length=input_length,
-                    output_length=len(result),
-                    duration_ms=duration_ms,
-                    success=True,
-                    cleaning_method="json_extraction",
-                    fields_found=list(data.keys()) if isinstance(data, dict) else []
-                )
-                return result
-        except Exception as e:
-            enhanced_logger.logger.debug(f"JSON parsing failed for {content_id}: {str(e)}")
-
-    # Try to extract text from Python dict-like strings
-    if "'text':" in content:
-        enhanced_logger.logger.debug(f"Processing Python dict content for {content_id}")
-        try:
-            text_match = re.search(r"'text':\s*'([^']+)'", content)
-            if text_match:
-                text = text_match.group(1)
-                # Clean up escaped characters
-                text = text.replace('\\n', ' ').replace('\\t', ' ')
-                text = text.replace('\\"', '"').replace("\\'", "'")
-                text = text.replace('\u2014', '-')  # Handle em dash
-                if len(text) > 10:  # Only return if it's substantial text
-                    duration_ms = (time.time() - start_time) * 1000
-                    enhanced_logger.log_content_processing(
-                        content_type="post",
-                        content_id=content_id,
-                        operation="clean",
-                        input_length=input_length,
-                        output_length=len(text),
-                        duration_ms=duration_ms,
-                        success=True,
-                        cleaning_method="python_dict_extraction",
-                        pattern_matched="'text':"
-                    )
-                    return text
-        except Exception as e:
-            enhanced_logger.logger.debug(f"Python dict extraction failed for {content_id}: {str(e)}")
-
-    # If content looks like raw JSON data, try to extract the actual tweet text
-    if "text" in content and ("source" in content or "username" in content):
-        enhanced_logger.logger.debug(f"Processing raw JSON-like content for {content_id}")
-        try:
-            # Look for text field in JSON-like content
-            text_patterns = [
-                r'"text":\s*"([^"]+)"',
-                r"'text':\s*'([^']+)'",
-                r'"content":\s*"([^"]+)"',
-                r"'content':\s*'([^']+)'",
-            ]
-            
-            for pattern in text_patterns:
-                match = re.search(pattern, content)
-                if match:
-                    text = match.group(1)
-                    # Clean up escaped characters
-                    text = text.replace('\\n', ' ').replace('\\t', ' ')
-                    text = text.replace('\\"', '"').replace("\\'", "'")
-                    if len(text) > 10:  # Only return if it's substantial text
-                        duration_ms = (time.time() - start_time) * 1000
-                        enhanced_logger.log_content_processing(
-                            content_type="post",
-                            content_id=content_id,
-                            operation="clean",
-                            input_length=input_length,
-                            output_length=len(text),
-                            duration_ms=duration_ms,
-                            success=True,
-                            cleaning_method="regex_pattern_extraction",
-                            pattern_used=pattern
-                        )
-                        return text
-        except Exception as e:
-            enhanced_logger.log_error(
-                error=e,
-                operation="content_cleaning",
-                component="content",
-                content_id=content_id,
-                cleaning_method="regex_pattern_extraction"
-            )
-
-    # If it's plain text (not JSON), return as is
-    if not content.startswith("{") and not content.startswith("["):
-        enhanced_logger.logger.debug(f"Processing plain text content for {content_id}")
-        # Clean up basic formatting
-        content = content.replace('\\n', ' ').replace('\\t', ' ')
-        content = content.replace('\\"', '"').replace("\\'", "'")
-        content = re.sub(r'\s+', ' ', content).strip()
-        
-        if len(content) > 5:
-            duration_ms = (time.time() - start_time) * 1000
-            enhanced_logger.log_content_processing(
-                content_type="post",
-                content_id=content_id,
-                operation="clean",
-                input_length=input_length,
-                output_length=len(content),
-                duration_ms=duration_ms,
-                success=True,
-                cleaning_method="plain_text_cleaning"
-            )
-            return content
-
-    # If we can't extract meaningful content, return empty
-    duration_ms = (time.time() - start_time) * 1000
-    enhanced_logger.log_content_processing(
-        content_type="post",
-        content_id=content_id,
-        operation="clean",
-        input_length=input_length,
-        output_length=0,
-        duration_ms=duration_ms,
-        success=True,
-        cleaning_method="no_extraction_possible"
-    )
-    
-    enhanced_logger.logger.warning(
-        f"Could not extract meaningful content for {content_id}",
-        extra={
-            "context": LogContext(
-                request_id=request_id.get(),
-                operation="content_cleaning_failed",
-                component="content",
-                duration_ms=duration_ms,
-                success=False,
-                metadata={
-                    "content_id": content_id,
-                    "input_length": input_length,
-                    "content_preview": str(content)[:200] if content else ""
-                }
-            )
-        }
-    )
-    
-    return ""
-
-
-def clean_post_title(title):
-    """Clean post title by removing technical data"""
-    if not title:
-        return ""
-
-    # Remove common technical prefixes
-    title = title.replace("No title", "")
-    title = title.replace("playwright_", "")
-    title = title.replace("source:", "")
-
-    # Clean up
-    title = title.strip()
-
-    # If title is too short or technical, return empty instead of generic fallback
-    if len(title) < 3 or title.startswith("{"):
-        return ""
-
-    return title
-
-
 def extract_news_metadata(raw_data):
     """Extract published date and source from news raw_data"""
     try:
@@ -659,6 +414,7 @@ def serve_static(filename):
 
 
 @app.route("/api/stats")
+@cached_response(ttl=60)
 def get_stats():
     """Get overall statistics from dedicated tables"""
     try:
@@ -668,84 +424,8 @@ def get_stats():
 
         cursor = conn.cursor()
 
-        # Get counts for each source from dedicated tables
-        stats = {}
-
-        # Twitter posts count
-        cursor.execute(
-            """
-            SELECT COUNT(*) FROM tweets
-            WHERE collected_at >= NOW() - INTERVAL '24 hours'
-        """
-        )
-        stats["twitter_posts"] = cursor.fetchone()[0]
-
-        # Reddit posts count
-        cursor.execute(
-            """
-            SELECT COUNT(*) FROM reddit_posts
-            WHERE collected_at >= NOW() - INTERVAL '24 hours'
-        """
-        )
-        stats["reddit_posts"] = cursor.fetchone()[0]
-
-        # News articles count
-        cursor.execute(
-            """
-            SELECT COUNT(*) FROM articles
-            WHERE created_at >= NOW() - INTERVAL '24 hours'
-        """
-        )
-        stats["news_articles"] = cursor.fetchone()[0]
-
-        # Crypto tokens count
-        cursor.execute(
-            """
-            SELECT COUNT(*) FROM crypto_tokens
-            WHERE last_updated_at >= NOW() - INTERVAL '24 hours'
-        """
-        )
-        stats["crypto_tokens"] = cursor.fetchone()[0]
-
-        # DexScreener pairs count
-        cursor.execute(
-            """
-            SELECT COUNT(*) FROM dexscreener_pairs
-            WHERE collected_at >= NOW() - INTERVAL '24 hours'
-        """
-        )
-        stats["dexscreener_pairs"] = cursor.fetchone()[0]
-
-        # DexPaprika tokens count
-        cursor.execute(
-            """
-            SELECT COUNT(*) FROM dexpaprika_pairs
-            WHERE collected_at >= NOW() - INTERVAL '24 hours'
-        """
-        )
-        stats["dexpaprika_tokens"] = cursor.fetchone()[0]
-
-        # Total engagement from all sources
-        cursor.execute(
-            """
-            SELECT 
-                COALESCE(SUM(likes_count + retweets_count + replies_count), 0) as twitter_engagement,
-                COALESCE(SUM(score + comments_count), 0) as reddit_engagement,
-                COALESCE(SUM(engagement_score), 0) as news_engagement
-            FROM (
-                SELECT likes_count, retweets_count, replies_count, 0 as score, 0 as comments_count, 0 as engagement_score
-                FROM tweets WHERE collected_at >= NOW() - INTERVAL '24 hours'
-                UNION ALL
-                SELECT 0, 0, 0, score, comments_count, 0
-                FROM reddit_posts WHERE collected_at >= NOW() - INTERVAL '24 hours'
-                UNION ALL
-                SELECT 0, 0, 0, 0, 0, engagement_score
-                FROM articles WHERE created_at >= NOW() - INTERVAL '24 hours'
-            ) combined_engagement
-        """
-        )
-        engagement_row = cursor.fetchone()
-        stats["total_engagement"] = (engagement_row[0] or 0) + (engagement_row[1] or 0) + (engagement_row[2] or 0)
+        # Counts and engagement for every source in one round trip
+        stats = fetch_stats(conn, cursor)
 
         cursor.close()
         conn.close()
@@ -848,6 +528,7 @@ def format_token_display(token_data):
 
 
 @app.route("/api/crypto/top-gainers")
+@cached_response(ttl=120)
 def get_top_gainers():
     """Get top gaining crypto tokens from dedicated crypto_tokens table"""
     try:
@@ -858,7 +539,7 @@ def get_top_gainers():
         cursor = conn.cursor()
 
         # Get top gainers from crypto_tokens table, prioritizing most recent data for each symbol
-        cursor.execute("""
+        conn.execute_prepared(cursor, "top_gainers", """
             SELECT DISTINCT ON (symbol) id, symbol, name, price_usd, price_change_24h, market_cap, volume_24h, 
                    network, contract_address, last_updated_at
             FROM crypto_tokens 
@@ -913,6 +594,7 @@ def get_top_gainers():
 
 
 @app.route("/api/crypto/trending")
+@cached_response(ttl=120)
 def get_trending_crypto():
     """Get trending crypto tokens from dedicated crypto_tokens table"""
     try:
@@ -923,7 +605,7 @@ def get_trending_crypto():
         cursor = conn.cursor()
 
         # Get trending tokens by volume and recent updates, prioritizing most recent data for each symbol
-        cursor.execute("""
+        conn.execute_prepared(cursor, "trending_crypto", """
             SELECT DISTINCT ON (symbol) id, symbol, name, price_usd, price_change_24h, market_cap, volume_24h, 
                    network, contract_address, last_updated_at
             FROM crypto_tokens 
@@ -975,6 +657,39 @@ def get_trending_crypto():
         return jsonify({"error": str(e)}), 500
 
 
+TOKEN_COLUMNS = """id, symbol, name, price_usd, price_change_24h, market_cap, volume_24h,
+                   network, contract_address, last_updated_at"""
+
+# Must match the expression of idx_crypto_tokens_search
+TOKEN_SEARCH_VECTOR = "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(symbol, ''))"
+
+
+def token_from_row(row):
+    """Token dict for format_token_display from a TOKEN_COLUMNS row"""
+    symbol = row[1] or ""
+    name = row[2] or symbol
+
+    # Clean up name and symbol
+    if name and "(" in name and ")" in name:
+        # Extract symbol from parentheses if present
+        symbol = name.split("(")[-1].split(")")[0].replace("$", "")
+        name = name.split("(")[0].strip()
+
+    return {
+        'id': row[0],
+        'symbol': symbol.upper(),
+        'name': name,
+        'price_usd': float(row[3]) if row[3] else 0,
+        'price_change_24h': float(row[4]) if row[4] else 0,
+        'price_change_percentage_24h': float(row[4]) if row[4] else 0,
+        'market_cap': float(row[5]) if row[5] else 0,
+        'volume_24h': float(row[6]) if row[6] else 0,
+        'network': row[7] or '',
+        'contract_address': row[8] or '',
+        'last_updated_at': row[9].isoformat() if row[9] else None,
+    }
+
+
 @app.route("/api/crypto/meme-coins")
 def get_meme_coins():
     """Get meme coins and viral tokens"""
@@ -985,61 +700,25 @@ def get_meme_coins():
 
         cursor = conn.cursor()
 
-        # Get meme coins by looking for specific keywords in names and symbols
-        cursor.execute("""
-            SELECT id, symbol, name, price_usd, price_change_24h, market_cap, volume_24h, 
-                   network, contract_address, last_updated_at
-            FROM crypto_tokens 
-            WHERE (
-                LOWER(name) LIKE '%dog%' OR 
-                LOWER(name) LIKE '%cat%' OR 
-                LOWER(name) LIKE '%moon%' OR 
-                LOWER(name) LIKE '%inu%' OR 
-                LOWER(name) LIKE '%pepe%' OR 
-                LOWER(name) LIKE '%shib%' OR 
-                LOWER(name) LIKE '%floki%' OR 
-                LOWER(name) LIKE '%wojak%' OR 
-                LOWER(name) LIKE '%chad%' OR 
-                LOWER(name) LIKE '%based%' OR
-                LOWER(symbol) LIKE '%DOGE%' OR 
-                LOWER(symbol) LIKE '%SHIB%' OR 
-                LOWER(symbol) LIKE '%PEPE%' OR 
-                LOWER(symbol) LIKE '%FLOKI%' OR 
-                LOWER(symbol) LIKE '%WOJAK%' OR 
-                LOWER(symbol) LIKE '%CHAD%' OR 
-                LOWER(symbol) LIKE '%BASED%'
-            )
+        # Meme coins are classified when crawlers upsert them (is_meme and
+        # meme_tags, see create_meme_token_index.sql); the partial index
+        # hands them over in volume order, optionally narrowed to ?tag=dog
+        query = f"""
+            SELECT {TOKEN_COLUMNS}
+            FROM crypto_tokens
+            WHERE is_meme
             AND price_usd > 0
             AND last_updated_at >= NOW() - INTERVAL '24 hours'
-            ORDER BY volume_24h DESC, price_change_24h DESC
-            LIMIT 20
-        """)
+        """
+        params = []
+        tag = request.args.get("tag", "").strip().lower()
+        if tag:
+            query += " AND meme_tags @> ARRAY[%s]::text[]"
+            params.append(tag)
+        query += " ORDER BY volume_24h DESC, price_change_24h DESC LIMIT 20"
+        cursor.execute(query, params)
 
-        meme_coins = []
-        for row in cursor.fetchall():
-            symbol = row[1] or ""
-            name = row[2] or symbol
-            
-            # Clean up name and symbol
-            if name and "(" in name and ")" in name:
-                # Extract symbol from parentheses if present
-                symbol = name.split("(")[-1].split(")")[0].replace("$", "")
-                name = name.split("(")[0].strip()
-            
-            token_data = {
-                'id': row[0],
-                'symbol': symbol.upper(),
-                'name': name,
-                'price_usd': float(row[3]) if row[3] else 0,
-                'price_change_24h': float(row[4]) if row[4] else 0,
-                'price_change_percentage_24h': float(row[4]) if row[4] else 0,
-                'market_cap': float(row[5]) if row[5] else 0,
-                'volume_24h': float(row[6]) if row[6] else 0,
-                'network': row[7] or '',
-                'contract_address': row[8] or '',
-                'last_updated_at': row[9].isoformat() if row[9] else None,
-            }
-            meme_coins.append(format_token_display(token_data))
+        meme_coins = [format_token_display(token_from_row(row)) for row in cursor.fetchall()]
 
         cursor.close()
         conn.close()
@@ -1093,6 +772,40 @@ def get_meme_coins():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/crypto/search")
+def search_crypto():
+    """Search tokens by name or symbol word prefixes (?q=dog wif&meme=1)"""
+    words = re.findall(r"\w+", request.args.get("q", "").lower())[:5]
+    if not words:
+        return jsonify([])
+    limit = max(1, min(request.args.get("limit", 20, type=int), 100))
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return jsonify({"error": "Database connection failed"}), 500
+
+        cursor = conn.cursor()
+        # Every word must start a word of the name or symbol
+        query = f"""
+            SELECT {TOKEN_COLUMNS}
+            FROM crypto_tokens
+            WHERE {TOKEN_SEARCH_VECTOR} @@ to_tsquery('simple', %s)
+        """
+        if request.args.get("meme") in ("1", "true"):
+            query += " AND is_meme"
+        query += " ORDER BY volume_24h DESC NULLS LAST LIMIT %s"
+        cursor.execute(query, (" & ".join(f"{word}:*" for word in words), limit))
+        tokens = [format_token_display(token_from_row(row)) for row in cursor.fetchall()]
+
+        cursor.close()
+        conn.close()
+        return jsonify(tokens)
+
+    except Exception as e:
+        logger.error(f"Error searching crypto tokens: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route("/api/crypto/market-data")
 def get_market_data():
     """Get overall crypto market data"""
@@ -1130,10 +843,50 @@ def get_market_data():
         return jsonify({"error": str(e)}), 500
 
 
+TWITTER_SORTS = {
+    "recent": SortKey("published_at"),
+    "engagement": SortKey("likes_count + retweets_count + replies_count", skip_nulls=True),
+    "likes": SortKey("likes_count", skip_nulls=True),
+    "retweets": SortKey("retweets_count", skip_nulls=True),
+}
+
+
+def tweet_from_row(row):
+    """Tweet item for /api/twitter, or None if it has no readable text"""
+    # Cleaned at ingest; rows not yet backfilled are cleaned here
+    clean_content = row[14] if row[14] is not None else clean_post_content(row[2])
+    if not clean_content:
+        return None
+
+    return {
+        "id": row[0],
+        "tweet_id": row[1],
+        "title": f"Tweet by @{row[3]}",
+        "content": clean_content,
+        "author": f"@{row[3]}",
+        "user_screen_name": row[3],
+        "user_followers_count": row[4],
+        "user_verified": row[5],
+        "engagement_score": row[6] + row[7] + row[8],  # likes + retweets + replies
+        "virality_score": row[6] + row[7] * 2,  # likes + retweets*2
+        "sentiment_score": 0,  # Could be calculated later
+        "published_at": row[12].isoformat() if row[12] else None,
+        "scraped_at": row[13].isoformat() if row[13] else None,
+        "url": f"https://twitter.com/{row[3]}/status/{row[1]}",
+        "likes": row[6],
+        "replies": row[8],
+        "retweets": row[7],
+        "views": row[9] or 0,
+        "quote_count": row[10] or 0,
+        "bookmark_count": row[11] or 0,
+    }
+
+
 @app.route("/api/twitter")
 @performance_monitor("twitter_api")
 def get_twitter_posts():
-    """Get tweets from the tweet table"""
+    """Get tweets from the tweet table, a keyset page at a time"""
+    page = page_from_request(TWITTER_SORTS, default_sort="recent")
     start_time = time.time()
     request_id_val = str(uuid.uuid4())
     request_id.set(request_id_val)
@@ -1174,59 +927,48 @@ def get_twitter_posts():
             )
             return jsonify({"error": "Database connection failed"}), 500
 
-        cursor = conn.cursor()
-
-        # Get sort parameter from query string
-        sort_by = request.args.get('sort', 'recent')
-        enhanced_logger.logger.debug(f"Sort parameter: {sort_by}")
-        
-        if sort_by == 'engagement':
-            order_clause = "ORDER BY (like_count + retweet_count + reply_count) DESC"
-        elif sort_by == 'likes':
-            order_clause = "ORDER BY like_count DESC"
-        elif sort_by == 'retweets':
-            order_clause = "ORDER BY retweet_count DESC"
-        else:
-            order_clause = "ORDER BY created_at DESC"
-
         # Execute query
+        where, order = page.clauses()
         query_start_time = time.time()
-        cursor.execute(
+        rows = fetch_rows(
+            conn,
+            page,
+            prepared_name("twitter_posts", where + order),
             f"""
-            SELECT id, tweet_id, content, author_username, author_followers_count,
+            SELECT id, tweet_id, CASE WHEN clean_content IS NULL THEN content END,
+                   author_username, author_followers_count,
                    author_verified, likes_count, retweets_count, replies_count, views_count,
-                   0 as quote_count, 0 as bookmark_count, published_at, collected_at
+                   0 as quote_count, 0 as bookmark_count, published_at, collected_at,
+                   clean_content, {page.key_columns}
             FROM tweets
-            WHERE published_at >= NOW() - INTERVAL '7 days'
-            {order_clause}
-            LIMIT 50
+            WHERE published_at >= NOW() - INTERVAL '7 days'{where}
+            {order}
         """
         )
         query_time = (time.time() - query_start_time) * 1000
-        
+
+        if page.stream:
+            # Rows are read while the response is sent; nothing to count yet
+            return page_response(page, rows, tweet_from_row)
+
         enhanced_logger.log_database_operation(
             operation="select",
             table="tweet",
             duration_ms=query_time,
-            record_count=0,  # Will be updated after fetch
+            record_count=len(rows),
             success=True,
             query_type="twitter_posts",
-            sort_by=sort_by
+            sort_by=page.sort
         )
 
-        # Process results
-        processing_start_time = time.time()
-        rows = cursor.fetchall()
-        fetch_time = (time.time() - processing_start_time) * 1000
-        
         enhanced_logger.logger.info(
-            f"Fetched {len(rows)} tweets in {fetch_time:.2f}ms",
+            f"Fetched {len(rows)} tweets in {query_time:.2f}ms",
             extra={
                 "context": LogContext(
                     request_id=request_id_val,
                     operation="twitter_posts_fetch",
                     component="database",
-                    duration_ms=fetch_time,
+                    duration_ms=query_time,
                     success=True,
                     metadata={
                         "rows_fetched": len(rows),
@@ -1236,51 +978,22 @@ def get_twitter_posts():
             }
         )
 
-        posts = []
+        # Process results
+        processing_start_time = time.time()
         content_processing_stats = {
             "total_processed": 0,
             "successful_cleaning": 0,
             "failed_cleaning": 0
         }
-        
-        for i, row in enumerate(rows):
+
+        def to_post(row):
             content_processing_stats["total_processed"] += 1
-            
-            # Clean the tweet text
-            clean_content = clean_post_content(row[2])
-            
-            if clean_content:
-                content_processing_stats["successful_cleaning"] += 1
-                
-                # Create tweet URL
-                tweet_url = f"https://twitter.com/{row[3]}/status/{row[1]}"
-                
-                posts.append(
-                    {
-                        "id": row[0],
-                        "tweet_id": row[1],
-                        "title": f"Tweet by @{row[3]}",
-                        "content": clean_content,
-                        "author": f"@{row[3]}",
-                        "user_screen_name": row[3],
-                        "user_followers_count": row[4],
-                        "user_verified": row[5],
-                        "engagement_score": row[6] + row[7] + row[8],  # likes + retweets + replies
-                        "virality_score": row[6] + row[7] * 2,  # likes + retweets*2
-                        "sentiment_score": 0,  # Could be calculated later
-                        "published_at": row[12].isoformat() if row[12] else None,
-                        "scraped_at": row[13].isoformat() if row[13] else None,
-                        "url": tweet_url,
-                        "likes": row[6],
-                        "replies": row[8],
-                        "retweets": row[7],
-                        "views": row[9] or 0,
-                        "quote_count": row[10] or 0,
-                        "bookmark_count": row[11] or 0,
-                    }
-                )
-            else:
-                content_processing_stats["failed_cleaning"] += 1
+            post = tweet_from_row(row)
+            content_processing_stats["successful_cleaning" if post else "failed_cleaning"] += 1
+            return post
+
+        response = page_response(page, rows, to_post)
+        posts_count = content_processing_stats["successful_cleaning"]
 
         processing_time = (time.time() - processing_start_time) * 1000
         
@@ -1289,22 +1002,19 @@ def get_twitter_posts():
             content_id=f"batch_{request_id_val}",
             operation="batch_processing",
             input_length=len(rows),
-            output_length=len(posts),
+            output_length=posts_count,
             duration_ms=processing_time,
             success=True,
             **content_processing_stats
         )
 
-        cursor.close()
-        conn.close()
-
         # Calculate total response time
         total_time = (time.time() - start_time) * 1000
         
         # Log business metrics
         enhanced_logger.log_business_metric(
             metric_name="twitter_posts_retrieved",
-            value=len(posts),
+            value=posts_count,
             category="content_retrieval",
             total_time_ms=total_time,
             db_connect_time_ms=db_connect_time,
@@ -1318,13 +1028,13 @@ def get_twitter_posts():
             path=request.path,
             status_code=200,
             duration_ms=total_time,
-            response_size=len(str(posts)),
-            posts_count=len(posts),
+            response_size=response.content_length,
+            posts_count=posts_count,
             **content_processing_stats
         )
 
         enhanced_logger.logger.info(
-            f"Twitter posts API completed - {len(posts)} posts in {total_time:.2f}ms",
+            f"Twitter posts API completed - {posts_count} posts in {total_time:.2f}ms",
             extra={
                 "context": LogContext(
                     request_id=request_id_val,
@@ -1333,7 +1043,7 @@ def get_twitter_posts():
                     duration_ms=total_time,
                     success=True,
                     metadata={
-                        "posts_returned": len(posts),
+                        "posts_returned": posts_count,
                         "db_connect_time_ms": db_connect_time,
                         "query_time_ms": query_time,
                         "processing_time_ms": processing_time,
@@ -1343,7 +1053,7 @@ def get_twitter_posts():
             }
         )
         
-        return jsonify(posts)
+        return response
 
     except Exception as e:
         total_time = (time.time() - start_time) * 1000
@@ -1367,177 +1077,170 @@ def get_twitter_posts():
         return jsonify({"error": str(e)}), 500
 
 
+REDDIT_SORTS = {
+    "recent": SortKey("published_at"),
+    "score": SortKey("score", skip_nulls=True),
+    "comments": SortKey("comments_count", skip_nulls=True),
+}
+
+
+def reddit_post_from_row(row):
+    """Post item for /api/reddit, or None if its title cleans to nothing"""
+    clean_title = clean_post_title(row[2])
+    if not clean_title:
+        return None
+
+    return {
+        "id": row[0],
+        "post_id": row[1],
+        "title": clean_title,
+        "content": f"Reddit post from r/{row[4]}",
+        "author": row[3] or "Anonymous",
+        "subreddit": row[4],
+        "engagement_score": row[5] + row[6],  # score + comments
+        "virality_score": row[5] + row[6] * 2,  # score + comments*2
+        "sentiment_score": 0,  # Could be calculated later
+        "published_at": row[7].isoformat() if row[7] else None,
+        "scraped_at": row[9].isoformat() if row[9] else None,
+        "url": row[8],
+        "score": row[5],
+        "num_comments": row[6],
+        "upvotes": row[5],  # Reddit uses upvotes
+        "comments": row[6],
+    }
+
+
 @app.route("/api/reddit")
 def get_reddit_posts():
-    """Get Reddit posts from the redditpost table"""
+    """Get Reddit posts from the reddit_posts table, a keyset page at a time"""
+    page = page_from_request(REDDIT_SORTS, default_sort="recent")
     try:
         conn = get_db_connection()
         if not conn:
             return jsonify({"error": "Database connection failed"}), 500
 
-        cursor = conn.cursor()
-
-        # Get sort parameter from query string
-        sort_by = request.args.get('sort', 'recent')
-        
-        if sort_by == 'score':
-            order_clause = "ORDER BY score DESC"
-        elif sort_by == 'comments':
-            order_clause = "ORDER BY num_comments DESC"
-        else:
-            order_clause = "ORDER BY created_at DESC"
-
-        # Get Reddit posts from the reddit_posts table
-        cursor.execute(
+        # The connection goes back to the pool at teardown, after a streamed
+        # page has been sent
+        where, order = page.clauses()
+        rows = fetch_rows(
+            conn,
+            page,
+            prepared_name("reddit_posts", where + order),
             f"""
             SELECT id, post_id, title, author_username, subreddit, score, comments_count, 
-                   published_at, url, collected_at
+                   published_at, url, collected_at, {page.key_columns}
             FROM reddit_posts
-            WHERE published_at >= NOW() - INTERVAL '7 days'
-            {order_clause}
-            LIMIT 50
+            WHERE published_at >= NOW() - INTERVAL '7 days'{where}
+            {order}
         """
         )
 
-        posts = []
-        for row in cursor.fetchall():
-            # Clean the title
-            clean_title = clean_post_title(row[2])
-            
-            if clean_title:
-                posts.append(
-                    {
-                        "id": row[0],
-                        "post_id": row[1],
-                        "title": clean_title,
-                        "content": f"Reddit post from r/{row[4]}",
-                        "author": row[3] or "Anonymous",
-                        "subreddit": row[4],
-                        "engagement_score": row[5] + row[6],  # score + comments
-                        "virality_score": row[5] + row[6] * 2,  # score + comments*2
-                        "sentiment_score": 0,  # Could be calculated later
-                        "published_at": row[7].isoformat() if row[7] else None,
-                        "scraped_at": row[9].isoformat() if row[9] else None,
-                        "url": row[8],
-                        "score": row[5],
-                        "num_comments": row[6],
-                        "upvotes": row[5],  # Reddit uses upvotes
-                        "comments": row[6],
-                    }
-                )
-
-        cursor.close()
-        conn.close()
-
-        # Return the posts found
-        logger.info(f"Found {len(posts)} Reddit posts")
-        return jsonify(posts)
+        if not page.stream:
+            logger.info(f"Found {len(rows)} Reddit posts")
+        return page_response(page, rows, reddit_post_from_row)
 
     except Exception as e:
         logger.error(f"Error getting Reddit posts: {e}")
         return jsonify({"error": str(e)}), 500
 
 
+NEWS_SORTS = {
+    "engagement": SortKey("COALESCE(engagement_score, 0)"),
+    "published_at": SortKey("COALESCE(published_at, created_at)"),
+    "recent": SortKey("created_at"),
+}
+
+
+def news_post_from_row(row):
+    """Article item for /api/news-posts, or None if it has no text at all"""
+    # Extract engagement data from raw_data
+    engagement_data = extract_engagement_data(row[9])
+
+    # Clean the content and title
+    clean_title = clean_post_title(row[1])
+    clean_content = row[10] if row[10] is not None else clean_post_content(row[2])
+
+    # Use original content if cleaned content is empty
+    if not clean_content and row[2]:
+        clean_content = row[2][:200] + "..." if len(row[2]) > 200 else row[2]
+    
+    # Use original title if cleaned title is empty
+    if not clean_title and row[1]:
+        clean_title = row[1]
+    
+    # Extract published date and source from raw_data if database fields are empty
+    published_at = row[7]
+    author = row[3]
+    
+    if not published_at or not author:
+        extracted_published, extracted_source = extract_news_metadata(row[9])
+        if not published_at and extracted_published:
+            try:
+                # Try to parse the date string
+                if isinstance(extracted_published, str):
+                    # Handle different date formats
+                    for fmt in ["%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%d %H:%M:%S"]:
+                        try:
+                            published_at = datetime.strptime(extracted_published, fmt)
+                            break
+                        except:
+                            continue
+                else:
+                    published_at = extracted_published
+            except:
+                pass
+        
+        if not author and extracted_source:
+            author = extracted_source
+    
+    # Include posts with any content or title, be more permissive
+    if not (clean_content or clean_title or row[2] or row[1]):
+        return None
+
+    return {
+        "id": row[0],
+        "title": row[1] or "No title",
+        "content": clean_content or "Content available",
+        "author": author or "Anonymous",
+        "engagement_score": row[4] or 0,
+        "virality_score": row[5] or 0,
+        "sentiment_score": row[6] or 0,
+        "published_at": published_at.isoformat() if published_at else None,
+        "url": row[8] or "",
+        "upvotes": engagement_data.get("likes", 0),
+        "comments": engagement_data.get("replies", 0),
+        "score": engagement_data.get("score", 0),
+        "raw_data": row[9],
+    }
+
+
 @app.route("/api/news-posts")
 def get_news_posts():
-    """Get top news posts with engagement metrics"""
+    """Get top news posts with engagement metrics, a keyset page at a time"""
+    page = page_from_request(NEWS_SORTS, default_sort="engagement")
     try:
         conn = get_db_connection()
         if not conn:
             return jsonify({"error": "Database connection failed"}), 500
 
-        cursor = conn.cursor()
-
-        # Get sort parameter from query string
-        sort_by = request.args.get('sort', 'engagement')
-        
-        if sort_by == 'published_at':
-            order_clause = "ORDER BY ci.published_at DESC NULLS LAST"
-        elif sort_by == 'recent':
-            order_clause = "ORDER BY ci.created_at DESC NULLS LAST"
-        else:
-            order_clause = "ORDER BY ci.engagement_score DESC NULLS LAST, ci.published_at DESC"
-
-        # Get top news posts with sorting
-        cursor.execute(
+        where, order = page.clauses()
+        rows = fetch_rows(
+            conn,
+            page,
+            prepared_name("news_posts", where + order),
             f"""
             SELECT id, title, content, author, engagement_score,
-                   virality_score, sentiment_score, published_at, url, raw_data
+                   virality_score, sentiment_score, published_at, url, raw_data,
+                   clean_content, {page.key_columns}
             FROM articles
-            WHERE created_at >= NOW() - INTERVAL '30 days'
-            {order_clause}
-            LIMIT 50
+            WHERE created_at >= NOW() - INTERVAL '30 days'{where}
+            {order}
         """
         )
 
-        posts = []
-        for row in cursor.fetchall():
-            # Extract engagement data from raw_data
-            engagement_data = extract_engagement_data(row[9])
-
-            # Clean the content and title
-            clean_title = clean_post_title(row[1])
-            clean_content = clean_post_content(row[2])
-
-            # Use original content if cleaned content is empty
-            if not clean_content and row[2]:
-                clean_content = row[2][:200] + "..." if len(row[2]) > 200 else row[2]
-            
-            # Use original title if cleaned title is empty
-            if not clean_title and row[1]:
-                clean_title = row[1]
-            
-            # Extract published date and source from raw_data if database fields are empty
-            published_at = row[7]
-            author = row[3]
-            
-            if not published_at or not author:
-                extracted_published, extracted_source = extract_news_metadata(row[9])
-                if not published_at and extracted_published:
-                    try:
-                        # Try to parse the date string
-                        if isinstance(extracted_published, str):
-                            # Handle different date formats
-                            for fmt in ["%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M:%SZ", "%Y-%m-%d %H:%M:%S"]:
-                                try:
-                                    published_at = datetime.strptime(extracted_published, fmt)
-                                    break
-                                except:
-                                    continue
-                        else:
-                            published_at = extracted_published
-                    except:
-                        pass
-                
-                if not author and extracted_source:
-                    author = extracted_source
-            
-            # Include posts with any content or title, be more permissive
-            if clean_content or clean_title or row[2] or row[1]:
-                posts.append(
-                    {
-                        "id": row[0],
-                        "title": row[1] or "No title",
-                        "content": clean_content or "Content available",
-                        "author": author or "Anonymous",
-                        "engagement_score": row[4] or 0,
-                        "virality_score": row[5] or 0,
-                        "sentiment_score": row[6] or 0,
-                        "published_at": published_at.isoformat() if published_at else None,
-                        "url": row[8] or "",
-                        "upvotes": engagement_data.get("likes", 0),
-                        "comments": engagement_data.get("replies", 0),
-                        "score": engagement_data.get("score", 0),
-                        "raw_data": row[9],
-                    }
-                )
-
-        cursor.close()
-        conn.close()
-
-        # Return the posts found (no fallback needed since there's plenty of data)
-        logger.info(f"Found {len(posts)} news posts")
-        return jsonify(posts)
+        if not page.stream:
+            logger.info(f"Found {len(rows)} news posts")
+        return page_response(page, rows, news_post_from_row)
 
     except Exception as e:
         logger.error(f"Error getting news posts: {e}")
@@ -1545,6 +1248,7 @@ def get_news_posts():
 
 
 @app.route("/api/latest-digest")
+@cached_response(ttl=300)
 def get_latest_digest():
     """Get the most recent digest"""
     try:
@@ -1590,6 +1294,7 @@ def get_latest_digest():
 
 
 @app.route("/api/system-status")
+@cached_response(ttl=15)
 def get_system_status():
     """Get comprehensive system status for all crawlers and migrations using dedicated status table"""
     try:
@@ -1636,6 +1341,15 @@ def get_system_status():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/metrics")
+def get_metrics():
+    """Connection pool and response cache metrics for this worker process"""
+    return jsonify({
+        "db_pool": get_pool(DB_CONFIG).stats(),
+        "response_cache": response_cache.stats(),
+    })
+
+
 @app.route("/api/digests")
 def get_digests():
     """Get all digests"""
@@ -1676,58 +1390,63 @@ def get_digests():
         return jsonify({"error": str(e)}), 500
 
 
+CONTENT_SORTS = {
+    "engagement": SortKey("COALESCE(ci.engagement_score, 0)", ("ci.id",)),
+    "recent": SortKey("ci.published_at", ("ci.id",)),
+}
+
+
+def content_item_from_row(row):
+    """Item for /api/content/<source>"""
+    # Extract engagement data from raw_data
+    engagement_data = extract_engagement_data(row[9])
+
+    return {
+        "id": row[0],
+        "title": row[1] or "No title",
+        "content": row[2] or "",
+        "author": row[3] or "Anonymous",
+        "engagement_score": row[4] or 0,
+        "virality_score": row[5] or 0,
+        "sentiment_score": row[6] or 0,
+        "published_at": row[7].isoformat() if row[7] else None,
+        "url": row[8] or "",
+        "likes": engagement_data["likes"],
+        "replies": engagement_data["replies"],
+        "retweets": engagement_data["retweets"],
+        "views": engagement_data["views"],
+    }
+
+
 @app.route("/api/content/<source>")
 def get_content_by_source(source):
-    """Get content by source with engagement metrics"""
+    """Get content by source with engagement metrics, a keyset page at a time"""
+    page = page_from_request(CONTENT_SORTS, default_sort="engagement")
     try:
         conn = get_db_connection()
         if not conn:
             return jsonify({"error": "Database connection failed"}), 500
 
-        cursor = conn.cursor()
-
-        # Get content from specific source
-        cursor.execute(
-            """
+        # Get content from specific source; $1 is the source name
+        where, order = page.clauses(first_param=2)
+        rows = fetch_rows(
+            conn,
+            page,
+            prepared_name("content_by_source", where + order),
+            f"""
             SELECT ci.id, ci.title, ci.content, ci.author, ci.engagement_score,
-                   ci.virality_score, ci.sentiment_score, ci.published_at, ci.url, ci.raw_data
+                   ci.virality_score, ci.sentiment_score, ci.published_at, ci.url, ci.raw_data,
+                   {page.key_columns}
             FROM content_items ci
             JOIN data_sources ds ON ci.source_id = ds.id
-            WHERE ds.name = %s
-            AND ci.published_at >= NOW() - INTERVAL '7 days'
-            ORDER BY ci.engagement_score DESC NULLS LAST, ci.published_at DESC
-            LIMIT 50
+            WHERE ds.name = $1
+            AND ci.published_at >= NOW() - INTERVAL '7 days'{where}
+            {order}
         """,
             (source,),
         )
 
-        posts = []
-        for row in cursor.fetchall():
-            # Extract engagement data from raw_data
-            engagement_data = extract_engagement_data(row[9])
-
-            posts.append(
-                {
-                    "id": row[0],
-                    "title": row[1] or "No title",
-                    "content": row[2] or "",
-                    "author": row[3] or "Anonymous",
-                    "engagement_score": row[4] or 0,
-                    "virality_score": row[5] or 0,
-                    "sentiment_score": row[6] or 0,
-                    "published_at": row[7].isoformat() if row[7] else None,
-                    "url": row[8] or "",
-                    "likes": engagement_data["likes"],
-                    "replies": engagement_data["replies"],
-                    "retweets": engagement_data["retweets"],
-                    "views": engagement_data["views"],
-                }
-            )
-
-        cursor.close()
-        conn.close()
-
-        return jsonify(posts)
+        return page_response(page, rows, content_item_from_row)
 
     except Exception as e:
         logger.error(f"Error getting content for {source}: {e}")
@@ -1744,6 +1463,11 @@ def internal_error(error):
     return jsonify({"error": "Internal server error"}), 500
 
 
+@app.errorhandler(InvalidCursor)
+def invalid_cursor(error):
+    return jsonify({"error": str(error)}), 400
+
+
 def update_crawler_status_db(crawler_name, status, items_collected=0, error_message=None):
     """Update crawler status in the database"""
     try:
@@ -1863,6 +1587,8 @@ def update_crawler_status_endpoint():
         success = update_crawler_status_db(crawler_name, status, items_collected, error_message)
         
         if success:
+            # A crawler or migration finished: cached aggregates are out of date
+            response_cache.invalidate()
             return jsonify({"message": f"Updated {crawler_name} status to {status}"})
         else:
             return jsonify({"error": "Failed to update crawler status"}), 500
@@ -1891,6 +1617,8 @@ def refresh_crawler_status():
         conn.commit()
         cursor.close()
         conn.close()
+
+        response_cache.invalidate("/api/system-status")
         
         return jsonify({
             "message": "Crawler status refreshed successfully",
@@ -1902,219 +1630,195 @@ def refresh_crawler_status():
         return jsonify({"error": str(e)}), 500
 
 
+def dex_sorts(tiebreakers=("id",)):
+    """Sorts of the /api/dex lists; pairs without the sorted metric are left out"""
+    return {
+        "volume": SortKey("volume_24h", tiebreakers, skip_nulls=True),
+        "price_change": SortKey("price_change_24h", tiebreakers, skip_nulls=True),
+        "liquidity": SortKey("liquidity_usd", tiebreakers, skip_nulls=True),
+        "recent": SortKey("collected_at", tiebreakers),
+    }
+
+
+DEX_SORTS = dex_sorts()
+# ids of the two tables overlap, so the source breaks ties first
+COMBINED_DEX_SORTS = dex_sorts(("source", "id"))
+
+
+def dexscreener_pair_from_row(row):
+    """Pair item for /api/dex/dexscreener"""
+    return {
+        "id": row[0],
+        "pair_id": row[1],
+        "base_token_symbol": row[2] or "N/A",
+        "base_token_name": row[3] or "Unknown",
+        "base_token_address": row[4] or "",
+        "quote_token_symbol": row[5] or "N/A",
+        "quote_token_name": row[6] or "Unknown",
+        "quote_token_address": row[7] or "",
+        "dex": row[8] or "Unknown",
+        "chain": row[9] or "Unknown",
+        "price_usd": float(row[10]) if row[10] else 0,
+        "price_change_24h": float(row[11]) if row[11] else 0,
+        "volume_24h": float(row[12]) if row[12] else 0,
+        "liquidity_usd": float(row[13]) if row[13] else 0,
+        "fdv": float(row[14]) if row[14] else 0,
+        "txns_24h": int(row[15]) if row[15] else 0,
+        "buys_24h": int(row[16]) if row[16] else 0,
+        "sells_24h": int(row[17]) if row[17] else 0,
+        "collected_at": row[18].isoformat() if row[18] else None,
+        "pair_name": f"{row[2] or 'N/A'}/{row[5] or 'N/A'}",
+        "dex_url": f"https://dexscreener.com/{row[9] or 'unknown'}/{row[1]}"
+    }
+
+
 @app.route("/api/dex/dexscreener")
 def get_dexscreener_pairs():
-    """Get DexScreener pairs from dedicated dexscreener_pairs table"""
+    """Get DexScreener pairs from dedicated dexscreener_pairs table, a keyset page at a time"""
+    page = page_from_request(DEX_SORTS, default_sort="volume")
     try:
         conn = get_db_connection()
         if not conn:
             return jsonify({"error": "Database connection failed"}), 500
 
-        cursor = conn.cursor()
-
-        # Get sort parameter from query string
-        sort_by = request.args.get('sort', 'volume')
-        
-        if sort_by == 'price_change':
-            order_clause = "ORDER BY price_change_24h DESC"
-        elif sort_by == 'liquidity':
-            order_clause = "ORDER BY liquidity_usd DESC"
-        elif sort_by == 'recent':
-            order_clause = "ORDER BY collected_at DESC"
-        else:
-            order_clause = "ORDER BY volume_24h DESC"
-
         # Get DexScreener pairs from the dexscreener_pairs table
-        cursor.execute(
+        where, order = page.clauses()
+        rows = fetch_rows(
+            conn,
+            page,
+            prepared_name("dexscreener_pairs", where + order),
             f"""
             SELECT id, pair_id, base_token_symbol, base_token_name, base_token_address,
                    quote_token_symbol, quote_token_name, quote_token_address,
                    dex_id, chain_id, price_usd, price_change_24h, volume_24h, 
-                   liquidity_usd, fdv, txns_24h, buys_24h, sells_24h, collected_at
+                   liquidity_usd, fdv, txns_24h, buys_24h, sells_24h, collected_at,
+                   {page.key_columns}
             FROM dexscreener_pairs
             WHERE collected_at >= NOW() - INTERVAL '24 hours'
-            AND price_usd > 0
-            {order_clause}
-            LIMIT 50
+            AND price_usd > 0{where}
+            {order}
         """
         )
 
-        pairs = []
-        for row in cursor.fetchall():
-            pairs.append({
-                "id": row[0],
-                "pair_id": row[1],
-                "base_token_symbol": row[2] or "N/A",
-                "base_token_name": row[3] or "Unknown",
-                "base_token_address": row[4] or "",
-                "quote_token_symbol": row[5] or "N/A",
-                "quote_token_name": row[6] or "Unknown",
-                "quote_token_address": row[7] or "",
-                "dex": row[8] or "Unknown",
-                "chain": row[9] or "Unknown",
-                "price_usd": float(row[10]) if row[10] else 0,
-                "price_change_24h": float(row[11]) if row[11] else 0,
-                "volume_24h": float(row[12]) if row[12] else 0,
-                "liquidity_usd": float(row[13]) if row[13] else 0,
-                "fdv": float(row[14]) if row[14] else 0,
-                "txns_24h": int(row[15]) if row[15] else 0,
-                "buys_24h": int(row[16]) if row[16] else 0,
-                "sells_24h": int(row[17]) if row[17] else 0,
-                "collected_at": row[18].isoformat() if row[18] else None,
-                "pair_name": f"{row[2] or 'N/A'}/{row[5] or 'N/A'}",
-                "dex_url": f"https://dexscreener.com/{row[9] or 'unknown'}/{row[1]}"
-            })
-
-        cursor.close()
-        conn.close()
-
-        logger.info(f"Found {len(pairs)} DexScreener pairs")
-        return jsonify(pairs)
+        if not page.stream:
+            logger.info(f"Found {len(rows)} DexScreener pairs")
+        return page_response(page, rows, dexscreener_pair_from_row)
 
     except Exception as e:
         logger.error(f"Error getting DexScreener pairs: {e}")
         return jsonify({"error": str(e)}), 500
 
 
+def dexpaprika_token_from_row(row):
+    """Token item for /api/dex/dexpaprika"""
+    return {
+        "id": row[0],
+        "token_id": row[1],
+        "symbol": row[2] or "N/A",
+        "name": row[3] or "Unknown",
+        "address": row[4] or "",
+        "dex": row[5] or "DexPaprika",
+        "chain": row[6] or "Unknown",
+        "price_usd": float(row[7]) if row[7] else 0,
+        "price_change_24h": float(row[8]) if row[8] else 0,
+        "volume_24h": float(row[9]) if row[9] else 0,
+        "liquidity_usd": float(row[10]) if row[10] else 0,
+        "txns_24h": int(row[11]) if row[11] else 0,
+        "market_cap": float(row[12]) if row[12] else 0,
+        "collected_at": row[13].isoformat() if row[13] else None,
+        "token_url": f"https://dexpaprika.com/token/{row[4]}" if row[4] else ""
+    }
+
+
 @app.route("/api/dex/dexpaprika")
 def get_dexpaprika_tokens():
-    """Get DexPaprika tokens from dedicated dexpaprika_pairs table"""
+    """Get DexPaprika tokens from dedicated dexpaprika_pairs table, a keyset page at a time"""
+    page = page_from_request(DEX_SORTS, default_sort="volume")
     try:
         conn = get_db_connection()
         if not conn:
             return jsonify({"error": "Database connection failed"}), 500
 
-        cursor = conn.cursor()
-
-        # Get sort parameter from query string
-        sort_by = request.args.get('sort', 'volume')
-        
-        if sort_by == 'price_change':
-            order_clause = "ORDER BY price_change_24h DESC"
-        elif sort_by == 'liquidity':
-            order_clause = "ORDER BY liquidity_usd DESC"
-        elif sort_by == 'recent':
-            order_clause = "ORDER BY collected_at DESC"
-        else:
-            order_clause = "ORDER BY volume_24h DESC"
-
         # Get DexPaprika tokens from the dexpaprika_pairs table
-        cursor.execute(
+        where, order = page.clauses()
+        rows = fetch_rows(
+            conn,
+            page,
+            prepared_name("dexpaprika_pairs", where + order),
             f"""
             SELECT id, pair_id, base_token_symbol, base_token_name, base_token_address,
                    dex_id, chain_id, price_usd, price_change_24h, volume_24h, 
-                   liquidity_usd, txns_24h, market_cap, collected_at
+                   liquidity_usd, txns_24h, market_cap, collected_at,
+                   {page.key_columns}
             FROM dexpaprika_pairs
             WHERE collected_at >= NOW() - INTERVAL '24 hours'
-            AND price_usd > 0
-            {order_clause}
-            LIMIT 50
+            AND price_usd > 0{where}
+            {order}
         """
         )
 
-        tokens = []
-        for row in cursor.fetchall():
-            tokens.append({
-                "id": row[0],
-                "token_id": row[1],
-                "symbol": row[2] or "N/A",
-                "name": row[3] or "Unknown",
-                "address": row[4] or "",
-                "dex": row[5] or "DexPaprika",
-                "chain": row[6] or "Unknown",
-                "price_usd": float(row[7]) if row[7] else 0,
-                "price_change_24h": float(row[8]) if row[8] else 0,
-                "volume_24h": float(row[9]) if row[9] else 0,
-                "liquidity_usd": float(row[10]) if row[10] else 0,
-                "txns_24h": int(row[11]) if row[11] else 0,
-                "market_cap": float(row[12]) if row[12] else 0,
-                "collected_at": row[13].isoformat() if row[13] else None,
-                "token_url": f"https://dexpaprika.com/token/{row[4]}" if row[4] else ""
-            })
-
-        cursor.close()
-        conn.close()
-
-        logger.info(f"Found {len(tokens)} DexPaprika tokens")
-        return jsonify(tokens)
+        if not page.stream:
+            logger.info(f"Found {len(rows)} DexPaprika tokens")
+        return page_response(page, rows, dexpaprika_token_from_row)
 
     except Exception as e:
         logger.error(f"Error getting DexPaprika tokens: {e}")
         return jsonify({"error": str(e)}), 500
 
 
+def combined_dex_item_from_row(row):
+    """Item for /api/dex/combined"""
+    return {
+        "source": row[0],
+        "id": row[1],
+        "token_id": row[2],
+        "symbol": row[3] or "N/A",
+        "name": row[4] or "Unknown",
+        "address": row[5] or "",
+        "dex": row[6] or "Unknown",
+        "chain": row[7] or "Unknown",
+        "price_usd": float(row[8]) if row[8] else 0,
+        "price_change_24h": float(row[9]) if row[9] else 0,
+        "volume_24h": float(row[10]) if row[10] else 0,
+        "liquidity_usd": float(row[11]) if row[11] else 0,
+        "market_cap": float(row[12]) if row[12] else 0,
+        "txns_24h": int(row[13]) if row[13] else 0,
+        "collected_at": row[14].isoformat() if row[14] else None
+    }
+
+
 @app.route("/api/dex/combined")
+@cached_response(ttl=60)
 def get_combined_dex_data():
-    """Get combined DEX data from both DexScreener and DexPaprika"""
+    """Get combined DEX data from both DexScreener and DexPaprika, a keyset page at a time"""
+    page = page_from_request(COMBINED_DEX_SORTS, default_sort="volume", default_limit=100)
     try:
         conn = get_db_connection()
         if not conn:
             return jsonify({"error": "Database connection failed"}), 500
 
-        cursor = conn.cursor()
-
-        # Get sort parameter from query string
-        sort_by = request.args.get('sort', 'volume')
-        
-        if sort_by == 'price_change':
-            order_clause = "ORDER BY price_change_24h DESC"
-        elif sort_by == 'liquidity':
-            order_clause = "ORDER BY liquidity_usd DESC"
-        elif sort_by == 'recent':
-            order_clause = "ORDER BY collected_at DESC"
-        else:
-            order_clause = "ORDER BY volume_24h DESC"
-
-        # Get combined data from both tables
-        cursor.execute(
+        # One row per pair from both sources, kept current by the ingest
+        # triggers (create_dex_latest_tables.sql); each sort has its index
+        where, order = page.clauses()
+        rows = fetch_rows(
+            conn,
+            page,
+            prepared_name("dex_combined", where + order),
             f"""
-            (SELECT 
-                'dexscreener' as source,
-                id, pair_id as token_id, base_token_symbol as symbol, base_token_name as name,
-                base_token_address as address, dex_id as dex, chain_id as chain,
-                price_usd, price_change_24h, volume_24h, liquidity_usd, fdv as market_cap,
-                txns_24h, collected_at
-            FROM dexscreener_pairs
-            WHERE collected_at >= NOW() - INTERVAL '24 hours' AND price_usd > 0)
-            UNION ALL
-            (SELECT 
-                'dexpaprika' as source,
-                id, pair_id as token_id, base_token_symbol as symbol, base_token_name as name,
-                base_token_address as address, dex_id as dex, chain_id as chain,
-                price_usd, price_change_24h, volume_24h, liquidity_usd, market_cap,
-                txns_24h, collected_at
-            FROM dexpaprika_pairs
-            WHERE collected_at >= NOW() - INTERVAL '24 hours' AND price_usd > 0)
-            {order_clause}
-            LIMIT 100
+            SELECT source, id, pair_id, base_token_symbol, base_token_name,
+                   base_token_address, dex_id, chain_id, price_usd, price_change_24h,
+                   volume_24h, liquidity_usd, market_cap, txns_24h, collected_at,
+                   {page.key_columns}
+            FROM dex_pairs_latest
+            WHERE collected_at >= NOW() - INTERVAL '24 hours'
+            AND price_usd > 0{where}
+            {order}
         """
         )
 
-        combined_data = []
-        for row in cursor.fetchall():
-            combined_data.append({
-                "source": row[0],
-                "id": row[1],
-                "token_id": row[2],
-                "symbol": row[3] or "N/A",
-                "name": row[4] or "Unknown",
-                "address": row[5] or "",
-                "dex": row[6] or "Unknown",
-                "chain": row[7] or "Unknown",
-                "price_usd": float(row[8]) if row[8] else 0,
-                "price_change_24h": float(row[9]) if row[9] else 0,
-                "volume_24h": float(row[10]) if row[10] else 0,
-                "liquidity_usd": float(row[11]) if row[11] else 0,
-                "market_cap": float(row[12]) if row[12] else 0,
-                "txns_24h": int(row[13]) if row[13] else 0,
-                "collected_at": row[14].isoformat() if row[14] else None
-            })
-
-        cursor.close()
-        conn.close()
-
-        logger.info(f"Found {len(combined_data)} combined DEX entries")
-        return jsonify(combined_data)
+        if not page.stream:
+            logger.info(f"Found {len(rows)} combined DEX entries")
+        return page_response(page, rows, combined_dex_item_from_row)
 
     except Exception as e:
         logger.error(f"Error getting combined DEX data: {e}")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Dashboard statistics in a single database round trip.
+
+``/api/stats`` used to run one ``COUNT(*)`` per source table plus a separate
+engagement query that scanned the social tables a second time. Each source is
+now declared once in ``STATS_SOURCES`` and all of them are folded into one
+``UNION ALL`` statement that computes the count and the engagement sum in the
+same pass over each table. Adding a source is one entry here, not another
+query per request.
+
+With the covering indexes from ``create_stats_indexes.sql`` every branch is an
+index-only range scan over the last 24 hours, so the cost tracks recent rows
+rather than table size.
+"""
+
+from decimal import Decimal
+from typing import Any, NamedTuple
+
+
+class StatsSource(NamedTuple):
+    key: str  # key in the /api/stats response
+    table: str
+    time_column: str  # rows newer than the window are counted
+    engagement: str | None = None  # per-row engagement expression
+
+
+STATS_SOURCES: list[StatsSource] = [
+    StatsSource("twitter_posts", "tweets", "collected_at", "likes_count + retweets_count + replies_count"),
+    StatsSource("reddit_posts", "reddit_posts", "collected_at", "score + comments_count"),
+    StatsSource("news_articles", "articles", "created_at", "engagement_score"),
+    StatsSource("crypto_tokens", "crypto_tokens", "last_updated_at"),
+    StatsSource("dexscreener_pairs", "dexscreener_pairs", "collected_at"),
+    StatsSource("dexpaprika_tokens", "dexpaprika_pairs", "collected_at"),
+]
+
+STATS_WINDOW = "24 hours"
+
+
+def build_stats_query(sources: list[StatsSource] = STATS_SOURCES, window: str = STATS_WINDOW) -> str:
+    """One statement returning ``(key, count, engagement)`` per source"""
+    branches = []
+    for source in sources:
+        engagement = f"COALESCE(SUM({source.engagement}), 0)" if source.engagement else "0"
+        branches.append(
+            f"SELECT '{source.key}'::text AS source, COUNT(*) AS items, {engagement}::numeric AS engagement "
+            f"FROM {source.table} WHERE {source.time_column} >= NOW() - INTERVAL '{window}'"
+        )
+    return "\nUNION ALL\n".join(branches)
+
+
+STATS_QUERY = build_stats_query()
+
+
+def rows_to_stats(rows, sources: list[StatsSource] = STATS_SOURCES) -> dict[str, Any]:
+    """Shape ``(key, count, engagement)`` rows like the /api/stats response"""
+    by_key = {key: (count, engagement) for key, count, engagement in rows}
+    stats: dict[str, Any] = {}
+    total_engagement = Decimal(0)
+    for source in sources:
+        count, engagement = by_key.get(source.key, (0, 0))
+        stats[source.key] = count
+        total_engagement += engagement or 0
+    stats["total_engagement"] = total_engagement
+    return stats
+
+
+def fetch_stats(conn, cursor) -> dict[str, Any]:
+    """Run the stats query on *cursor* (prepared when *conn* is pooled)"""
+    if hasattr(conn, "execute_prepared"):
+        conn.execute_prepared(cursor, "dashboard_stats", STATS_QUERY)
+    else:
+        cursor.execute(STATS_QUERY)
+    return rows_to_stats(cursor.fetchall())
@@ -8,7 +8,7 @@ import sys
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from server import clean_post_content, clean_post_title
+from content_cleaning import clean_post_content, clean_post_title
 
 
 def test_content_cleaning():
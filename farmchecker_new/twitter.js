@@ -6,6 +6,9 @@ class TwitterPage {
       twitterPosts: [],
     };
     this.currentSort = 'engagement';
+    // Keyset cursor of the next page (X-Next-Cursor); null once all are loaded
+    this.nextCursor = null;
+    this.loadingMore = false;
     this.darkMode = localStorage.getItem('darkMode') === 'true';
     this.init();
   }
@@ -14,10 +17,22 @@ class TwitterPage {
     this.setupTheme();
     await this.loadData();
     this.setupEventListeners();
+    this.setupInfiniteScroll();
     this.updateUI();
 
-    // Auto-refresh every 5 minutes
-    setInterval(() => this.loadData(), 5 * 60 * 1000);
+    // Auto-refresh every 5 minutes, unless older pages have been scrolled in
+    setInterval(() => {
+      if (this.data.twitterPosts.length <= this.pageSize) this.refresh();
+    }, 5 * 60 * 1000);
+  }
+
+  get pageSize() {
+    return 50;
+  }
+
+  async refresh() {
+    await this.loadData();
+    this.updateUI();
   }
 
   setupTheme() {
@@ -48,16 +63,66 @@ class TwitterPage {
     }
   }
 
+  async fetchPage(cursor) {
+    let url = `${this.apiBase}/twitter?sort=${this.currentSort}&limit=${this.pageSize}`;
+    if (cursor) url += `&cursor=${encodeURIComponent(cursor)}`;
+    const response = await fetch(url);
+    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+    return {
+      posts: await response.json(),
+      nextCursor: response.headers.get("X-Next-Cursor"),
+    };
+  }
+
   async loadTwitterPosts() {
     try {
-      const response = await fetch(`${this.apiBase}/twitter?sort=${this.currentSort}`);
-      this.data.twitterPosts = await response.json();
+      const page = await this.fetchPage(null);
+      this.data.twitterPosts = page.posts;
+      this.nextCursor = page.nextCursor;
     } catch (error) {
       console.error("Error loading Twitter posts:", error);
       this.data.twitterPosts = [];
+      this.nextCursor = null;
     }
   }
 
+  async loadMorePosts() {
+    if (!this.nextCursor || this.loadingMore) return;
+    this.loadingMore = true;
+    const sort = this.currentSort;
+    try {
+      const page = await this.fetchPage(this.nextCursor);
+      // The sort changed while this page was loading
+      if (sort !== this.currentSort) return;
+      this.nextCursor = page.nextCursor;
+      this.data.twitterPosts.push(...page.posts);
+      const container = document.getElementById("twitter-posts");
+      if (container) {
+        container.insertAdjacentHTML("beforeend", page.posts.map((post) => this.renderPost(post)).join(""));
+      }
+    } catch (error) {
+      console.error("Error loading more Twitter posts:", error);
+    } finally {
+      this.loadingMore = false;
+    }
+  }
+
+  setupInfiniteScroll() {
+    const container = document.getElementById("twitter-posts");
+    if (!container || !("IntersectionObserver" in window)) return;
+
+    // Load the next page when the end of the list comes within 600px
+    const sentinel = document.createElement("div");
+    sentinel.className = "scroll-sentinel";
+    container.after(sentinel);
+    new IntersectionObserver(
+      (entries) => {
+        if (entries.some((entry) => entry.isIntersecting)) this.loadMorePosts();
+      },
+      { rootMargin: "600px" },
+    ).observe(sentinel);
+  }
+
   setupEventListeners() {
     // Dark mode toggle
     const darkModeToggle = document.getElementById("dark-mode-toggle");
@@ -79,7 +144,7 @@ class TwitterPage {
     if (twitterFilter) {
       twitterFilter.addEventListener("change", (e) => {
         this.currentSort = e.target.value;
-        this.loadData();
+        this.refresh();
       });
     }
   }
@@ -97,9 +162,11 @@ class TwitterPage {
       return;
     }
 
-    container.innerHTML = this.data.twitterPosts
-      .map(
-        (post) => `
+    container.innerHTML = this.data.twitterPosts.map((post) => this.renderPost(post)).join("");
+  }
+
+  renderPost(post) {
+    return `
             <div class="post-card twitter-post">
                 <div class="post-header">
                     <div class="post-author-info">
@@ -162,9 +229,7 @@ class TwitterPage {
                     ` : ''}
                 </div>
             </div>
-        `,
-      )
-      .join("");
+        `;
   }
 
   cleanTwitterTitle(title) {
@@ -260,5 +325,4 @@ class TwitterPage {
 // Initialize the Twitter page
 document.addEventListener("DOMContentLoaded", () => {
   new TwitterPage();
-}); 
 }); 
\ No newline at end of file
@@ -3,7 +3,7 @@ from datetime import date
 from pathlib import Path
 
 import main as _digest
-from processor.scorer import degen_score
+from processor.scorer import degen_score_batch
 from utils.advanced_logging import get_logger
 from utils.pdf import md_to_pdf
 
@@ -47,10 +47,8 @@ def build_review_md() -> str:
     top_viral = processed[:15]  # Increased from 10 to 15
 
     upcoming: list[tuple[int, dict]] = []
-    for it in all_items:
-        if not isinstance(it, dict):
-            continue
-        score = degen_score(it)
+    dict_items = [it for it in all_items if isinstance(it, dict)]
+    for score, it in zip(degen_score_batch(dict_items), dict_items, strict=True):
         likes = it.get("likeCount", 0)
         if score > 70 and likes < 50:  # Adjusted criteria
             upcoming.append((score, it))
@@ -61,18 +59,13 @@ def build_review_md() -> str:
     try:
         import processor.buzz as _buzz
 
-        recent, prev = _buzz._load_two_latest()  # type: ignore (private ok)
-        ratios = []
-        for term, cnt in recent.items():
-            prev_cnt = prev.get(term, 0)
-            if cnt < 3:
-                continue  # ignore tiny counts
-            ratio = cnt / (prev_cnt or 0.1)
-            if ratio < 1.3:  # Lowered threshold
-                continue
-            ratios.append((ratio, term, cnt, prev_cnt))
-        ratios.sort(reverse=True)
-        top_terms = ratios[:15]  # Increased from 10 to 15
+        # Lowered ratio threshold; top 15 instead of 10
+        top_terms = [
+            (ratio, term, cnt, prev_cnt)
+            for term, cnt, prev_cnt, ratio in _buzz.get_store().top_accelerating(
+                limit=15, min_count=3, min_ratio=1.3
+            )
+        ]
     except Exception as exc:
         logger.warning("Buzz acceleration unavailable: %s", exc)
         top_terms = []
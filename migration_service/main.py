@@ -6,11 +6,14 @@ import json
 import logging
 import os
 from datetime import datetime
+from itertools import islice
 
 import psycopg2
 from flask import Flask, jsonify, request
 from google.cloud import storage
-from psycopg2.extras import RealDictCursor
+from migration_state import MigrationState, local_bucket_from_env
+from ndjson import iter_fields
+from psycopg2.extras import RealDictCursor, execute_values
 
 # Configure logging
 logging.basicConfig(
@@ -29,6 +32,8 @@ DB_USER = os.getenv("DB_USER", "postgres")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "DegenDigest2024!")
 GCS_BUCKET = os.getenv("BUCKET_NAME", "degen-digest-data")
 PROJECT_ID = os.getenv("PROJECT_ID", "lucky-union-463615-t3")
+# Rows per INSERT statement when loading a file
+BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", "1000"))
 
 # Source mapping for data keys
 DATA_KEYS = {
@@ -73,6 +78,35 @@ def extract_items_from_data(data, source_name):
     return items
 
 
+def iter_items_from_blob(blob, source_name):
+    """Stream the items ``extract_items_from_data`` would return for *blob*
+
+    The file is parsed incrementally (see ndjson.py), so only one item is in
+    memory at a time however large the consolidated file is.
+    """
+    if source_name == "dexscreener":
+        keys = [
+            "latest_token_profiles",
+            "latest_boosted_tokens",
+            "top_boosted_tokens",
+            "token_pairs",
+        ]
+    else:
+        keys = [DATA_KEYS.get(source_name, "data")]
+    found = False
+    for _, item in iter_fields(blob.open("rb"), keys):
+        found = True
+        yield item
+    if (
+        not found
+        and keys != ["data"]
+        and source_name not in ("crypto", "dexpaprika", "dexscreener")
+    ):
+        # Same fallback as extract_items_from_data: a generic "data" list
+        for _, item in iter_fields(blob.open("rb"), ["data"]):
+            yield item
+
+
 def test_database_connection():
     """Test database connection"""
     try:
@@ -106,8 +140,55 @@ def test_gcs_connection():
         return False
 
 
-def migrate_data():
-    """Migrate data from GCS to Cloud SQL"""
+def content_item_row(item, collection_id, source_id):
+    """content_items column values for one scraped item"""
+    external_id = safe_string(
+        item.get("id")
+        or item.get("external_id")
+        or item.get("address")
+        or item.get("pair_id")
+    )
+    title = safe_string(
+        item.get("title")
+        or item.get("name")
+        or item.get("symbol")
+        or str(item.get("price_change", ""))[:500]
+    )
+    content = safe_string(
+        item.get("content")
+        or item.get("summary")
+        or item.get("description")
+        or str(item)
+    )
+    author = safe_string(
+        item.get("author") or item.get("username") or item.get("creator")
+    )
+    url = safe_string(item.get("url") or item.get("link") or item.get("website"))
+    published_at = (
+        item.get("published_at")
+        or item.get("created_at")
+        or item.get("published")
+        or item.get("timestamp")
+    )
+    return (
+        collection_id,
+        source_id,
+        external_id,
+        title,
+        content,
+        author,
+        url,
+        published_at,
+        json.dumps(item),
+    )
+
+
+def migrate_data(bucket=None, full=False, batch_size=BATCH_SIZE):
+    """Migrate new or changed consolidated files from GCS to Cloud SQL
+
+    Files already loaded at their current generation/etag are skipped (see
+    migration_state.py); pass ``full=True`` to reload everything.
+    """
     try:
         logger.info("🚀 Starting data migration...")
 
@@ -120,27 +201,34 @@ def migrate_data():
             password=DB_PASSWORD,
         )
 
-        # Connect to GCS
-        storage_client = storage.Client(project=PROJECT_ID)
-        bucket = storage_client.bucket(GCS_BUCKET)
-
-        # Get consolidated files
-        blobs = list(bucket.list_blobs(prefix="consolidated/"))
-        logger.info(f"📁 Found {len(blobs)} consolidated files")
+        # Connect to GCS (or a local directory standing in for it)
+        if bucket is None:
+            bucket = local_bucket_from_env()
+        if bucket is None:
+            storage_client = storage.Client(project=PROJECT_ID)
+            bucket = storage_client.bucket(GCS_BUCKET)
+
+        state = MigrationState(conn, "consolidated/")
+        if full:
+            state.reset()
+
+        # Listing is cheap; only new or changed files are downloaded
+        blobs = [
+            b for b in bucket.list_blobs(prefix="consolidated/") if b.name.endswith(".json")
+        ]
+        pending = state.pending(blobs)
+        logger.info(
+            f"📁 Found {len(blobs)} consolidated files, {len(pending)} new or changed"
+        )
 
         total_imported = 0
         source_stats = {}
 
-        for blob in blobs:
-            if not blob.name.endswith(".json"):
-                continue
-
+        for blob in pending:
             source_name = blob.name.split("/")[-1].replace("_consolidated.json", "")
             logger.info(f"📊 Processing {source_name}...")
 
             try:
-                data = json.loads(blob.download_as_text())
-
                 # Get source_id
                 with conn.cursor() as cursor:
                     cursor.execute(
@@ -152,12 +240,18 @@ def migrate_data():
                         continue
                     source_id = result[0]
 
-                    # Extract items
-                    items = extract_items_from_data(data, source_name)
-                    logger.info(f"   Found {len(items)} items")
-
-                    if not items:
+                    # Items are streamed from the file and inserted one batch
+                    # at a time; the collection row gets its count at the end
+                    items = (
+                        item
+                        for item in iter_items_from_blob(blob, source_name)
+                        if isinstance(item, dict)
+                    )
+                    batch = list(islice(items, batch_size))
+                    if not batch:
                         logger.warning(f"   No items found for {source_name}")
+                        state.mark(cursor, blob, 0)
+                        conn.commit()
                         continue
 
                     # Insert collection
@@ -167,80 +261,44 @@ def migrate_data():
                         VALUES (%s, %s, %s, %s, %s)
                         RETURNING id
                     """,
-                        (source_id, datetime.now(), blob.name, len(items), blob.size),
+                        (source_id, datetime.now(), blob.name, 0, blob.size),
                     )
                     collection_id = cursor.fetchone()[0]
 
-                    # Insert content items
+                    # Insert content items in batches
                     imported_count = 0
-                    for item in items:
-                        try:
-                            external_id = safe_string(
-                                item.get("id")
-                                or item.get("external_id")
-                                or item.get("address")
-                                or item.get("pair_id")
-                            )
-                            title = safe_string(
-                                item.get("title")
-                                or item.get("name")
-                                or item.get("symbol")
-                                or str(item.get("price_change", ""))[:500]
-                            )
-                            content = safe_string(
-                                item.get("content")
-                                or item.get("summary")
-                                or item.get("description")
-                                or str(item)
-                            )
-                            author = safe_string(
-                                item.get("author")
-                                or item.get("username")
-                                or item.get("creator")
-                            )
-                            url = safe_string(
-                                item.get("url")
-                                or item.get("link")
-                                or item.get("website")
-                            )
-                            published_at = (
-                                item.get("published_at")
-                                or item.get("created_at")
-                                or item.get("published")
-                                or item.get("timestamp")
-                            )
-
-                            cursor.execute(
-                                """
-                                INSERT INTO content_items (collection_id, source_id, external_id, title, content, author, url, published_at, raw_data)
-                                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                                ON CONFLICT DO NOTHING
-                            """,
-                                (
-                                    collection_id,
-                                    source_id,
-                                    external_id,
-                                    title,
-                                    content,
-                                    author,
-                                    url,
-                                    published_at,
-                                    json.dumps(item),
-                                ),
-                            )
-                            imported_count += 1
-                        except Exception as e:
-                            logger.error(f"   Error inserting item: {e}")
-                            continue
-
-                    source_stats[source_name] = imported_count
-                    total_imported += imported_count
-                    logger.info(f"   ✅ Imported {imported_count} items")
+                    while batch:
+                        execute_values(
+                            cursor,
+                            """
+                            INSERT INTO content_items (collection_id, source_id, external_id, title, content, author, url, published_at, raw_data)
+                            VALUES %s
+                            ON CONFLICT DO NOTHING
+                        """,
+                            [
+                                content_item_row(item, collection_id, source_id)
+                                for item in batch
+                            ],
+                            page_size=batch_size,
+                        )
+                        imported_count += len(batch)
+                        batch = list(islice(items, batch_size))
+
+                    cursor.execute(
+                        "UPDATE data_collections SET record_count = %s WHERE id = %s",
+                        (imported_count, collection_id),
+                    )
+                    state.mark(cursor, blob, imported_count)
 
+                # Commit after each file so its checkpoint matches its rows
                 conn.commit()
+                source_stats[source_name] = imported_count
+                total_imported += imported_count
+                logger.info(f"   ✅ Imported {imported_count} items")
 
             except Exception as e:
                 logger.error(f"   ❌ Error processing {source_name}: {e}")
+                conn.rollback()
                 continue
 
         conn.close()
@@ -306,8 +364,9 @@ def migrate_endpoint():
     try:
         logger.info("Received migration request")
 
-        # Run migration
-        total_imported, source_stats = migrate_data()
+        # Run migration; ?full=1 ignores checkpoints and reloads every file
+        full = request.args.get("full", "").lower() in ("1", "true", "yes")
+        total_imported, source_stats = migrate_data(full=full)
 
         return (
             jsonify(
@@ -25,6 +25,8 @@ except ImportError:
     GCS_AVAILABLE = False
     print("Warning: Google Cloud Storage not available")
 
+from utils.seen_store import get_seen_store
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -36,11 +38,18 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def article_key(article: dict[str, Any]) -> str:
+    """Seen-store key of an article: its URL, else its title."""
+    return article["url"] or article["title"]
+
+
 class NewsCrawler:
     def __init__(self):
         self.cloud_only = True
         self.gcs_bucket = "degen-digest-data"
         self.project_id = "lucky-union-463615-t3"
+        # Articles already uploaded by earlier crawls (see utils.seen_store)
+        self.seen = get_seen_store()
         self.newsapi_key = os.environ.get("NEWSAPI_KEY")
 
     def get_gcs_client(self):
@@ -214,8 +223,19 @@ class NewsCrawler:
         # Crawl News
         news_data = await self.crawl_news()
 
+        # Only upload articles that earlier crawls have not
+        crawled = news_data["articles"]
+        news_data["articles"] = self.seen.unseen("news", crawled, key=article_key)
+        news_data["metadata"]["count"] = len(news_data["articles"])
+        news_data["metadata"]["seen_before"] = len(crawled) - len(news_data["articles"])
+        if crawled and not news_data["articles"]:
+            self.seen.mark("news", map(article_key, crawled))
+            logger.info(f"No new articles ({len(crawled)} seen before), skipping upload")
+            return news_data
+
         # Upload to GCS
         if self.upload_to_gcs(news_data):
+            self.seen.mark("news", map(article_key, crawled))
             logger.info("✅ News crawl session completed successfully")
         else:
             logger.error("❌ Failed to upload News data")
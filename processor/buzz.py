@@ -1,9 +1,26 @@
+"""Rolling, time-bucketed buzz counts for tickers and hashtags.
+
+Term counts are kept per time bucket (hourly by default) in an in-memory ring
+of the most recent ``retention_buckets`` buckets, persisted to SQLite with one
+row per term. Old buckets expire automatically. Acceleration and EWMA can
+be computed over any window without re-reading snapshot files::
+
+    from processor import buzz
+    buzz.make_snapshot(items)       # record the terms in *items*
+    buzz.get_accel("$PEPE")         # latest bucket vs the one before
+    buzz.get_store().ewma("pepe")   # smoothed per-bucket rate
+"""
+
 from __future__ import annotations
 
 import json
 import re
+import sqlite3
+import threading
 import time
 from collections import Counter
+from collections.abc import Iterable
+from datetime import UTC, datetime
 from pathlib import Path
 
 from utils.advanced_logging import get_logger
@@ -12,6 +29,13 @@ logger = get_logger(__name__)
 
 SNAP_DIR = Path("output/buzz")
 SNAP_DIR.mkdir(parents=True, exist_ok=True)
+DB_PATH = SNAP_DIR / "buzz.sqlite"
+
+BUCKET_SECONDS = 3600
+RETENTION_BUCKETS = 24 * 7
+# How long a reader trusts its in-memory view before re-reading SQLite, so
+# long-running processes see buckets written by other processes.
+REFRESH_SECONDS = 60
 
 ticker_re = re.compile(r"\$(\w{2,10})")
 hashtag_re = re.compile(r"#(\w{2,20})")
@@ -21,41 +45,233 @@ def _extract_terms(text: str):
     return ticker_re.findall(text) + hashtag_re.findall(text)
 
 
-def make_snapshot(items: list[dict]):
-    """Write a snapshot ``buzz_YYYYMMDD_HH.json`` with term counts."""
+def _norm(term: str) -> str:
+    """Canonical key for a term: ``$PEPE``, ``#pepe`` and ``pepe`` are equal."""
+    return term.lstrip("$#").lower()
+
+
+def count_terms(items: Iterable[dict]) -> Counter[str]:
     counter: Counter[str] = Counter()
     for it in items:
         txt = (it.get("full_text") or it.get("text") or it.get("summary") or "").lower()
-        counter.update(t.lower() for t in _extract_terms(txt))
-    ts = time.gmtime()
-    fname = SNAP_DIR / time.strftime("buzz_%Y%m%d_%H.json", ts)
-    with fname.open("w") as f:
-        json.dump(counter, f)
-    logger.info("buzz snapshot saved", path=str(fname), unique=len(counter))
+        counter.update(_norm(t) for t in _extract_terms(txt))
+    return counter
+
+
+class BuzzStore:
+    """Per-bucket term counts with O(1) updates and windowed queries."""
+
+    def __init__(
+        self,
+        path: Path | str = DB_PATH,
+        bucket_seconds: int = BUCKET_SECONDS,
+        retention_buckets: int = RETENTION_BUCKETS,
+    ):
+        self.path = Path(path)
+        self.bucket_seconds = bucket_seconds
+        self.retention_buckets = retention_buckets
+        self._lock = threading.Lock()
+        self._buckets: dict[int, Counter[str]] = {}
+        self._loaded_at = 0.0
+
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS buzz_counts (
+                resolution INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                term TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (resolution, bucket, term)
+            ) WITHOUT ROWID"""
+        )
+        self._conn.commit()
+        self.refresh()
+
+    # -- bucketing ---------------------------------------------------------
+    def bucket_of(self, ts: float | None = None) -> int:
+        return int((time.time() if ts is None else ts) // self.bucket_seconds)
+
+    def latest_bucket(self) -> int | None:
+        with self._lock:
+            return max(self._buckets) if self._buckets else None
+
+    # -- writes ------------------------------------------------------------
+    def record(self, counts: dict[str, int], ts: float | None = None) -> None:
+        """Set the bucket containing *ts* (default: now) to *counts*.
+
+        Each call replaces what the bucket held, like the hourly JSON snapshot
+        it stands in for, so recording the same corpus twice in one hour does
+        not double its counts.
+        """
+        bucket = self.bucket_of(ts)
+        totals: Counter[str] = Counter()
+        for t, c in counts.items():
+            if c:
+                totals[_norm(t)] += int(c)
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM buzz_counts WHERE resolution = ? AND bucket = ?",
+                (self.bucket_seconds, bucket),
+            )
+            self._conn.executemany(
+                """INSERT INTO buzz_counts(resolution, bucket, term, count)
+                   VALUES (?, ?, ?, ?)""",
+                [(self.bucket_seconds, bucket, t, c) for t, c in totals.items()],
+            )
+            self._conn.commit()
+            if totals:
+                self._buckets[bucket] = totals
+            else:
+                self._buckets.pop(bucket, None)
+        self.expire()
 
+    def record_items(self, items: Iterable[dict], ts: float | None = None) -> int:
+        counter = count_terms(items)
+        self.record(counter, ts)
+        return len(counter)
 
-# ---------------------------------------------------------------------------
-# Acceleration helper
-# ---------------------------------------------------------------------------
-_recent_cache: dict[str, float] | None = None
-_prev_cache: dict[str, float] | None = None
+    def expire(self, now: float | None = None) -> int:
+        """Drop buckets older than the retention window; returns buckets dropped."""
+        cutoff = self.bucket_of(now) - self.retention_buckets
+        with self._lock:
+            stale = [b for b in self._buckets if b < cutoff]
+            for b in stale:
+                del self._buckets[b]
+            if stale:
+                self._conn.execute(
+                    "DELETE FROM buzz_counts WHERE resolution = ? AND bucket < ?",
+                    (self.bucket_seconds, cutoff),
+                )
+                self._conn.commit()
+        return len(stale)
 
+    def refresh(self) -> None:
+        """Reload the retained buckets from SQLite."""
+        cutoff = self.bucket_of() - self.retention_buckets
+        buckets: dict[int, Counter[str]] = {}
+        with self._lock:
+            rows = self._conn.execute(
+                """SELECT bucket, term, count FROM buzz_counts
+                   WHERE resolution = ? AND bucket >= ?""",
+                (self.bucket_seconds, cutoff),
+            )
+            for bucket, term, count in rows:
+                buckets.setdefault(bucket, Counter())[term] = count
+            self._buckets = buckets
+            self._loaded_at = time.monotonic()
 
-def _load_two_latest():
-    files = sorted(SNAP_DIR.glob("buzz_*.json"))[-2:]
-    if len(files) < 2:
-        return {}, {}
-    with files[-1].open() as f1, files[-2].open() as f2:
-        recent = json.load(f1)
-        prev = json.load(f2)
-    return recent, prev
+    def refresh_if_stale(self, max_age: float = REFRESH_SECONDS) -> None:
+        if time.monotonic() - self._loaded_at > max_age:
+            self.refresh()
+
+    def import_snapshots(self, snap_dir: Path = SNAP_DIR) -> int:
+        """Load legacy ``buzz_YYYYMMDD_HH.json`` files; returns files imported."""
+        imported = 0
+        for path in sorted(snap_dir.glob("buzz_*.json")):
+            try:
+                ts = datetime.strptime(path.stem, "buzz_%Y%m%d_%H")
+                with path.open() as f:
+                    counts = json.load(f)
+            except (ValueError, OSError) as exc:
+                logger.warning("buzz snapshot skipped", path=str(path), error=str(exc))
+                continue
+            self.record(counts, ts.replace(tzinfo=UTC).timestamp())
+            imported += 1
+        return imported
+
+    # -- queries -----------------------------------------------------------
+    def _anchor(self, at: int | None) -> int:
+        if at is not None:
+            return at
+        latest = self.latest_bucket()
+        return latest if latest is not None else self.bucket_of()
+
+    def series(self, term: str, buckets: int, at: int | None = None) -> list[int]:
+        """Counts for *term* over *buckets* buckets ending at *at*, oldest first.
+
+        *at* defaults to the most recent bucket holding data.
+        """
+        end = self._anchor(at)
+        key = _norm(term)
+        with self._lock:
+            return [
+                self._buckets.get(b, {}).get(key, 0)
+                for b in range(end - buckets + 1, end + 1)
+            ]
+
+    def window_count(self, term: str, window: int = 1, at: int | None = None) -> int:
+        return sum(self.series(term, window, at))
+
+    def accel(self, term: str, window: int = 1, at: int | None = None) -> float:
+        """Count in the last *window* buckets over the *window* before it."""
+        end = self._anchor(at)
+        recent = self.window_count(term, window, end)
+        prev = self.window_count(term, window, end - window)
+        return recent / (prev or 0.1)
+
+    def ewma(
+        self, term: str, alpha: float = 0.3, buckets: int = 24, at: int | None = None
+    ) -> float:
+        """Exponentially weighted per-bucket count over the last *buckets*."""
+        value = 0.0
+        for i, count in enumerate(self.series(term, buckets, at)):
+            value = count if i == 0 else alpha * count + (1 - alpha) * value
+        return value
+
+    def top_accelerating(
+        self,
+        limit: int = 20,
+        window: int = 1,
+        min_count: int = 0,
+        min_ratio: float = 0.0,
+        at: int | None = None,
+    ) -> list[tuple[str, int, int, float]]:
+        """``(term, count, prev_count, ratio)`` for the fastest-rising terms."""
+        end = self._anchor(at)
+        with self._lock:
+            recent: Counter[str] = Counter()
+            prev: Counter[str] = Counter()
+            for b in range(end - window + 1, end + 1):
+                recent.update(self._buckets.get(b, {}))
+            for b in range(end - 2 * window + 1, end - window + 1):
+                prev.update(self._buckets.get(b, {}))
+        rows = []
+        for term, cnt in recent.items():
+            if cnt < min_count:
+                continue
+            ratio = cnt / (prev[term] or 0.1)
+            if ratio < min_ratio:
+                continue
+            rows.append((term, cnt, prev[term], ratio))
+        rows.sort(key=lambda r: r[3], reverse=True)
+        return rows[:limit]
+
+
+_store: BuzzStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> BuzzStore:
+    """Process-wide store; imports legacy JSON snapshots on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = BuzzStore()
+            if _store.latest_bucket() is None and _store.import_snapshots():
+                logger.info("legacy buzz snapshots imported", path=str(SNAP_DIR))
+        return _store
+
+
+def make_snapshot(items: list[dict]):
+    """Set the current bucket to the ticker/hashtag counts of *items*."""
+    store = get_store()
+    unique = store.record_items(items)
+    logger.info("buzz counts recorded", path=str(store.path), unique=unique)
 
 
 def get_accel(term: str) -> float:
-    global _recent_cache, _prev_cache
-    if _recent_cache is None:
-        _recent_cache, _prev_cache = _load_two_latest()
-    recent = _recent_cache.get(term.lower(), 0)
-    prev = _prev_cache.get(term.lower(), 0)
-    avg_prev_hour = prev / 1 if prev else 0.1  # avoid div/0
-    return recent / avg_prev_hour if avg_prev_hour else 1.0
+    """Latest-bucket count for *term* relative to the bucket before it."""
+    store = get_store()
+    store.refresh_if_stale()
+    return store.accel(term)
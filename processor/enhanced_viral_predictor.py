@@ -50,9 +50,9 @@ import nltk
 # Visualization
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
-from textblob import TextBlob
 
 from processor.scorer import extract_tickers
+from processor.sentiment import textblob_sentiment
 from utils.advanced_logging import get_logger
 
 logger = get_logger(__name__)
@@ -351,9 +351,9 @@ class EnhancedViralPredictor:
         """Extract sentiment and emotion features"""
 
         # Basic sentiment analysis
-        blob = TextBlob(text)
-        sentiment_polarity = blob.sentiment.polarity
-        sentiment_subjectivity = blob.sentiment.subjectivity
+        blob = textblob_sentiment(text)
+        sentiment_polarity = blob["polarity"]
+        sentiment_subjectivity = blob["subjectivity"]
 
         # Crypto-specific sentiment
         crypto_positive = [
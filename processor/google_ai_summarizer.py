@@ -124,9 +124,10 @@ def rewrite_batch(items: list[dict[str, str]]) -> list[dict[str, str]]:
         for it in items
     ]
 
+    cached_responses = llm_cache.get_many(prompts)
     uncached_indices = []
     for idx, p in enumerate(prompts):
-        cached = llm_cache.get(p)
+        cached = cached_responses.get(p)
         if cached:
             text = cached["text"]
             parts = text.split("\n", 1)
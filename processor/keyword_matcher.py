@@ -0,0 +1,154 @@
+"""Single-pass multi-keyword matching.
+
+Replaces loops of ``keyword in text`` over long keyword lists. All keywords
+are compiled once into an Aho-Corasick automaton (``pyahocorasick``, when
+installed) or else into one trie-shaped regular expression. A single scan of
+the lowercased text yields every keyword that occurs as a substring, i.e.
+exactly what the ``in`` loops returned.
+
+The regex fallback only needs the standard library, so the standalone Cloud
+Function bundles can ship this module next to ``config/keywords.py``.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Mapping
+from functools import lru_cache
+
+try:
+    import ahocorasick
+
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in node.items() if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy optional suffix: the longest keyword at a position wins
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Case-insensitive substring matcher over a fixed keyword set.
+
+    Regex fallback: a search from position *p* returns the longest keyword
+    starting at the first candidate position; every shorter keyword starting
+    there is a prefix of it, so the full hit set is recovered from a
+    precomputed prefix table before resuming one character later.
+    """
+
+    def __init__(self, keywords: Mapping[str, float] | Iterable[str]):
+        pairs = (
+            keywords.items()
+            if isinstance(keywords, Mapping)
+            else ((k, 1.0) for k in keywords)
+        )
+        self.weights: dict[str, float] = {}
+        for keyword, weight in pairs:
+            self.weights.setdefault(keyword.lower(), weight)
+        self._order = {k: i for i, k in enumerate(self.weights)}
+        self._prefixes = {
+            k: tuple(k[:i] for i in range(1, len(k) + 1) if k[:i] in self.weights)
+            for k in self.weights
+        }
+        words = [k for k in self.weights if k]
+        self._automaton = None
+        self._regex = None
+        if words and AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for word in words:
+                self._automaton.add_word(word, word)
+            self._automaton.make_automaton()
+        elif words:
+            self._regex = re.compile(_trie_regex(words))
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def find(self, text: str) -> set[str]:
+        """Keywords (lowercased) occurring anywhere in *text*."""
+        if not text:
+            return set()
+        lowered = text.lower()
+        if self._automaton is not None:
+            return {word for _, word in self._automaton.iter(lowered)}
+
+        found: set[str] = set()
+        if self._regex is None:
+            return found
+        search = self._regex.search
+        prefixes = self._prefixes
+        pos = 0
+        while (m := search(lowered, pos)) is not None:
+            found.update(prefixes[m.group()])
+            pos = m.start() + 1
+        return found
+
+    def find_ordered(self, text: str) -> list[str]:
+        """Like :meth:`find` but in the order the keywords were given."""
+        return sorted(self.find(text), key=self._order.__getitem__)
+
+    def hits(self, text: str) -> dict[str, float]:
+        """Matched keywords mapped to their weights."""
+        return {k: self.weights[k] for k in self.find_ordered(text)}
+
+    def score(self, text: str) -> float:
+        """Sum of the weights of all matched keywords."""
+        return sum(self.hits(text).values())
+
+
+@lru_cache(maxsize=1)
+def viral_keyword_matcher() -> KeywordMatcher:
+    from config.keywords import get_extraction_keywords
+
+    return KeywordMatcher(get_extraction_keywords())
+
+
+@lru_cache(maxsize=1)
+def news_keyword_matcher() -> KeywordMatcher:
+    from config.keywords import get_news_extraction_keywords
+
+    return KeywordMatcher(get_news_extraction_keywords())
+
+
+@lru_cache(maxsize=1)
+def _meme_token_matcher() -> tuple[KeywordMatcher, dict[str, str]]:
+    from config.keywords import get_meme_token_keywords
+
+    tag_of = {
+        keyword.lower(): tag
+        for tag, keywords in get_meme_token_keywords().items()
+        for keyword in keywords
+    }
+    return KeywordMatcher(tag_of.keys()), tag_of
+
+
+def meme_tags(name: str | None, symbol: str | None = None) -> list[str]:
+    """Sorted meme tags of a token's name and symbol; empty for other tokens."""
+    matcher, tag_of = _meme_token_matcher()
+    return sorted({tag_of[k] for k in matcher.find(f"{name or ''} {symbol or ''}")})
+
+
+def extract_viral_keywords(text: str) -> list[str]:
+    """Viral keywords found in *text*, in configuration order."""
+    return viral_keyword_matcher().find_ordered(text)
+
+
+def extract_news_keywords(text: str) -> list[str]:
+    """Viral and announcement keywords found in a news *text*."""
+    return news_keyword_matcher().find_ordered(text)
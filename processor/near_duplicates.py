@@ -0,0 +1,489 @@
+"""Near-duplicate detection with MinHash and LSH banding.
+
+``DataDeduplicator`` used to drop only exact copies (an MD5 of text, author
+and timestamp), so the same shill posted by a dozen bot accounts, or lightly
+edited, survived and flooded the digest. ``NearDuplicateIndex`` compares
+items by the Jaccard similarity of their shingles (substrings) instead:
+
+* each text is normalised (lowercase, URLs and mentions dropped, whitespace
+  collapsed) and cut into overlapping ``shingle_size``-byte shingles;
+* a MinHash signature of ``num_perm`` values estimates the Jaccard
+  similarity of two shingle sets as the share of equal values;
+* the signature is split into ``bands``; items sharing any band land in the
+  same bucket and become candidates, so a lookup touches a handful of rows
+  however many items are indexed. A candidate is a duplicate when its
+  estimated similarity reaches ``threshold``.
+
+The index is a SQLite file, so every run checks new items against
+everything seen before instead of re-deduplicating all files. Only cluster
+heads (the first item of each group, the "canonical" post) are banded;
+later copies are recorded as members with their similarity, and
+``clusters`` reports the groups so ranking can credit the canonical post.
+Items are keyed (e.g. ``twitter:<id>``), so re-checking a known item gives
+the same answer instead of flagging it as a copy of itself.
+
+    from processor.near_duplicates import NearDuplicateIndex
+    index = NearDuplicateIndex("output/near_duplicates.sqlite")
+    for match in index.check_many([(key, text), ...], namespace="twitter"):
+        if match.canonical is None:
+            keep(match.key)
+    index.clusters(namespace="twitter")   # [{"canonical": ..., "members": [...]}]
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import time
+import zlib
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from utils.advanced_logging import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_PATH = Path(os.getenv("NEAR_DUP_INDEX", "output/near_duplicates.sqlite"))
+# Estimated Jaccard similarity at which two items count as duplicates
+THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.7"))
+# Clusters whose canonical post is older than this are forgotten by prune()
+RETENTION_DAYS = float(os.getenv("NEAR_DUP_RETENTION_DAYS", "30"))
+# 16 bands of 4 rows: pairs at 0.7 similarity share a band 99% of the time
+NUM_PERM = 64
+BANDS = 16
+SHINGLE_SIZE = 5
+SEED = 1
+# Items checked per transaction by check_many
+BATCH_SIZE = 1000
+# Items hashed per numpy pass (bounds the num_perm x shingles temporary)
+_ITEMS_PER_PASS = 128
+# SQLite caps bound parameters per statement
+_CHUNK = 500
+
+_URL = re.compile(r"https?://\S+|www\.\S+")
+_MENTION = re.compile(r"@\w+")
+_NON_WORD = re.compile(r"[^\w$#]+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    key TEXT UNIQUE NOT NULL,
+    namespace TEXT NOT NULL,
+    canonical_id INTEGER,          -- NULL for cluster heads
+    similarity REAL,
+    signature BLOB,                -- cluster heads only
+    cluster_size INTEGER NOT NULL DEFAULT 1,
+    first_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_items_canonical ON items(canonical_id);
+CREATE INDEX IF NOT EXISTS idx_items_first_seen ON items(first_seen);
+CREATE TABLE IF NOT EXISTS bands (
+    bucket INTEGER NOT NULL,
+    item_id INTEGER NOT NULL,
+    PRIMARY KEY (bucket, item_id)
+) WITHOUT ROWID;
+"""
+
+
+def normalize(text: str) -> str:
+    """Lowercased text without URLs, mentions, punctuation or extra spaces."""
+    text = _MENTION.sub(" ", _URL.sub(" ", text.lower()))
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def _chunks(seq: list, size: int = _CHUNK):
+    for i in range(0, len(seq), size):
+        yield seq[i : i + size]
+
+
+@dataclass
+class Match:
+    key: str
+    # Key of the cluster head this item duplicates; None for a new or known head
+    canonical: str | None = None
+    similarity: float = 1.0
+    # True when the key was already in the index before this check
+    known: bool = False
+
+    @property
+    def is_duplicate(self) -> bool:
+        return self.canonical is not None
+
+
+class NearDuplicateIndex:
+    """Persistent MinHash/LSH index of item texts (see module doc).
+
+    One writer at a time: ``check_many`` holds a write transaction per batch.
+    """
+
+    def __init__(
+        self,
+        path: Path | str = INDEX_PATH,
+        *,
+        threshold: float = THRESHOLD,
+        num_perm: int = NUM_PERM,
+        bands: int = BANDS,
+        shingle_size: int = SHINGLE_SIZE,
+        seed: int = SEED,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        if not 1 <= shingle_size <= 8:
+            raise ValueError("shingle_size must be 1-8 bytes")
+        self.path = Path(path)
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        # Multiply-add-shift hashing: (a*x + b) mod 2**64, top 32 bits
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.randint(0, 2**63, size=num_perm, dtype=np.uint64)
+        self._band_mix = rng.randint(1, 2**63, size=self.rows, dtype=np.uint64)
+        self._band_offsets = rng.randint(0, 2**63, size=bands, dtype=np.uint64)
+        self._byte_weights = np.array(
+            [1 << (8 * i) for i in reversed(range(shingle_size))], dtype=np.uint64
+        )
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA cache_size=-65536")  # 64 MB of band pages
+        self.conn.executescript(_SCHEMA)
+        self._check_settings(seed)
+
+    def _check_settings(self, seed: int):
+        """Signatures are only comparable with the settings that made them."""
+        settings = {
+            "num_perm": str(self.num_perm),
+            "bands": str(self.bands),
+            "shingle_size": str(self.shingle_size),
+            "seed": str(seed),
+        }
+        stored = dict(self.conn.execute("SELECT name, value FROM meta"))
+        if not stored:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO meta VALUES (?, ?)", settings.items()
+            )
+            return
+        if stored != settings:
+            raise ValueError(
+                f"{self.path} was built with {stored}, not {settings}; "
+                "use the same settings or a new index file"
+            )
+
+    def close(self):
+        self.conn.close()
+
+    # -- signatures ----------------------------------------------------------
+
+    def signatures(self, texts: list[str]) -> list[np.ndarray | None]:
+        """MinHash signatures (uint32[num_perm]) of *texts*; None for empty text.
+
+        Shingles are the normalised UTF-8 text's overlapping
+        ``shingle_size``-byte windows, packed into integers (so no hashing
+        collisions). The whole batch is hashed in a few numpy passes.
+        """
+        k = self.shingle_size
+        encoded = [normalize(text).encode() for text in texts]
+        # A short text still gets one (zero-padded) shingle
+        encoded = [e.ljust(k, b"\0") if e else e for e in encoded]
+        lengths = np.array([len(e) for e in encoded], dtype=np.int64)
+        counts = np.where(lengths > 0, lengths - k + 1, 0)
+        results: list[np.ndarray | None] = [None] * len(texts)
+        if not counts.sum():
+            return results
+
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        windows = np.lib.stride_tricks.sliding_window_view(data, k)
+        # Drop the windows that straddle two texts
+        offsets = np.cumsum(counts) - counts
+        starts = np.cumsum(lengths) - lengths
+        keep = np.repeat(starts - offsets, counts) + np.arange(counts.sum())
+        shingles = windows[keep].astype(np.uint64) @ self._byte_weights
+
+        nonempty = np.flatnonzero(counts)
+        for g in range(0, len(nonempty), _ITEMS_PER_PASS):
+            group = nonempty[g : g + _ITEMS_PER_PASS]
+            lo = offsets[group[0]]
+            hi = offsets[group[-1]] + counts[group[-1]]
+            mixed = np.multiply.outer(self._a, shingles[lo:hi]) + self._b[:, None]
+            # Repeated shingles do not change a minimum, so no need to dedupe
+            mins = np.minimum.reduceat(
+                mixed >> np.uint64(32), offsets[group] - lo, axis=1
+            )
+            for i, signature in zip(group, mins.T.astype(np.uint32), strict=True):
+                results[i] = signature
+        return results
+
+    def signature(self, text: str) -> np.ndarray | None:
+        return self.signatures([text])[0]
+
+    def band_keys(self, signature: np.ndarray, namespace: str = "") -> list[int]:
+        """One bucket id per band; the namespace keeps sources apart."""
+        rows = signature.astype(np.uint64).reshape(self.bands, self.rows)
+        salt = np.uint64(zlib.crc32(namespace.encode()))
+        keys = (rows * self._band_mix).sum(axis=1) + self._band_offsets + salt
+        return keys.view(np.int64).tolist()
+
+    def similarity(self, a: np.ndarray, b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures."""
+        return float(np.mean(a == b))
+
+    # -- lookups -------------------------------------------------------------
+
+    def _known(self, keys: list[str]) -> dict[str, Match]:
+        found = {}
+        for chunk in _chunks(keys):
+            marks = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"""SELECT i.key, c.key, i.similarity FROM items i
+                    LEFT JOIN items c ON c.id = i.canonical_id
+                    WHERE i.key IN ({marks})""",
+                chunk,
+            )
+            for key, canonical, similarity in rows:
+                found[key] = Match(key, canonical, similarity or 1.0, known=True)
+        return found
+
+    def _candidates(self, buckets: Iterable[int]) -> dict[int, list[int]]:
+        by_bucket: dict[int, list[int]] = {}
+        for chunk in _chunks(list(set(buckets))):
+            marks = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT bucket, item_id FROM bands WHERE bucket IN ({marks})", chunk
+            )
+            for bucket, item_id in rows:
+                by_bucket.setdefault(bucket, []).append(item_id)
+        return by_bucket
+
+    def _heads(self, ids: Iterable[int]) -> dict[int, tuple[str, np.ndarray]]:
+        heads = {}
+        for chunk in _chunks(list(set(ids))):
+            marks = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT id, key, signature FROM items WHERE id IN ({marks})", chunk
+            )
+            for item_id, key, blob in rows:
+                heads[item_id] = (key, np.frombuffer(blob, dtype=np.uint32))
+        return heads
+
+    # -- checking --------------------------------------------------------------
+
+    def check_many(
+        self,
+        items: Iterable[tuple[str, str]],
+        namespace: str = "",
+        *,
+        add: bool = True,
+        batch_size: int = BATCH_SIZE,
+    ) -> Iterator[Match]:
+        """Check (key, text) pairs in order, yielding one ``Match`` each.
+
+        With *add*, new items join the index: as cluster heads when nothing
+        similar is indexed, else as members of the most similar head (so an
+        item is also matched against earlier items of the same call).
+        """
+        batch: list[tuple[str, str]] = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield from self._check_batch(batch, namespace, add)
+                batch = []
+        if batch:
+            yield from self._check_batch(batch, namespace, add)
+
+    def check(
+        self, key: str, text: str, namespace: str = "", add: bool = True
+    ) -> Match:
+        return next(self.check_many([(key, text)], namespace, add=add))
+
+    def _check_batch(
+        self, batch: list[tuple[str, str]], namespace: str, add: bool
+    ) -> list[Match]:
+        now = time.time()
+        conn = self.conn
+        if add:
+            conn.execute("BEGIN IMMEDIATE")
+        try:
+            known = self._known(list(dict.fromkeys(key for key, _ in batch)))
+            todo = [
+                (pos, key, text)
+                for pos, (key, text) in enumerate(batch)
+                if key not in known
+            ]
+            signatures = self.signatures([text for *_, text in todo])
+            pending = []  # (position, key, signature, band keys) still to decide
+            for (pos, key, _), signature in zip(todo, signatures, strict=True):
+                buckets = (
+                    self.band_keys(signature, namespace)
+                    if signature is not None
+                    else []
+                )
+                pending.append((pos, key, signature, buckets))
+            stored = self._candidates(b for *_, buckets in pending for b in buckets)
+            heads = self._heads(i for ids in stored.values() for i in ids)
+
+            # Ids are assigned here so new heads can be banded in the same batch
+            (next_id,) = conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM items"
+            ).fetchone()
+            new_buckets: dict[int, list[int]] = {}  # heads added by this batch
+            results: dict[int, Match] = {}
+            new_rows, band_rows, grown = [], [], {}
+            for pos, key, signature, buckets in pending:
+                if key in known:  # repeated within the batch
+                    results[pos] = known[key]
+                    continue
+                best_id, best_sim = None, 0.0
+                if signature is not None:
+                    candidates = {
+                        i
+                        for b in buckets
+                        for i in stored.get(b, []) + new_buckets.get(b, [])
+                    }
+                    for candidate in candidates:
+                        sim = self.similarity(signature, heads[candidate][1])
+                        if sim > best_sim:
+                            best_id, best_sim = candidate, sim
+                if best_id is not None and best_sim >= self.threshold:
+                    match = Match(key, heads[best_id][0], best_sim)
+                    if add:
+                        next_id += 1
+                        new_rows.append(
+                            (next_id, key, namespace, best_id, best_sim, None, now)
+                        )
+                        grown[best_id] = grown.get(best_id, 0) + 1
+                else:
+                    match = Match(key)
+                    if add and signature is not None:
+                        next_id += 1
+                        blob = signature.tobytes()
+                        new_rows.append(
+                            (next_id, key, namespace, None, None, blob, now)
+                        )
+                        heads[next_id] = (key, signature)
+                        for b in buckets:
+                            new_buckets.setdefault(b, []).append(next_id)
+                            band_rows.append((b, next_id))
+                results[pos] = match
+                known[key] = Match(key, match.canonical, match.similarity, known=True)
+
+            if add:
+                conn.executemany(
+                    """INSERT INTO items (id, key, namespace, canonical_id, similarity,
+                       signature, first_seen) VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                    new_rows,
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO bands (bucket, item_id) VALUES (?, ?)",
+                    band_rows,
+                )
+                conn.executemany(
+                    "UPDATE items SET cluster_size = cluster_size + ? WHERE id = ?",
+                    [(n, head) for head, n in grown.items()],
+                )
+                conn.execute("COMMIT")
+        except BaseException:
+            if add:
+                conn.execute("ROLLBACK")
+            raise
+        return [results.get(pos) or known[key] for pos, (key, _) in enumerate(batch)]
+
+    # -- reporting -------------------------------------------------------------
+
+    def cluster_size(self, key: str) -> int:
+        """Items in the cluster *key* belongs to (1 if unique or unknown)."""
+        row = self.conn.execute(
+            """SELECT COALESCE(c.cluster_size, i.cluster_size) FROM items i
+               LEFT JOIN items c ON c.id = i.canonical_id WHERE i.key = ?""",
+            (key,),
+        ).fetchone()
+        return row[0] if row else 1
+
+    def clusters(
+        self,
+        namespace: str | None = None,
+        min_size: int = 2,
+        since: float | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Duplicate clusters, largest first: the canonical (first seen) key,
+        the size and the members with their similarity to it. *since* limits
+        the report to clusters that gained a member after that timestamp."""
+        sql = "SELECT id, key, namespace, cluster_size FROM items WHERE canonical_id IS NULL AND cluster_size >= ?"
+        params: list[Any] = [min_size]
+        if namespace is not None:
+            sql += " AND namespace = ?"
+            params.append(namespace)
+        if since is not None:
+            sql += " AND id IN (SELECT canonical_id FROM items WHERE first_seen >= ?)"
+            params.append(since)
+        for head_id, key, ns, size in self.conn.execute(
+            sql + " ORDER BY cluster_size DESC, id", params
+        ).fetchall():
+            members = self.conn.execute(
+                "SELECT key, similarity FROM items WHERE canonical_id = ? ORDER BY id",
+                (head_id,),
+            )
+            yield {
+                "canonical": key,
+                "namespace": ns,
+                "size": size,
+                "members": [
+                    {"key": member, "similarity": round(sim, 3)}
+                    for member, sim in members
+                ],
+            }
+
+    def prune(self, max_age_seconds: float) -> int:
+        """Forget clusters whose head was first seen more than *max_age_seconds*
+        ago (with their members); returns the number of items removed."""
+        cutoff = time.time() - max_age_seconds
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS expired (id INTEGER PRIMARY KEY)"
+            )
+            conn.execute("DELETE FROM expired")
+            conn.execute(
+                """INSERT INTO expired SELECT id FROM items
+                   WHERE canonical_id IS NULL AND first_seen < ?""",
+                (cutoff,),
+            )
+            conn.execute("DELETE FROM bands WHERE item_id IN (SELECT id FROM expired)")
+            removed = conn.execute(
+                """DELETE FROM items WHERE id IN (SELECT id FROM expired)
+                   OR canonical_id IN (SELECT id FROM expired)"""
+            ).rowcount
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if removed:
+            logger.info(f"Pruned {removed} near-duplicate index entries")
+        return removed
+
+    def stats(self) -> dict[str, int]:
+        heads, members = self.conn.execute(
+            """SELECT COALESCE(SUM(canonical_id IS NULL), 0),
+                      COALESCE(SUM(canonical_id IS NOT NULL), 0) FROM items"""
+        ).fetchone()
+        clusters = self.conn.execute(
+            "SELECT COUNT(*) FROM items WHERE canonical_id IS NULL AND cluster_size > 1"
+        ).fetchone()[0]
+        return {
+            "items": heads + members,
+            "canonical": heads,
+            "duplicates": members,
+            "clusters": clusters,
+        }
@@ -6,16 +6,15 @@ from typing import Any
 
 import numpy as np
 from joblib import load
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
 from processor import buzz as _buzz
+from processor import sentiment as _sentiment
 from utils.advanced_logging import get_logger
 from utils.logger import setup_logging
 
 MODEL_PATH = Path("models/meme_lr.joblib")
 
 _model: object | None = None
-_analyzer = SentimentIntensityAnalyzer()
 _virality_model = None
 
 try:
@@ -36,11 +35,7 @@ def extract_tickers(text: str) -> list[str]:
 
 def get_sentiment_score(text: str) -> float:
     """Get sentiment score from text using VADER"""
-    try:
-        scores = _analyzer.polarity_scores(text)
-        return scores["compound"]
-    except Exception:
-        return 0.0
+    return _sentiment.compound(text)
 
 
 # Ticker pattern for backward compatibility
@@ -76,6 +71,22 @@ def _engagement_score(
     return min(math.log1p(weight_sum) * 25, 100)  # log1p(≈1500) ≈ 7.3 → 100
 
 
+def _hours_ago(item: dict[str, Any], now: datetime.datetime) -> float | None:
+    """Age of *item* in hours relative to naive-UTC *now*, or ``None``.
+
+    Offset-aware timestamps can't be subtracted from the naive ``now`` and
+    therefore yield ``None`` (no decay), matching the historical behaviour.
+    """
+    created_at = item.get("created_at") or item.get("createdAt")
+    if not created_at:
+        return None
+    try:
+        dt = datetime.datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+        return (now - dt).total_seconds() / 3600
+    except Exception:
+        return None
+
+
 def degen_score(item: dict[str, Any]) -> int:
     """Return an approximate viral-hype score in the 0-100 range.
 
@@ -106,26 +117,17 @@ def degen_score(item: dict[str, Any]) -> int:
     engage_score = _engagement_score(likes, retweets, replies, follower_count)
 
     # Exponential time decay (half-life ≈12 h)
-    created_at = item.get("created_at") or item.get("createdAt")
-    if created_at:
-        try:
-            dt = datetime.datetime.fromisoformat(created_at.replace("Z", "+00:00"))
-            hours_ago = (datetime.datetime.utcnow() - dt).total_seconds() / 3600
-            decay = math.exp(-hours_ago / 12)  # 50 % every 12 h
-            engage_score *= max(decay, 0.2)  # keep at least 20 %
-        except Exception:
-            pass
+    hours_ago = _hours_ago(item, datetime.datetime.utcnow())
+    if hours_ago is not None:
+        decay = math.exp(-hours_ago / 12)  # 50 % every 12 h
+        engage_score *= max(decay, 0.2)  # keep at least 20 %
 
     # Sentiment boost: strongly positive (>0.6) +5, strongly negative (<-0.6) -5
-    if text_content:
-        try:
-            compound = _analyzer.polarity_scores(text_content)["compound"]
-            if compound > 0.6:
-                engage_score += 5
-            elif compound < -0.6:
-                engage_score -= 5
-        except Exception:
-            pass
+    compound = _sentiment.compound(text_content)
+    if compound > 0.6:
+        engage_score += 5
+    elif compound < -0.6:
+        engage_score -= 5
 
     # Buzz acceleration bonus
     try:
@@ -151,7 +153,7 @@ def degen_score(item: dict[str, Any]) -> int:
                     retweets,
                     replies,
                     len(text_content),
-                    _analyzer.polarity_scores(text_content)["compound"],
+                    compound,
                 ]
             ).reshape(1, -1)
             pred = _virality_model.predict(feat_vec)[0]
@@ -162,3 +164,110 @@ def degen_score(item: dict[str, Any]) -> int:
     score = int(min(base_score, 100))
     logger.debug("degen score", score=score)
     return score
+
+
+def degen_score_batch(items: list[dict[str, Any]]) -> list[int]:
+    """Score many items at once; returns the same values as :func:`degen_score`.
+
+    The ML and virality models are each called once for the whole batch,
+    VADER runs once per distinct text and buzz acceleration once per distinct
+    ticker. Engagement, time decay and clamping are computed on NumPy arrays.
+    """
+    n = len(items)
+    if not n:
+        return []
+
+    texts = [it.get("full_text") or it.get("text") or "" for it in items]
+
+    # --- ML probability ---------------------------------------------------
+    ml_score = np.full(n, np.nan)
+    if _model:
+        idx = [i for i, t in enumerate(texts) if t]
+        if idx:
+            try:
+                probs = _model.predict_proba([texts[i] for i in idx])[:, 1]
+                ml_score[idx] = probs * 100
+            except Exception as exc:
+                # One bad text must not cost the rest their ML component:
+                # retry item by item, as degen_score would have scored them
+                logger.debug("batch ml scorer failed", exc_info=exc)
+                for i in idx:
+                    try:
+                        ml_score[i] = _model.predict_proba([texts[i]])[0][1] * 100
+                    except Exception as item_exc:
+                        logger.debug("ml scorer failed", exc_info=item_exc)
+
+    # --- Engagement score -------------------------------------------------
+    likes = np.array([it.get("likeCount", 0) for it in items], dtype=float)
+    retweets = np.array([it.get("retweetCount", 0) for it in items], dtype=float)
+    replies = np.array([it.get("replyCount", 0) for it in items], dtype=float)
+    followers = np.array(
+        [it.get("userFollowersCount") or 0 for it in items], dtype=float
+    )
+
+    weight_sum = likes + 2 * retweets + replies
+    has_followers = followers > 0
+    weight_sum = np.where(
+        has_followers,
+        weight_sum / np.where(has_followers, followers, 1) * 1000,
+        weight_sum,
+    )
+    engage_score = np.minimum(np.log1p(weight_sum) * 25, 100)
+
+    # Exponential time decay (half-life ≈12 h) over a shared age column
+    now = datetime.datetime.utcnow()
+    hours_ago = np.array(
+        [h if (h := _hours_ago(it, now)) is not None else np.nan for it in items]
+    )
+    dated = ~np.isnan(hours_ago)
+    decay = np.maximum(np.exp(-np.where(dated, hours_ago, 0) / 12), 0.2)
+    engage_score = np.where(dated, engage_score * decay, engage_score)
+
+    # Sentiment boost, one VADER pass per distinct text
+    compound = np.array(_sentiment.compound_batch(texts))
+    engage_score = engage_score + np.where(
+        compound > 0.6, 5, np.where(compound < -0.6, -5, 0)
+    )
+
+    # Buzz acceleration bonus, one lookup per distinct ticker
+    accel: dict[str, float] = {}
+    buzz_bonus = np.zeros(n)
+    for i, t in enumerate(texts):
+        for sym in ticker_pattern.findall(t):
+            try:
+                if sym not in accel:
+                    accel[sym] = _buzz.get_accel(sym)
+                if accel[sym] > 2:
+                    buzz_bonus[i] = 10
+                    break
+            except Exception:
+                break
+    engage_score = engage_score + buzz_bonus
+
+    # Combine ML and engagement – weighted average preferring ML when present
+    base_score = np.where(
+        np.isnan(ml_score),
+        np.where(engage_score > 0, engage_score, 20),
+        0.6 * ml_score + 0.4 * engage_score,
+    )
+
+    # virality model prediction
+    if _virality_model:
+        try:
+            feats = np.column_stack(
+                [likes, retweets, replies, [len(t) for t in texts], compound]
+            )
+            pred = _virality_model.predict(feats)
+            base_score = 0.5 * base_score + 0.5 * np.minimum(pred / 10, 100)
+        except Exception:
+            # Same per-item fallback as the ML model above
+            for i in range(n):
+                try:
+                    pred = _virality_model.predict(feats[i].reshape(1, -1))[0]
+                    base_score[i] = 0.5 * base_score[i] + 0.5 * min(pred / 10, 100)
+                except Exception:
+                    pass
+
+    scores = np.minimum(base_score, 100).astype(int).tolist()
+    logger.debug("degen scores", count=n)
+    return scores
@@ -0,0 +1,163 @@
+"""Shared sentiment scoring with a bounded, content-addressed cache.
+
+The scorer, viral predictors and Twitter crawlers all score the same texts
+(retweets, cross-posted headlines, the scorer's own repeated calls). Results
+are memoised by a BLAKE2 digest of the text so duplicates are scored once per
+process without keeping the texts themselves in memory.
+
+    from processor.sentiment import compound, compound_batch, textblob_sentiment
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from utils.advanced_logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CACHE_SIZE = int(os.getenv("SENTIMENT_CACHE_SIZE", "50000"))
+
+_ZERO_BLOB = {"polarity": 0.0, "subjectivity": 0.0}
+
+
+class SentimentCache:
+    """Thread-safe LRU mapping text digests to scores, with hit/miss counters."""
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self._data: OrderedDict[bytes, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def get_or_compute(self, text: str, compute: Callable[[str], Any]) -> Any:
+        k = self.key(text)
+        with self._lock:
+            if k in self._data:
+                self._data.move_to_end(k)
+                self.hits += 1
+                return self._data[k]
+            self.misses += 1
+        value = compute(text)
+        with self._lock:
+            self._data[k] = value
+            self._data.move_to_end(k)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_vader_cache = SentimentCache()
+_textblob_cache = SentimentCache()
+
+
+@functools.cache
+def _analyzer():
+    # Imported on first use: the crawler images do not install vaderSentiment
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+    return SentimentIntensityAnalyzer()
+
+
+def _vader(text: str) -> dict[str, float]:
+    try:
+        return _analyzer().polarity_scores(text)
+    except Exception:
+        return {"neg": 0.0, "neu": 0.0, "pos": 0.0, "compound": 0.0}
+
+
+def _textblob(text: str) -> dict[str, float]:
+    try:
+        from textblob import TextBlob
+
+        blob = TextBlob(text)
+        return {
+            "polarity": blob.sentiment.polarity,
+            "subjectivity": blob.sentiment.subjectivity,
+        }
+    except Exception:
+        return dict(_ZERO_BLOB)
+
+
+def polarity_scores(text: str) -> dict[str, float]:
+    """VADER ``polarity_scores`` for *text*, cached. Do not mutate the result."""
+    return _vader_cache.get_or_compute(text, _vader)
+
+
+def compound(text: str) -> float:
+    """VADER compound score in [-1, 1]; 0.0 for empty text or on failure."""
+    if not text:
+        return 0.0
+    return polarity_scores(text)["compound"]
+
+
+def compound_batch(texts: Iterable[str]) -> list[float]:
+    """Compound scores for *texts*; each distinct text is scored at most once."""
+    local: dict[str, float] = {}
+    out = []
+    for t in texts:
+        if t not in local:
+            local[t] = compound(t)
+        out.append(local[t])
+    return out
+
+
+def textblob_sentiment(text: str) -> dict[str, float]:
+    """TextBlob ``polarity``/``subjectivity`` for *text*, cached.
+
+    Returns zeros when TextBlob is unavailable or fails.
+    """
+    if not text:
+        return dict(_ZERO_BLOB)
+    return dict(_textblob_cache.get_or_compute(text, _textblob))
+
+
+def textblob_batch(texts: Iterable[str]) -> list[dict[str, float]]:
+    """TextBlob sentiment for *texts*; each distinct text is scored at most once."""
+    local: dict[str, dict[str, float]] = {}
+    out = []
+    for t in texts:
+        if t not in local:
+            local[t] = textblob_sentiment(t)
+        out.append(dict(local[t]))
+    return out
+
+
+def cache_stats() -> dict[str, dict[str, Any]]:
+    """Hit/miss/eviction counters for both analyzers."""
+    return {"vader": _vader_cache.stats(), "textblob": _textblob_cache.stats()}
+
+
+def clear_cache() -> None:
+    _vader_cache.clear()
+    _textblob_cache.clear()
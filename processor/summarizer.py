@@ -1,15 +1,25 @@
 import asyncio
 import logging
 import os
+import random
+import time
+from datetime import datetime
 
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import (
+    APIConnectionError,
+    AsyncOpenAI,
+    InternalServerError,
+    OpenAI,
+    RateLimitError,
+)
 
 from storage.db import add_llm_tokens, get_month_usage
 from utils import llm_cache
 from utils.advanced_logging import get_logger
 from utils.env import get
 from utils.logger import setup_logging
+from utils.rate_limiter import APIRateLimiter, api_limiter
 
 load_dotenv()
 
@@ -78,8 +88,6 @@ def rewrite_content(item: dict[str, str]) -> dict[str, str]:
 
     cost_per_1k = float(get("OPENROUTER_COST_PER_1K_USD", "0.005"))
     monthly_budget = float(get("LLM_BUDGET_MONTHLY_USD", "10"))
-    from datetime import datetime
-
     month = datetime.utcnow().strftime("%Y-%m")
     usage = get_month_usage(month)
 
@@ -129,117 +137,211 @@ def rewrite_content(item: dict[str, str]) -> dict[str, str]:
     return {"headline": headline, "body": body}
 
 
-async def _rewrite_single_item(item: dict[str, str], prompt: str) -> dict[str, str]:
-    """Async helper for rewriting a single item"""
-    client = get_client()
-    if not client:
-        logger.warning("No OpenAI/OpenRouter API key; returning original text")
-        content = item.get("full_text") or item.get("text") or item.get("summary") or ""
-        return {"headline": content[:50], "body": content}
+# ---------------------------------------------------------------------------
+# Concurrent batch rewrite
+# ---------------------------------------------------------------------------
+# Transient failures worth retrying: 429s, 5xx responses, timeouts and
+# dropped connections. Anything else (bad request, auth) fails immediately.
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "3"))
+RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "1.0"))
+RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "20.0"))
+REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "60"))
 
-    try:
-        completion = client.chat.completions.create(
-            model=os.getenv("OPENROUTER_MODEL", "google/gemini-2.0-flash-001"),
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.9,
-            max_tokens=120,
-        )
-        rewritten = completion.choices[0].message.content.strip()
-        llm_cache.set(prompt, {"text": rewritten})
 
-        # cost tracking
-        est_tokens_prompt = int(len(prompt) / 4)
-        usage_tokens = est_tokens_prompt + int(len(rewritten) / 4)
-        cost_per_1k = float(get("OPENROUTER_COST_PER_1K_USD", "0.005"))
-        add_llm_tokens(usage_tokens, usage_tokens / 1000 * cost_per_1k)
+def get_async_client() -> AsyncOpenAI | None:
+    """Async counterpart of :func:`get_client`.
+
+    One client is shared by every request of a batch so they reuse its HTTP
+    connection pool. Retries are handled by :func:`_complete_with_retry`.
+    """
+    base_url = (
+        get("OPENROUTER_API_BASE")
+        or get("OPENAI_API_BASE")
+        or "https://api.openai.com/v1"
+    )
+    api_key = get("OPENROUTER_API_KEY") or get("OPENAI_API_KEY")
+
+    if not api_key:
+        logger.warning("No OpenAI/OpenRouter API key found in environment")
+        return None
+
+    return AsyncOpenAI(
+        base_url=base_url,
+        api_key=api_key,
+        max_retries=0,
+        timeout=REQUEST_TIMEOUT,
+    )
+
+
+def _item_content(item: dict[str, str]) -> str:
+    return item.get("full_text") or item.get("text") or item.get("summary") or ""
+
+
+def _original(item: dict[str, str]) -> dict[str, str]:
+    content = _item_content(item)
+    return {"headline": content[:50], "body": content}
+
+
+def _split_rewrite(text: str) -> dict[str, str]:
+    parts = text.split("\n", 1)
+    return {"headline": parts[0], "body": parts[1] if len(parts) == 2 else ""}
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform in [0, base * 2**attempt]."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt))
 
-        parts = rewritten.split("\n", 1)
-        if len(parts) == 2:
-            return {"headline": parts[0], "body": parts[1]}
+
+async def _complete_with_retry(
+    client: AsyncOpenAI, prompt: str, limiter: APIRateLimiter
+) -> tuple[str, int]:
+    """Run one chat completion; returns the rewrite and the tokens it used."""
+    for attempt in range(MAX_ATTEMPTS):
+        if not await limiter.wait_and_acquire("openai"):
+            raise TimeoutError("Rate limit wait timed out for openai")
+        try:
+            completion = await client.chat.completions.create(
+                model=os.getenv("OPENROUTER_MODEL", "google/gemini-2.0-flash-001"),
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.9,
+                max_tokens=120,
+            )
+        except RETRYABLE_ERRORS as exc:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            delay = _backoff_delay(attempt)
+            logger.warning(
+                f"LLM request failed ({type(exc).__name__}), retrying in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+            continue
+
+        rewritten = completion.choices[0].message.content.strip()
+        usage = getattr(completion, "usage", None)
+        if usage and usage.total_tokens:
+            tokens = usage.total_tokens
         else:
-            return {"headline": parts[0], "body": ""}
-    except Exception as exc:
-        logger.error("LLM rewrite failed for item: %s", exc)
-        content = item.get("full_text") or item.get("text") or item.get("summary") or ""
-        return {"headline": content[:50], "body": content}
+            tokens = int(len(prompt) / 4) + int(len(rewritten) / 4)
+        return rewritten, tokens
+
+    raise RuntimeError("unreachable")  # pragma: no cover
 
 
-def rewrite_batch(items: list[dict[str, str]]) -> list[dict[str, str]]:
-    """Rewrite multiple items with improved caching and concurrent processing"""
+def _admit_within_budget(prompts: list[str], indices: list[int]) -> list[int]:
+    """Indices whose estimated prompt cost fits in this month's remaining budget."""
+    cost_per_1k = float(get("OPENROUTER_COST_PER_1K_USD", "0.005"))
+    monthly_budget = float(get("LLM_BUDGET_MONTHLY_USD", "10"))
+    usage = get_month_usage(datetime.utcnow().strftime("%Y-%m"))
+    projected = usage.cost_usd if usage else 0.0
+
+    admitted = []
+    for idx in indices:
+        projected += int(len(prompts[idx]) / 4) / 1000 * cost_per_1k
+        if projected > monthly_budget:
+            logger.warning(
+                f"LLM budget exceeded; keeping original text for {len(indices) - len(admitted)} items"
+            )
+            break
+        admitted.append(idx)
+    return admitted
+
+
+async def rewrite_batch_async(
+    items: list[dict[str, str]],
+    concurrency: int | None = None,
+    limiter: APIRateLimiter | None = None,
+) -> list[dict[str, str]]:
+    """Rewrite *items* concurrently; see :func:`rewrite_batch`."""
     if not items:
         return []
 
-    results: list[dict[str, str]] = [None] * len(items)  # type: ignore
-
-    # Build prompts and check cache first
-    prompts = [
-        PROMPT_TEMPLATE.format(
-            content=(it.get("full_text") or it.get("text") or it.get("summary") or "")[
-                :1000
-            ]
-        )
-        for it in items
-    ]
+    limiter = limiter or api_limiter
+    concurrency = concurrency or limiter.max_concurrency("openai")
+    prompts = [PROMPT_TEMPLATE.format(content=_item_content(it)[:1000]) for it in items]
+    results: list[dict[str, str]] = [_original(it) for it in items]
 
+    cached = llm_cache.get_many(prompts)
     uncached_indices = []
-    for idx, p in enumerate(prompts):
-        cached = llm_cache.get(p)
-        if cached:
-            text = cached["text"]
-            parts = text.split("\n", 1)
-            results[idx] = {
-                "headline": parts[0],
-                "body": parts[1] if len(parts) == 2 else "",
-            }
+    for idx, prompt in enumerate(prompts):
+        if prompt in cached:
+            results[idx] = _split_rewrite(cached[prompt]["text"])
         else:
             uncached_indices.append(idx)
 
     if not uncached_indices:
         return results  # all cached
 
-    # Process uncached items with controlled concurrency
-    semaphore = asyncio.Semaphore(5)  # Limit concurrent requests
+    client = get_async_client()
+    if not client:
+        logger.warning("No OpenAI/OpenRouter API key; returning original text")
+        return results
 
-    async def process_with_semaphore(idx: int):
+    admitted = _admit_within_budget(prompts, uncached_indices)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def rewrite_one(idx: int) -> tuple[str, int]:
         async with semaphore:
-            return await _rewrite_single_item(items[idx], prompts[idx])
-
-    async def process_all():
-        tasks = [process_with_semaphore(idx) for idx in uncached_indices]
-        completed_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        for _i, (idx, result) in enumerate(zip(uncached_indices, completed_results, strict=False)):
-            if isinstance(result, Exception):
-                logger.error("Task failed for index %s: %s", idx, result)
-                # Fallback to original content
-                content = (
-                    items[idx].get("full_text")
-                    or items[idx].get("text")
-                    or items[idx].get("summary")
-                    or ""
-                )
-                results[idx] = {"headline": content[:50], "body": content}
-            else:
-                results[idx] = result
-
-    # Run async processing
-    try:
-        asyncio.run(process_all())
-    except Exception as exc:
-        logger.error("Batch processing failed, falling back to sequential: %s", exc)
-        # Fallback to sequential processing
-        for idx in uncached_indices:
-            try:
-                results[idx] = rewrite_content(items[idx])
-            except Exception as e:
-                logger.error("Sequential processing failed for item %s: %s", idx, e)
-                # Final fallback
-                content = (
-                    items[idx].get("full_text")
-                    or items[idx].get("text")
-                    or items[idx].get("summary")
-                    or ""
-                )
-                results[idx] = {"headline": content[:50], "body": content}
+            return await _complete_with_retry(client, prompts[idx], limiter)
 
+    start = time.perf_counter()
+    try:
+        completed = await asyncio.gather(
+            *(rewrite_one(idx) for idx in admitted), return_exceptions=True
+        )
+    finally:
+        await client.close()
+
+    batch_tokens = 0
+    failures = 0
+    fresh = {}
+    for idx, outcome in zip(admitted, completed, strict=True):
+        if isinstance(outcome, BaseException):
+            failures += 1
+            logger.error(f"LLM rewrite failed for item {idx}: {outcome}")
+            continue
+        rewritten, tokens = outcome
+        fresh[prompts[idx]] = {"text": rewritten}
+        results[idx] = _split_rewrite(rewritten)
+        batch_tokens += tokens
+
+    # One cache transaction and one usage row update per batch
+    llm_cache.set_many(fresh)
+    if batch_tokens:
+        cost_per_1k = float(get("OPENROUTER_COST_PER_1K_USD", "0.005"))
+        add_llm_tokens(batch_tokens, batch_tokens / 1000 * cost_per_1k)
+    logger.info(
+        f"LLM batch rewrite: {len(admitted) - failures}/{len(uncached_indices)} rewritten, "
+        f"{len(items) - len(uncached_indices)} cached, {failures} failed, "
+        f"{batch_tokens} tokens in {time.perf_counter() - start:.2f}s "
+        f"(concurrency {concurrency})"
+    )
     return results
+
+
+def rewrite_batch(
+    items: list[dict[str, str]],
+    concurrency: int | None = None,
+    limiter: APIRateLimiter | None = None,
+) -> list[dict[str, str]]:
+    """Rewrite multiple items concurrently, reusing cached rewrites.
+
+    Uncached items are sent through one shared ``AsyncOpenAI`` client, at most
+    *concurrency* at a time (default: ``api_limiter.max_concurrency("openai")``,
+    i.e. ``OPENAI_MAX_CONCURRENCY``) and within the limiter's per-minute rate.
+    Transient errors are retried with jittered exponential backoff. Items
+    that fail, or that would exceed the monthly budget, keep their original
+    text. Token usage is recorded once for the whole batch.
+    """
+    if not items:
+        return []
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(rewrite_batch_async(items, concurrency, limiter))
+
+    # Called from inside an event loop (asyncio.run would fail): rewrite
+    # sequentially; async callers should await rewrite_batch_async instead.
+    logger.warning("rewrite_batch called from a running event loop; rewriting sequentially")
+    return [rewrite_content(item) for item in items]
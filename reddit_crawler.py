@@ -25,6 +25,8 @@ except ImportError:
     GCS_AVAILABLE = False
     print("Warning: Google Cloud Storage not available")
 
+from utils.seen_store import get_seen_store
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -36,11 +38,18 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def post_key(post: dict[str, Any]) -> str:
+    """Seen-store key of a post: its permalink."""
+    return post["link"]
+
+
 class RedditCrawler:
     def __init__(self):
         self.cloud_only = True
         self.gcs_bucket = "degen-digest-data"
         self.project_id = "lucky-union-463615-t3"
+        # Posts already uploaded by earlier crawls (see utils.seen_store)
+        self.seen = get_seen_store()
 
     def get_gcs_client(self):
         """Get GCS client if available"""
@@ -244,8 +253,19 @@ class RedditCrawler:
         # Crawl Reddit
         reddit_data = await self.crawl_reddit()
 
+        # Only upload posts that earlier crawls have not
+        crawled = reddit_data["posts"]
+        reddit_data["posts"] = self.seen.unseen("reddit", crawled, key=post_key)
+        reddit_data["metadata"]["count"] = len(reddit_data["posts"])
+        reddit_data["metadata"]["seen_before"] = len(crawled) - len(reddit_data["posts"])
+        if crawled and not reddit_data["posts"]:
+            self.seen.mark("reddit", map(post_key, crawled))
+            logger.info(f"No new posts ({len(crawled)} seen before), skipping upload")
+            return reddit_data
+
         # Upload to GCS
         if self.upload_to_gcs(reddit_data):
+            self.seen.mark("reddit", map(post_key, crawled))
             logger.info("✅ Reddit crawl session completed successfully")
         else:
             logger.error("❌ Failed to upload Reddit data")
@@ -7,10 +7,11 @@ import json
 from datetime import UTC, datetime, timezone
 from pathlib import Path
 
-import httpx
 import psycopg2
 
+from processor.keyword_matcher import meme_tags
 from utils.advanced_logging import get_logger
+from utils.http_client import session
 from utils.logger import setup_logging
 
 setup_logging()
@@ -36,6 +37,8 @@ def get_db_connection():
         return None
 
 def upsert_crypto_token(conn, token_data):
+    # Classified here so /api/crypto/meme-coins is an index lookup
+    tags = meme_tags(token_data.get('name'), token_data.get('symbol'))
     try:
         cursor = conn.cursor()
         cursor.execute("""
@@ -50,6 +53,8 @@ def upsert_crypto_token(conn, token_data):
                     price_change_24h = %s,
                     market_cap = %s,
                     volume_24h = %s,
+                    is_meme = %s,
+                    meme_tags = %s::text[],
                     last_updated_at = NOW()
                 WHERE id = %s
             """, (
@@ -58,6 +63,8 @@ def upsert_crypto_token(conn, token_data):
                 token_data.get('price_change_24h', 0),
                 token_data.get('market_cap', 0),
                 token_data.get('volume_24h', 0),
+                bool(tags),
+                tags,
                 existing[0]
             ))
             token_id = existing[0]
@@ -66,8 +73,9 @@ def upsert_crypto_token(conn, token_data):
             cursor.execute("""
                 INSERT INTO crypto_tokens (
                     symbol, name, network, contract_address, market_cap, 
-                    price_usd, volume_24h, price_change_24h, first_seen_at, last_updated_at
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
+                    price_usd, volume_24h, price_change_24h, is_meme, meme_tags,
+                    first_seen_at, last_updated_at
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s::text[], NOW(), NOW())
                 RETURNING id
             """, (
                 token_data.get('symbol', ''),
@@ -77,7 +85,9 @@ def upsert_crypto_token(conn, token_data):
                 token_data.get('market_cap', 0),
                 token_data.get('price_usd', 0),
                 token_data.get('volume_24h', 0),
-                token_data.get('price_change_24h', 0)
+                token_data.get('price_change_24h', 0),
+                bool(tags),
+                tags,
             ))
             token_id = cursor.fetchone()[0]
             logger.info(f"Inserted token: {token_data.get('symbol')} (ID: {token_id})")
@@ -97,7 +107,7 @@ def fetch_top_gainers(limit: int = 20) -> list[dict]:
         "price_change_percentage": "24h",
     }
     logger.info("coingecko request", limit=limit)
-    resp = httpx.get(API_URL, params=params, timeout=30)
+    resp = session.get(API_URL, params=params, timeout=30)
     resp.raise_for_status()
     data = resp.json()
     return data
@@ -1,9 +1,16 @@
 import json
+import os
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
-import os
+
 import psycopg2
-import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processor.keyword_matcher import meme_tags
+from scrapers.fetch_pipeline import fetch_all
+from utils.http_client import session
 
 API_BASE = "https://api.dexpaprika.com"
 
@@ -25,6 +32,8 @@ def get_db_connection():
         return None
 
 def upsert_crypto_token(conn, token_data):
+    # Classified here so /api/crypto/meme-coins is an index lookup
+    tags = meme_tags(token_data.get('name'), token_data.get('symbol'))
     try:
         cursor = conn.cursor()
         cursor.execute("""
@@ -39,6 +48,8 @@ def upsert_crypto_token(conn, token_data):
                     price_change_24h = %s,
                     market_cap = %s,
                     volume_24h = %s,
+                    is_meme = %s,
+                    meme_tags = %s::text[],
                     last_updated_at = NOW()
                 WHERE id = %s
             """, (
@@ -47,6 +58,8 @@ def upsert_crypto_token(conn, token_data):
                 token_data.get('price_change_24h', 0),
                 token_data.get('market_cap', 0),
                 token_data.get('volume_24h', 0),
+                bool(tags),
+                tags,
                 existing[0]
             ))
             token_id = existing[0]
@@ -55,8 +68,9 @@ def upsert_crypto_token(conn, token_data):
             cursor.execute("""
                 INSERT INTO crypto_tokens (
                     symbol, name, network, contract_address, market_cap, 
-                    price_usd, volume_24h, price_change_24h, first_seen_at, last_updated_at
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
+                    price_usd, volume_24h, price_change_24h, is_meme, meme_tags,
+                    first_seen_at, last_updated_at
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s::text[], NOW(), NOW())
                 RETURNING id
             """, (
                 token_data.get('symbol', ''),
@@ -66,7 +80,9 @@ def upsert_crypto_token(conn, token_data):
                 token_data.get('market_cap', 0),
                 token_data.get('price_usd', 0),
                 token_data.get('volume_24h', 0),
-                token_data.get('price_change_24h', 0)
+                token_data.get('price_change_24h', 0),
+                bool(tags),
+                tags,
             ))
             token_id = cursor.fetchone()[0]
             print(f"Inserted token: {token_data.get('symbol')} (ID: {token_id})")
@@ -80,7 +96,7 @@ def upsert_crypto_token(conn, token_data):
 def fetch_token_data(network_id: str, token_address: str):
     """Fetch detailed token data from DexPaprika"""
     url = f"{API_BASE}/networks/{network_id}/tokens/{token_address}"
-    resp = requests.get(url, timeout=30)
+    resp = session.get(url, timeout=30)
     resp.raise_for_status()
     return resp.json()
 
@@ -88,7 +104,7 @@ def fetch_token_data(network_id: str, token_address: str):
 def fetch_networks():
     """Fetch supported networks"""
     url = f"{API_BASE}/networks"
-    resp = requests.get(url, timeout=30)
+    resp = session.get(url, timeout=30)
     resp.raise_for_status()
     return resp.json()
 
@@ -105,6 +121,49 @@ def fetch_token_prices(network_id: str, token_addresses: list):
     return results
 
 
+# Async variants for crawl cycles that fan out (continuous_dexpaprika_crawler.py).
+# DexPaprika has no multi-token endpoint, so token lookups run concurrently
+# instead, capped by the shared session at the API's API_CONCURRENCY entry.
+
+
+async def _aget_json(path):
+    resp = await session.aget(f"{API_BASE}{path}", timeout=30)
+    resp.raise_for_status()
+    return resp.json()
+
+
+async def afetch_token_data(network_id: str, token_address: str):
+    """Fetch detailed token data from DexPaprika (async)"""
+    return await _aget_json(f"/networks/{network_id}/tokens/{token_address}")
+
+
+async def afetch_networks():
+    """Fetch supported networks (async)"""
+    return await _aget_json("/networks")
+
+
+async def fetch_dexpaprika_snapshot(network_id: str, token_addresses: list):
+    """Fetch networks and every token concurrently.
+
+    Returns ``(networks, token_data, metrics)``. *token_data* maps each
+    token address to its data, in the order given; tokens that fail or
+    return nothing are left out (as ``fetch_token_prices`` does) and failures
+    are reported in the per-endpoint *metrics*.
+    """
+    metrics = {}
+    calls = {"networks": afetch_networks()}
+    for address in token_addresses:
+        calls[f"token:{address}"] = afetch_token_data(network_id, address)
+    results = await fetch_all(calls, metrics, defaults={"networks": []})
+    networks = results.pop("networks")
+    token_data = {
+        address: data
+        for address in token_addresses
+        if (data := results[f"token:{address}"]) is not None
+    }
+    return networks, token_data, metrics
+
+
 def main():
     # Example Solana tokens to track
     solana_tokens = [
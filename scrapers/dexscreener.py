@@ -1,8 +1,15 @@
 import json
-from pathlib import Path
 import os
+import sys
+from pathlib import Path
+
 import psycopg2
-import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processor.keyword_matcher import meme_tags
+from scrapers.fetch_pipeline import chunked, fetch_all
+from utils.http_client import session
 
 API_BASE = "https://api.dexscreener.com"
 
@@ -24,6 +31,8 @@ def get_db_connection():
         return None
 
 def upsert_crypto_token(conn, token_data):
+    # Classified here so /api/crypto/meme-coins is an index lookup
+    tags = meme_tags(token_data.get('name'), token_data.get('symbol'))
     try:
         cursor = conn.cursor()
         cursor.execute("""
@@ -38,6 +47,8 @@ def upsert_crypto_token(conn, token_data):
                     price_change_24h = %s,
                     market_cap = %s,
                     volume_24h = %s,
+                    is_meme = %s,
+                    meme_tags = %s::text[],
                     last_updated_at = NOW()
                 WHERE id = %s
             """, (
@@ -46,6 +57,8 @@ def upsert_crypto_token(conn, token_data):
                 token_data.get('price_change_24h', 0),
                 token_data.get('market_cap', 0),
                 token_data.get('volume_24h', 0),
+                bool(tags),
+                tags,
                 existing[0]
             ))
             token_id = existing[0]
@@ -54,8 +67,9 @@ def upsert_crypto_token(conn, token_data):
             cursor.execute("""
                 INSERT INTO crypto_tokens (
                     symbol, name, network, contract_address, market_cap, 
-                    price_usd, volume_24h, price_change_24h, first_seen_at, last_updated_at
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
+                    price_usd, volume_24h, price_change_24h, is_meme, meme_tags,
+                    first_seen_at, last_updated_at
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s::text[], NOW(), NOW())
                 RETURNING id
             """, (
                 token_data.get('symbol', ''),
@@ -65,7 +79,9 @@ def upsert_crypto_token(conn, token_data):
                 token_data.get('market_cap', 0),
                 token_data.get('price_usd', 0),
                 token_data.get('volume_24h', 0),
-                token_data.get('price_change_24h', 0)
+                token_data.get('price_change_24h', 0),
+                bool(tags),
+                tags,
             ))
             token_id = cursor.fetchone()[0]
             print(f"Inserted token: {token_data.get('symbol')} (ID: {token_id})")
@@ -78,46 +94,175 @@ def upsert_crypto_token(conn, token_data):
 
 def fetch_latest_token_profiles():
     url = f"{API_BASE}/token-profiles/latest/v1"
-    resp = requests.get(url, timeout=30)
+    resp = session.get(url, timeout=30)
     resp.raise_for_status()
     return resp.json()
 
 def fetch_latest_boosted_tokens():
     url = f"{API_BASE}/token-boosts/latest/v1"
-    resp = requests.get(url, timeout=30)
+    resp = session.get(url, timeout=30)
     resp.raise_for_status()
     return resp.json()
 
 def fetch_top_boosted_tokens():
     url = f"{API_BASE}/token-boosts/top/v1"
-    resp = requests.get(url, timeout=30)
+    resp = session.get(url, timeout=30)
     resp.raise_for_status()
     return resp.json()
 
 def fetch_token_pairs(chain_id, token_address):
     url = f"{API_BASE}/token-pairs/v1/{chain_id}/{token_address}"
-    resp = requests.get(url, timeout=30)
+    resp = session.get(url, timeout=30)
     resp.raise_for_status()
     return resp.json()
 
 def fetch_tokens_by_address(chain_id, token_addresses):
     url = f"{API_BASE}/tokens/v1/{chain_id}/{token_addresses}"
-    resp = requests.get(url, timeout=30)
+    resp = session.get(url, timeout=30)
     resp.raise_for_status()
     return resp.json()
 
 def fetch_pair_by_id(chain_id, pair_id):
     url = f"{API_BASE}/latest/dex/pairs/{chain_id}/{pair_id}"
-    resp = requests.get(url, timeout=30)
+    resp = session.get(url, timeout=30)
     resp.raise_for_status()
     return resp.json()
 
 def fetch_search_pairs(query):
     url = f"{API_BASE}/latest/dex/search"
-    resp = requests.get(url, params={"q": query}, timeout=30)
+    resp = session.get(url, params={"q": query}, timeout=30)
     resp.raise_for_status()
     return resp.json()
 
+
+# Async variants for crawl cycles that fan out (continuous_dexscreener_crawler.py).
+# Requests go through the shared session, which caps DexScreener at its
+# API_CONCURRENCY entry and its per-minute quota.
+
+# /tokens/v1 accepts up to 30 comma-separated addresses per request
+MAX_ADDRESSES_PER_REQUEST = 30
+
+
+async def _aget_json(path, params=None):
+    resp = await session.aget(f"{API_BASE}{path}", params=params, timeout=30)
+    resp.raise_for_status()
+    return resp.json()
+
+
+async def afetch_latest_token_profiles():
+    return await _aget_json("/token-profiles/latest/v1")
+
+
+async def afetch_latest_boosted_tokens():
+    return await _aget_json("/token-boosts/latest/v1")
+
+
+async def afetch_top_boosted_tokens():
+    return await _aget_json("/token-boosts/top/v1")
+
+
+async def afetch_token_pairs(chain_id, token_address):
+    return await _aget_json(f"/token-pairs/v1/{chain_id}/{token_address}")
+
+
+async def afetch_tokens_by_address(chain_id, token_addresses):
+    return await _aget_json(f"/tokens/v1/{chain_id}/{token_addresses}")
+
+
+async def afetch_pair_by_id(chain_id, pair_id):
+    return await _aget_json(f"/latest/dex/pairs/{chain_id}/{pair_id}")
+
+
+async def afetch_search_pairs(query):
+    return await _aget_json("/latest/dex/search", params={"q": query})
+
+
+def items_by_token(data):
+    """Snapshot contents keyed for change tracking (``AdaptiveScheduler.observe``):
+    listing entries per listing and token, pairs grouped by base token address"""
+    items = {}
+    for key in ("latest_token_profiles", "latest_boosted_tokens", "top_boosted_tokens"):
+        listing = data.get(key) or []
+        if isinstance(listing, dict):
+            listing = listing.get("tokens", [])
+        for token in listing:
+            items[f"{key}:{token.get('chainId')}:{token.get('tokenAddress')}"] = token
+    for key in ("tokens_by_address", "discovered_token_pairs"):
+        for pair in data.get(key) or []:
+            address = (pair.get("baseToken") or {}).get("address")
+            if address:
+                items.setdefault(address, []).append(pair)
+    return items
+
+
+def discovered_addresses(*listings, exclude=()):
+    """{chain_id: [token addresses]} found in profile/boost listings, deduplicated in order"""
+    seen = set(exclude)
+    by_chain = {}
+    for listing in listings:
+        if isinstance(listing, dict):
+            listing = listing.get("tokens", [])
+        for token in listing or []:
+            chain_id = token.get("chainId")
+            address = token.get("tokenAddress")
+            if chain_id and address and (chain_id, address) not in seen:
+                seen.add((chain_id, address))
+                by_chain.setdefault(chain_id, []).append(address)
+    return by_chain
+
+
+async def fetch_dexscreener_snapshot(chain_id, tracked_tokens, pair_id, search_query, select=None):
+    """Fetch every endpoint of a crawl cycle concurrently.
+
+    Returns ``(data, metrics)``: the same keys ``main()`` collects, plus
+    ``discovered_token_pairs`` (pairs for every token seen in the profile and
+    boost listings, looked up 30 addresses per request), and per-endpoint
+    latency/outcome metrics.
+
+    *select*, if given, picks which discovered addresses of a chain to look
+    up this cycle (e.g. ``AdaptiveScheduler.select``), in priority order.
+    """
+    metrics = {}
+    data = await fetch_all(
+        {
+            "latest_token_profiles": afetch_latest_token_profiles(),
+            "latest_boosted_tokens": afetch_latest_boosted_tokens(),
+            "top_boosted_tokens": afetch_top_boosted_tokens(),
+            "token_pairs": afetch_token_pairs(chain_id, tracked_tokens[0]),
+            "tokens_by_address": afetch_tokens_by_address(chain_id, ",".join(tracked_tokens)),
+            "pair_by_id": afetch_pair_by_id(chain_id, pair_id),
+            "search_pairs": afetch_search_pairs(search_query),
+        },
+        metrics,
+        defaults={
+            "latest_token_profiles": [],
+            "latest_boosted_tokens": [],
+            "top_boosted_tokens": [],
+            "token_pairs": [],
+            "tokens_by_address": [],
+            "pair_by_id": {},
+            "search_pairs": {},
+        },
+    )
+
+    # Follow-up lookups for newly listed/boosted tokens, batched per chain
+    by_chain = discovered_addresses(
+        data["latest_token_profiles"],
+        data["latest_boosted_tokens"],
+        data["top_boosted_tokens"],
+        exclude={(chain_id, address) for address in tracked_tokens},
+    )
+    if select is not None:
+        by_chain = {chain: select(addresses) for chain, addresses in by_chain.items()}
+    batches = {
+        f"tokens_batch:{chain}:{i}": afetch_tokens_by_address(chain, ",".join(batch))
+        for chain, addresses in by_chain.items()
+        for i, batch in enumerate(chunked(addresses, MAX_ADDRESSES_PER_REQUEST))
+    }
+    results = await fetch_all(batches, metrics, defaults=dict.fromkeys(batches, []))
+    data["discovered_token_pairs"] = [pair for pairs in results.values() for pair in pairs or []]
+    return data, metrics
+
 def main():
     solana_token = "So11111111111111111111111111111111111111112"
     usdc_token = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
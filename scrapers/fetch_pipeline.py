@@ -0,0 +1,74 @@
+"""Concurrent fan-out of independent API calls with per-endpoint timings.
+
+Crawl cycles fetch several endpoints that do not depend on each other.
+``fetch_all`` runs them together on the event loop (through the shared
+``utils.http_client.session``, which applies the per-API concurrency and
+quota limits) and records how long each one took, so a slow or failing
+endpoint shows up in the cycle metadata instead of stalling the others.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Iterable
+from typing import Any
+
+from utils.advanced_logging import get_logger
+
+logger = get_logger(__name__)
+
+
+async def timed(
+    name: str, call: Awaitable[Any], metrics: dict[str, dict], default: Any = None
+) -> Any:
+    """Await *call*, storing its latency and outcome in ``metrics[name]``.
+
+    Errors are logged and recorded; *default* is returned in their place.
+    """
+    start = time.perf_counter()
+    try:
+        result = await call
+    except Exception as exc:
+        metrics[name] = {
+            "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+            "ok": False,
+            "error": f"{type(exc).__name__}: {exc}",
+        }
+        logger.warning(f"{name} failed: {exc}")
+        return default
+    metrics[name] = {
+        "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+        "ok": True,
+        "items": len(result) if isinstance(result, list | dict) else None,
+    }
+    return result
+
+
+async def fetch_all(
+    calls: dict[str, Awaitable[Any]],
+    metrics: dict[str, dict],
+    defaults: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Run named calls concurrently; returns ``{name: result or default}``."""
+    defaults = defaults or {}
+    names = list(calls)
+    results = await asyncio.gather(
+        *(timed(n, calls[n], metrics, defaults.get(n)) for n in names)
+    )
+    return dict(zip(names, results, strict=True))
+
+
+def chunked(items: Iterable[Any], size: int) -> list[list[Any]]:
+    """Split *items* into lists of at most *size*, preserving order."""
+    items = list(items)
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def summarize(metrics: dict[str, dict]) -> str:
+    """One-line ``name=123ms`` summary, slowest first."""
+    ordered = sorted(metrics.items(), key=lambda kv: kv[1]["latency_ms"], reverse=True)
+    return ", ".join(
+        f"{name}={m['latency_ms']:.0f}ms" + ("" if m["ok"] else " (failed)")
+        for name, m in ordered
+    )
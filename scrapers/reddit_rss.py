@@ -10,7 +10,6 @@ from datetime import UTC, datetime, timezone
 from pathlib import Path
 
 import feedparser
-import httpx
 from dateutil import parser as dateparser
 
 # DB insertion optional – only if table/model exists. Import guarded.
@@ -19,6 +18,7 @@ try:
 except ImportError:
     add_reddit_posts = None  # type: ignore
 from utils.advanced_logging import get_logger
+from utils.http_client import session
 from utils.logger import setup_logging
 
 logger = get_logger(__name__)
@@ -51,9 +51,8 @@ REDDIT_FEEDS = [
 async def parse_reddit_feed_async(url: str, keyword_filters: list[str]) -> list[dict]:
     """Fetch RSS feed and filter entries by keywords (async)."""
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, timeout=30)
-            resp.raise_for_status()
+        resp = await session.aget(url, timeout=30)
+        resp.raise_for_status()
         feed = feedparser.parse(resp.content)
         entries = []
         for item in feed.entries:
@@ -99,8 +98,10 @@ def scrape_reddit(keyword_filters: list[str]):
         return await parse_reddit_feed_async(url, keyword_filters)
 
     async def gather_all():
-        results = await asyncio.gather(*[worker(u) for u in REDDIT_FEEDS])
-        return results
+        try:
+            return await asyncio.gather(*[worker(u) for u in REDDIT_FEEDS])
+        finally:
+            await session.aclose()
 
     results = asyncio.run(gather_all())
     for entries in results:
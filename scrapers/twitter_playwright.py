@@ -14,7 +14,8 @@ from pathlib import Path
 from typing import Any
 
 from playwright.async_api import async_playwright
-from textblob import TextBlob
+
+from processor.sentiment import textblob_sentiment
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -275,14 +276,7 @@ class TwitterPlaywrightCrawler:
 
     def analyze_sentiment(self, text: str) -> dict[str, float]:
         """Analyze sentiment of tweet text"""
-        try:
-            blob = TextBlob(text)
-            return {
-                "polarity": blob.sentiment.polarity,
-                "subjectivity": blob.sentiment.subjectivity,
-            }
-        except Exception:
-            return {"polarity": 0.0, "subjectivity": 0.0}
+        return textblob_sentiment(text)
 
     async def crawl_continuously(
         self, interval_minutes: int = 5, max_tweets_per_query: int = 30
@@ -33,7 +33,7 @@ except ImportError:
     PLAYWRIGHT_AVAILABLE = False
     print("Warning: Playwright not available. Install with: pip install playwright")
 
-from textblob import TextBlob
+from processor.sentiment import textblob_sentiment
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -1379,14 +1379,7 @@ class EnhancedTwitterPlaywrightCrawler:
 
     def analyze_sentiment(self, text: str) -> dict[str, float]:
         """Analyze sentiment of tweet text"""
-        try:
-            blob = TextBlob(text)
-            return {
-                "polarity": blob.sentiment.polarity,
-                "subjectivity": blob.sentiment.subjectivity,
-            }
-        except Exception:
-            return {"polarity": 0.0, "subjectivity": 0.0}
+        return textblob_sentiment(text)
 
     async def run_single_crawl(
         self, max_tweets_per_query: int = 10
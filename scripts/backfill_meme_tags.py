@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Backfill the is_meme/meme_tags columns of crypto_tokens.
+
+The crawlers classify tokens in ``upsert_crypto_token``; rows written
+before that, or by loaders that do not classify (the GCS migrators), have
+``meme_tags IS NULL``. This walks those rows in id order and stores
+``processor.keyword_matcher.meme_tags(name, symbol)``. Adds the columns
+where they are missing; safe to re-run, e.g. after the migrators. Use
+``--all`` to reclassify every row after config/keywords.py changes.
+
+    python scripts/backfill_meme_tags.py
+    python scripts/backfill_meme_tags.py --all
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from processor.keyword_matcher import meme_tags  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "34.9.71.174"),
+    "database": os.getenv("DB_NAME", "degen_digest"),
+    "user": os.getenv("DB_USER", "postgres"),
+    "password": os.getenv("DB_PASSWORD", "DegenDigest2024!"),
+    "port": os.getenv("DB_PORT", "5432"),
+}
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def ensure_columns(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "ALTER TABLE crypto_tokens "
+            "ADD COLUMN IF NOT EXISTS is_meme BOOLEAN NOT NULL DEFAULT FALSE"
+        )
+        cursor.execute(
+            "ALTER TABLE crypto_tokens ADD COLUMN IF NOT EXISTS meme_tags TEXT[]"
+        )
+    conn.commit()
+
+
+def backfill(conn, batch_size=DEFAULT_BATCH_SIZE, recompute=False):
+    """Classify crypto_tokens rows; returns (rows classified, meme coins)"""
+    pending = "" if recompute else "AND meme_tags IS NULL"
+    last_id = 0
+    classified = memes = 0
+    start = time.time()
+
+    while True:
+        with conn.cursor() as cursor:
+            # Keyset pagination: each batch is an index range scan on id
+            cursor.execute(
+                f"""
+                SELECT id, name, symbol FROM crypto_tokens
+                WHERE id > %s {pending}
+                ORDER BY id
+                LIMIT %s
+                """,
+                (last_id, batch_size),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            values = []
+            for row_id, name, symbol in rows:
+                tags = meme_tags(name, symbol)
+                memes += bool(tags)
+                values.append((row_id, bool(tags), tags))
+            execute_values(
+                cursor,
+                """
+                UPDATE crypto_tokens AS t
+                SET is_meme = v.is_meme, meme_tags = v.meme_tags
+                FROM (VALUES %s) AS v (id, is_meme, meme_tags)
+                WHERE t.id = v.id
+                """,
+                values,
+                template="(%s, %s::boolean, %s::text[])",
+                page_size=batch_size,
+            )
+        conn.commit()
+
+        last_id = rows[-1][0]
+        classified += len(rows)
+        logger.info(f"crypto_tokens: {classified} rows classified (last id {last_id})")
+
+    elapsed = time.time() - start
+    rate = classified / elapsed if elapsed else 0
+    logger.info(
+        f"✅ crypto_tokens: classified {classified} rows, {memes} meme coins, "
+        f"in {elapsed:.1f}s ({rate:.0f} rows/s)"
+    )
+    return classified, memes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill crypto_tokens meme tags")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument(
+        "--all", action="store_true", help="reclassify rows that already have tags"
+    )
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        ensure_columns(conn)
+        backfill(conn, args.batch_size, recompute=args.all)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
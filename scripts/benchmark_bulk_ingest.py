@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark storage.db tweet ingestion: per-row lookups vs bulk insert.
+
+Usage:
+    python scripts/benchmark_bulk_ingest.py [--db-url postgresql://...]
+
+Defaults to a throwaway SQLite file. Each size is ingested twice so the
+second pass measures the all-duplicates path.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from storage.db import Tweet, _tweet_row, add_tweets
+
+SIZES = [1_000, 10_000, 100_000]
+
+
+def make_tweets(n: int, offset: int = 0) -> list[dict]:
+    return [
+        {
+            "id": str(offset + i),
+            "text": f"$PEPE to the moon #{i}",
+            "userScreenName": f"user{i % 500}",
+            "userFollowersCount": i % 10_000,
+            "likeCount": i % 100,
+            "retweetCount": i % 30,
+            "replyCount": i % 7,
+            "createdAt": "2025-07-01T12:00:00Z",
+        }
+        for i in range(n)
+    ]
+
+
+def legacy_add_tweets(tweets: list[dict], eng) -> None:
+    """The previous implementation: one SELECT per row inside one session."""
+    from datetime import UTC, datetime
+
+    now = datetime.now(UTC)
+    with Session(eng) as session:
+        for t in tweets:
+            row = _tweet_row(t, now)
+            existing = session.exec(
+                select(Tweet).where(Tweet.tweet_id == row["tweet_id"])
+            ).first()
+            if existing:
+                continue
+            session.add(Tweet(**row))
+        session.commit()
+
+
+def fresh_engine(db_url: str | None, tmpdir: str, name: str):
+    eng = create_engine(db_url or f"sqlite:///{tmpdir}/{name}.db")
+    SQLModel.metadata.drop_all(eng, tables=[Tweet.__table__])
+    SQLModel.metadata.create_all(eng, tables=[Tweet.__table__])
+    return eng
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db-url", help="SQLAlchemy URL (default: temp SQLite)")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument(
+        "--skip-legacy-above",
+        type=int,
+        default=10_000,
+        help="Skip the slow per-row path for larger sizes",
+    )
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'path':>8} {'insert r/s':>12} {'re-run r/s':>12}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for n in SIZES:
+            tweets = make_tweets(n)
+
+            eng = fresh_engine(args.db_url, tmpdir, f"bulk_{n}")
+            bulk = partial(add_tweets, tweets, args.chunk_size, bind=eng)
+            first = timed(bulk)
+            second = timed(bulk)
+            print(f"{n:>8} {'bulk':>8} {n / first:>12,.0f} {n / second:>12,.0f}")
+
+            if n > args.skip_legacy_above:
+                continue
+            eng = fresh_engine(args.db_url, tmpdir, f"legacy_{n}")
+            legacy = partial(legacy_add_tweets, tweets, eng)
+            first = timed(legacy)
+            second = timed(legacy)
+            print(f"{n:>8} {'per-row':>8} {n / first:>12,.0f} {n / second:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
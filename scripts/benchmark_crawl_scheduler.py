@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Simulate a day of DexPaprika-style polling: fixed 7-minute cycles versus
+``utils.crawl_scheduler.AdaptiveScheduler``.
+
+Usage:
+    python scripts/benchmark_crawl_scheduler.py [--tokens 20] [--volatile 4] [--hours 24]
+
+Each poll costs one call for the network list plus one per token looked up.
+A few tokens trade in bursts (a change most minutes for an hour or two,
+then quiet); the rest barely move. Reports total calls and how long a
+price change waits before a poll picks it up.
+"""
+
+import argparse
+import logging
+import random
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from utils import crawl_scheduler  # noqa: E402
+from utils.crawl_scheduler import AdaptiveScheduler  # noqa: E402
+
+BASE_INTERVAL = 7 * 60
+
+
+def change_times(rng, minutes, volatile):
+    """Minute offsets (in seconds) at which a token's price changes."""
+    times = []
+    hot_until = -1
+    for minute in range(minutes):
+        if volatile and minute > hot_until and rng.random() < 1 / 240:
+            hot_until = minute + rng.randint(60, 150)
+        p = 0.6 if minute <= hot_until else (0.01 if volatile else 0.003)
+        if rng.random() < p:
+            times.append(minute * 60 + rng.uniform(0, 60))
+    return times
+
+
+def simulate(changes, horizon, poll):
+    """Run *poll* until *horizon*; returns (calls, {token: detection delays}).
+
+    A change's delay is the time until the token is next fetched.
+    """
+    versions = dict.fromkeys(changes, 0)
+    upcoming = {token: list(times) for token, times in changes.items()}
+    unseen = {token: [] for token in changes}
+    delays = {token: [] for token in changes}
+    now, calls = 0.0, 0
+    while now < horizon:
+        for token, times in upcoming.items():
+            while times and times[0] <= now:
+                unseen[token].append(times.pop(0))
+                versions[token] += 1
+        fetched, cost, wait = poll(now, versions)
+        calls += cost
+        for token in fetched:
+            delays[token].extend(now - t for t in unseen[token])
+            unseen[token] = []
+        now += wait
+    return calls, delays
+
+
+def run(label, changes, horizon, poll, volatile_tokens):
+    calls, delays = simulate(changes, horizon, poll)
+    hot = [d for token in volatile_tokens for d in delays[token]]
+    calm = [
+        d for token, ds in delays.items() if token not in volatile_tokens for d in ds
+    ]
+    print(
+        f"{label:<10} calls={calls:>6}  volatile median={statistics.median(hot):6.0f}s "
+        f"mean={statistics.mean(hot):6.0f}s  calm mean={statistics.mean(calm):6.0f}s"
+    )
+    return calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tokens", type=int, default=20)
+    parser.add_argument("--volatile", type=int, default=4)
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    # One log line per decision would swamp the report
+    crawl_scheduler.logger = logging.getLogger(crawl_scheduler.__name__)
+    rng = random.Random(args.seed)
+    minutes = int(args.hours * 60)
+    tokens = [f"token{i}" for i in range(args.tokens)]
+    volatile = set(tokens[: args.volatile])
+    changes = {t: change_times(rng, minutes, t in volatile) for t in tokens}
+    horizon = minutes * 60
+
+    def fixed(now, versions):
+        return tokens, len(tokens) + 1, BASE_INTERVAL
+
+    def adaptive_poll():
+        clock = [0.0]
+        scheduler = AdaptiveScheduler(
+            "benchmark",
+            clock=lambda: clock[0],
+            metrics_path=Path(tempfile.mkdtemp()) / "schedule.json",
+        )
+        scheduler.register("tokens", BASE_INTERVAL)
+
+        def poll(now, versions):
+            clock[0] = now
+            wanted = scheduler.select("tokens", tokens)
+            scheduler.observe(
+                "tokens", {t: versions[t] for t in wanted}, calls=len(wanted) + 1
+            )
+            return wanted, len(wanted) + 1, scheduler.seconds_until_due()
+
+        return poll
+
+    print(f"{args.tokens} tokens ({args.volatile} volatile), {args.hours:g}h simulated")
+    fixed_calls = run("fixed 7m", changes, horizon, fixed, volatile)
+    adaptive_calls = run("adaptive", changes, horizon, adaptive_poll(), volatile)
+    print(f"adaptive/fixed calls: {adaptive_calls / fixed_calls:.2f}")
+
+
+if __name__ == "__main__":
+    main()
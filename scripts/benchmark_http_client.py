@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shared HTTP session against the per-call clients it replaced.
+
+Usage:
+    python scripts/benchmark_http_client.py [--requests 400] [--latency 0.005]
+
+Serves a small JSON body from a local keep-alive stub server (one thread per
+connection) and counts the TCP connections each strategy opens:
+
+* ``requests.get`` per call, as dexscreener/dexpaprika did,
+* a new ``httpx.AsyncClient`` per request, as reddit_rss/token_price did,
+* ``utils.http_client.session`` (sync, then async with per-host limits).
+"""
+
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+import requests
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from utils.http_client import HttpSession  # noqa: E402
+
+BODY = b'{"pairs": [' + b",".join([b'{"priceUsd": "1.0"}'] * 50) + b"]}"
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, latency: float):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.latency = latency
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    def process_request_thread(self, request, client_address):
+        with self.lock:
+            self.connections += 1
+        super().process_request_thread(request, client_address)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Send headers and body in one segment (no Nagle/delayed-ACK stalls)
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+
+def per_call_requests(url, n, concurrency):
+    for i in range(n):
+        requests.get(f"{url}?i={i}", timeout=30).json()
+
+
+def per_call_async_clients(url, n, concurrency):
+    async def one(i, slots):
+        async with slots:
+            async with httpx.AsyncClient() as client:
+                (await client.get(f"{url}?i={i}", timeout=30)).json()
+
+    async def run():
+        slots = asyncio.Semaphore(concurrency)
+        await asyncio.gather(*(one(i, slots) for i in range(n)))
+
+    asyncio.run(run())
+
+
+def shared_session_sync(url, n, concurrency):
+    session = HttpSession()
+    for i in range(n):
+        session.get_json(url, params={"i": i})
+    session.close()
+
+
+def shared_session_async(url, n, concurrency):
+    session = HttpSession(per_host_limit=concurrency)
+
+    async def run():
+        try:
+            await asyncio.gather(
+                *(session.aget_json(url, params={"i": i}) for i in range(n))
+            )
+        finally:
+            await session.aclose()
+
+    asyncio.run(run())
+
+
+STRATEGIES = [
+    ("requests.get per call (sequential)", per_call_requests),
+    ("httpx.AsyncClient per request (async)", per_call_async_clients),
+    ("shared session (sequential)", shared_session_sync),
+    ("shared session (async)", shared_session_async),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument(
+        "--latency", type=float, default=0.005, help="server think time (s)"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="in-flight limit for async runs"
+    )
+    args = parser.parse_args()
+
+    print(f"{args.requests} GETs, {args.latency * 1000:.0f} ms server latency")
+    print(f"{'strategy':<42}{'req/s':>10}{'connections':>14}")
+    for label, fn in STRATEGIES:
+        server = StubServer(args.latency)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/latest/dex/pairs"
+        start = time.perf_counter()
+        fn(url, args.requests, args.concurrency)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<42}{args.requests / elapsed:>10.0f}{server.connections:>14}")
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark the single-pass KeywordMatcher against per-keyword ``in`` loops.
+
+Usage:
+    python scripts/benchmark_keyword_matcher.py [--items 50000]
+
+Covers classify(), get_solana_score() and extract_viral_keywords() on
+synthetic tweet-sized texts and checks that both paths agree.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from config.keywords import (
+    get_classifier_categories,
+    get_extraction_keywords,
+    get_solana_weights,
+)
+from processor.classifier import classify, get_solana_score
+from processor.keyword_matcher import AHOCORASICK_AVAILABLE, extract_viral_keywords
+
+FILLER = "the a market today just saw huge volume on chain wallet ser anon".split()
+
+
+def loop_classify(text: str, categories: dict) -> str:
+    text = text.lower()
+    if any(k in text for k in categories["solana"]):
+        for label, words in categories["solana_subcategories"]:
+            if any(w in text for w in words):
+                return label
+        return "🌞 Solana General"
+    for label, words in categories["general"]:
+        if any(w in text for w in words):
+            return label
+    return "💬 General Crypto"
+
+
+def loop_solana_score(text: str, weights: dict) -> float:
+    text = text.lower()
+    total = sum(w for k, w in weights.items() if k in text)
+    return min(1.0, total / sum(weights.values()))
+
+
+def loop_extract(text: str, keywords: list[str]) -> list[str]:
+    text = text.lower()
+    return [k for k in keywords if k in text]
+
+
+def make_texts(n: int) -> list[str]:
+    rng = random.Random(0)
+    vocab = get_extraction_keywords() + FILLER * 20
+    return [" ".join(rng.choices(vocab, k=rng.randint(15, 40))) for _ in range(n)]
+
+
+def bench(label: str, fn, texts: list[str]):
+    start = time.perf_counter()
+    out = [fn(t) for t in texts]
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {len(texts) / elapsed:>12,.0f} items/s ({elapsed:.2f}s)")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=50_000)
+    args = parser.parse_args()
+
+    texts = make_texts(args.items)
+    categories = get_classifier_categories()
+    weights = get_solana_weights()
+    keywords = get_extraction_keywords()
+    print("backend:", "pyahocorasick" if AHOCORASICK_AVAILABLE else "regex")
+
+    a = bench("classify (loops)", lambda t: loop_classify(" " + t, categories), texts)
+    b = bench("classify (matcher)", lambda t: classify({"text": t}), texts)
+    assert a == b
+
+    a = bench("solana score (loops)", lambda t: loop_solana_score(t, weights), texts)
+    b = bench("solana score (matcher)", lambda t: get_solana_score({"text": t}), texts)
+    assert a == b
+
+    a = bench("extract keywords (loops)", lambda t: loop_extract(t, keywords), texts)
+    b = bench("extract keywords (matcher)", extract_viral_keywords, texts)
+    assert a == b
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark rewrite_batch wall-clock time against a local mock LLM server.
+
+Usage:
+    python scripts/benchmark_llm_rewrite.py [--items 64] [--latency 0.25]
+
+Starts an OpenAI-compatible /chat/completions stub that answers after
+``--latency`` seconds, then rewrites the same batch at several concurrency
+limits. Nothing is sent to a real provider and the LLM cache and usage table
+are bypassed.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from processor import summarizer  # noqa: E402
+from utils.rate_limiter import APIRateLimiter, RateLimiter  # noqa: E402
+
+
+def make_handler(latency: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so the client pool is exercised
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(latency)
+            data = json.dumps(
+                {
+                    "id": "cmpl",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": body["model"],
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {
+                                "role": "assistant",
+                                "content": "🚀 Headline\nbody",
+                            },
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {
+                        "prompt_tokens": 90,
+                        "completion_tokens": 10,
+                        "total_tokens": 100,
+                    },
+                }
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--items", type=int, default=64)
+    parser.add_argument(
+        "--latency", type=float, default=0.25, help="seconds per mock completion"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32]
+    )
+    args = parser.parse_args()
+
+    ThreadingHTTPServer.request_queue_size = 128
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ["OPENROUTER_API_BASE"] = f"http://127.0.0.1:{server.server_port}/v1"
+    os.environ.setdefault("OPENROUTER_API_KEY", "benchmark")
+    for name in ("httpx", "httpx2", summarizer.__name__):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    summarizer.llm_cache.get_many = lambda prompts: {}
+    summarizer.llm_cache.set_many = lambda items: None
+    summarizer.get_month_usage = lambda month: None
+    summarizer.add_llm_tokens = lambda tokens, cost: None
+
+    items = [
+        {"text": f"Solana memecoin {i} pumps as whales rotate"}
+        for i in range(args.items)
+    ]
+    serial = args.items * args.latency
+    print(
+        f"{args.items} items, {args.latency * 1000:.0f} ms per completion (serial: {serial:.1f}s)"
+    )
+    print(f"{'concurrency':>12}{'wall s':>10}{'items/s':>10}{'speedup':>10}")
+    for concurrency in args.concurrency:
+        start = time.perf_counter()
+        summarizer.rewrite_batch(
+            items,
+            concurrency=concurrency,
+            limiter=APIRateLimiter({"openai": RateLimiter(100_000)}),
+        )
+        elapsed = time.perf_counter() - start
+        print(
+            f"{concurrency:>12}{elapsed:>10.2f}{args.items / elapsed:>10.1f}{serial / elapsed:>9.1f}x"
+        )
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark reading a large scraper file: ``json.load`` of a JSON array versus
+streaming it with ``utils.ndjson.iter_records`` (legacy array, NDJSON,
+gzip/zstd NDJSON).
+
+Usage:
+    python scripts/benchmark_ndjson.py [--items 1000000] [--dir /tmp/ndjson_bench]
+
+Writes a synthetic tweet file in each format once (reused on later runs),
+then reads each one in a fresh subprocess so peak RSS (ru_maxrss) reflects
+that reader alone. Every reader counts items and sums a field, the way a
+deduplication or migration pass touches each record.
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from utils import ndjson  # noqa: E402
+from utils.ndjson import iter_records, write_records  # noqa: E402
+
+
+def make_tweets(n: int):
+    for i in range(n):
+        yield {
+            "id": str(i),
+            "text": f"$PEPE to the moon #{i} 🚀 gm frens, chart looks bullish",
+            "userScreenName": f"user{i % 5000}",
+            "likeCount": i % 100,
+            "retweetCount": i % 30,
+            "createdAt": "2025-07-01T12:00:00Z",
+        }
+
+
+def prepare(directory: Path, items: int) -> dict[str, Path]:
+    files = {
+        "json.load": directory / "tweets.json",
+        "stream json": directory / "tweets.json",
+        "stream ndjson": directory / "tweets.ndjson",
+        "stream ndjson.gz": directory / "tweets.ndjson.gz",
+    }
+    if ndjson.ZSTD_AVAILABLE:
+        files["stream ndjson.zst"] = directory / "tweets.ndjson.zst"
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = directory / "items.txt"
+    fresh = stamp.exists() and stamp.read_text() == str(items)
+    for path in dict.fromkeys(files.values()):
+        if fresh and path.exists():
+            continue
+        start = time.perf_counter()
+        count = write_records(path, make_tweets(items))
+        elapsed = time.perf_counter() - start
+        print(
+            f"wrote {path.name:<20} {count:,} items, "
+            f"{path.stat().st_size / 1e6:7.1f} MB in {elapsed:5.1f}s "
+            f"({count / elapsed:,.0f} items/s)"
+        )
+    stamp.write_text(str(items))
+    return files
+
+
+def read(mode: str, path: Path) -> dict:
+    """Runs in the child process."""
+    start = time.perf_counter()
+    if mode == "json.load":
+        with open(path) as f:
+            records = json.load(f)
+    else:
+        records = iter_records(path)
+    count = likes = 0
+    for record in records:
+        count += 1
+        likes += record["likeCount"]
+    elapsed = time.perf_counter() - start
+    return {
+        "items": count,
+        "likes": likes,
+        "seconds": elapsed,
+        # KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--items", type=int, default=1_000_000)
+    parser.add_argument("--dir", type=Path, default=Path("/tmp/ndjson_bench"))
+    parser.add_argument(
+        "--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS
+    )
+    args = parser.parse_args()
+
+    if args.child:
+        mode, path = args.child
+        print(json.dumps(read(mode, Path(path))))
+        return
+
+    files = prepare(args.dir, args.items)
+    baseline = json.loads(
+        subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import json, resource, utils.ndjson;"
+                "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=project_root,
+        ).stdout
+    )
+    print(f"\n{args.items:,} items; interpreter baseline RSS {baseline:.0f} MB")
+    print(f"{'reader':<20} {'seconds':>8} {'items/s':>12} {'peak RSS':>10}")
+    for mode, path in files.items():
+        result = json.loads(
+            subprocess.run(
+                [sys.executable, __file__, "--child", mode, str(path)],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+        )
+        assert result["items"] == args.items, result
+        print(
+            f"{mode:<20} {result['seconds']:8.2f} "
+            f"{result['items'] / result['seconds']:12,.0f} "
+            f"{result['peak_rss_mb']:8.0f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
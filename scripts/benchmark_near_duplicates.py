@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark ``processor.near_duplicates.NearDuplicateIndex`` against the exact
+MD5 check ``DataDeduplicator`` used before, on synthetic posts.
+
+Usage:
+    python scripts/benchmark_near_duplicates.py [--posts 500000] [--dup-share 0.4]
+
+Originals are random 12-30 word posts. A share of the posts are planted
+copies of an earlier original: verbatim from another account, or lightly
+edited (a word swapped, dropped or added, emojis, a link, a mention, case
+changes). Reports recall (planted copies caught), precision (flagged posts
+that really were copies), throughput, and the cost of checking a further
+batch of posts incrementally against the filled index.
+"""
+
+import argparse
+import hashlib
+import logging
+import random
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from processor import near_duplicates  # noqa: E402
+from processor.near_duplicates import NearDuplicateIndex  # noqa: E402
+
+EDITS = ("verbatim", "swap", "drop", "add", "emoji", "link", "mention", "case")
+
+
+def make_vocabulary(rng, n=5000):
+    words = {"$pepe", "$wif", "$bonk", "moon", "pump", "gm", "wagmi", "send", "based"}
+    while len(words) < n:
+        words.add("".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))))
+    return sorted(words)
+
+
+def edit(rng, words, vocabulary, kind):
+    words = list(words)
+    if kind == "swap":
+        words[rng.randrange(len(words))] = rng.choice(vocabulary)
+    elif kind == "drop":
+        del words[rng.randrange(len(words))]
+    elif kind == "add":
+        words.insert(rng.randrange(len(words)), rng.choice(vocabulary))
+    elif kind == "emoji":
+        words.append(rng.choice(["🚀🚀🚀", "🔥", "💎🙌", "📈"]))
+    elif kind == "link":
+        words.append(f"https://t.co/{rng.randrange(10**8):x}")
+    elif kind == "mention":
+        words.insert(0, f"@user{rng.randrange(10**5)}")
+    elif kind == "case":
+        words = [w.upper() if rng.random() < 0.3 else w for w in words]
+    return words
+
+
+def make_posts(n, dup_share, seed):
+    """[(key, author, text, original key or None)]"""
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng)
+    posts, originals = [], []
+    for i in range(n):
+        if originals and rng.random() < dup_share:
+            source_key, words = rng.choice(originals)
+            words = edit(rng, words, vocabulary, rng.choice(EDITS))
+            posts.append(
+                (f"p{i}", f"bot{rng.randrange(1000)}", " ".join(words), source_key)
+            )
+        else:
+            words = rng.choices(vocabulary, k=rng.randint(12, 30))
+            originals.append((f"p{i}", words))
+            posts.append(
+                (f"p{i}", f"user{rng.randrange(10**5)}", " ".join(words), None)
+            )
+    return posts
+
+
+def score(label, posts, flagged, seconds):
+    planted = {key for key, _, _, original in posts if original}
+    caught = planted & flagged
+    recall = len(caught) / len(planted) if planted else 1.0
+    precision = len(caught) / len(flagged) if flagged else 1.0
+    print(
+        f"{label:<12} recall={recall:6.1%} precision={precision:6.1%} "
+        f"flagged={len(flagged):>7,} {len(posts) / seconds:>9,.0f} posts/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--posts", type=int, default=500_000)
+    parser.add_argument("--dup-share", type=float, default=0.4)
+    parser.add_argument("--incremental", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    near_duplicates.logger = logging.getLogger(near_duplicates.__name__)
+    posts = make_posts(args.posts + args.incremental, args.dup_share, args.seed)
+    bulk, extra = posts[: args.posts], posts[args.posts :]
+    print(f"{len(bulk):,} posts, {args.dup_share:.0%} planted copies")
+
+    # The previous check: MD5 of text + author (+ timestamp)
+    start = time.perf_counter()
+    seen, flagged = set(), set()
+    for key, author, text, _ in bulk:
+        digest = hashlib.md5((text + author).lower().strip().encode()).hexdigest()
+        if digest in seen:
+            flagged.add(key)
+        seen.add(digest)
+    score("exact md5", bulk, flagged, time.perf_counter() - start)
+
+    path = Path(tempfile.mkdtemp()) / "near_duplicates.sqlite"
+    index = NearDuplicateIndex(path)
+    start = time.perf_counter()
+    flagged = {
+        m.key
+        for m in index.check_many(((k, t) for k, _, t, _ in bulk), "twitter")
+        if m.is_duplicate
+    }
+    score("minhash/lsh", bulk, flagged, time.perf_counter() - start)
+
+    # New posts against everything indexed so far, as a crawl cycle would
+    start = time.perf_counter()
+    flagged = {
+        m.key
+        for m in index.check_many(((k, t) for k, _, t, _ in extra), "twitter")
+        if m.is_duplicate
+    }
+    elapsed = time.perf_counter() - start
+    score("incremental", extra, flagged, elapsed)
+    print(
+        f"incremental batch: {elapsed * 1e6 / len(extra):.0f} us/post against "
+        f"{len(bulk):,} indexed; index {path.stat().st_size / 1e6:.0f} MB, "
+        f"{index.stats()}"
+    )
+    largest = next(index.clusters(namespace="twitter"), None)
+    if largest:
+        print(f"largest cluster: {largest['canonical']} x{largest['size']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark processor.scorer: per-item degen_score vs degen_score_batch.
+
+Usage:
+    python scripts/benchmark_scorer.py [--items 20000]
+
+Uses the models in models/ when present, otherwise trains a small TF-IDF
+logistic regression in-process so the predict_proba cost is represented.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from processor import scorer
+
+WORDS = "moon rug pump wagmi scam gm ser ape bullish bearish $PEPE $WIF $BONK".split()
+
+
+def make_items(n: int) -> list[dict]:
+    rng = random.Random(0)
+    return [
+        {
+            "text": " ".join(rng.choices(WORDS, k=12)),
+            "likeCount": rng.randint(0, 5000),
+            "retweetCount": rng.randint(0, 800),
+            "replyCount": rng.randint(0, 300),
+            "userFollowersCount": rng.randint(0, 10**6),
+            "createdAt": f"2025-07-01T{i % 24:02d}:00:00",
+        }
+        for i in range(n)
+    ]
+
+
+def ensure_model():
+    if scorer._model is not None:
+        return
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+
+    texts = [" ".join(random.choices(WORDS, k=10)) for _ in range(200)]
+    labels = [int("moon" in t) for t in texts]
+    scorer._model = Pipeline(
+        [("tfidf", TfidfVectorizer()), ("clf", LogisticRegression())]
+    ).fit(texts, labels)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=20_000)
+    args = parser.parse_args()
+
+    ensure_model()
+    items = make_items(args.items)
+
+    start = time.perf_counter()
+    single = [scorer.degen_score(it) for it in items]
+    t_single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = scorer.degen_score_batch(items)
+    t_batch = time.perf_counter() - start
+
+    assert single == batch, "batch scores diverged from per-item scores"
+    print(f"items:      {args.items:,}")
+    print(f"per-item:   {args.items / t_single:>10,.0f} items/s ({t_single:.2f}s)")
+    print(f"batch:      {args.items / t_batch:>10,.0f} items/s ({t_batch:.2f}s)")
+    print(f"speedup:    {t_single / t_batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
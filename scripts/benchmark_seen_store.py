@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark ``utils.seen_store.SeenStore`` against an in-memory set and a
+plain SQLite lookup per batch.
+
+Usage:
+    python scripts/benchmark_seen_store.py [--keys 1000000] [--new-share 0.5]
+
+Marks ``--keys`` item keys, then checks crawl-cycle sized batches where a
+share of the keys is new. Reports lookups per second, the memory each
+approach holds (a set of key strings versus the Bloom filter generations)
+and the store's measured false-positive rate against the expected one.
+"""
+
+import argparse
+import logging
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from utils import seen_store  # noqa: E402
+from utils.seen_store import SeenStore, key_hash  # noqa: E402
+
+
+def make_key(i: int) -> str:
+    return f"https://www.reddit.com/r/CryptoCurrency/comments/{i:x}/post_title_{i}/"
+
+
+def batches(total: int, size: int, new_share: float, known: int, seed: int):
+    rng = random.Random(seed)
+    for _ in range(0, total, size):
+        yield [
+            (
+                make_key(10**9 + rng.randrange(10**9))
+                if rng.random() < new_share
+                else make_key(rng.randrange(known))
+            )
+            for _ in range(size)
+        ]
+
+
+def report(label: str, lookups: int, seconds: float, memory: int):
+    print(
+        f"{label:<14} {lookups / seconds:>12,.0f} lookups/s "
+        f"{memory / 1e6:>9.1f} MB held"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--keys", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--new-share", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    seen_store.logger = logging.getLogger(seen_store.__name__)
+    keys = [make_key(i) for i in range(args.keys)]
+    work = list(batches(args.lookups, args.batch, args.new_share, args.keys, args.seed))
+    print(
+        f"{args.keys:,} keys marked, {args.lookups:,} lookups in batches of "
+        f"{args.batch}, {args.new_share:.0%} new"
+    )
+
+    # What the crawlers would need to keep in memory without the store
+    tracemalloc.start()
+    known = {make_key(i) for i in range(args.keys)}
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for batch in work:
+        [key in known for key in batch]
+    report("python set", args.lookups, time.perf_counter() - start, memory)
+    del known
+
+    directory = Path(tempfile.mkdtemp())
+    start = time.perf_counter()
+    store = SeenStore(directory / "seen.sqlite", ttl_seconds=0)
+    for i in range(0, len(keys), 100_000):
+        store.mark("reddit", keys[i : i + 100_000])
+    print(
+        f"marked {args.keys:,} keys in {time.perf_counter() - start:.1f}s, "
+        f"{(directory / 'seen.sqlite').stat().st_size / 1e6:.0f} MB on disk"
+    )
+
+    # Exact lookups only: every key goes to SQLite
+    conn = sqlite3.connect(directory / "seen.sqlite")
+    start = time.perf_counter()
+    for batch in work:
+        hashes = [key_hash("reddit", key) for key in batch]
+        placeholders = ",".join("?" * len(hashes))
+        set(
+            conn.execute(
+                f"SELECT hash FROM seen WHERE hash IN ({placeholders})", hashes
+            )
+        )
+    report("sqlite only", args.lookups, time.perf_counter() - start, 0)
+
+    # A fresh process: the filter is rebuilt from SQLite
+    start = time.perf_counter()
+    store = SeenStore(directory / "seen.sqlite", ttl_seconds=0)
+    print(f"warm start: filter rebuilt in {time.perf_counter() - start:.1f}s")
+    start = time.perf_counter()
+    for batch in work:
+        store.seen_many("reddit", batch)
+    stats = store.stats()
+    report(
+        "seen store", args.lookups, time.perf_counter() - start, stats["filter_bytes"]
+    )
+    print(
+        f"false positives: {stats['false_positives']:,} of "
+        f"{stats['checks'] - stats['seen']:,} new keys, measured "
+        f"{stats['false_positive_rate']:.4%}, expected "
+        f"{stats['expected_false_positive_rate']:.4%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
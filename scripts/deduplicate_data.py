@@ -2,25 +2,60 @@
 """
 Data Deduplication Script for Degen Digest
 Removes duplicate data from all sources and creates clean datasets.
+
+Raw files are read item by item (NDJSON, or the legacy JSON arrays) and the
+unique items are written straight to output/deduplicated/<source>_deduplicated.ndjson,
+so memory use does not grow with the size of the files.
+
+Besides exact copies, near-duplicates (the same post from other accounts,
+lightly edited shills) are dropped using the persistent MinHash index in
+output/near_duplicates.sqlite (processor/near_duplicates.py), which also
+remembers items from earlier runs. The clusters found are written to
+deduplicated/<source>_clusters.ndjson with their canonical (first seen) post.
 """
 
 import hashlib
 import json
 import logging
+import sys
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from processor.near_duplicates import (  # noqa: E402
+    BATCH_SIZE,
+    RETENTION_DAYS,
+    NearDuplicateIndex,
+)
+from utils.ndjson import (  # noqa: E402
+    RecordWriter,
+    find_records,
+    iter_records,
+    write_document,
+)
+
+# Fields that identify an item across crawls, in order of preference
+ID_FIELDS = ("id", "tweet_id", "post_id", "url", "link")
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
 class DataDeduplicator:
-    def __init__(self, output_dir: str = "output"):
+    def __init__(self, output_dir: str = "output", near_duplicates: bool = True):
         self.output_dir = Path(output_dir)
         self.deduplicated_dir = self.output_dir / "deduplicated"
         self.deduplicated_dir.mkdir(exist_ok=True)
+        self.near_index = (
+            NearDuplicateIndex(self.output_dir / "near_duplicates.sqlite")
+            if near_duplicates
+            else None
+        )
 
     def generate_content_hash(self, item: dict[str, Any]) -> str:
         """Generate a hash for content-based deduplication"""
@@ -51,259 +86,178 @@ class DataDeduplicator:
             text += str(item.get("author", ""))
             text += str(item.get("publishedAt", ""))
 
+        # Tweets scraped without full_text
+        elif "text" in item:
+            text = str(item.get("text", ""))
+            text += str(item.get("username", item.get("userScreenName", "")))
+            text += str(item.get("created_at", item.get("createdAt", "")))
+
         # Normalize text
         text = text.lower().strip()
 
         # Generate hash
         return hashlib.md5(text.encode("utf-8")).hexdigest()
 
-    def deduplicate_twitter_data(self) -> dict[str, Any]:
-        """Deduplicate Twitter data"""
-        logger.info("Deduplicating Twitter data...")
-
-        twitter_file = self.output_dir / "twitter_raw.json"
-        if not twitter_file.exists():
-            logger.warning("Twitter data file not found")
-            return {"tweets": [], "duplicates_removed": 0}
-
+    def content_text(self, item: dict[str, Any]) -> str:
+        """The text near-duplicates are compared on (no author or timestamp)"""
+        parts = [
+            item.get("full_text") or item.get("text"),
+            item.get("title"),
+            item.get("message"),
+        ]
+        return " ".join(str(part) for part in parts if part)
+
+    def item_key(self, name: str, item: dict[str, Any], content_hash: str) -> str:
+        """Stable near-duplicate index key: the item's id, else its hash"""
+        for field in ID_FIELDS:
+            if item.get(field):
+                return f"{name}:{item[field]}"
+        return f"{name}:{content_hash}"
+
+    def _drop_near_duplicates(self, name: str, batch: list[tuple[str, dict]]):
+        """Items of *batch* ((key, item) pairs) that are not near-duplicates"""
+        if self.near_index is None:
+            return [item for _, item in batch]
+        matches = self.near_index.check_many(
+            ((key, self.content_text(item)) for key, item in batch), namespace=name
+        )
+        return [
+            item
+            for (_, item), match in zip(batch, matches, strict=True)
+            if not match.is_duplicate
+        ]
+
+    def deduplicate_source(self, name: str, raw_stem: str) -> dict[str, Any]:
+        """Stream output/<raw_stem>.{ndjson,json} into
+        deduplicated/<name>_deduplicated.ndjson, dropping repeated content."""
+        label = name.title()
+        logger.info(f"Deduplicating {label} data...")
+
+        raw_file = find_records(self.output_dir, raw_stem)
+        if raw_file is None:
+            logger.warning(f"{label} data file not found")
+            return {"file": None, "duplicates_removed": 0}
+
+        deduplicated_file = self.deduplicated_dir / f"{name}_deduplicated.ndjson"
+        started = time.time()
         try:
-            with open(twitter_file) as f:
-                tweets = json.load(f)
-
-            original_count = len(tweets)
+            original_count = 0
+            exact_unique = 0
             seen_hashes = set()
-            unique_tweets = []
-            duplicates = []
-
-            for tweet in tweets:
-                content_hash = self.generate_content_hash(tweet)
-
-                if content_hash not in seen_hashes:
+            batch = []
+            with RecordWriter(deduplicated_file) as writer:
+                for item in iter_records(raw_file):
+                    original_count += 1
+                    content_hash = self.generate_content_hash(item)
+                    if content_hash in seen_hashes:
+                        continue
                     seen_hashes.add(content_hash)
-                    unique_tweets.append(tweet)
-                else:
-                    duplicates.append(tweet)
-
-            # Save deduplicated data
-            deduplicated_file = self.deduplicated_dir / "twitter_deduplicated.json"
-            with open(deduplicated_file, "w") as f:
-                json.dump(unique_tweets, f, indent=2, default=str)
-
-            duplicates_removed = original_count - len(unique_tweets)
+                    exact_unique += 1
+                    batch.append((self.item_key(name, item, content_hash), item))
+                    if len(batch) >= BATCH_SIZE:
+                        writer.write_all(self._drop_near_duplicates(name, batch))
+                        batch = []
+                writer.write_all(self._drop_near_duplicates(name, batch))
+
+            duplicates_removed = original_count - writer.count
+            near_duplicates_removed = exact_unique - writer.count
             logger.info(
-                f"Twitter: {duplicates_removed} duplicates removed ({original_count} -> {len(unique_tweets)})"
+                f"{label}: {duplicates_removed} duplicates removed, {near_duplicates_removed} of them near-duplicates ({original_count} -> {writer.count})"
             )
 
-            return {
-                "tweets": unique_tweets,
+            result = {
+                "file": str(deduplicated_file),
                 "duplicates_removed": duplicates_removed,
+                "near_duplicates_removed": near_duplicates_removed,
                 "original_count": original_count,
-                "final_count": len(unique_tweets),
+                "final_count": writer.count,
             }
+            if self.near_index is not None:
+                clusters_file = self.deduplicated_dir / f"{name}_clusters.ndjson"
+                with RecordWriter(clusters_file) as clusters:
+                    clusters.write_all(
+                        self.near_index.clusters(namespace=name, since=started)
+                    )
+                result["clusters_file"] = str(clusters_file)
+                result["clusters"] = clusters.count
+            return result
 
         except Exception as e:
-            logger.error(f"Error deduplicating Twitter data: {e}")
-            return {"tweets": [], "duplicates_removed": 0}
+            logger.error(f"Error deduplicating {label} data: {e}")
+            return {"file": None, "duplicates_removed": 0}
+
+    def deduplicate_twitter_data(self) -> dict[str, Any]:
+        """Deduplicate Twitter data"""
+        return self.deduplicate_source("twitter", "twitter_raw")
 
     def deduplicate_reddit_data(self) -> dict[str, Any]:
         """Deduplicate Reddit data"""
-        logger.info("Deduplicating Reddit data...")
-
-        reddit_file = self.output_dir / "reddit_raw.json"
-        if not reddit_file.exists():
-            logger.warning("Reddit data file not found")
-            return {"reddit_posts": [], "duplicates_removed": 0}
-
-        try:
-            with open(reddit_file) as f:
-                posts = json.load(f)
-
-            original_count = len(posts)
-            seen_hashes = set()
-            unique_posts = []
-            duplicates = []
-
-            for post in posts:
-                content_hash = self.generate_content_hash(post)
-
-                if content_hash not in seen_hashes:
-                    seen_hashes.add(content_hash)
-                    unique_posts.append(post)
-                else:
-                    duplicates.append(post)
-
-            # Save deduplicated data
-            deduplicated_file = self.deduplicated_dir / "reddit_deduplicated.json"
-            with open(deduplicated_file, "w") as f:
-                json.dump(unique_posts, f, indent=2, default=str)
-
-            duplicates_removed = original_count - len(unique_posts)
-            logger.info(
-                f"Reddit: {duplicates_removed} duplicates removed ({original_count} -> {len(unique_posts)})"
-            )
-
-            return {
-                "reddit_posts": unique_posts,
-                "duplicates_removed": duplicates_removed,
-                "original_count": original_count,
-                "final_count": len(unique_posts),
-            }
-
-        except Exception as e:
-            logger.error(f"Error deduplicating Reddit data: {e}")
-            return {"reddit_posts": [], "duplicates_removed": 0}
+        return self.deduplicate_source("reddit", "reddit_raw")
 
     def deduplicate_telegram_data(self) -> dict[str, Any]:
         """Deduplicate Telegram data"""
-        logger.info("Deduplicating Telegram data...")
-
-        telegram_file = self.output_dir / "telegram_raw.json"
-        if not telegram_file.exists():
-            logger.warning("Telegram data file not found")
-            return {"telegram_messages": [], "duplicates_removed": 0}
-
-        try:
-            with open(telegram_file) as f:
-                messages = json.load(f)
-
-            original_count = len(messages)
-            seen_hashes = set()
-            unique_messages = []
-            duplicates = []
-
-            for message in messages:
-                content_hash = self.generate_content_hash(message)
-
-                if content_hash not in seen_hashes:
-                    seen_hashes.add(content_hash)
-                    unique_messages.append(message)
-                else:
-                    duplicates.append(message)
-
-            # Save deduplicated data
-            deduplicated_file = self.deduplicated_dir / "telegram_deduplicated.json"
-            with open(deduplicated_file, "w") as f:
-                json.dump(unique_messages, f, indent=2, default=str)
-
-            duplicates_removed = original_count - len(unique_messages)
-            logger.info(
-                f"Telegram: {duplicates_removed} duplicates removed ({original_count} -> {len(unique_messages)})"
-            )
-
-            return {
-                "telegram_messages": unique_messages,
-                "duplicates_removed": duplicates_removed,
-                "original_count": original_count,
-                "final_count": len(unique_messages),
-            }
-
-        except Exception as e:
-            logger.error(f"Error deduplicating Telegram data: {e}")
-            return {"telegram_messages": [], "duplicates_removed": 0}
+        return self.deduplicate_source("telegram", "telegram_raw")
 
     def deduplicate_news_data(self) -> dict[str, Any]:
         """Deduplicate news data"""
-        logger.info("Deduplicating news data...")
-
-        news_file = self.output_dir / "newsapi_raw.json"
-        if not news_file.exists():
-            logger.warning("News data file not found")
-            return {"news_articles": [], "duplicates_removed": 0}
-
-        try:
-            with open(news_file) as f:
-                articles = json.load(f)
-
-            original_count = len(articles)
-            seen_hashes = set()
-            unique_articles = []
-            duplicates = []
-
-            for article in articles:
-                content_hash = self.generate_content_hash(article)
-
-                if content_hash not in seen_hashes:
-                    seen_hashes.add(content_hash)
-                    unique_articles.append(article)
-                else:
-                    duplicates.append(article)
-
-            # Save deduplicated data
-            deduplicated_file = self.deduplicated_dir / "news_deduplicated.json"
-            with open(deduplicated_file, "w") as f:
-                json.dump(unique_articles, f, indent=2, default=str)
-
-            duplicates_removed = original_count - len(unique_articles)
-            logger.info(
-                f"News: {duplicates_removed} duplicates removed ({original_count} -> {len(unique_articles)})"
-            )
-
-            return {
-                "news_articles": unique_articles,
-                "duplicates_removed": duplicates_removed,
-                "original_count": original_count,
-                "final_count": len(unique_articles),
-            }
-
-        except Exception as e:
-            logger.error(f"Error deduplicating news data: {e}")
-            return {"news_articles": [], "duplicates_removed": 0}
+        return self.deduplicate_source("news", "newsapi_raw")
 
     def create_deduplicated_consolidated_data(self, results: dict[str, Any]):
-        """Create new consolidated data with deduplicated content"""
+        """Create new consolidated data with deduplicated content
+
+        The item lists are streamed from the deduplicated files into
+        consolidated_data_deduplicated.json; returns its metadata.
+        """
         logger.info("Creating deduplicated consolidated data...")
 
-        consolidated_data = {
-            "tweets": results.get("twitter", {}).get("tweets", []),
-            "reddit_posts": results.get("reddit", {}).get("reddit_posts", []),
-            "telegram_messages": results.get("telegram", {}).get(
-                "telegram_messages", []
-            ),
-            "news_articles": results.get("news", {}).get("news_articles", []),
-            "crypto_data": [],  # Keep original crypto data
-            "metadata": {
-                "last_updated": datetime.now().isoformat(),
-                "deduplication_date": datetime.now().isoformat(),
-                "sources": [],
-                "total_items": 0,
-                "duplicates_removed": 0,
-            },
-        }
+        def items(source: str):
+            path = results.get(source, {}).get("file")
+            return iter_records(path) if path else iter(())
 
-        # Add crypto data if exists
-        crypto_file = self.output_dir / "coingecko_raw.json"
-        if crypto_file.exists():
-            try:
-                with open(crypto_file) as f:
-                    consolidated_data["crypto_data"] = json.load(f)
-            except Exception as e:
-                logger.error(f"Error loading crypto data: {e}")
+        metadata = {
+            "last_updated": datetime.now().isoformat(),
+            "deduplication_date": datetime.now().isoformat(),
+            "sources": [],
+            "total_items": 0,
+            "duplicates_removed": 0,
+        }
 
         # Calculate totals
-        total_items = 0
-        total_duplicates = 0
-
         for source, data in results.items():
             if data.get("final_count", 0) > 0:
-                consolidated_data["metadata"]["sources"].append(source)
-                total_items += data.get("final_count", 0)
-                total_duplicates += data.get("duplicates_removed", 0)
+                metadata["sources"].append(source)
+                metadata["total_items"] += data.get("final_count", 0)
+                metadata["duplicates_removed"] += data.get("duplicates_removed", 0)
 
-        consolidated_data["metadata"]["total_items"] = total_items
-        consolidated_data["metadata"]["duplicates_removed"] = total_duplicates
+        # Keep original crypto data
+        crypto_file = find_records(self.output_dir, "coingecko_raw")
+        crypto_data = iter_records(crypto_file) if crypto_file else iter(())
 
         # Save deduplicated consolidated data
         consolidated_file = (
             self.deduplicated_dir / "consolidated_data_deduplicated.json"
         )
-        with open(consolidated_file, "w") as f:
-            json.dump(consolidated_data, f, indent=2, default=str)
+        try:
+            write_document(
+                consolidated_file,
+                {
+                    "tweets": items("twitter"),
+                    "reddit_posts": items("reddit"),
+                    "telegram_messages": items("telegram"),
+                    "news_articles": items("news"),
+                    "crypto_data": crypto_data,
+                    "metadata": metadata,
+                },
+            )
+        except Exception as e:
+            logger.error(f"Error writing consolidated data: {e}")
+            return metadata
 
         logger.info(
-            f"Deduplicated consolidated data saved: {total_items} items, {total_duplicates} duplicates removed"
+            f"Deduplicated consolidated data saved: {metadata['total_items']} items, {metadata['duplicates_removed']} duplicates removed"
         )
 
-        return consolidated_data
+        return metadata
 
     def generate_deduplication_report(self, results: dict[str, Any]):
         """Generate a detailed deduplication report"""
@@ -338,9 +292,11 @@ class DataDeduplicator:
                 "original_count": original,
                 "final_count": final,
                 "duplicates_removed": duplicates,
-                "deduplication_rate": (duplicates / original * 100)
-                if original > 0
-                else 0,
+                "near_duplicates_removed": data.get("near_duplicates_removed", 0),
+                "duplicate_clusters": data.get("clusters", 0),
+                "deduplication_rate": (
+                    (duplicates / original * 100) if original > 0 else 0
+                ),
             }
 
         report["summary"]["total_duplicates_removed"] = total_duplicates
@@ -374,6 +330,8 @@ class DataDeduplicator:
     def run_deduplication(self):
         """Run complete deduplication process"""
         logger.info("Starting data deduplication process...")
+        if self.near_index is not None:
+            self.near_index.prune(RETENTION_DAYS * 86400)
 
         # Run deduplication for each source
         results = {
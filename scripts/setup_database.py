@@ -157,6 +157,8 @@ class DatabaseMigrator:
                         price_usd DECIMAL(20,8),
                         volume_24h DECIMAL(20,2),
                         price_change_24h DECIMAL(10,4),
+                        is_meme BOOLEAN NOT NULL DEFAULT FALSE,
+                        meme_tags TEXT[],
                         first_seen_at TIMESTAMP DEFAULT NOW(),
                         last_updated_at TIMESTAMP DEFAULT NOW()
                     );
@@ -7,6 +7,7 @@ from datetime import UTC, datetime, timedelta, timezone
 from pathlib import Path
 
 from dateutil import parser as dateparser
+from sqlalchemy.engine import Engine
 from sqlmodel import Field, Session, SQLModel, create_engine, select
 
 from utils.advanced_logging import get_logger
@@ -150,81 +151,147 @@ def _parse_tweet_date(date_str: str) -> datetime | None:
         return None
 
 
-def add_tweets(tweets: list[dict]):
-    if not tweets:
-        return
-    objs: list[Tweet] = []
-    for t in tweets:
-        tid = t.get("id") or t.get("tweetId")
-        if not tid:
-            continue
-        objs.append(
-            Tweet(
-                tweet_id=str(tid),
-                full_text=t.get("full_text") or t.get("text", ""),
-                user_screen_name=t.get("userScreenName", ""),
-                user_followers_count=t.get("userFollowersCount", 0),
-                user_verified=t.get("userVerified", False),
-                like_count=t.get("likeCount", 0),
-                retweet_count=t.get("retweetCount", 0),
-                reply_count=t.get("replyCount", 0),
-                view_count=t.get("viewCount"),
-                quote_count=t.get("quoteCount"),
-                bookmark_count=t.get("bookmarkCount"),
-                created_at=_parse_tweet_date(t.get("createdAt"))
-                if t.get("createdAt")
-                else None,
+# Bulk ingest ------------------------------------------------------------
+
+# Rows per executemany batch. Kept well below SQLite's bound-parameter limit
+# for the IN (...) lookup.
+DEFAULT_CHUNK_SIZE = 500
+
+
+def _chunks(rows: list[dict], size: int):
+    for i in range(0, len(rows), size):
+        yield rows[i : i + size]
+
+
+def _insert_ignore(table, key: str, dialect: str):
+    """Return an ``INSERT ... ON CONFLICT (key) DO NOTHING`` for *dialect*."""
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"bulk insert not supported for dialect {dialect!r}")
+    return insert(table).on_conflict_do_nothing(index_elements=[key])
+
+
+def bulk_insert(
+    model: type[SQLModel],
+    key: str,
+    rows: list[dict],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    bind: Engine | None = None,
+) -> dict[str, int]:
+    """Insert *rows* into *model*'s table, skipping rows whose *key* exists.
+
+    Existing keys are resolved with one ``SELECT ... WHERE key IN (...)`` per
+    chunk and the remainder is written with a single executemany
+    ``INSERT ... ON CONFLICT DO NOTHING``, so concurrent writers can't cause
+    unique violations. Duplicate keys inside *rows* keep the first occurrence.
+
+    Returns ``{"inserted": n, "skipped": m}``.
+    """
+    bind = bind or engine
+    table = model.__table__
+    key_col = table.c[key]
+    stmt = _insert_ignore(table, key, bind.dialect.name)
+
+    inserted = skipped = 0
+    seen: set[str] = set()
+    with bind.begin() as conn:
+        for chunk in _chunks(rows, chunk_size):
+            keys = [r[key] for r in chunk]
+            existing = set(
+                conn.execute(select(key_col).where(key_col.in_(keys))).scalars()
             )
-        )
-    with Session(engine) as session:
-        for obj in objs:
-            # Check if tweet already exists by tweet_id
-            existing = session.exec(
-                select(Tweet).where(Tweet.tweet_id == obj.tweet_id)
-            ).first()
-            if existing:
-                continue
-            session.add(obj)
-        session.commit()
-    if objs:
-        logger.info("tweets stored", count=len(objs))
-
-
-def add_reddit_posts(posts: list[dict]):
+            fresh = []
+            for r in chunk:
+                k = r[key]
+                if k in existing or k in seen:
+                    skipped += 1
+                    continue
+                seen.add(k)
+                fresh.append(r)
+            if fresh:
+                conn.execute(stmt, fresh)
+                inserted += len(fresh)
+    return {"inserted": inserted, "skipped": skipped}
+
+
+def _tweet_row(t: dict, scraped_at: datetime) -> dict | None:
+    tid = t.get("id") or t.get("tweetId")
+    if not tid:
+        return None
+    return {
+        "tweet_id": str(tid),
+        "full_text": t.get("full_text") or t.get("text", ""),
+        "user_screen_name": t.get("userScreenName", ""),
+        "user_followers_count": t.get("userFollowersCount", 0),
+        "user_verified": t.get("userVerified", False),
+        "like_count": t.get("likeCount", 0),
+        "retweet_count": t.get("retweetCount", 0),
+        "reply_count": t.get("replyCount", 0),
+        "view_count": t.get("viewCount"),
+        "quote_count": t.get("quoteCount"),
+        "bookmark_count": t.get("bookmarkCount"),
+        "created_at": _parse_tweet_date(t.get("createdAt"))
+        if t.get("createdAt")
+        else None,
+        "scraped_at": scraped_at,
+    }
+
+
+def _reddit_row(p: dict, scraped_at: datetime) -> dict | None:
+    pid = p.get("link")
+    if not pid:
+        return None
+    created_at = p.get("published")
+    if isinstance(created_at, str):
+        try:
+            created_at = dateparser.parse(created_at)
+        except Exception:
+            created_at = None
+    return {
+        "post_id": pid,  # Use post_id instead of id for the URL
+        "title": p.get("title", ""),
+        "subreddit": p.get("subreddit"),
+        "created_at": created_at,
+        "link": pid,
+        "scraped_at": scraped_at,
+    }
+
+
+def add_tweets(
+    tweets: list[dict],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    bind: Engine | None = None,
+) -> dict[str, int]:
+    """Store scraped tweet dicts, skipping tweet IDs already in the table."""
+    if not tweets:
+        return {"inserted": 0, "skipped": 0}
+    now = datetime.now(UTC)
+    rows = [r for r in (_tweet_row(t, now) for t in tweets) if r]
+    result = bulk_insert(Tweet, "tweet_id", rows, chunk_size=chunk_size, bind=bind)
+    if rows:
+        logger.info("tweets stored", count=len(rows), **result)
+    return result
+
+
+def add_reddit_posts(
+    posts: list[dict],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    bind: Engine | None = None,
+) -> dict[str, int]:
+    """Store Reddit RSS entries, skipping links already in the table."""
     if not posts:
-        return
-    objs = []
-    for p in posts:
-        pid = p.get("link")
-        if not pid:
-            continue
-        created_at = p.get("published")
-        if isinstance(created_at, str):
-            try:
-                created_at = dateparser.parse(created_at)
-            except Exception:
-                created_at = None
-        objs.append(
-            RedditPost(
-                post_id=pid,  # Use post_id instead of id for the URL
-                title=p.get("title", ""),
-                link=pid,
-                subreddit=p.get("subreddit"),
-                created_at=created_at,
-            )
-        )
-    with Session(engine) as session:
-        for obj in objs:
-            # Check if post already exists by post_id
-            existing = session.exec(
-                select(RedditPost).where(RedditPost.post_id == obj.post_id)
-            ).first()
-            if existing:
-                continue
-            session.add(obj)
-        session.commit()
-    if objs:
-        logger.info("reddit posts stored", count=len(objs))
+        return {"inserted": 0, "skipped": 0}
+    now = datetime.now(UTC)
+    rows = [r for r in (_reddit_row(p, now) for p in posts) if r]
+    result = bulk_insert(
+        RedditPost, "post_id", rows, chunk_size=chunk_size, bind=bind
+    )
+    if rows:
+        logger.info("reddit posts stored", count=len(rows), **result)
+    return result
 
 
 def record_digest(date_str: str, md_path: Path, pdf_path: Path | None = None):
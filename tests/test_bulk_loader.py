@@ -0,0 +1,136 @@
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "farmchecker_new"))
+
+import bulk_loader  # noqa: E402
+from bulk_loader import LoadTarget, load_rows  # noqa: E402
+
+TEST_DSN = os.getenv("FARMCHECKER_TEST_DSN")
+needs_postgres = pytest.mark.skipif(not TEST_DSN, reason="FARMCHECKER_TEST_DSN not set")
+
+POSTS = LoadTarget("posts", ("post_id", "content", "published_at", "likes"))
+TOKENS = LoadTarget(
+    "tokens",
+    ("symbol", "price_usd", "updated"),
+    conflict_key=("symbol",),
+    update=("price_usd", "updated = 'yes'"),
+)
+
+
+def test_copy_value():
+    assert bulk_loader.copy_value(None) == "\\N"
+    assert bulk_loader.copy_value(True) == "t"
+    assert bulk_loader.copy_value(datetime(2025, 1, 2, 3, 4)) == "2025-01-02T03:04:00"
+    assert bulk_loader.copy_value("a\tb\nc\\d\r") == "a\\tb\\nc\\\\d\\r"
+    assert bulk_loader.copy_value({"k": [1]}) == '{"k": [1]}'
+    assert bulk_loader.copy_value(1.5) == "1.5"
+
+
+def test_merge_sql():
+    assert bulk_loader.merge_sql(POSTS, "stage_posts") == (
+        "INSERT INTO posts (post_id, content, published_at, likes)"
+        " SELECT post_id, content, published_at, likes FROM stage_posts"
+        " ORDER BY _seq ON CONFLICT DO NOTHING"
+    )
+    upsert = bulk_loader.merge_sql(TOKENS, "stage_tokens")
+    assert "DISTINCT ON (symbol)" in upsert
+    assert upsert.endswith(
+        "ON CONFLICT (symbol) DO UPDATE SET price_usd = EXCLUDED.price_usd, updated = 'yes'"
+    )
+
+
+@pytest.fixture
+def pg():
+    psycopg2 = pytest.importorskip("psycopg2")
+    conn = psycopg2.connect(TEST_DSN, options="-c search_path=bulk_loader_test")
+    with conn.cursor() as cursor:
+        cursor.execute("DROP SCHEMA IF EXISTS bulk_loader_test CASCADE")
+        cursor.execute("CREATE SCHEMA bulk_loader_test")
+        cursor.execute("""
+            CREATE TABLE posts (
+                id SERIAL, post_id VARCHAR(8) NOT NULL, content TEXT NOT NULL,
+                published_at TIMESTAMP, likes INTEGER DEFAULT 0,
+                UNIQUE NULLS NOT DISTINCT (post_id, published_at)
+            ) PARTITION BY RANGE (published_at);
+            CREATE TABLE posts_default PARTITION OF posts DEFAULT;
+            CREATE TABLE tokens (
+                symbol VARCHAR(10) PRIMARY KEY, price_usd NUMERIC, updated TEXT DEFAULT 'no'
+            );
+            """)
+    conn.commit()
+    yield conn
+    conn.rollback()
+    with conn.cursor() as cursor:
+        cursor.execute("DROP SCHEMA bulk_loader_test CASCADE")
+    conn.commit()
+    conn.close()
+
+
+def post_row(post):
+    if "id" not in post:
+        raise ValueError("post has no id")
+    return post["id"], post.get("text"), post.get("at"), post.get("likes", 0)
+
+
+@needs_postgres
+def test_bad_rows_go_to_dead_letters(pg):
+    posts = [
+        {"id": "p1", "text": "gm", "at": "2025-01-01 10:00"},
+        {"id": "p2", "text": "bad date", "at": "yesterday-ish"},
+        {"id": "p3-far-too-long", "text": "long id"},
+        {"text": "no id"},
+        {"id": "p4", "text": None},
+        {"id": "p5", "text": "nul \x00 byte"},
+        {"id": "p6", "text": "tab\tand\nnewline", "likes": "12"},
+        {"id": "p1", "text": "gm again", "at": "2025-01-01 10:00"},
+        {"id": "p7", "text": "undated"},
+        {"id": "p8", "text": "bad likes", "likes": {"n": 1}},
+    ]
+    result = load_rows(pg, POSTS, posts, post_row, source="a.json", batch_size=3)
+    assert (result.staged, result.written, result.rejected) == (4, 3, 6)
+    assert result.rows_per_second > 0
+    pg.commit()
+
+    with pg.cursor() as cursor:
+        cursor.execute("SELECT post_id, content, likes FROM posts ORDER BY id")
+        assert cursor.fetchall() == [
+            ("p1", "gm", 0),
+            ("p6", "tab\tand\nnewline", 12),
+            ("p7", "undated", 0),
+        ]
+        cursor.execute(
+            "SELECT source, error, record FROM load_dead_letters ORDER BY id"
+        )
+        letters = cursor.fetchall()
+    assert [source for source, _, _ in letters] == ["a.json"] * 6
+    errors = {json.loads(record)["text"]: error for _, error, record in letters}
+    assert errors["no id"] == "ValueError: post has no id"
+    assert "timestamp" in errors["bad date"]
+    assert "too long" in errors["long id"]
+    assert "null value" in errors[None]
+    assert "0x00" in errors["nul \x00 byte"]
+    assert "integer" in errors["bad likes"]
+
+    # A reload skips what is there, undated rows included
+    assert load_rows(pg, POSTS, posts[:1] + posts[6:9], post_row).written == 0
+
+
+@needs_postgres
+def test_upsert_keeps_last_copy_of_a_key(pg):
+    tokens = [("BONK", 1), ("WIF", 2), ("BONK", 3)]
+    result = load_rows(pg, TOKENS, tokens, lambda token: (*token, "no"))
+    assert (result.staged, result.written) == (3, 2)
+    result = load_rows(
+        pg, TOKENS, [("WIF", 5), ("TOOLONGSYMBOL", 1)], lambda t: (*t, "no")
+    )
+    assert (result.written, result.rejected) == (1, 1)
+    with pg.cursor() as cursor:
+        cursor.execute("SELECT symbol, price_usd, updated FROM tokens ORDER BY symbol")
+        assert cursor.fetchall() == [("BONK", 3, "no"), ("WIF", 5, "yes")]
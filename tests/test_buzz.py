@@ -0,0 +1,47 @@
+from processor.buzz import BuzzStore
+
+HOUR = 3600
+T0 = 1_750_000_000 // HOUR * HOUR
+
+
+def test_accel_and_ewma_over_buckets(tmp_path):
+    store = BuzzStore(tmp_path / "buzz.sqlite", retention_buckets=10**6)
+    store.record_items([{"text": "$PEPE to the moon #wagmi"}] * 2, ts=T0)
+    store.record_items([{"text": "$pepe $PEPE"}] * 4, ts=T0 + HOUR)
+
+    assert store.series("$PEPE", 2) == [2, 8]
+    assert store.accel("pepe") == 4.0
+    assert store.accel("#wagmi") == 0.0
+    assert store.ewma("pepe", alpha=0.5, buckets=2) == 5.0
+    assert store.top_accelerating(limit=1)[0][:3] == ("pepe", 8, 2)
+
+    # A second store over the same file sees the persisted counts
+    reopened = BuzzStore(tmp_path / "buzz.sqlite", retention_buckets=10**6)
+    assert reopened.window_count("pepe", window=2) == 10
+
+
+def test_old_buckets_expire(tmp_path):
+    store = BuzzStore(tmp_path / "buzz.sqlite", retention_buckets=2)
+    store.record({"pepe": 3}, ts=T0)
+    assert store.latest_bucket() is None  # older than the retention window
+
+    store.record({"pepe": 3})
+    assert store.window_count("pepe") == 3
+
+
+def test_recording_a_corpus_again_replaces_its_bucket(tmp_path):
+    store = BuzzStore(tmp_path / "buzz.sqlite", retention_buckets=10**6)
+    store.record_items([{"text": "$PEPE"}] * 2, ts=T0)
+    corpus = [{"text": "$PEPE #wagmi"}] * 4
+    store.record_items(corpus, ts=T0 + HOUR)
+    store.record_items(corpus, ts=T0 + HOUR + 60)
+
+    assert store.series("pepe", 2) == [2, 4]
+    assert store.accel("pepe") == 2.0
+
+    # A smaller corpus later in the hour drops the terms it no longer has
+    store.record_items([{"text": "$PEPE"}], ts=T0 + HOUR + 120)
+    reopened = BuzzStore(tmp_path / "buzz.sqlite", retention_buckets=10**6)
+    for s in (store, reopened):
+        assert s.series("pepe", 2) == [2, 1]
+        assert s.window_count("wagmi") == 0
@@ -0,0 +1,118 @@
+import json
+
+import pytest
+
+from utils.crawl_scheduler import AdaptiveScheduler
+from utils.rate_limiter import RateLimiter
+
+BASE = 420
+
+
+@pytest.fixture
+def clock():
+    now = [1_000_000.0]
+    return now
+
+
+@pytest.fixture
+def scheduler(clock, tmp_path):
+    return AdaptiveScheduler(
+        "test", clock=lambda: clock[0], metrics_path=tmp_path / "schedule.json"
+    )
+
+
+def poll(scheduler, clock, source, items, **kwargs):
+    clock[0] = scheduler.sources[source].next_due
+    return scheduler.observe(source, items, **kwargs)
+
+
+def test_busy_source_polled_sooner_than_idle_one(scheduler, clock):
+    scheduler.register("busy", BASE, calls_per_poll=1)
+    scheduler.register("idle", BASE, calls_per_poll=1)
+    # Idle polls bank calls that the busy source may not borrow
+    for i in range(12):
+        busy = poll(scheduler, clock, "busy", {f"b{i}": i})
+        idle = poll(scheduler, clock, "idle", {"a": 1})
+    assert idle["reason"] == "idle"
+    assert idle["interval_seconds"] == BASE * 4
+    assert busy["interval_seconds"] == BASE  # no savings: fixed pace
+    assert scheduler.sources["busy"].change_rate > scheduler.sources["idle"].change_rate
+
+
+def test_hot_item_spends_calls_saved_on_flat_ones(scheduler, clock):
+    tokens = [f"t{i}" for i in range(10)]
+    scheduler.register("tokens", BASE)
+    prices = dict.fromkeys(tokens, 1.0)
+    start = clock[0]
+    calls = 0
+    for _ in range(60):
+        prices["t0"] += 1
+        wanted = scheduler.select("tokens", tokens)
+        calls += len(wanted)
+        decision = poll(
+            scheduler,
+            clock,
+            "tokens",
+            {t: prices[t] for t in wanted},
+            calls=len(wanted),
+        )
+    assert decision["reason"] in {"hot", "budget"}
+    assert decision["interval_seconds"] < BASE
+    assert decision["hot_items"][0] == "t0"
+    # Never more calls than the fixed schedule plus the banked allowance
+    elapsed = clock[0] - start
+    assert calls <= (elapsed / BASE + 1) * len(tokens) + 6 * len(tokens)
+
+
+def test_select_skips_unchanged_items(scheduler, clock):
+    scheduler.register("tokens", BASE)
+    assert scheduler.select("tokens", ["a", "b"]) == ["a", "b"]
+    poll(scheduler, clock, "tokens", {"a": 1, "b": 1})
+    poll(scheduler, clock, "tokens", {"a": 2, "b": 1})
+    # b backed off one poll; a changed and unseen c comes first
+    assert scheduler.select("tokens", ["a", "b", "c"]) == ["c", "a"]
+    assert scheduler.select("tokens", ["a", "b", "c"]) == ["c", "a", "b"]
+
+
+def test_errors_back_off(scheduler, clock):
+    scheduler.register("api", BASE, calls_per_poll=1)
+    poll(scheduler, clock, "api", {"a": 1})
+    intervals = [
+        poll(scheduler, clock, "api", None, error=True)["interval_seconds"]
+        for _ in range(3)
+    ]
+    assert intervals == sorted(intervals)
+    assert intervals[2] == pytest.approx(intervals[1] * 2, rel=0.01)
+    assert scheduler.sources["api"].consecutive_errors == 3
+    poll(scheduler, clock, "api", {"b": 1})
+    assert scheduler.sources["api"].consecutive_errors == 0
+
+
+def test_waits_for_quota(clock, tmp_path):
+    limiter = RateLimiter(10, period=600, burst=3, name="tiny")
+    scheduler = AdaptiveScheduler(
+        "test",
+        clock=lambda: clock[0],
+        metrics_path=tmp_path / "s.json",
+        limiters={"tiny": limiter},
+    )
+    scheduler.register("api", 60, quota="tiny", calls_per_poll=3)
+    for _ in range(3):
+        assert limiter.try_acquire()
+    decision = scheduler.observe("api", {"a": 1}, calls=3)
+    assert decision["quota_available"] == 0
+    assert decision["reason"] == "quota"
+    assert decision["interval_seconds"] == pytest.approx(180, abs=1)
+
+
+def test_decisions_exported(scheduler, clock):
+    scheduler.register("api", BASE)
+    poll(scheduler, clock, "api", {"a": 1}, calls=2)
+    exported = json.loads(scheduler.metrics_path.read_text())
+    source = exported["sources"]["api"]
+    assert exported["scheduler"] == "test"
+    assert source["polls"] == 1 and source["total_calls"] == 2
+    assert source["new_ratio"] == 1.0
+    assert {"reason", "interval_seconds", "next_poll_at", "credit_calls"} <= set(source)
+    assert scheduler.due(clock[0]) == []
+    assert scheduler.seconds_until_due(clock[0]) == source["interval_seconds"]
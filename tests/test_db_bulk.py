@@ -0,0 +1,27 @@
+from sqlmodel import SQLModel, create_engine
+
+from storage.db import add_reddit_posts, add_tweets
+
+
+def _engine():
+    eng = create_engine("sqlite://")
+    SQLModel.metadata.create_all(eng)
+    return eng
+
+
+def test_add_tweets_counts_and_skips_existing():
+    eng = _engine()
+    tweets = [{"id": i, "text": f"tweet {i}"} for i in range(1, 11)]
+    tweets.append({"id": 3, "text": "duplicate in batch"})
+    tweets.append({"text": "no id"})
+
+    assert add_tweets(tweets, chunk_size=4, bind=eng) == {"inserted": 10, "skipped": 1}
+    again = [{"id": 10}, {"id": 11}, {"id": 12}]
+    assert add_tweets(again, bind=eng) == {"inserted": 2, "skipped": 1}
+
+
+def test_add_reddit_posts_skips_existing_links():
+    eng = _engine()
+    posts = [{"link": "https://r/a", "title": "a"}, {"link": "https://r/b"}]
+    assert add_reddit_posts(posts, bind=eng) == {"inserted": 2, "skipped": 0}
+    assert add_reddit_posts(posts, bind=eng) == {"inserted": 0, "skipped": 2}
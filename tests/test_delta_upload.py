@@ -0,0 +1,123 @@
+import json
+
+from utils.delta_upload import (
+    DeltaUploader,
+    LocalBucket,
+    read_gzip_ndjson,
+    split_records,
+)
+
+
+def payload(prices, crawled_at="2025-01-01T00:00:00"):
+    return {
+        "token_data": [{"address": a, "price": p} for a, p in prices.items()],
+        "summary": {"network_id": "solana"},
+        "metadata": {"crawled_at": crawled_at},
+    }
+
+
+def delta_rows(bucket, result):
+    return list(read_gzip_ndjson(bucket.blob(result.delta_path).download_as_bytes()))
+
+
+def test_first_upload_writes_delta_latest_and_manifest(tmp_path):
+    bucket = LocalBucket(tmp_path)
+    data = payload({"a": 1, "b": 2})
+    result = DeltaUploader(bucket, "dexpaprika").upload(data)
+
+    assert not result.skipped
+    assert (result.added, result.changed, result.removed) == (3, 0, 0)
+    assert (
+        json.loads(bucket.blob("data/dexpaprika_latest.json").download_as_text())
+        == data
+    )
+    manifest = json.loads(
+        bucket.blob("data/dexpaprika_manifest.json").download_as_text()
+    )
+    assert manifest["content_hash"] == result.content_hash
+    assert manifest["deltas"][0]["path"] == result.delta_path
+    assert result.delta_path.startswith("data/dexpaprika/deltas/")
+    assert {row["key"] for row in delta_rows(bucket, result)} == {
+        "address=a",
+        "address=b",
+        "",
+    }
+
+
+def test_unchanged_content_skips_upload(tmp_path):
+    bucket = LocalBucket(tmp_path)
+    uploader = DeltaUploader(bucket, "dexpaprika")
+    uploader.upload(payload({"a": 1}))
+    files = sorted(p.name for p in tmp_path.rglob("*"))
+
+    # Only the crawl timestamp differs
+    result = uploader.upload(payload({"a": 1}, crawled_at="2025-01-01T00:07:00"))
+    assert result.skipped and result.uploaded == []
+    assert sorted(p.name for p in tmp_path.rglob("*")) == files
+
+
+def test_delta_holds_only_changed_records(tmp_path):
+    bucket = LocalBucket(tmp_path)
+    DeltaUploader(bucket, "dexpaprika").upload(payload({"a": 1, "b": 2, "c": 3}))
+
+    # A new process: the previous index comes from the bucket
+    uploader = DeltaUploader(bucket, "dexpaprika")
+    result = uploader.upload(payload({"a": 1, "b": 5, "d": 4}))
+    assert (result.added, result.changed, result.removed) == (1, 1, 1)
+    rows = {row["key"]: row for row in delta_rows(bucket, result)}
+    assert rows["address=b"]["value"] == {"address": "b", "price": 5}
+    assert rows["address=d"]["value"]["price"] == 4
+    assert rows["address=c"]["deleted"] is True
+    assert "address=a" not in rows
+
+    assert len(list(uploader.deltas())) == 4 + 3
+    manifest = json.loads(bucket.blob(uploader.manifest_path).download_as_text())
+    assert len(manifest["deltas"]) == 2 and manifest["records"] == 4
+
+
+def test_reordering_and_nested_lists(tmp_path):
+    bucket = LocalBucket(tmp_path)
+    uploader = DeltaUploader(bucket, "consolidated", prefix="consolidated_data")
+    posts = [{"id": 1, "text": "gm"}, {"id": 2, "text": "wagmi"}]
+    first = uploader.upload({"twitter": {"posts": posts}, "metadata": {}})
+    assert {row["collection"] for row in delta_rows(bucket, first)} == {"twitter.posts"}
+
+    result = uploader.upload({"twitter": {"posts": posts[::-1]}, "metadata": {}})
+    assert not result.skipped
+    assert (result.added, result.changed, result.removed) == (0, 0, 0)
+    latest = json.loads(
+        bucket.blob("consolidated_data/consolidated_latest.json").download_as_text()
+    )
+    assert latest["twitter"]["posts"][0]["id"] == 2
+
+
+def replay(uploader):
+    """``{collection: {key: value}}`` rebuilt from the deltas alone."""
+    state = {}
+    for row in uploader.deltas():
+        records = state.setdefault(row["collection"], {})
+        if row.get("deleted"):
+            records.pop(row["key"], None)
+        else:
+            records[row["key"]] = row["value"]
+    return state
+
+
+def test_replay_after_remove_and_readd(tmp_path):
+    uploader = DeltaUploader(LocalBucket(tmp_path), "dexpaprika")
+    uploader.upload(payload({"a": 1, "b": 2}))
+    uploader.upload(payload({"a": 1}))
+    result = uploader.upload(payload({"a": 1, "b": 2}))
+
+    assert (result.added, result.removed) == (1, 0)
+    assert replay(uploader) == split_records(payload({"a": 1, "b": 2}))
+
+
+def test_replay_after_value_returns(tmp_path):
+    uploader = DeltaUploader(LocalBucket(tmp_path), "dexpaprika")
+    uploader.upload(payload({"a": 1}))
+    uploader.upload(payload({"a": 2}))
+    result = uploader.upload(payload({"a": 1}))
+
+    assert result.changed == 1
+    assert replay(uploader) == split_records(payload({"a": 1}))
@@ -0,0 +1,122 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scrapers import dexpaprika, dexscreener
+from utils.http_client import session
+
+LATENCY = 0.1
+
+
+def listing(prefix, n):
+    return [{"chainId": "solana", "tokenAddress": f"{prefix}{i}"} for i in range(n)]
+
+
+class DexStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), DexHandler)
+        self.paths = []
+
+
+class DexHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.paths.append(self.path)
+        time.sleep(LATENCY)
+        path = self.path.split("?")[0]
+        if path == "/token-profiles/latest/v1":
+            body = listing("profile", 40)
+        elif path.startswith("/token-boosts/"):
+            body = listing("profile", 10) + listing("boost", 5)
+        elif path.startswith("/tokens/v1/"):
+            body = [
+                {"baseToken": {"address": a}} for a in path.rsplit("/", 1)[1].split(",")
+            ]
+        elif path == "/networks/solana/tokens/bad":
+            body = {"error": "not found"}
+            return self.reply(404, body)
+        elif path == "/networks/solana/tokens/null":
+            body = None
+        elif path.startswith("/networks/solana/tokens/"):
+            body = {"address": path.rsplit("/", 1)[1]}
+        else:
+            body = {"pairs": []}
+        self.reply(200, body)
+
+    def reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = DexStub()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    monkeypatch.setattr(dexscreener, "API_BASE", base)
+    monkeypatch.setattr(dexpaprika, "API_BASE", base)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def run(coro):
+    async def wrapped():
+        try:
+            return await coro
+        finally:
+            await session.aclose()
+
+    return asyncio.run(wrapped())
+
+
+def test_dexscreener_snapshot_fans_out_and_batches(stub):
+    start = time.perf_counter()
+    data, metrics = run(
+        dexscreener.fetch_dexscreener_snapshot(
+            "solana", ["sol", "usdc"], "pair", "SOL/USDC"
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    # 7 concurrent calls, then 2 concurrent batches: two round trips, not nine
+    assert elapsed < 4 * LATENCY
+    batch_paths = [
+        p
+        for p in stub.paths
+        if p.startswith("/tokens/v1/solana/") and "sol,usdc" not in p
+    ]
+    assert len(batch_paths) == 2
+    assert all(len(p.rsplit("/", 1)[1].split(",")) <= 30 for p in batch_paths)
+    # 40 profiles + 5 boosts, duplicates across listings looked up once
+    assert len(data["discovered_token_pairs"]) == 45
+    assert set(metrics) >= {
+        "latest_token_profiles",
+        "search_pairs",
+        "tokens_batch:solana:1",
+    }
+    assert all(m["ok"] and m["latency_ms"] >= LATENCY * 1000 for m in metrics.values())
+
+
+def test_dexpaprika_snapshot_skips_failed_tokens(stub):
+    networks, tokens, metrics = run(
+        dexpaprika.fetch_dexpaprika_snapshot("solana", ["a", "bad", "null", "c"])
+    )
+    # Keyed by address, so an empty reply does not shift the tokens after it
+    assert tokens == {"a": {"address": "a"}, "c": {"address": "c"}}
+    assert metrics["token:bad"]["ok"] is False
+    assert metrics["networks"]["ok"] is True
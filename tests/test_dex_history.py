@@ -0,0 +1,189 @@
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "farmchecker_new"))
+
+import dex_history  # noqa: E402
+
+TEST_DSN = os.getenv("FARMCHECKER_TEST_DSN")
+needs_postgres = pytest.mark.skipif(not TEST_DSN, reason="FARMCHECKER_TEST_DSN not set")
+
+PAIR_COLUMNS = """
+    id SERIAL PRIMARY KEY, pair_id VARCHAR(255) UNIQUE NOT NULL,
+    chain_id VARCHAR(50) NOT NULL, dex_id VARCHAR(100) NOT NULL,
+    base_token_symbol VARCHAR(20), base_token_name VARCHAR(100),
+    base_token_address VARCHAR(255), price_usd DECIMAL(20,8),
+    price_change_24h DECIMAL(10,4), volume_24h DECIMAL(20,2),
+    liquidity_usd DECIMAL(20,2), txns_24h INTEGER DEFAULT 0,
+    collected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+"""
+
+
+def test_parse_tiers():
+    assert dex_history.parse_tiers(" 2 days=1 hour, 30 days=1 day,") == [
+        ("2 days", "1 hour"),
+        ("30 days", "1 day"),
+    ]
+    with pytest.raises(ValueError):
+        dex_history.parse_tiers("2 days")
+
+
+@pytest.fixture
+def pg():
+    psycopg2 = pytest.importorskip("psycopg2")
+    conn = psycopg2.connect(TEST_DSN)
+    with conn.cursor() as cursor:
+        cursor.execute("DROP SCHEMA IF EXISTS dex_history_test CASCADE")
+        cursor.execute("CREATE SCHEMA dex_history_test")
+        cursor.execute("SET search_path TO dex_history_test")
+        cursor.execute(
+            f"CREATE TABLE dexscreener_pairs ({PAIR_COLUMNS}, fdv DECIMAL(20,2))"
+        )
+        cursor.execute(
+            f"CREATE TABLE dexpaprika_pairs ({PAIR_COLUMNS}, market_cap DECIMAL(20,2))"
+        )
+        cursor.execute(
+            (ROOT / "farmchecker_new" / "create_dex_latest_tables.sql").read_text()
+        )
+    conn.commit()
+    yield conn
+    conn.rollback()
+    with conn.cursor() as cursor:
+        cursor.execute("DROP SCHEMA dex_history_test CASCADE")
+    conn.commit()
+    conn.close()
+
+
+def upsert(cursor, table, pair_id, price, volume, collected_at):
+    # The ON CONFLICT of migrate_dexscreener_only/migrate_dexpaprika_only
+    cap = "fdv" if table == "dexscreener_pairs" else "market_cap"
+    cursor.execute(
+        f"""
+        INSERT INTO {table} (pair_id, chain_id, dex_id, base_token_symbol, price_usd,
+                             volume_24h, {cap}, collected_at)
+        VALUES (%s, 'solana', 'raydium', 'BONK', %s, %s, 1000, %s)
+        ON CONFLICT (pair_id) DO UPDATE SET
+            price_usd = EXCLUDED.price_usd, volume_24h = EXCLUDED.volume_24h,
+            collected_at = EXCLUDED.collected_at
+        """,
+        (pair_id, price, volume, collected_at),
+    )
+
+
+@needs_postgres
+def test_latest_follows_ingest(pg):
+    now = datetime.now().replace(microsecond=0)
+    with pg.cursor() as cursor:
+        upsert(cursor, "dexscreener_pairs", "p1", 1, 100, now - timedelta(hours=2))
+        upsert(cursor, "dexpaprika_pairs", "p1", 2, 50, now - timedelta(hours=2))
+        upsert(cursor, "dexscreener_pairs", "p1", 3, 300, now)
+        # The same snapshot again refreshes nothing and adds no history
+        upsert(cursor, "dexscreener_pairs", "p1", 3, 300, now)
+        upsert(cursor, "dexpaprika_pairs", "stale", 1, 10, now - timedelta(days=3))
+
+        cursor.execute(
+            "SELECT source, pair_id, price_usd, volume_24h, market_cap, collected_at"
+            " FROM dex_pairs_latest ORDER BY source, pair_id"
+        )
+        assert cursor.fetchall() == [
+            ("dexpaprika", "p1", 2, 50, 1000, now - timedelta(hours=2)),
+            ("dexpaprika", "stale", 1, 10, 1000, now - timedelta(days=3)),
+            ("dexscreener", "p1", 3, 300, 1000, now),
+        ]
+        cursor.execute("SELECT source, price_close FROM dex_pair_history ORDER BY id")
+        assert cursor.fetchall() == [
+            ("dexscreener", 1),
+            ("dexpaprika", 2),
+            ("dexscreener", 3),
+            ("dexpaprika", 1),
+        ]
+
+        assert dex_history.prune_latest(pg, max_age_hours=24) == 1
+        cursor.execute("SELECT COUNT(*) FROM dex_pairs_latest")
+        assert cursor.fetchone()[0] == 2
+
+
+@needs_postgres
+def test_history_compacts_into_buckets(pg):
+    day = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    hour = day - timedelta(days=3) + timedelta(hours=5)
+    old = day - timedelta(days=40)
+    snapshots = [
+        (hour + timedelta(minutes=10), 4),
+        (hour + timedelta(minutes=20), 9),
+        (hour + timedelta(minutes=50), 6),
+        (old + timedelta(hours=1), 2),
+        (old + timedelta(hours=7), 1),
+        (day, 5),  # recent, stays raw
+    ]
+    tiers = [("2 days", "1 hour"), ("30 days", "1 day")]
+    with pg.cursor() as cursor:
+        for at, price in snapshots:
+            upsert(cursor, "dexscreener_pairs", "p1", price, price * 10, at)
+
+        assert dex_history.compact_history(pg, tiers) == {
+            "2 days=1 hour": (5, 3),
+            "30 days=1 day": (2, 1),
+        }
+        cursor.execute(
+            """SELECT bucket_start, bucket_seconds, samples, price_open, price_high,
+                      price_low, price_close, volume_24h
+               FROM dex_pair_history ORDER BY bucket_start"""
+        )
+        assert cursor.fetchall() == [
+            (old, 86400, 2, 2, 2, 1, 1, 10),
+            (hour, 3600, 3, 4, 9, 4, 6, 60),
+            (day, 0, 1, 5, 5, 5, 5, 50),
+        ]
+        assert dex_history.compact_history(pg, tiers) == {
+            "2 days=1 hour": (0, 0),
+            "30 days=1 day": (0, 0),
+        }
+
+        # A late snapshot for a compacted hour is merged into its bucket
+        upsert(cursor, "dexscreener_pairs", "p1", 12, 120, hour + timedelta(minutes=30))
+        dex_history.compact_history(pg, tiers)
+        cursor.execute(
+            "SELECT samples, price_high, price_close FROM dex_pair_history WHERE bucket_start = %s",
+            (hour,),
+        )
+        assert cursor.fetchall() == [(4, 12, 6)]
+
+
+@needs_postgres
+def test_combined_endpoint_reads_latest(pg, monkeypatch):
+    import db_pool
+    import psycopg2
+    import server
+
+    now = datetime.now()
+    with pg.cursor() as cursor:
+        for i in range(5):
+            upsert(cursor, "dexscreener_pairs", f"s{i}", 1, i * 100, now)
+            upsert(cursor, "dexpaprika_pairs", f"p{i}", 1, i * 100 + 50, now)
+        upsert(cursor, "dexscreener_pairs", "s4", 1, 1, now)
+    pg.commit()
+
+    pool = db_pool.ConnectionPool(
+        connect=lambda: psycopg2.connect(
+            TEST_DSN, options="-c search_path=dex_history_test"
+        )
+    )
+    monkeypatch.setattr(server, "get_pool", lambda dsn: pool)
+    try:
+        items = server.app.test_client().get("/api/dex/combined?limit=4").get_json()
+    finally:
+        pool.close()
+    assert [
+        (item["source"], item["token_id"], item["volume_24h"]) for item in items
+    ] == [
+        ("dexpaprika", "p4", 450),
+        ("dexpaprika", "p3", 350),
+        ("dexscreener", "s3", 300),
+        ("dexpaprika", "p2", 250),
+    ]
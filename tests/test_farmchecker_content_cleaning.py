@@ -0,0 +1,35 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "farmchecker_new"))
+
+from content_cleaning import clean_post_content, clean_post_title  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        (None, ""),
+        ("", ""),
+        ("hi", ""),
+        ("gm \\n  degens, $PEPE is   pumping", "gm degens, $PEPE is pumping"),
+        (json.dumps({"text": "from a json payload", "id": 1}), "from a json payload"),
+        (json.dumps({"title": "Title", "summary": "Summary"}), "Title Summary"),
+        (json.dumps({"meta": {"text": "nested text"}}), "nested text"),
+        (str({"text": "python dict text — with dash", "user": "x"}), "python dict text - with dash"),
+        ('{"source": "x", "text": "truncated json text", "ur', "truncated json text"),
+        ("[1, 2, 3]", ""),
+        ("{}", ""),
+    ],
+)
+def test_clean_post_content(content, expected):
+    assert clean_post_content(content) == expected
+
+
+def test_clean_post_title():
+    assert clean_post_title("playwright_Moon soon") == "Moon soon"
+    assert clean_post_title("No title") == ""
+    assert clean_post_title('{"raw": 1}') == ""
@@ -0,0 +1,126 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from psycopg2 import extensions
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "farmchecker_new"))
+
+from db_pool import ConnectionPool, PoolTimeout  # noqa: E402
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=None):
+        if self.conn.broken:
+            raise RuntimeError("server closed the connection")
+        self.conn.executed.append(sql)
+        self.conn.info.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeInfo:
+    transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.rollbacks = 0
+        self.executed = []
+        self.info = FakeInfo()
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+def make_pool(**kwargs):
+    opened = []
+
+    def connect():
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+
+    kwargs.setdefault("min_size", 0)
+    return ConnectionPool(connect=connect, **kwargs), opened
+
+
+def test_connections_are_reused_and_rolled_back():
+    pool, opened = make_pool(max_size=2)
+    conn = pool.getconn()
+    conn.cursor().execute("SELECT 1")
+    conn.close()
+    conn.close()  # second close is a no-op
+
+    with pool.connection() as again:
+        assert again.raw is opened[0]
+    assert len(opened) == 1
+    assert opened[0].rollbacks == 1
+    stats = pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["in_use"] == 0 and stats["idle"] == 1
+
+
+def test_checkout_times_out_when_exhausted():
+    pool, _ = make_pool(max_size=1)
+    held = pool.getconn()
+    with pytest.raises(PoolTimeout):
+        pool.getconn(timeout=0.05)
+    stats = pool.stats()
+    assert stats["waits"] == 1 and stats["timeouts"] == 1 and stats["in_use"] == 1
+    held.close()
+
+
+def test_waiter_gets_released_connection():
+    pool, opened = make_pool(max_size=1)
+    held = pool.getconn()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.getconn(timeout=2)))
+    waiter.start()
+    time.sleep(0.05)
+    held.close()
+    waiter.join()
+    assert got[0].raw is opened[0]
+    got[0].close()
+
+
+def test_broken_connection_replaced_after_health_check():
+    pool, opened = make_pool(max_size=1, health_check_interval=0)
+    pool.getconn().close()
+    opened[0].broken = True
+    with pool.connection() as conn:
+        assert conn.raw is opened[1]
+    stats = pool.stats()
+    assert stats["failed_health_checks"] == 1
+    assert stats["connections_discarded"] == 1
+    assert stats["size"] == 1
+
+
+def test_execute_prepared_prepares_once_per_connection():
+    pool, opened = make_pool(max_size=1)
+    for _ in range(3):
+        with pool.connection() as conn:
+            conn.execute_prepared(conn.cursor(), "q", "SELECT $1")
+    prepares = [sql for sql in opened[0].executed if sql.startswith("PREPARE")]
+    assert prepares == ["PREPARE q AS SELECT $1"]
@@ -0,0 +1,174 @@
+import json
+import os
+import sys
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "farmchecker_new"))
+
+import pagination as pg  # noqa: E402
+
+TEST_DSN = os.getenv("FARMCHECKER_TEST_DSN")
+needs_postgres = pytest.mark.skipif(not TEST_DSN, reason="FARMCHECKER_TEST_DSN not set")
+
+SORTS = {
+    "recent": pg.SortKey("published_at"),
+    "volume": pg.SortKey("volume_24h", ("source", "id"), skip_nulls=True),
+}
+
+
+def test_cursor_round_trip_and_rejects():
+    values = [datetime(2025, 1, 2, 3, 4, 5, 6), Decimal("12.50"), "dexscreener", 7]
+    token = pg.encode_cursor("volume", values)
+    assert pg.decode_cursor(token, "volume", 4) == values
+    assert type(pg.decode_cursor(token, "volume", 4)[1]) is Decimal
+
+    with pytest.raises(pg.InvalidCursor, match="sort=volume"):
+        pg.decode_cursor(token, "recent", 4)
+    with pytest.raises(pg.InvalidCursor):
+        pg.decode_cursor(token, "volume", 2)
+    for garbage in ["!!", "bm9wZQ", pg.encode_cursor("volume", [None, 1])]:
+        with pytest.raises(pg.InvalidCursor):
+            pg.decode_cursor(garbage, "volume", 2)
+
+
+def test_clauses_continue_after_cursor():
+    first = pg.Page("recent", SORTS["recent"], 50)
+    assert first.clauses() == ("", "ORDER BY published_at DESC, id DESC LIMIT $1")
+    assert first.params == [50]
+
+    after = pg.Page("volume", SORTS["volume"], 20, [Decimal("3"), "dexpaprika", 9])
+    where, order = after.clauses(first_param=2)
+    assert (
+        where
+        == " AND volume_24h IS NOT NULL AND (volume_24h, source, id) < ($2, $3, $4)"
+    )
+    assert order == "ORDER BY volume_24h DESC, source DESC, id DESC LIMIT $5"
+    assert after.params == [Decimal("3"), "dexpaprika", 9, 20]
+    assert after.key_columns == "volume_24h, source, id"
+
+
+@pytest.fixture
+def app():
+    return Flask(__name__)
+
+
+def rows(n):
+    # (title, published_at, id): the key columns come last
+    return [
+        (f"t{i}" if i % 3 else "", datetime(2025, 1, 1, 0, 0, 50 - i), 100 - i)
+        for i in range(n)
+    ]
+
+
+def to_item(row):
+    return {"title": row[0]} if row[0] else None
+
+
+def test_buffered_page_sets_next_cursor_only_when_full(app):
+    with app.test_request_context("/api/x?limit=3&sort=nope"):
+        page = pg.page_from_request(SORTS, default_sort="recent")
+        assert (page.sort, page.limit, page.stream) == ("recent", 3, False)
+        response = pg.page_response(page, rows(3), to_item)
+    items = response.get_json()
+    # Rows mapped to None are left out, but the next page starts after them
+    assert [item["title"] for item in items] == ["t1", "t2"]
+    assert pg.decode_cursor(items[-1]["cursor"], "recent", 2) == [
+        datetime(2025, 1, 1, 0, 0, 48),
+        98,
+    ]
+    assert pg.decode_cursor(response.headers["X-Next-Cursor"], "recent", 2)[1] == 98
+
+    with app.test_request_context("/api/x?limit=4"):
+        page = pg.page_from_request(SORTS, default_sort="recent")
+        assert "X-Next-Cursor" not in pg.page_response(page, rows(3), to_item).headers
+
+
+def test_large_and_ndjson_pages_are_streamed(app, monkeypatch):
+    monkeypatch.setattr(pg, "STREAM_MIN_PAGE_SIZE", 5)
+    with app.test_request_context("/api/x?limit=6"):
+        page = pg.page_from_request(SORTS, default_sort="recent")
+        response = pg.page_response(page, rows(6), to_item)
+        assert response.is_streamed
+        assert [item["title"] for item in json.loads(response.get_data())] == [
+            "t1",
+            "t2",
+            "t4",
+            "t5",
+        ]
+
+    with app.test_request_context("/api/x?format=ndjson&limit=2"):
+        page = pg.page_from_request(SORTS, default_sort="recent")
+        response = pg.page_response(page, rows(3), to_item)
+        assert response.mimetype == "application/x-ndjson"
+        lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line)["title"] for line in lines] == ["t1", "t2"]
+
+
+@needs_postgres
+def test_endpoint_pages_cover_every_row_once(monkeypatch):
+    psycopg2 = pytest.importorskip("psycopg2")
+    import db_pool
+    import server
+
+    conn = psycopg2.connect(TEST_DSN)
+    conn.autocommit = True
+    cursor = conn.cursor()
+    cursor.execute("DROP SCHEMA IF EXISTS pagination_test CASCADE")
+    cursor.execute("CREATE SCHEMA pagination_test")
+    cursor.execute("SET search_path TO pagination_test")
+    cursor.execute(
+        """CREATE TABLE dexpaprika_pairs (
+            id SERIAL PRIMARY KEY, pair_id TEXT, base_token_symbol TEXT, base_token_name TEXT,
+            base_token_address TEXT, dex_id TEXT, chain_id TEXT, price_usd DECIMAL(20,8),
+            price_change_24h DECIMAL(10,4), volume_24h DECIMAL(20,2), liquidity_usd DECIMAL(20,2),
+            txns_24h INTEGER, market_cap DECIMAL(20,2), collected_at TIMESTAMP DEFAULT NOW())"""
+    )
+    # Few distinct volumes, so most of the order comes from the id tiebreaker
+    cursor.execute("""INSERT INTO dexpaprika_pairs (pair_id, price_usd, volume_24h)
+        SELECT 'p' || i, 1, CASE WHEN i % 10 = 0 THEN NULL ELSE i % 7 END
+        FROM generate_series(1, 230) i""")
+    pool = db_pool.ConnectionPool(
+        connect=lambda: psycopg2.connect(
+            TEST_DSN, options="-c search_path=pagination_test"
+        )
+    )
+    monkeypatch.setattr(server, "get_pool", lambda dsn: pool)
+    client = server.app.test_client()
+
+    try:
+        seen, url = [], "/api/dex/dexpaprika?limit=40"
+        while url:
+            response = client.get(url)
+            seen += [(item["volume_24h"], item["id"]) for item in response.get_json()]
+            cursor_token = response.headers.get("X-Next-Cursor")
+            url = cursor_token and f"/api/dex/dexpaprika?limit=40&cursor={cursor_token}"
+        assert len(seen) == len(set(seen)) == 207
+        assert seen == sorted(seen, reverse=True)
+
+        # A streamed page resumes from the cursor of its last item and
+        # returns its connection once sent
+        response = client.get("/api/dex/dexpaprika?format=ndjson&limit=100")
+        items = [
+            json.loads(line) for line in response.get_data(as_text=True).splitlines()
+        ]
+        response.close()
+        rest = client.get(
+            f"/api/dex/dexpaprika?limit=200&cursor={items[-1]['cursor']}"
+        ).get_json()
+        assert [item["id"] for item in items + rest] == [item_id for _, item_id in seen]
+        assert pool.stats()["in_use"] == 0
+        assert (
+            client.get(
+                "/api/dex/dexpaprika?sort=recent&cursor=" + items[0]["cursor"]
+            ).status_code
+            == 400
+        )
+    finally:
+        pool.close()
+        cursor.execute("DROP SCHEMA pagination_test CASCADE")
+        conn.close()
@@ -0,0 +1,98 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from flask import Flask, jsonify, request
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "farmchecker_new"))
+
+import response_cache as rc  # noqa: E402
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    cache = rc.ResponseCache(invalidation_file=str(tmp_path / "stamp"))
+    monkeypatch.setattr(rc, "response_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def app(cache):
+    app = Flask(__name__)
+    app.calls = 0
+
+    @app.route("/api/stats")
+    @rc.cached_response(ttl=60)
+    def stats():
+        app.calls += 1
+        return jsonify({"calls": app.calls, "sort": request.args.get("sort")})
+
+    @app.route("/api/flaky")
+    @rc.cached_response(ttl=60)
+    def flaky():
+        app.calls += 1
+        return jsonify({"error": "db down"}), 500
+
+    @app.route("/api/stale")
+    @rc.cached_response(ttl=0.05, stale_ttl=60)
+    def stale():
+        app.calls += 1
+        return jsonify({"calls": app.calls})
+
+    return app
+
+
+def test_hit_and_query_args_keyed(app, cache):
+    client = app.test_client()
+    first = client.get("/api/stats")
+    assert first.headers["X-Cache"] == "MISS"
+    second = client.get("/api/stats")
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json == first.json == {"calls": 1, "sort": None}
+    assert client.get("/api/stats?sort=volume").json["calls"] == 2
+    stats = cache.stats()["endpoints"]["/api/stats"]
+    assert stats["hits"] == 1 and stats["misses"] == 2
+
+
+def test_etag_not_modified(app, cache):
+    client = app.test_client()
+    etag = client.get("/api/stats").headers["ETag"]
+    resp = client.get("/api/stats", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.data == b""
+    assert cache.stats()["not_modified"] == 1
+
+
+def test_errors_are_not_cached(app):
+    client = app.test_client()
+    assert client.get("/api/flaky").status_code == 500
+    assert client.get("/api/flaky").status_code == 500
+    assert app.calls == 2
+
+
+def test_invalidate_and_cross_process_stamp(app, cache, tmp_path):
+    client = app.test_client()
+    client.get("/api/stats")
+    cache.invalidate()
+    assert client.get("/api/stats").json["calls"] == 2
+
+    # Another worker invalidating touches the shared stamp file
+    rc.ResponseCache(invalidation_file=str(tmp_path / "stamp")).invalidate()
+    time.sleep(0.01)
+    (tmp_path / "stamp").touch()
+    assert client.get("/api/stats").json["calls"] == 3
+
+
+def test_stale_while_revalidate(app, cache):
+    client = app.test_client()
+    client.get("/api/stale")
+    time.sleep(0.1)
+    resp = client.get("/api/stale")
+    assert resp.headers["X-Cache"] == "STALE"
+    assert resp.json["calls"] == 1
+    deadline = time.monotonic() + 2
+    while cache.stats()["refreshes"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert app.calls == 2
+    assert client.get("/api/stale").json["calls"] == 2
@@ -0,0 +1,106 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils import http_client
+from utils.http_client import HttpSession
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.connections = set()
+        self.hits = {}
+        self.lock = threading.Lock()
+
+    @property
+    def base(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.connections.add(self.client_address)
+            hits = self.server.hits[self.path] = self.server.hits.get(self.path, 0) + 1
+        if self.path == "/flaky" and hits <= 2:
+            return self.reply(503, b"busy", {"Retry-After": "0"})
+        if self.path == "/etag":
+            if self.headers.get("If-None-Match") == '"v1"':
+                return self.reply(304, b"", {"ETag": '"v1"'})
+            return self.reply(200, b'{"version": 1}', {"ETag": '"v1"'})
+        self.reply(200, b'{"ok": true}')
+
+    def reply(self, status, body, headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    monkeypatch.setattr(http_client, "RETRY_BASE_DELAY", 0.01)
+    server = StubServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_connections_are_reused(stub):
+    session = HttpSession(http2=False)
+    for _ in range(20):
+        assert session.get_json(f"{stub.base}/ok") == {"ok": True}
+    assert len(stub.connections) == 1
+    session.close()
+
+
+def test_retries_transient_errors(stub):
+    session = HttpSession(http2=False, max_attempts=3)
+    assert session.get(f"{stub.base}/flaky").status_code == 200
+    assert stub.hits["/flaky"] == 3
+    assert session.stats()["retries"] == 2
+
+    stub.hits["/flaky"] = 0
+    assert (
+        HttpSession(http2=False, max_attempts=2).get(f"{stub.base}/flaky").status_code
+        == 503
+    )
+
+
+def test_conditional_get_replays_cached_body(stub):
+    session = HttpSession(http2=False)
+    first = session.get(f"{stub.base}/etag")
+    second = session.get(f"{stub.base}/etag")
+    assert second.status_code == 200
+    assert second.json() == first.json() == {"version": 1}
+    assert second.extensions.get("from_cache") is True
+    assert session.stats()["not_modified"] == 1
+
+
+def test_async_requests_share_a_pool_and_host_limit(stub):
+    session = HttpSession(http2=False, per_host_limit=4)
+
+    async def run():
+        try:
+            return await asyncio.gather(
+                *(session.aget_json(f"{stub.base}/ok?i={i}") for i in range(40))
+            )
+        finally:
+            await session.aclose()
+
+    assert asyncio.run(run()) == [{"ok": True}] * 40
+    assert len(stub.connections) <= 4
@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from config.keywords import get_extraction_keywords
+from processor import keyword_matcher
+from processor.keyword_matcher import KeywordMatcher, extract_viral_keywords, meme_tags
+
+
+@pytest.mark.parametrize("use_automaton", [True, False])
+def test_matches_same_keywords_as_substring_loop(monkeypatch, use_automaton):
+    if use_automaton and not keyword_matcher.AHOCORASICK_AVAILABLE:
+        pytest.skip("pyahocorasick not installed")
+    monkeypatch.setattr(keyword_matcher, "AHOCORASICK_AVAILABLE", use_automaton)
+    keywords = ["gm", "gm fam", "gm ser", "sol", "solana", "$sol", "🚀", "ta", "a"]
+    matcher = KeywordMatcher(keywords)
+    rng = random.Random(3)
+    alphabet = keywords + [" ", "x", "data", "SOLANA", "fam"]
+    for _ in range(2000):
+        text = "".join(rng.choices(alphabet, k=rng.randint(0, 10)))
+        expected = {k for k in keywords if k in text.lower()}
+        assert matcher.find(text) == expected
+
+
+def test_weights_and_order():
+    matcher = KeywordMatcher({"solana": 1.0, "sol": 0.9, "bonk": 0.8})
+    assert matcher.find_ordered("BONK on Solana") == ["solana", "sol", "bonk"]
+    assert matcher.score("bonk bonk") == 0.8
+    assert matcher.find("") == set()
+
+
+def test_extract_viral_keywords_follows_config_order():
+    text = "GM fam, this gem will moon on solana"
+    expected = [k for k in get_extraction_keywords() if k in text.lower()]
+    assert extract_viral_keywords(text) == expected
+
+
+def test_meme_tags_from_name_and_symbol():
+    assert meme_tags("dogwifhat", "WIF") == ["dog"]
+    assert meme_tags("Moon Cat Inu") == ["cat", "dog", "moon"]
+    assert meme_tags("Pepe", "PEPE") == ["frog"]
+    assert meme_tags("Bitcoin", "BTC") == []
+    assert meme_tags(None, None) == []
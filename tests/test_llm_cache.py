@@ -0,0 +1,101 @@
+import multiprocessing
+import sqlite3
+import threading
+
+from utils.llm_cache import LLMCache
+
+
+def test_memory_tier_and_batched_lookups(tmp_path):
+    cache = LLMCache(tmp_path / "cache.sqlite", memory_entries=2)
+    cache.set_many({"a": {"text": "A"}, "b": {"text": "B"}, "c": {"text": "C"}})
+
+    assert cache.get_many(["a", "b", "c", "missing"]) == {
+        "a": {"text": "A"},
+        "b": {"text": "B"},
+        "c": {"text": "C"},
+    }
+    assert cache.get("c") == {"text": "C"}
+    stats = cache.stats()
+    # "a" had been pushed out of the two-entry memory tier by "b" and "c"
+    assert stats["disk_hits"] == 1
+    assert stats["memory_hits"] == 3
+    assert stats["misses"] == 1
+    assert stats["memory_size"] == 2
+    assert stats["disk_size"] == 3
+
+    # A fresh instance (another process) reads what this one wrote
+    assert LLMCache(tmp_path / "cache.sqlite").get("b") == {"text": "B"}
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    cache = LLMCache(tmp_path / "cache.sqlite", max_entries=10, memory_entries=0)
+    cache.set_many({f"p{i}": {"text": str(i)} for i in range(10)})
+    cache.get("p0")  # touch the oldest entry
+    cache.set_many({f"q{i}": {"text": str(i)} for i in range(3)})
+
+    stats = cache.stats()
+    assert stats["disk_size"] == 9
+    assert stats["evictions"] == 4
+    assert cache.get("p0") is not None
+    assert len(cache.get_many([f"p{i}" for i in range(1, 10)])) == 5
+    assert len(cache.get_many([f"q{i}" for i in range(3)])) == 3
+
+
+def test_ttl_expiry(tmp_path):
+    cache = LLMCache(tmp_path / "cache.sqlite", ttl_seconds=60)
+    cache.set("old", {"text": "stale"})
+    cache.set("new", {"text": "fresh"})
+    cache._conn().execute(
+        "UPDATE cache SET created_at = created_at - 120 WHERE response LIKE '%stale%'"
+    )
+    cache._memory.clear()
+
+    assert cache.get("old") is None
+    assert cache.get("new") == {"text": "fresh"}
+    cache.set_many({"x": {"text": "x"}})
+    assert cache.stats()["disk_size"] == 2
+
+
+def test_upgrades_legacy_table(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE cache (hash TEXT PRIMARY KEY, response TEXT)")
+    conn.execute(
+        "INSERT INTO cache VALUES (?, ?)",
+        # A row written by the old two-column schema
+        (
+            "e0b2b9e1ed6a2b9c3f3b1ab8e8a3c6d19a0b4b4b9a1b8e3f4aa9a3b2c1d0e9f8",
+            '{"text": "x"}',
+        ),
+    )
+    conn.commit()
+    conn.close()
+    cache = LLMCache(path)
+    cache.set("fresh", {"text": "y"})
+    assert cache.get("fresh") == {"text": "y"}
+    assert cache.stats()["disk_size"] == 2
+
+
+def _write_entries(path, start):
+    cache = LLMCache(path, memory_entries=0)
+    for i in range(start, start + 50):
+        cache.set(f"prompt {i}", {"text": str(i)})
+
+
+def test_concurrent_threads_and_processes(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    LLMCache(path).stats()  # create the schema up front
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_write_entries, args=(path, n * 50)) for n in range(2)]
+    threads = [
+        threading.Thread(target=_write_entries, args=(path, 100 + n * 50))
+        for n in range(2)
+    ]
+    for worker in procs + threads:
+        worker.start()
+    for worker in procs + threads:
+        worker.join()
+
+    assert all(proc.exitcode == 0 for proc in procs)
+    cache = LLMCache(path)
+    assert len(cache.get_many([f"prompt {i}" for i in range(200)])) == 200
@@ -0,0 +1,121 @@
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "farmchecker_new"))
+
+from migration_state import LocalBucket, MigrationState  # noqa: E402
+
+# Postgres-backed tests run when a scratch database is configured, e.g.
+# FARMCHECKER_TEST_DSN="host=/tmp/pgdata dbname=postgres user=postgres"
+TEST_DSN = os.getenv("FARMCHECKER_TEST_DSN")
+needs_postgres = pytest.mark.skipif(not TEST_DSN, reason="FARMCHECKER_TEST_DSN not set")
+
+
+def write_tweets(bucket_dir, name, ids):
+    path = bucket_dir / "twitter_data" / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tweets = [{"id": f"t{i}", "username": "user", "text": f"tweet number {i} text"} for i in ids]
+    path.write_text(json.dumps({"tweets": tweets}))
+    return path
+
+
+def test_migration_service_copy_in_sync():
+    canonical = (ROOT / "farmchecker_new" / "migration_state.py").read_text()
+    assert (ROOT / "migration_service" / "migration_state.py").read_text() == canonical
+
+
+def test_local_bucket_lists_by_prefix(tmp_path):
+    write_tweets(tmp_path, "a.json", [1])
+    (tmp_path / "other").mkdir()
+    (tmp_path / "other" / "b.json").write_text("{}")
+    blobs = LocalBucket(tmp_path).list_blobs(prefix="twitter_data/")
+    assert [b.name for b in blobs] == ["twitter_data/a.json"]
+    assert json.loads(blobs[0].download_as_text())["tweets"][0]["id"] == "t1"
+    assert blobs[0].etag and blobs[0].generation and blobs[0].updated
+
+
+@pytest.fixture
+def pg(monkeypatch):
+    psycopg2 = pytest.importorskip("psycopg2")
+    conn = psycopg2.connect(TEST_DSN)
+    with conn.cursor() as cursor:
+        cursor.execute("DROP SCHEMA IF EXISTS migration_state_test CASCADE")
+        cursor.execute("CREATE SCHEMA migration_state_test")
+        cursor.execute("SET search_path TO migration_state_test")
+        cursor.execute(
+            """CREATE TABLE tweets (
+                id SERIAL PRIMARY KEY, tweet_id VARCHAR(255) UNIQUE NOT NULL,
+                author_username VARCHAR(255), author_display_name VARCHAR(255),
+                author_verified BOOLEAN, author_followers_count INTEGER, content TEXT,
+                clean_content TEXT, url TEXT, published_at TIMESTAMP, collected_at TIMESTAMP,
+                likes_count INTEGER, retweets_count INTEGER, replies_count INTEGER,
+                views_count INTEGER, engagement_score DECIMAL, virality_score DECIMAL,
+                sentiment_score DECIMAL, viral_keywords JSONB, category VARCHAR(100),
+                urgency VARCHAR(50), raw_data JSONB)"""
+        )
+    conn.commit()
+
+    def connect():
+        c = psycopg2.connect(TEST_DSN, options="-c search_path=migration_state_test")
+        return c
+
+    yield conn, connect
+    conn.rollback()
+    with conn.cursor() as cursor:
+        cursor.execute("DROP SCHEMA migration_state_test CASCADE")
+    conn.commit()
+    conn.close()
+
+
+@needs_postgres
+def test_incremental_twitter_migration(pg, tmp_path, monkeypatch):
+    import migrate_to_dedicated_tables as m
+
+    conn, connect = pg
+    monkeypatch.setattr(m, "get_db_connection", connect)
+    bucket = LocalBucket(tmp_path)
+    write_tweets(tmp_path, "a.json", [1, 2])
+    write_tweets(tmp_path, "b.json", [3])
+
+    def count():
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*), COUNT(clean_content) FROM tweets")
+            result = cursor.fetchone()
+        conn.commit()
+        return result
+
+    assert m.migrate_twitter_data(bucket=bucket, batch_size=1)
+    assert count() == (3, 3)
+
+    state = MigrationState(conn, "twitter_data/")
+    assert state.pending(bucket.list_blobs(prefix="twitter_data/")) == []
+    assert state.watermark() is not None
+
+    # Only the rewritten file is downloaded again
+    time.sleep(0.01)
+    write_tweets(tmp_path, "b.json", [3, 4])
+    downloaded = []
+    original = bucket.list_blobs
+
+    def tracking_list(prefix=""):
+        blobs = original(prefix)
+        for blob in blobs:
+            read = blob.download_as_text
+            blob.download_as_text = lambda read=read, name=blob.name: downloaded.append(name) or read()
+        return blobs
+
+    monkeypatch.setattr(bucket, "list_blobs", tracking_list)
+    assert m.migrate_twitter_data(bucket=bucket)
+    assert downloaded == ["twitter_data/b.json"]
+    assert count() == (4, 4)
+
+    downloaded.clear()
+    assert m.migrate_twitter_data(bucket=bucket, full=True)
+    assert sorted(downloaded) == ["twitter_data/a.json", "twitter_data/b.json"]
+    assert count() == (4, 4)
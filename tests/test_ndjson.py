@@ -0,0 +1,116 @@
+import gzip
+import importlib.util
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from utils import ndjson
+from utils.delta_upload import LocalBucket
+from utils.ndjson import (
+    RecordWriter,
+    find_records,
+    iter_fields,
+    iter_records,
+    write_records,
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+ITEMS = [{"id": i, "text": "gm ✨" * (i % 4), "price": i / 3} for i in range(200)] + [
+    12345678901234567890,
+    -1.5e-7,
+    True,
+    None,
+    "tail",
+]
+
+
+def test_legacy_documents_stream_across_chunk_boundaries(tmp_path, monkeypatch):
+    # Tiny chunks split strings, numbers and literals mid-token
+    monkeypatch.setattr(ndjson, "CHUNK_SIZE", 5)
+    array = tmp_path / "twitter_raw.json"
+    array.write_text(json.dumps(ITEMS, indent=2))
+    assert list(iter_records(array)) == ITEMS
+
+    document = tmp_path / "twitter_latest.json"
+    document.write_text(
+        json.dumps({"meta": {"pages": [1, 2]}, "tweets": ITEMS, "other": [{"x": 1}]})
+    )
+    assert list(iter_records(document, key="tweets")) == ITEMS
+    assert list(iter_records(document, key="missing")) == []
+    assert [k for k, _ in iter_fields(document, ["other", "meta"])] == ["meta", "other"]
+
+
+def test_ndjson_roundtrip_and_sniffing(tmp_path):
+    path = tmp_path / "tweets.ndjson.gz"
+    assert write_records(path, iter(ITEMS)) == len(ITEMS)
+    assert gzip.decompress(path.read_bytes()).count(b"\n") == len(ITEMS)
+    assert list(iter_records(path)) == ITEMS
+    # Bytes and file objects: compression and format are sniffed
+    assert list(iter_records(path.read_bytes())) == ITEMS
+    assert list(iter_records(b'{"a": 1}\n\n{"a": 2}\n')) == [{"a": 1}, {"a": 2}]
+    assert find_records(tmp_path, "tweets") == path
+
+
+def test_json_writer_output_loads_with_json_module(tmp_path):
+    path = tmp_path / "out.json"
+    write_records(path, ITEMS, indent=2)
+    assert json.loads(path.read_text()) == ITEMS
+    write_records(path, [])
+    assert json.loads(path.read_text()) == []
+
+    # A failed write leaves the previous file in place
+    with pytest.raises(KeyError):
+        with RecordWriter(path) as writer:
+            writer.write({"partial": True})
+            raise KeyError
+    assert json.loads(path.read_text()) == []
+    assert list(tmp_path.glob("*.tmp")) == []
+
+
+def test_document_writer_streams_iterators(tmp_path):
+    path = tmp_path / "consolidated.json"
+    counts = ndjson.write_document(
+        path, {"tweets": iter(ITEMS), "empty": iter(()), "metadata": {"n": 1}}
+    )
+    assert counts == {"tweets": len(ITEMS), "empty": 0}
+    assert json.loads(path.read_text()) == {
+        "tweets": ITEMS,
+        "empty": [],
+        "metadata": {"n": 1},
+    }
+
+
+def test_migration_service_streams_items(tmp_path):
+    copy = ROOT / "migration_service" / "ndjson.py"
+    assert copy.read_text() == (ROOT / "utils" / "ndjson.py").read_text()
+
+    for module in ("flask", "psycopg2", "google.cloud.storage"):
+        pytest.importorskip(module)
+    sys.path.insert(0, str(ROOT / "migration_service"))
+    try:
+        spec = importlib.util.spec_from_file_location(
+            "migration_service_main", ROOT / "migration_service" / "main.py"
+        )
+        main = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(main)
+    finally:
+        sys.path.remove(str(ROOT / "migration_service"))
+
+    documents = {
+        "dexscreener": {
+            "token_pairs": [{"id": "p"}],
+            "latest_token_profiles": [{"id": "a"}],
+            "metadata": {},
+        },
+        "reddit": {"data": [{"id": "r"}]},
+        "crypto": {"data": [{"id": "c"}]},
+    }
+    bucket = LocalBucket(tmp_path)
+    for source, document in documents.items():
+        blob = bucket.blob(f"consolidated/{source}_consolidated.json")
+        blob.upload_from_string(json.dumps(document))
+        expected = main.extract_items_from_data(document, source)
+        streamed = list(main.iter_items_from_blob(blob, source))
+        assert sorted(streamed, key=str) == sorted(expected, key=str)
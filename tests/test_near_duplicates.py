@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+from processor.near_duplicates import NearDuplicateIndex
+
+SHILL = "$PEPE is about to send, devs are based and the chart looks insane, get in before 100x"
+OTHER = "Bitcoin ETF inflows hit a record today as miners keep selling into strength"
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "near_duplicates.sqlite"
+
+
+def test_copies_and_light_edits_cluster_under_first_post(path):
+    index = NearDuplicateIndex(path)
+    matches = list(
+        index.check_many(
+            [
+                ("t:1", SHILL),
+                ("t:2", SHILL.upper() + " 🚀🚀 https://t.co/x @pepe_holder"),
+                ("t:3", SHILL.replace("insane", "wild")),
+                ("t:4", OTHER),
+                ("t:5", ""),
+            ],
+            namespace="twitter",
+        )
+    )
+    assert [m.canonical for m in matches] == [None, "t:1", "t:1", None, None]
+    assert 0.7 <= matches[2].similarity < 1.0
+
+    [cluster] = index.clusters(namespace="twitter")
+    assert cluster["canonical"] == "t:1" and cluster["size"] == 3
+    assert [m["key"] for m in cluster["members"]] == ["t:2", "t:3"]
+    assert index.cluster_size("t:3") == 3 and index.cluster_size("t:4") == 1
+
+
+def test_index_persists_and_known_items_keep_their_answer(path):
+    NearDuplicateIndex(path).check("t:1", SHILL, "twitter")
+
+    index = NearDuplicateIndex(path)
+    assert index.check("t:2", SHILL, "twitter").canonical == "t:1"
+    # Re-checking the head (a re-crawl) does not flag it as its own copy
+    again = index.check("t:1", SHILL, "twitter")
+    assert again.known and not again.is_duplicate
+    assert index.check("t:2", SHILL, "twitter").known
+    # Namespaces are matched separately
+    assert not index.check("r:1", SHILL, "reddit").is_duplicate
+    assert index.stats() == {"items": 3, "canonical": 2, "duplicates": 1, "clusters": 1}
+
+    # Checking without adding leaves the index untouched
+    assert index.check("t:9", SHILL, "twitter", add=False).canonical == "t:1"
+    assert index.stats()["items"] == 3
+
+
+def test_settings_are_fixed_per_index_and_prune_expires(path):
+    index = NearDuplicateIndex(path)
+    index.check("t:1", SHILL, "twitter")
+    index.check("t:2", SHILL, "twitter")
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(path, bands=8)
+
+    assert index.prune(3600) == 0
+    time.sleep(0.01)
+    assert index.prune(0) == 2
+    assert not index.check("t:3", SHILL, "twitter").is_duplicate
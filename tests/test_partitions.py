@@ -0,0 +1,157 @@
+import gzip
+import os
+import sys
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "farmchecker_new"))
+
+import partitions  # noqa: E402
+
+TEST_DSN = os.getenv("FARMCHECKER_TEST_DSN")
+needs_postgres = pytest.mark.skipif(not TEST_DSN, reason="FARMCHECKER_TEST_DSN not set")
+
+TWEETS = partitions.PartitionedTable(
+    "tweets", "published_at", "week", (("tweet_id",),), keep=4
+)
+
+
+def test_periods():
+    wednesday = date(2025, 1, 1)
+    assert partitions.period_start(wednesday, "day") == wednesday
+    assert partitions.period_start(datetime(2025, 1, 1, 13), "week") == date(
+        2024, 12, 30
+    )
+    assert partitions.period_start(wednesday, "month") == wednesday
+    assert partitions.shift(date(2024, 11, 1), "month", 3) == date(2025, 2, 1)
+    assert partitions.shift(date(2025, 1, 1), "month", -1) == date(2024, 12, 1)
+    assert partitions.shift(date(2024, 12, 30), "week", -1) == date(2024, 12, 23)
+    assert partitions.partition_name("tweets", date(2024, 12, 30)) == "tweets_p20241230"
+    with pytest.raises(ValueError):
+        partitions.period_start(wednesday, "year")
+
+
+@pytest.fixture
+def pg(tmp_path):
+    psycopg2 = pytest.importorskip("psycopg2")
+    conn = psycopg2.connect(TEST_DSN, options="-c search_path=partitions_test")
+    with conn.cursor() as cursor:
+        cursor.execute("DROP SCHEMA IF EXISTS partitions_test CASCADE")
+        cursor.execute("CREATE SCHEMA partitions_test")
+        cursor.execute("""
+            CREATE TABLE tweets (
+                id SERIAL PRIMARY KEY, tweet_id VARCHAR(255) UNIQUE NOT NULL,
+                content TEXT NOT NULL, published_at TIMESTAMP,
+                collected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)
+            """)
+        cursor.execute(
+            "CREATE INDEX idx_tweets_published_at_id ON tweets (published_at, id)"
+        )
+        cursor.execute("""
+            CREATE FUNCTION touch() RETURNS TRIGGER AS $$
+            BEGIN NEW.updated_at = '2000-01-01'; RETURN NEW; END; $$ LANGUAGE plpgsql;
+            CREATE TRIGGER update_tweets_updated_at BEFORE UPDATE ON tweets
+                FOR EACH ROW EXECUTE FUNCTION touch();
+            """)
+    conn.commit()
+    yield conn
+    conn.rollback()
+    with conn.cursor() as cursor:
+        cursor.execute("DROP SCHEMA partitions_test CASCADE")
+    conn.commit()
+    conn.close()
+
+
+def insert(cursor, *rows):
+    cursor.execute(
+        "INSERT INTO tweets (tweet_id, content, published_at) VALUES "
+        + ", ".join(["(%s, 'gm', %s)"] * len(rows))
+        + " ON CONFLICT DO NOTHING",
+        [value for row in rows for value in row],
+    )
+    return cursor.rowcount
+
+
+@needs_postgres
+def test_migrate_keeps_rows_keys_and_triggers(pg):
+    now = datetime.now()
+    with pg.cursor() as cursor:
+        insert(
+            cursor, *[(f"t{day}", now - timedelta(days=day)) for day in range(0, 60, 3)]
+        )
+        insert(cursor, ("undated", None))
+    pg.commit()
+
+    assert partitions.migrate_table(pg, TWEETS, batch_size=7) == 21
+    assert partitions.is_partitioned(pg, "tweets")
+    # The four newest weeks and two ahead; older rows wait in the default
+    starts = [start for start, _ in partitions.list_partitions(pg, "tweets")]
+    this_week = partitions.period_start(date.today(), "week")
+    assert starts == [partitions.shift(this_week, "week", n) for n in range(-3, 3)]
+
+    with pg.cursor() as cursor:
+        # Natural keys still dedupe, NULL partition keys included
+        assert insert(cursor, ("t0", now), ("undated", None), ("new", now)) == 1
+        # The id sequence carries on; each attempted row drew an id
+        cursor.execute("SELECT nextval(pg_get_serial_sequence('tweets', 'id'))")
+        assert cursor.fetchone()[0] == 25
+        cursor.execute(
+            "UPDATE tweets SET content = 'gn' WHERE tweet_id = 'new' RETURNING updated_at"
+        )
+        assert cursor.fetchone()[0] == datetime(2000, 1, 1)
+
+        # A recent window skips the partitions of older weeks
+        cursor.execute(
+            "EXPLAIN (ANALYZE, COSTS OFF) SELECT id FROM tweets"
+            " WHERE published_at >= NOW() - INTERVAL '7 days' ORDER BY published_at DESC, id DESC LIMIT 5"
+        )
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+        scanned = [
+            start
+            for start, name in partitions.list_partitions(pg, "tweets")
+            if name in plan
+        ]
+        assert min(scanned) == partitions.shift(this_week, "week", -1)
+        cursor.execute(
+            "SELECT indexdef FROM pg_indexes WHERE indexname = 'idx_tweets_published_at_id'"
+        )
+        assert "ON ONLY partitions_test.tweets " in cursor.fetchone()[0]
+
+
+@needs_postgres
+def test_maintain_drains_default_and_archives_expired(pg, tmp_path):
+    now = datetime.now()
+    with pg.cursor() as cursor:
+        insert(cursor, ("recent", now), ("old", now - timedelta(weeks=10)))
+    pg.commit()
+    partitions.migrate_table(pg, TWEETS)
+    with pg.cursor() as cursor:
+        insert(cursor, ("later", now + timedelta(weeks=8)))
+    pg.commit()
+
+    created, dropped = partitions.maintain(pg, TWEETS, archive_dir=str(tmp_path))
+    later = partitions.partition_name(
+        "tweets", partitions.period_start(now + timedelta(weeks=8), "week")
+    )
+    old = partitions.partition_name(
+        "tweets", partitions.period_start(now - timedelta(weeks=10), "week")
+    )
+    assert created == [old, later]
+    assert dropped == [old]
+
+    with pg.cursor() as cursor:
+        cursor.execute(
+            "SELECT tableoid::regclass::text, tweet_id FROM tweets ORDER BY published_at"
+        )
+        assert [row[1] for row in cursor.fetchall()] == ["recent", "later"]
+        cursor.execute("SELECT COUNT(*) FROM tweets_default")
+        assert cursor.fetchone()[0] == 0
+    with gzip.open(tmp_path / f"{old}.csv.gz", "rt") as archive:
+        lines = archive.read().splitlines()
+    assert lines[0].startswith("id,tweet_id,content,published_at")
+    assert [line.split(",")[1] for line in lines[1:]] == ["old"]
+    assert partitions.maintain(pg, TWEETS, archive_dir=str(tmp_path)) == ([], [])
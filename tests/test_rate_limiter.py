@@ -0,0 +1,109 @@
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+
+from utils.rate_limiter import (
+    APIRateLimiter,
+    RateLimiter,
+    SQLiteBackend,
+    api_limiter,
+    get_limiter,
+    rate_limited,
+)
+
+
+def test_burst_then_exact_spacing():
+    limiter = RateLimiter(600, burst=3)  # one slot every 0.1s
+    assert all(limiter.try_acquire() for _ in range(3))
+    assert not limiter.try_acquire()
+
+    start = time.monotonic()
+    assert limiter.wait_sync(timeout=1)
+    assert limiter.wait_sync(timeout=1)
+    elapsed = time.monotonic() - start
+    assert 0.15 < elapsed < 0.3
+    # The next slot is more than 0.05s away: give up without reserving it
+    assert not limiter.wait_sync(timeout=0.05)
+    assert not limiter.try_acquire("default")
+    assert limiter.try_acquire("other-key")
+
+
+def test_async_waiters_released_in_fifo_order():
+    limiter = RateLimiter(1200, burst=1)  # one slot every 0.05s
+    released = []
+
+    async def waiter(n):
+        assert await limiter.wait_and_acquire(timeout=5)
+        released.append((n, time.monotonic()))
+
+    async def run():
+        await asyncio.gather(*(waiter(n) for n in range(6)))
+
+    start = time.monotonic()
+    asyncio.run(run())
+    assert [n for n, _ in released] == list(range(6))
+    # Woken at their slot, not on a 1s polling tick
+    assert released[-1][1] - start == pytest.approx(0.25, abs=0.08)
+
+
+def test_cancelled_waiter_returns_its_slot():
+    limiter = RateLimiter(60, burst=1)  # one slot per second
+    assert limiter.try_acquire()
+
+    async def run():
+        task = asyncio.create_task(limiter.wait_and_acquire(timeout=5))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    start = time.monotonic()
+    assert limiter.wait_sync(timeout=2)
+    assert time.monotonic() - start < 1.1
+
+
+def test_limiters_are_shared_process_wide():
+    assert APIRateLimiter().limiters["coingecko"] is get_limiter("coingecko")
+    assert api_limiter.limiters["coingecko"] is get_limiter("coingecko")
+    assert get_limiter("newsapi").period == 24 * 3600
+    assert get_limiter("unknown") is None
+
+    calls = []
+
+    @rate_limited("not-configured")
+    def sync_call(x):
+        calls.append(x)
+        return x
+
+    @rate_limited("not-configured")
+    async def async_call(x):
+        return x
+
+    assert sync_call(1) == 1
+    assert asyncio.run(async_call(2)) == 2
+    assert sync_call.__name__ == "sync_call"
+
+
+def _take_slots(path, n, out):
+    limiter = RateLimiter(1200, burst=1, name="shared", backend=SQLiteBackend(path))
+    for _ in range(n):
+        limiter.wait_sync(timeout=10)
+        out.put(time.time())
+
+
+def test_sqlite_backend_shares_quota_across_processes(tmp_path):
+    path = tmp_path / "limits.sqlite"
+    ctx = multiprocessing.get_context("fork")
+    out = ctx.Queue()
+    procs = [ctx.Process(target=_take_slots, args=(path, 5, out)) for _ in range(3)]
+    for proc in procs:
+        proc.start()
+    stamps = sorted(out.get(timeout=10) for _ in range(15))
+    for proc in procs:
+        proc.join()
+
+    # 15 calls at one per 0.05s across all processes: >= 0.7s in total
+    assert stamps[-1] - stamps[0] >= 0.65
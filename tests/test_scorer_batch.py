@@ -0,0 +1,103 @@
+import random
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from processor import scorer
+
+WORDS = ["moon", "rug", "pump", "wagmi", "scam", "love", "hate", "$PEPE", "$WIF"]
+
+
+class _LinearVirality:
+    def predict(self, x):
+        return np.asarray(x, dtype=float) @ np.array([1.0, 3.0, 2.0, 0.5, 40.0])
+
+
+def _items(n: int) -> list[dict]:
+    rng = random.Random(7)
+    items = []
+    for i in range(n):
+        item = {
+            "text": " ".join(rng.choices(WORDS, k=rng.randint(0, 8))),
+            "likeCount": rng.randint(0, 5000),
+            "retweetCount": rng.randint(0, 800),
+            "replyCount": rng.randint(0, 300),
+        }
+        if i % 3:
+            item["userFollowersCount"] = rng.choice([None, 0, rng.randint(1, 10**6)])
+        if i % 4 == 0:
+            item["createdAt"] = f"2025-07-01T{i % 24:02d}:00:00"
+        elif i % 4 == 1:
+            item["createdAt"] = "2025-07-01T10:00:00Z"
+        items.append(item)
+    return items
+
+
+def test_batch_matches_per_item(monkeypatch):
+    model = Pipeline(
+        [("tfidf", TfidfVectorizer()), ("clf", LogisticRegression())]
+    ).fit(["moon pump wagmi", "rug scam hate", "love moon", "scam"], [1, 0, 1, 0])
+    monkeypatch.setattr(scorer, "_model", model)
+    monkeypatch.setattr(scorer, "_virality_model", _LinearVirality())
+    monkeypatch.setattr(scorer._buzz, "get_accel", lambda s: 3.0 if s == "$PEPE" else 1.0)
+
+    items = _items(500)
+    assert scorer.degen_score_batch(items) == [scorer.degen_score(it) for it in items]
+
+
+def test_batch_matches_per_item_without_models(monkeypatch):
+    monkeypatch.setattr(scorer, "_model", None)
+    monkeypatch.setattr(scorer, "_virality_model", None)
+
+    items = _items(200) + [{}]
+    assert scorer.degen_score_batch(items) == [scorer.degen_score(it) for it in items]
+    assert scorer.degen_score_batch([]) == []
+
+
+class _FailsOn:
+    """Wraps a model so any call with a row matching *bad* raises"""
+
+    def __init__(self, model, method, bad):
+        self.model, self.method, self.bad = model, method, bad
+
+    def _call(self, x):
+        if any(self.bad(row) for row in x):
+            raise ValueError("bad row")
+        return getattr(self.model, self.method)(x)
+
+    def predict_proba(self, x):
+        return self._call(x)
+
+    def predict(self, x):
+        return self._call(x)
+
+
+def test_batch_matches_per_item_when_one_row_fails(monkeypatch):
+    model = Pipeline(
+        [("tfidf", TfidfVectorizer()), ("clf", LogisticRegression())]
+    ).fit(["moon pump wagmi", "rug scam hate", "love moon", "scam"], [1, 0, 1, 0])
+    items = _items(50)
+    items[7] = {"text": "poison row", "likeCount": 13_013, "retweetCount": 0}
+    monkeypatch.setattr(
+        scorer, "_model", _FailsOn(model, "predict_proba", lambda t: t == "poison row")
+    )
+    monkeypatch.setattr(
+        scorer,
+        "_virality_model",
+        _FailsOn(_LinearVirality(), "predict", lambda f: f[0] == 13_013),
+    )
+    monkeypatch.setattr(scorer._buzz, "get_accel", lambda s: 1.0)
+
+    single = [scorer.degen_score(it) for it in items]
+    assert scorer.degen_score_batch(items) == single
+
+    # Only the poisoned item lost its model components
+    monkeypatch.setattr(scorer, "_model", model)
+    monkeypatch.setattr(scorer, "_virality_model", _LinearVirality())
+    healthy = scorer.degen_score_batch(items)
+    changed = [
+        i for i, (a, b) in enumerate(zip(single, healthy, strict=True)) if a != b
+    ]
+    assert changed == [7]
@@ -0,0 +1,82 @@
+import pytest
+
+from utils.seen_store import SeenStore
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(SeenStore, "clock", staticmethod(clock))
+    return clock
+
+
+def test_unseen_skips_marked_and_repeated_keys(tmp_path, clock):
+    store = SeenStore(tmp_path / "seen.sqlite")
+    posts = [{"link": f"r/{i}"} for i in range(5)] + [{"link": "r/0"}]
+    fresh = store.unseen("reddit", posts, key=lambda p: p["link"])
+    assert [p["link"] for p in fresh] == ["r/0", "r/1", "r/2", "r/3", "r/4"]
+    # Nothing is marked until the caller says so
+    assert store.unseen("reddit", posts[:2], key=lambda p: p["link"]) == posts[:2]
+
+    assert store.mark("reddit", ["r/0", "r/1", "r/1"]) == 2
+    assert store.seen_many("reddit", ["r/0", "r/1", "r/2"]) == [True, True, False]
+    # Namespaces are separate
+    assert not store.seen("news", "r/0")
+
+    # Another process (or a restart) sees the same keys, and keys marked
+    # later by the first one
+    other = SeenStore(tmp_path / "seen.sqlite")
+    assert other.seen("reddit", "r/1")
+    store.mark("reddit", ["r/2"])
+    assert other.seen("reddit", "r/2")
+
+
+def test_keys_expire_after_ttl_since_last_seen(tmp_path, clock):
+    store = SeenStore(tmp_path / "seen.sqlite", ttl_seconds=3600)
+    store.mark("twitter", ["a", "b"])
+    clock.now += 3000
+    store.mark("twitter", ["b"])  # seen again: its TTL restarts
+    clock.now += 1000
+    assert store.seen_many("twitter", ["a", "b"]) == [False, True]
+    assert store.expire() == 1
+    assert store.stats("twitter")["entries"] == 1
+
+    clock.now += 3601
+    assert not store.seen("twitter", "b")
+    # Expired generations are dropped from memory
+    assert store.stats()["generations"] <= 2
+
+
+def test_filter_rotation_and_false_positive_rate(tmp_path, clock):
+    # Tiny, sloppy filters: rotation by size, plenty of false positives
+    store = SeenStore(
+        tmp_path / "seen.sqlite", capacity=200, error_rate=0.05, max_generations=3
+    )
+    marked = [f"m{i}" for i in range(500)]
+    store.mark("dex", marked)
+    new = [f"n{i}" for i in range(5000)]
+
+    # False positives are confirmed away in SQLite: answers stay exact
+    assert all(store.seen_many("dex", marked[-200:]))
+    assert not any(store.seen_many("dex", new))
+    stats = store.stats()
+    assert stats["generations"] == 3 and stats["entries"] == 500
+    assert stats["false_positives"] > 0
+    assert stats["false_positive_rate"] == stats["false_positives"] / 5000
+    assert 0 < stats["expected_false_positive_rate"] < 0.5
+
+    # A fourth generation pushes out the first before its keys expire; they
+    # are looked up in SQLite instead
+    store.mark("dex", [f"x{i}" for i in range(200)])
+    assert store.stats()["generations"] == 3
+    assert all(store.seen_many("dex", marked[:200]))
+    assert not any(store.seen_many("dex", new[:100]))
+
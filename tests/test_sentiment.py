@@ -0,0 +1,25 @@
+from processor import sentiment
+from processor.sentiment import SentimentCache
+
+
+def test_duplicate_texts_hit_cache():
+    sentiment.clear_cache()
+    texts = ["wagmi this is amazing", "rug pull, total scam", "wagmi this is amazing"]
+    scores = sentiment.compound_batch(texts)
+    assert scores[0] == scores[2] > 0 > scores[1]
+
+    sentiment.compound("rug pull, total scam")
+    stats = sentiment.cache_stats()["vader"]
+    assert stats["misses"] == 2
+    assert stats["hits"] == 1
+    assert sentiment.compound("") == 0.0
+
+
+def test_cache_is_bounded():
+    cache = SentimentCache(max_size=2)
+    for text in ["a", "b", "c", "a"]:
+        cache.get_or_compute(text, len)
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["evictions"] == 2
+    assert stats["hits"] == 0
@@ -0,0 +1,131 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from processor import summarizer
+from utils.rate_limiter import APIRateLimiter, RateLimiter
+
+LATENCY = 0.2
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    """OpenAI-compatible /chat/completions endpoint that answers after LATENCY seconds."""
+
+    daemon_threads = True
+
+    def __init__(self, fail_first: int = 0):
+        super().__init__(("127.0.0.1", 0), MockLLMHandler)
+        self.fail_first = fail_first
+        self.requests = 0
+        self.lock = threading.Lock()
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            self.server.requests += 1
+            fail = self.server.requests <= self.server.fail_first
+        time.sleep(LATENCY)
+        if fail:
+            payload, status = {"error": {"message": "overloaded"}}, 503
+        else:
+            text = (
+                body["messages"][0]["content"].rsplit("Now rewrite: \n", 1)[1].strip()
+            )
+            payload, status = {
+                "id": "cmpl",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": f"GM {text}\nbody"},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 90,
+                    "completion_tokens": 10,
+                    "total_tokens": 100,
+                },
+            }, 200
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def unlimited():
+    return APIRateLimiter({"openai": RateLimiter(100_000)})
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    def start(fail_first=0):
+        server = MockLLMServer(fail_first)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        monkeypatch.setenv(
+            "OPENROUTER_API_BASE", f"http://127.0.0.1:{server.server_port}/v1"
+        )
+        return server
+
+    servers = []
+    cache, usage_calls = {}, []
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    monkeypatch.setattr(
+        summarizer.llm_cache,
+        "get_many",
+        lambda ps: {p: cache[p] for p in ps if p in cache},
+    )
+    monkeypatch.setattr(summarizer.llm_cache, "set_many", cache.update)
+    monkeypatch.setattr(summarizer, "get_month_usage", lambda month: None)
+    monkeypatch.setattr(
+        summarizer, "add_llm_tokens", lambda t, c: usage_calls.append(t)
+    )
+    monkeypatch.setattr(summarizer, "RETRY_BASE_DELAY", 0.01)
+    yield start, cache, usage_calls
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_batch_runs_concurrently(llm):
+    start, cache, usage_calls = llm
+    server = start()
+    items = [{"text": f"post {i}"} for i in range(16)]
+
+    began = time.perf_counter()
+    results = summarizer.rewrite_batch(items, concurrency=8, limiter=unlimited())
+    elapsed = time.perf_counter() - began
+
+    assert [r["headline"] for r in results] == [f"GM post {i}" for i in range(16)]
+    assert server.requests == 16
+    # 16 requests at 8 in flight take two round trips, not sixteen
+    assert elapsed < 16 * LATENCY / 2
+    assert usage_calls == [1600]
+
+    # A second batch is served from the cache without any requests
+    assert summarizer.rewrite_batch(items, limiter=unlimited()) == results
+    assert server.requests == 16
+
+
+def test_transient_errors_are_retried(llm):
+    start, cache, usage_calls = llm
+    server = start(fail_first=2)
+    results = summarizer.rewrite_batch(
+        [{"text": "alpha"}, {"text": "beta"}], concurrency=2, limiter=unlimited()
+    )
+    assert [r["headline"] for r in results] == ["GM alpha", "GM beta"]
+    assert server.requests == 4
+    assert usage_calls == [200]
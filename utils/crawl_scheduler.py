@@ -0,0 +1,358 @@
+"""Adaptive poll scheduling for the continuous crawlers.
+
+The crawlers used to sleep a fixed interval between cycles (7 minutes for
+the DEX APIs, 30 minutes for Twitter) whether or not anything had changed.
+An ``AdaptiveScheduler`` sets each source's next poll from what its
+previous polls saw:
+
+* change rate: an EWMA of the share of fetched items that were new or
+  whose content hash changed. Busy sources are polled sooner and idle ones
+  back off towards ``max_interval``.
+* errors: every consecutive failure doubles the interval.
+* quota: the next poll waits until the source's ``utils.rate_limiter``
+  bucket has room for a poll of the same size.
+* call budget: a source never spends more API calls than its fixed
+  schedule would (``calls_per_poll`` every ``base_interval``). Calls saved
+  while idle, or by skipping unchanged items, are banked (up to
+  ``SCHEDULER_MAX_CREDIT`` polls' worth) and spent polling hot sources
+  faster.
+
+Within a source, ``select`` returns items (token addresses, pairs) hottest
+first and skips unchanged ones for exponentially more polls, so a volatile
+token is refreshed every poll while a flat one is looked up every few.
+
+Each decision is logged and written to ``output/crawl_schedule_<name>.json``.
+
+    scheduler = AdaptiveScheduler("dexpaprika")
+    scheduler.register("tokens", base_interval=420, quota="dexpaprika")
+    while True:
+        wanted = scheduler.select("tokens", addresses)
+        tokens = await fetch(wanted)
+        scheduler.observe("tokens", tokens, calls=len(wanted))
+        await asyncio.sleep(scheduler.seconds_until_due())
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from utils.advanced_logging import get_logger
+from utils.rate_limiter import RateLimiter, get_limiter
+
+logger = get_logger(__name__)
+
+SCHEDULE_DIR = Path(os.getenv("CRAWL_SCHEDULE_DIR", "output"))
+# Weight of the latest poll in the change-rate average
+CHANGE_ALPHA = float(os.getenv("SCHEDULER_CHANGE_ALPHA", "0.3"))
+# Change rate at which a source is polled exactly at its base interval
+TARGET_CHANGE_RATE = float(os.getenv("SCHEDULER_TARGET_CHANGE_RATE", "0.1"))
+# Unspent calls a source may bank, in polls at the base schedule
+MAX_CREDIT_POLLS = float(os.getenv("SCHEDULER_MAX_CREDIT", "6"))
+# An unchanged item is looked up at most every this many polls
+ITEM_MAX_BACKOFF = int(os.getenv("SCHEDULER_ITEM_MAX_BACKOFF", "4"))
+MAX_TRACKED_ITEMS = 5000
+MAX_ERROR_DOUBLINGS = 4
+HOT_ITEMS_REPORTED = 5
+# Keeps the interval finite for a source that has gone completely quiet
+_MIN_RATE = 0.01
+
+
+def content_hash(payload: Any) -> str:
+    """Stable digest of a JSON-like payload (key order does not matter)."""
+    text = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=UTC).isoformat()
+
+
+@dataclass
+class ItemState:
+    hash: str
+    change_rate: float = 1.0
+    backoff: int = 1  # looked up every *backoff* polls
+    skip: int = 0  # polls left before the next lookup
+
+
+@dataclass
+class SourceState:
+    name: str
+    base_interval: float
+    min_interval: float
+    max_interval: float
+    quota: str | None = None
+    # Calls the fixed schedule makes per poll; None = learn from the first poll
+    calls_per_poll: int | None = None
+    interval: float = 0.0
+    change_rate: float = TARGET_CHANGE_RATE
+    error_rate: float = 0.0
+    consecutive_errors: int = 0
+    credit: float = 0.0
+    last_poll: float | None = None
+    next_due: float = 0.0
+    polls: int = 0
+    calls: int = 0
+    items: OrderedDict[str, ItemState] = field(default_factory=OrderedDict)
+    last_decision: dict[str, Any] = field(default_factory=dict)
+
+
+class AdaptiveScheduler:
+    """Per-source poll intervals driven by change rate, errors and quota.
+
+    *limiters* maps quota names to limiters (tests, simulations); by default
+    the process-wide ``get_limiter`` instances are consulted.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        clock: Callable[[], float] = time.time,
+        metrics_path: Path | str | None = None,
+        limiters: Mapping[str, RateLimiter] | None = None,
+    ):
+        self.name = name
+        self.clock = clock
+        self.metrics_path = (
+            Path(metrics_path)
+            if metrics_path
+            else SCHEDULE_DIR / f"crawl_schedule_{name}.json"
+        )
+        self._limiters = limiters
+        self.sources: dict[str, SourceState] = {}
+
+    def register(
+        self,
+        source: str,
+        base_interval: float,
+        *,
+        min_interval: float | None = None,
+        max_interval: float | None = None,
+        quota: str | None = None,
+        calls_per_poll: int | None = None,
+    ) -> SourceState:
+        """Add a source, due immediately. Intervals default to a quarter and
+        four times *base_interval*."""
+        state = SourceState(
+            name=source,
+            base_interval=base_interval,
+            min_interval=min_interval or base_interval / 4,
+            max_interval=max_interval or base_interval * 4,
+            quota=quota,
+            calls_per_poll=calls_per_poll,
+            interval=base_interval,
+            next_due=self.clock(),
+        )
+        self.sources[source] = state
+        return state
+
+    def _limiter(self, quota: str | None) -> RateLimiter | None:
+        if quota is None:
+            return None
+        if self._limiters is not None:
+            return self._limiters.get(quota)
+        return get_limiter(quota)
+
+    # -- what to poll ------------------------------------------------------
+
+    def due(self, now: float | None = None) -> list[str]:
+        """Sources whose next poll is due, most active first."""
+        now = self.clock() if now is None else now
+        ready = [s for s in self.sources.values() if s.next_due <= now]
+        ready.sort(key=lambda s: (-s.change_rate, s.next_due))
+        return [s.name for s in ready]
+
+    def seconds_until_due(self, now: float | None = None) -> float:
+        """Time until the next source is due (0 if one already is)."""
+        if not self.sources:
+            return 0.0
+        now = self.clock() if now is None else now
+        return max(0.0, min(s.next_due for s in self.sources.values()) - now)
+
+    def select(
+        self, source: str, keys: Iterable[str], limit: int | None = None
+    ) -> list[str]:
+        """Items of *source* to look up this poll, hottest first.
+
+        Unseen items come first, then known ones by change rate; items that
+        have not changed lately sit out their backoff. Call once per poll.
+        """
+        state = self.sources[source]
+        chosen = []
+        for key in dict.fromkeys(keys):
+            item = state.items.get(key)
+            if item is not None and item.skip > 0:
+                item.skip -= 1
+                continue
+            chosen.append(key)
+        chosen.sort(
+            key=lambda k: -state.items[k].change_rate if k in state.items else -2.0
+        )
+        return chosen[:limit] if limit else chosen
+
+    def hot_items(self, source: str, n: int = HOT_ITEMS_REPORTED) -> list[str]:
+        """The *n* items of *source* that change most often."""
+        items = self.sources[source].items
+        ranked = sorted(items, key=lambda k: items[k].change_rate, reverse=True)
+        return [k for k in ranked[:n] if items[k].change_rate > 0]
+
+    # -- feedback ----------------------------------------------------------
+
+    def _track(self, state: SourceState, items: Mapping[str, Any]) -> tuple[int, int]:
+        """Update per-item hashes; returns (new, changed) counts."""
+        new = changed = 0
+        for key, payload in items.items():
+            digest = content_hash(payload)
+            item = state.items.get(key)
+            if item is None:
+                state.items[key] = ItemState(digest)
+                new += 1
+                continue
+            state.items.move_to_end(key)
+            moved = item.hash != digest
+            item.hash = digest
+            item.change_rate += CHANGE_ALPHA * (float(moved) - item.change_rate)
+            if moved:
+                changed += 1
+                item.backoff = 1
+            else:
+                item.backoff = min(item.backoff * 2, ITEM_MAX_BACKOFF)
+            item.skip = item.backoff - 1
+        while len(state.items) > MAX_TRACKED_ITEMS:
+            state.items.popitem(last=False)
+        return new, changed
+
+    def observe(
+        self,
+        source: str,
+        items: Mapping[str, Any] | None = None,
+        *,
+        error: bool = False,
+        calls: int | None = None,
+        now: float | None = None,
+    ) -> dict[str, Any]:
+        """Record a finished poll of *source* and schedule the next one.
+
+        *items* maps item keys (token address, tweet key, ...) to the payload
+        fetched for them; *calls* is the number of API calls the poll made.
+        Returns the schedule decision, which is also logged and exported.
+        """
+        state = self.sources[source]
+        now = self.clock() if now is None else now
+        items = items or {}
+        if state.calls_per_poll is None:
+            state.calls_per_poll = max(1, calls or 1)
+        calls = state.calls_per_poll if calls is None else calls
+
+        new, changed = self._track(state, items)
+        if error:
+            state.consecutive_errors += 1
+            state.error_rate += CHANGE_ALPHA * (1.0 - state.error_rate)
+        else:
+            state.consecutive_errors = 0
+            state.error_rate -= CHANGE_ALPHA * state.error_rate
+            activity = (new + changed) / len(items) if items else 0.0
+            state.change_rate += CHANGE_ALPHA * (activity - state.change_rate)
+
+        # Calls accrue at the fixed schedule's rate; the first poll is free,
+        # as the fixed schedule polls at start-up too
+        if state.last_poll is not None:
+            elapsed = now - state.last_poll
+            state.credit += elapsed / state.base_interval * state.calls_per_poll
+            state.credit -= calls
+        state.credit = min(state.credit, MAX_CREDIT_POLLS * state.calls_per_poll)
+
+        # A source is as hot as its busiest item, so one volatile token among
+        # many flat ones still gets polled quickly
+        hottest = max(
+            (state.items[k].change_rate for k in items if k in state.items), default=0.0
+        )
+        rate = max(state.change_rate, hottest, _MIN_RATE)
+        interval = state.base_interval * TARGET_CHANGE_RATE / rate
+        reason = "hot" if interval < state.base_interval else "idle"
+        if state.consecutive_errors:
+            interval *= 2 ** min(state.consecutive_errors, MAX_ERROR_DOUBLINGS)
+            reason = "errors"
+        interval = min(max(interval, state.min_interval), state.max_interval)
+
+        # Wait until the budget covers another poll of this size
+        budget_floor = (
+            max(0.0, calls - state.credit) * state.base_interval / state.calls_per_poll
+        )
+        if budget_floor > interval:
+            interval, reason = budget_floor, "budget"
+
+        quota_available = None
+        limiter = self._limiter(state.quota)
+        if limiter is not None:
+            quota_available = limiter.available()
+            shortfall = max(calls, 1) - quota_available
+            if shortfall > 0 and shortfall * limiter.interval > interval:
+                interval, reason = shortfall * limiter.interval, "quota"
+
+        state.interval = interval
+        state.last_poll = now
+        state.next_due = now + interval
+        state.polls += 1
+        state.calls += calls
+        state.last_decision = {
+            "source": source,
+            "reason": reason,
+            "interval_seconds": round(interval, 1),
+            "next_poll_at": _iso(state.next_due),
+            "change_rate": round(state.change_rate, 3),
+            "new_ratio": round(new / len(items), 3) if items else 0.0,
+            "changed_ratio": round(changed / len(items), 3) if items else 0.0,
+            "error_rate": round(state.error_rate, 3),
+            "consecutive_errors": state.consecutive_errors,
+            "credit_calls": round(state.credit, 1),
+            "quota_available": quota_available,
+            "calls": calls,
+            "items": len(items),
+            "hot_items": self.hot_items(source),
+        }
+        logger.info(
+            f"{self.name}/{source}: next poll in {interval:.0f}s ({reason}); "
+            f"change_rate={state.change_rate:.2f} new={new} changed={changed} "
+            f"errors={state.consecutive_errors} credit={state.credit:.1f}"
+        )
+        self.export()
+        return state.last_decision
+
+    # -- metrics -----------------------------------------------------------
+
+    def stats(self) -> dict[str, Any]:
+        """Latest decision and totals for every source."""
+        return {
+            "scheduler": self.name,
+            "updated_at": _iso(self.clock()),
+            "sources": {
+                name: {
+                    **state.last_decision,
+                    "base_interval_seconds": state.base_interval,
+                    "polls": state.polls,
+                    "total_calls": state.calls,
+                    "tracked_items": len(state.items),
+                }
+                for name, state in self.sources.items()
+            },
+        }
+
+    def export(self):
+        """Write ``stats()`` to the metrics file (atomically)."""
+        try:
+            self.metrics_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.metrics_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.stats(), indent=2))
+            os.replace(tmp, self.metrics_path)
+        except OSError as exc:
+            logger.warning(f"Could not write schedule metrics: {exc}")
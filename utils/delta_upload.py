@@ -0,0 +1,354 @@
+"""Content-addressed, delta-only uploads of crawler output to GCS.
+
+Crawlers used to upload every payload twice, pretty-printed: once as a
+timestamped blob and once as ``<source>_latest.json``, even when nothing
+had changed. ``DeltaUploader`` splits a payload into records (one per list
+element, keyed by its id field, plus one per other top-level value), hashes
+each one and compares the hashes with the previous upload's index:
+
+* nothing changed (ignoring ``metadata``): no upload at all;
+* otherwise the new/changed records and removals go to one gzip NDJSON
+  delta named by its content hash, ``<prefix>/<source>/deltas/<sha>.ndjson.gz``
+  (the history the timestamped blobs used to provide), and
+  ``<prefix>/<source>_latest.json`` is rewritten once, compact, for the
+  readers that load it whole;
+* ``<prefix>/<source>_manifest.json`` is a small pointer to the latest
+  document, the current content hash and the recent deltas.
+
+    from utils.delta_upload import DeltaUploader
+    uploader = DeltaUploader(bucket, "dexscreener")
+    result = uploader.upload(data)     # result.skipped when unchanged
+
+``LocalBucket`` stands in for a GCS bucket on the local filesystem (tests,
+``LOCAL_BUCKET_DIR`` for offline runs).
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from utils.advanced_logging import get_logger
+
+logger = get_logger(__name__)
+
+# Fields that identify a list element, in order of preference
+ID_FIELDS = (
+    "id",
+    "tweet_id",
+    "post_id",
+    "pairAddress",
+    "tokenAddress",
+    "address",
+    "url",
+    "link",
+)
+# Top-level keys that change every crawl without changing the content
+VOLATILE_KEYS = ("metadata",)
+# Deltas listed in the manifest; older ones stay in the bucket
+MANIFEST_DELTAS = int(os.getenv("DELTA_MANIFEST_ENTRIES", "48"))
+
+GZIP = "application/gzip"
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def gzip_ndjson(rows: list[dict[str, Any]]) -> bytes:
+    """Compact NDJSON, gzipped reproducibly (no timestamp in the header)."""
+    body = "".join(_dumps(row) + "\n" for row in rows).encode()
+    return gzip.compress(body, mtime=0)
+
+
+def read_gzip_ndjson(data: bytes) -> Iterator[dict[str, Any]]:
+    for line in gzip.decompress(data).splitlines():
+        if line.strip():
+            yield json.loads(line)
+
+
+def record_key(item: Any, seen: set[str]) -> str:
+    """Stable key for a list element: its id field, else its content hash."""
+    key = None
+    if isinstance(item, dict):
+        for name in ID_FIELDS:
+            if item.get(name) not in (None, ""):
+                key = f"{name}={item[name]}"
+                break
+    if key is None:
+        key = _digest(_dumps(item))[:16]
+    unique, n = key, 1
+    while unique in seen:
+        n += 1
+        unique = f"{key}#{n}"
+    seen.add(unique)
+    return unique
+
+
+def split_records(
+    payload: Any, volatile_keys: tuple[str, ...] = VOLATILE_KEYS
+) -> dict[str, dict[str, Any]]:
+    """``{collection: {key: value}}`` for *payload*.
+
+    Lists (at the top level or one dict down, e.g. ``twitter.posts``) become
+    one record per element; any other value is a single record with key "".
+    """
+    if not isinstance(payload, dict):
+        payload = {"items": payload}
+    collections: dict[str, dict[str, Any]] = {}
+
+    def add(path: str, value: Any):
+        if isinstance(value, list):
+            seen: set[str] = set()
+            collections[path] = {record_key(item, seen): item for item in value}
+        else:
+            collections[path] = {"": value}
+
+    for name, value in payload.items():
+        if name in volatile_keys:
+            continue
+        if isinstance(value, dict) and any(isinstance(v, list) for v in value.values()):
+            for sub, sub_value in value.items():
+                add(f"{name}.{sub}", sub_value)
+        else:
+            add(name, value)
+    return collections
+
+
+@dataclass
+class UploadResult:
+    skipped: bool
+    content_hash: str
+    delta_path: str | None = None
+    added: int = 0
+    changed: int = 0
+    removed: int = 0
+    bytes_uploaded: int = 0
+    uploaded: list[str] = field(default_factory=list)
+
+
+class DeltaUploader:
+    """Uploads *source* payloads under *prefix* as hashed deltas (see module doc).
+
+    The previous index is read from the bucket once and then kept in memory,
+    so a long-running crawler only re-reads the small manifest per upload.
+    """
+
+    def __init__(
+        self,
+        bucket,
+        source: str,
+        prefix: str = "data",
+        volatile_keys: tuple[str, ...] = VOLATILE_KEYS,
+    ):
+        self.bucket = bucket
+        self.source = source
+        self.volatile_keys = volatile_keys
+        self.latest_path = f"{prefix}/{source}_latest.json"
+        self.manifest_path = f"{prefix}/{source}_manifest.json"
+        self.index_path = f"{prefix}/{source}/index.json.gz"
+        self.delta_prefix = f"{prefix}/{source}/deltas/"
+        self._manifest: dict[str, Any] | None = None
+        self._index: dict[str, dict[str, str]] | None = None
+
+    # -- bucket state ------------------------------------------------------
+
+    def _read_manifest(self) -> dict[str, Any]:
+        blob = self.bucket.blob(self.manifest_path)
+        if not blob.exists():
+            return {}
+        return json.loads(blob.download_as_text())
+
+    def _previous_index(self, manifest: dict[str, Any]) -> dict[str, dict[str, str]]:
+        cached = self._manifest or {}
+        if self._index is not None and cached.get("content_hash") == manifest.get(
+            "content_hash"
+        ):
+            return self._index
+        blob = self.bucket.blob(self.index_path)
+        if not manifest or not blob.exists():
+            return {}
+        return json.loads(gzip.decompress(blob.download_as_bytes()))
+
+    def _put(self, result: UploadResult, path: str, data: bytes, content_type: str):
+        self.bucket.blob(path).upload_from_string(data, content_type=content_type)
+        result.uploaded.append(path)
+        result.bytes_uploaded += len(data)
+
+    # -- upload ------------------------------------------------------------
+
+    def upload(self, payload: Any) -> UploadResult:
+        """Upload what changed in *payload* since the last upload."""
+        collections = split_records(payload, self.volatile_keys)
+        index = {
+            name: {key: _digest(_dumps(value))[:32] for key, value in records.items()}
+            for name, records in collections.items()
+        }
+        # Unsorted, so a reordered listing (e.g. a ranking) counts as a change
+        content_hash = _digest(json.dumps(index))
+
+        manifest = self._read_manifest()
+        if manifest.get("content_hash") == content_hash:
+            logger.info(f"{self.source}: content unchanged, skipping upload")
+            self._manifest = manifest
+            self._index = index
+            return UploadResult(skipped=True, content_hash=content_hash)
+
+        previous = self._previous_index(manifest)
+        rows = []
+        result = UploadResult(skipped=False, content_hash=content_hash)
+        for name, hashes in index.items():
+            before = previous.get(name, {})
+            for key, h in hashes.items():
+                if before.get(key) != h:
+                    if key in before:
+                        result.changed += 1
+                    else:
+                        result.added += 1
+                    rows.append(
+                        {
+                            "collection": name,
+                            "key": key,
+                            "hash": h,
+                            "value": collections[name][key],
+                        }
+                    )
+        for name, before in previous.items():
+            for key in before.keys() - index.get(name, {}).keys():
+                result.removed += 1
+                rows.append({"collection": name, "key": key, "deleted": True})
+
+        now = datetime.now(UTC).isoformat()
+        delta = gzip_ndjson(rows)
+        result.delta_path = f"{self.delta_prefix}{_digest(_dumps(rows))}.ndjson.gz"
+        self._put(result, result.delta_path, delta, GZIP)
+        self._put(
+            result,
+            self.latest_path,
+            json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode(),
+            "application/json",
+        )
+        self._put(
+            result,
+            self.index_path,
+            gzip.compress(_dumps(index).encode(), mtime=0),
+            GZIP,
+        )
+
+        entry = {
+            "path": result.delta_path,
+            "uploaded_at": now,
+            "added": result.added,
+            "changed": result.changed,
+            "removed": result.removed,
+        }
+        manifest = {
+            "source": self.source,
+            "content_hash": content_hash,
+            "updated_at": now,
+            "latest": self.latest_path,
+            "index": self.index_path,
+            "records": sum(len(h) for h in index.values()),
+            "metadata": {
+                k: payload.get(k)
+                for k in self.volatile_keys
+                if isinstance(payload, dict)
+            },
+            "deltas": (manifest.get("deltas", []) + [entry])[-MANIFEST_DELTAS:],
+        }
+        self._put(
+            result,
+            self.manifest_path,
+            json.dumps(manifest, ensure_ascii=False, indent=2, default=str).encode(),
+            "application/json",
+        )
+        self._manifest, self._index = manifest, index
+        logger.info(
+            f"{self.source}: uploaded delta {result.delta_path} "
+            f"(+{result.added} ~{result.changed} -{result.removed}, "
+            f"{result.bytes_uploaded} bytes)"
+        )
+        return result
+
+    def deltas(self) -> Iterator[dict[str, Any]]:
+        """Records of the deltas listed in the manifest, oldest first."""
+        for entry in self._read_manifest().get("deltas", []):
+            yield from read_gzip_ndjson(
+                self.bucket.blob(entry["path"]).download_as_bytes()
+            )
+
+
+def upload_delta(
+    bucket, source: str, payload: Any, prefix: str = "data"
+) -> UploadResult:
+    """One-shot ``DeltaUploader(bucket, source, prefix).upload(payload)``."""
+    return DeltaUploader(bucket, source, prefix).upload(payload)
+
+
+# -- local stand-in ---------------------------------------------------------
+
+
+class LocalBlob:
+    """The subset of ``storage.Blob`` the uploader uses."""
+
+    def __init__(self, root: Path, name: str):
+        self.name = name
+        self._path = root / name
+        self.content_type: str | None = None
+
+    def exists(self) -> bool:
+        return self._path.is_file()
+
+    def upload_from_string(self, data: str | bytes, content_type: str | None = None):
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(data, str):
+            data = data.encode()
+        tmp = self._path.with_name(self._path.name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, self._path)
+        self.content_type = content_type
+
+    def download_as_bytes(self) -> bytes:
+        return self._path.read_bytes()
+
+    def download_as_text(self, encoding: str = "utf-8") -> str:
+        return self._path.read_text(encoding=encoding)
+
+    def open(self, mode: str = "rb"):
+        return open(self._path, mode)
+
+
+class LocalBucket:
+    """Directory tree served like a GCS bucket: object names are relative paths."""
+
+    def __init__(self, root: Path | str):
+        self.root = Path(root)
+        self.name = str(self.root)
+
+    def blob(self, name: str) -> LocalBlob:
+        return LocalBlob(self.root, name)
+
+    def list_blobs(self, prefix: str = "") -> list[LocalBlob]:
+        return [
+            LocalBlob(self.root, path.relative_to(self.root).as_posix())
+            for path in sorted(self.root.rglob("*"))
+            if path.is_file()
+            and path.relative_to(self.root).as_posix().startswith(prefix)
+        ]
+
+
+def local_bucket_from_env() -> LocalBucket | None:
+    """``LocalBucket`` for ``LOCAL_BUCKET_DIR`` if set, for offline runs."""
+    root = os.getenv("LOCAL_BUCKET_DIR")
+    return LocalBucket(root) if root else None
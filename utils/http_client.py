@@ -0,0 +1,394 @@
+"""Shared HTTP session for the scrapers.
+
+Scrapers used to open a new ``httpx.AsyncClient`` per feed or call and use
+blocking ``requests.get`` one URL after another, so every request paid for a
+fresh TCP + TLS handshake. ``HttpSession`` keeps one keep-alive connection
+pool per process (sync) and per event loop (async), and adds:
+
+* HTTP/2 when the ``h2`` package is installed,
+* a cap on concurrent requests per host (``HTTP_PER_HOST_LIMIT``, or the
+  API's ``utils.rate_limiter.API_CONCURRENCY`` entry),
+* the shared API quotas from ``utils.rate_limiter`` for known hosts,
+* retries with jittered exponential backoff on 429/5xx and transport
+  errors, honouring ``Retry-After``,
+* conditional GETs: responses carrying an ETag or Last-Modified header are
+  remembered and revalidated with If-None-Match / If-Modified-Since; a 304
+  is returned to the caller as the cached 200.
+
+    from utils.http_client import session
+    resp = session.get(url, params=...)          # blocking
+    resp = await session.aget(url, params=...)   # inside an event loop
+"""
+
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import os
+import random
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any
+
+import httpx
+
+from utils.advanced_logging import get_logger
+from utils.rate_limiter import api_limiter
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+TIMEOUT = httpx.Timeout(float(os.getenv("HTTP_TIMEOUT", "30")), connect=10.0)
+LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+    max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+    keepalive_expiry=60.0,
+)
+PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "8"))
+MAX_ATTEMPTS = int(os.getenv("HTTP_MAX_ATTEMPTS", "3"))
+RETRY_BASE_DELAY = float(os.getenv("HTTP_RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY = float(os.getenv("HTTP_RETRY_MAX_DELAY", "30"))
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+CONDITIONAL_CACHE_ENTRIES = int(os.getenv("HTTP_CONDITIONAL_CACHE_ENTRIES", "512"))
+# Bodies larger than this are not kept for revalidation
+CONDITIONAL_MAX_BYTES = 2 * 1024 * 1024
+
+USER_AGENT = "DegenDigest/1.0"
+
+# Hosts whose requests count against a utils.rate_limiter quota
+HOST_QUOTAS = {
+    "api.coingecko.com": "coingecko",
+    "www.reddit.com": "reddit",
+    "newsapi.org": "newsapi",
+    "api.dexscreener.com": "dexscreener",
+    "api.dexpaprika.com": "dexpaprika",
+}
+
+
+class RateLimitExceeded(Exception):
+    """The host's API quota has no free slot within the rate limiter timeout."""
+
+
+_BODY_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class _Revalidation:
+    """Validators and body of a cacheable GET response."""
+
+    __slots__ = ("etag", "last_modified", "status_code", "headers", "content")
+
+    def __init__(self, response: httpx.Response):
+        self.etag = response.headers.get("etag")
+        self.last_modified = response.headers.get("last-modified")
+        self.status_code = response.status_code
+        # The stored body is already decoded
+        self.headers = httpx.Headers(
+            [
+                (k, v)
+                for k, v in response.headers.multi_items()
+                if k.lower() not in _BODY_HEADERS
+            ]
+        )
+        self.content = response.content
+
+    def request_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def replay(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            self.status_code,
+            headers=self.headers,
+            content=self.content,
+            request=request,
+            extensions={"from_cache": True},
+        )
+
+
+class _LoopState:
+    """Async client and per-host semaphores bound to one event loop."""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.host_slots: dict[str, asyncio.Semaphore] = {}
+
+
+def _retry_after(response: httpx.Response | None) -> float | None:
+    value = response.headers.get("retry-after") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        parsed = email.utils.parsedate_to_datetime(value)
+        return max(0.0, parsed.timestamp() - time.time()) if parsed else None
+
+
+def _backoff(attempt: int, response: httpx.Response | None) -> float:
+    delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt))
+    retry_after = _retry_after(response)
+    return min(RETRY_MAX_DELAY, max(delay, retry_after)) if retry_after else delay
+
+
+class HttpSession:
+    """Pooled, retrying, conditional-GET HTTP session (sync and async)."""
+
+    def __init__(
+        self,
+        timeout: httpx.Timeout = TIMEOUT,
+        limits: httpx.Limits = LIMITS,
+        per_host_limit: int = PER_HOST_LIMIT,
+        max_attempts: int = MAX_ATTEMPTS,
+        http2: bool = HTTP2_AVAILABLE,
+        headers: dict[str, str] | None = None,
+    ):
+        self.timeout = timeout
+        self.limits = limits
+        self.per_host_limit = per_host_limit
+        self.max_attempts = max_attempts
+        self.http2 = http2
+        self.headers = {"User-Agent": USER_AGENT, **(headers or {})}
+
+        self._lock = threading.Lock()
+        self._client: httpx.Client | None = None
+        self._host_slots: dict[str, threading.BoundedSemaphore] = {}
+        self._loops: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, _LoopState
+        ] = weakref.WeakKeyDictionary()
+        self._revalidation: OrderedDict[str, _Revalidation] = OrderedDict()
+        self._stats = {"requests": 0, "retries": 0, "not_modified": 0, "errors": 0}
+
+    # -- clients -----------------------------------------------------------
+
+    def _client_kwargs(self) -> dict[str, Any]:
+        return {
+            "timeout": self.timeout,
+            "limits": self.limits,
+            "http2": self.http2,
+            "headers": self.headers,
+            "follow_redirects": True,
+        }
+
+    def _sync_client(self) -> httpx.Client:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(**self._client_kwargs())
+        return self._client
+
+    def _loop_state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            state = _LoopState(httpx.AsyncClient(**self._client_kwargs()))
+            self._loops[loop] = state
+        return state
+
+    def _host_limit(self, host: str) -> int:
+        """In-flight cap for *host*: its API's configured concurrency, if any."""
+        quota = HOST_QUOTAS.get(host)
+        if quota:
+            return api_limiter.max_concurrency(quota, default=self.per_host_limit)
+        return self.per_host_limit
+
+    def _host_slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(
+                    self._host_limit(host)
+                )
+            return slot
+
+    # -- conditional requests ----------------------------------------------
+
+    def _prepare(self, url: str, params, headers, conditional: bool):
+        full_url = str(httpx.URL(url, params=params))
+        cached = None
+        request_headers = dict(headers or {})
+        if conditional:
+            with self._lock:
+                cached = self._revalidation.get(full_url)
+                if cached:
+                    self._revalidation.move_to_end(full_url)
+            if cached:
+                request_headers.update(cached.request_headers())
+        return full_url, cached, request_headers
+
+    def _finish(self, full_url, cached, response: httpx.Response, conditional: bool):
+        if response.status_code == 304 and cached is not None:
+            with self._lock:
+                self._stats["not_modified"] += 1
+            return cached.replay(response.request)
+        if (
+            conditional
+            and response.status_code == 200
+            and ("etag" in response.headers or "last-modified" in response.headers)
+            and len(response.content) <= CONDITIONAL_MAX_BYTES
+        ):
+            with self._lock:
+                self._revalidation[full_url] = _Revalidation(response)
+                self._revalidation.move_to_end(full_url)
+                while len(self._revalidation) > CONDITIONAL_CACHE_ENTRIES:
+                    self._revalidation.popitem(last=False)
+        return response
+
+    def _should_retry(self, attempt: int, response=None, error=None) -> bool:
+        if attempt >= self.max_attempts - 1:
+            return False
+        if error is not None:
+            return isinstance(error, httpx.TransportError)
+        return response.status_code in RETRY_STATUSES
+
+    def _record(self, key: str, n: int = 1):
+        with self._lock:
+            self._stats[key] += n
+
+    # -- sync --------------------------------------------------------------
+
+    def get(
+        self,
+        url: str,
+        *,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float | None = None,
+        conditional: bool = True,
+    ) -> httpx.Response:
+        """GET *url*; returns the final response (call ``raise_for_status``)."""
+        full_url, cached, request_headers = self._prepare(
+            url, params, headers, conditional
+        )
+        host = httpx.URL(full_url).host
+        quota = HOST_QUOTAS.get(host)
+        client = self._sync_client()
+        kwargs = {"headers": request_headers}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+
+        for attempt in range(self.max_attempts):
+            if quota and not api_limiter.wait_sync(quota):
+                raise RateLimitExceeded(f"Rate limit exceeded for {quota}")
+            self._record("requests")
+            try:
+                with self._host_slot(host):
+                    response = client.get(full_url, **kwargs)
+            except httpx.HTTPError as exc:
+                if not self._should_retry(attempt, error=exc):
+                    self._record("errors")
+                    raise
+                response, error = None, exc
+            else:
+                if not self._should_retry(attempt, response=response):
+                    return self._finish(full_url, cached, response, conditional)
+                error = None
+            delay = _backoff(attempt, response)
+            self._record("retries")
+            logger.warning(
+                f"GET {host} failed ({error or response.status_code}), retrying in {delay:.2f}s"
+            )
+            time.sleep(delay)
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    def get_json(self, url: str, **kwargs) -> Any:
+        """GET *url*, raise on HTTP errors and return the decoded JSON body."""
+        response = self.get(url, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    # -- async -------------------------------------------------------------
+
+    async def aget(
+        self,
+        url: str,
+        *,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        timeout: float | None = None,
+        conditional: bool = True,
+    ) -> httpx.Response:
+        """Async :meth:`get`, pooled per running event loop."""
+        full_url, cached, request_headers = self._prepare(
+            url, params, headers, conditional
+        )
+        host = httpx.URL(full_url).host
+        quota = HOST_QUOTAS.get(host)
+        state = self._loop_state()
+        slot = state.host_slots.get(host)
+        if slot is None:
+            slot = state.host_slots[host] = asyncio.Semaphore(self._host_limit(host))
+        kwargs = {"headers": request_headers}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+
+        for attempt in range(self.max_attempts):
+            if quota and not await api_limiter.wait_and_acquire(quota):
+                raise RateLimitExceeded(f"Rate limit exceeded for {quota}")
+            self._record("requests")
+            try:
+                async with slot:
+                    response = await state.client.get(full_url, **kwargs)
+            except httpx.HTTPError as exc:
+                if not self._should_retry(attempt, error=exc):
+                    self._record("errors")
+                    raise
+                response, error = None, exc
+            else:
+                if not self._should_retry(attempt, response=response):
+                    return self._finish(full_url, cached, response, conditional)
+                error = None
+            delay = _backoff(attempt, response)
+            self._record("retries")
+            logger.warning(
+                f"GET {host} failed ({error or response.status_code}), retrying in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    async def aget_json(self, url: str, **kwargs) -> Any:
+        response = await self.aget(url, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "conditional_entries": len(self._revalidation),
+                "http2": self.http2,
+            }
+
+    def close(self):
+        """Close the sync pool."""
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+
+    async def aclose(self):
+        """Close the async pool of the running event loop.
+
+        Call before ``asyncio.run`` returns, since a loop's pool cannot be
+        used (or cleanly closed) from another loop.
+        """
+        state = self._loops.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state.client.aclose()
+
+
+# Process-wide session shared by all scrapers
+session = HttpSession()
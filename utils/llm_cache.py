@@ -1,50 +1,381 @@
 """LLM response cache.
 
 Stores prompt hash and response JSON in SQLite to avoid double-charging.
+
+Lookups go through a small in-process LRU first, then SQLite. The database
+runs in WAL mode with a busy timeout so digest, dashboard and crawler
+processes can share it, and each thread gets its own connection. Entries
+expire after ``LLM_CACHE_TTL_DAYS`` and the table is trimmed back to
+``LLM_CACHE_MAX_ENTRIES`` least recently used rows, so the file no longer
+grows without bound.
+
+    from utils import llm_cache
+    llm_cache.get(prompt)                  # dict or None
+    llm_cache.get_many(prompts)            # {prompt: dict} for the hits
+    llm_cache.set_many({prompt: response}) # one transaction
 """
 
+from __future__ import annotations
+
+import atexit
 import hashlib
 import json
+import os
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Mapping
 from pathlib import Path
 from typing import Any
 
+from utils.advanced_logging import get_logger
+
+logger = get_logger(__name__)
+
 DB_PATH = Path("output/llm_cache.sqlite")
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-_conn: sqlite3.Connection | None = None
+MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_DAYS", "30")) * 86400  # 0 = never expire
+MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "2048"))
 
+# Trim to this fraction of MAX_ENTRIES so eviction runs in occasional batches
+EVICT_TO = 0.9
+# Writes between size checks; set_many always checks
+EVICT_CHECK_EVERY = 100
+# Buffered LRU touches are flushed with the next write, or once this many pile up
+TOUCH_FLUSH_AT = 256
+# SQLite caps bound parameters per statement
+_CHUNK = 500
 
-def _get_conn() -> sqlite3.Connection:
-    global _conn
-    if _conn is None:
-        _conn = sqlite3.connect(DB_PATH)
-        _conn.execute(
-            """CREATE TABLE IF NOT EXISTS cache (
-                hash TEXT PRIMARY KEY,
-                response TEXT
-            )"""
-        )
-    return _conn
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    hash TEXT PRIMARY KEY,
+    response TEXT
+)
+"""
 
 
 def _hash(text: str) -> str:
     return hashlib.sha256(text.encode()).hexdigest()
 
 
+def _chunks(seq: list, size: int = _CHUNK):
+    for i in range(0, len(seq), size):
+        yield seq[i : i + size]
+
+
+class LLMCache:
+    """Two-tier (memory LRU + SQLite) prompt -> response cache."""
+
+    def __init__(
+        self,
+        path: Path | str = DB_PATH,
+        max_entries: int = MAX_ENTRIES,
+        ttl_seconds: float = TTL_SECONDS,
+        memory_entries: int = MEMORY_ENTRIES,
+    ):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pid = os.getpid()
+        self._memory: OrderedDict[str, tuple[dict[str, Any], float]] = OrderedDict()
+        self._touched: dict[str, float] = {}
+        self._writes_since_check = 0
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "expired": 0,
+            "evictions": 0,
+        }
+        self._initialised = False
+
+    # -- connections -------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        """Connection for the current thread (reopened after a fork)."""
+        if self._pid != os.getpid():
+            # Connections and buffered state must not cross a fork
+            self._local = threading.local()
+            self._pid = os.getpid()
+            with self._lock:
+                self._touched.clear()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            if not self._initialised:
+                self._init_schema(conn)
+                self._initialised = True
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _init_schema(conn: sqlite3.Connection):
+        conn.execute(_SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(cache)")}
+        # Databases written before eviction existed lack the timestamps;
+        # their rows count as created now.
+        now = time.time()
+        for column in ("created_at", "last_access"):
+            if column not in columns:
+                try:
+                    conn.execute(f"ALTER TABLE cache ADD COLUMN {column} REAL")
+                    conn.execute(
+                        f"UPDATE cache SET {column} = ? WHERE {column} IS NULL", (now,)
+                    )
+                except sqlite3.OperationalError:
+                    pass  # added concurrently by another process
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_last_access ON cache(last_access)"
+        )
+
+    # -- memory tier -------------------------------------------------------
+
+    def _expired(self, created_at: float | None, now: float) -> bool:
+        return bool(self.ttl_seconds) and (created_at or 0) < now - self.ttl_seconds
+
+    def _remember(self, h: str, response: dict[str, Any], created_at: float):
+        """Store in the memory tier; caller holds the lock."""
+        if self.memory_entries <= 0:
+            return
+        self._memory[h] = (response, created_at)
+        self._memory.move_to_end(h)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    # -- reads -------------------------------------------------------------
+
+    def get(self, prompt: str) -> dict[str, Any] | None:
+        return self.get_many([prompt]).get(prompt)
+
+    def get_many(self, prompts: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """Cached responses for *prompts*, keyed by prompt; misses are omitted."""
+        now = time.time()
+        wanted: dict[str, list[str]] = {}
+        for prompt in prompts:
+            wanted.setdefault(_hash(prompt), []).append(prompt)
+
+        found: dict[str, dict[str, Any]] = {}
+        disk_lookup = []
+        with self._lock:
+            for h in wanted:
+                entry = self._memory.get(h)
+                if entry and not self._expired(entry[1], now):
+                    self._memory.move_to_end(h)
+                    self._touched[h] = now
+                    found[h] = entry[0]
+                else:
+                    if entry:
+                        del self._memory[h]
+                    disk_lookup.append(h)
+            self._counters["memory_hits"] += len(found)
+
+        rows = []
+        if disk_lookup:
+            conn = self._conn()
+            for chunk in _chunks(disk_lookup):
+                marks = ",".join("?" * len(chunk))
+                rows.extend(
+                    conn.execute(
+                        f"SELECT hash, response, created_at FROM cache WHERE hash IN ({marks})",
+                        chunk,
+                    ).fetchall()
+                )
+
+        disk_hits = 0
+        expired = 0
+        with self._lock:
+            for h, response, created_at in rows:
+                if self._expired(created_at, now):
+                    expired += 1
+                    continue
+                value = json.loads(response)
+                found[h] = value
+                self._touched[h] = now
+                self._remember(h, value, created_at or now)
+                disk_hits += 1
+            self._counters["disk_hits"] += disk_hits
+            self._counters["expired"] += expired
+            self._counters["misses"] += len(wanted) - len(found)
+            flush = len(self._touched) >= TOUCH_FLUSH_AT
+
+        if flush:
+            self.flush()
+        return {
+            prompt: found[h] for h, ps in wanted.items() if h in found for prompt in ps
+        }
+
+    # -- writes ------------------------------------------------------------
+
+    def set(self, prompt: str, response: dict[str, Any]):
+        self._write({_hash(prompt): response}, check_size=False)
+
+    def set_many(
+        self, items: Mapping[str, dict[str, Any]] | Iterable[tuple[str, dict[str, Any]]]
+    ):
+        """Store several prompt -> response pairs in one transaction."""
+        pairs = items.items() if isinstance(items, Mapping) else items
+        entries = {_hash(prompt): response for prompt, response in pairs}
+        if entries:
+            self._write(entries, check_size=True)
+
+    def flush(self):
+        """Persist buffered LRU access times."""
+        self._write({}, check_size=False)
+
+    def _write(self, entries: dict[str, dict[str, Any]], check_size: bool):
+        now = time.time()
+        with self._lock:
+            touched = self._touched
+            self._touched = {}
+            for h, response in entries.items():
+                self._remember(h, response, now)
+            self._writes_since_check += len(entries)
+            if self._writes_since_check >= EVICT_CHECK_EVERY:
+                check_size = True
+            if check_size:
+                self._writes_since_check = 0
+        if not entries and not touched:
+            return
+
+        conn = self._conn()
+        evicted = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if entries:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO cache(hash, response, created_at, last_access) VALUES (?, ?, ?, ?)",
+                    [
+                        (h, json.dumps(response), now, now)
+                        for h, response in entries.items()
+                    ],
+                )
+            if touched:
+                conn.executemany(
+                    "UPDATE cache SET last_access = MAX(COALESCE(last_access, 0), ?) WHERE hash = ?",
+                    [(at, h) for h, at in touched.items()],
+                )
+            if check_size:
+                evicted = self._evict(conn, now)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        with self._lock:
+            self._counters["writes"] += len(entries)
+            self._counters["evictions"] += evicted
+        if evicted:
+            logger.info(f"LLM cache evicted {evicted} entries")
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> int:
+        """Drop expired rows, then least recently used rows above the size cap."""
+        evicted = 0
+        if self.ttl_seconds:
+            evicted += conn.execute(
+                "DELETE FROM cache WHERE created_at < ?", (now - self.ttl_seconds,)
+            ).rowcount
+        if self.max_entries:
+            size = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            if size > self.max_entries:
+                excess = size - int(self.max_entries * EVICT_TO)
+                evicted += conn.execute(
+                    """DELETE FROM cache WHERE hash IN (
+                        SELECT hash FROM cache ORDER BY last_access LIMIT ?
+                    )""",
+                    (excess,),
+                ).rowcount
+        return evicted
+
+    # -- maintenance -------------------------------------------------------
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss/eviction counters plus memory and disk sizes."""
+        disk_size = self._conn().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        with self._lock:
+            counters = dict(self._counters)
+            memory_size = len(self._memory)
+        lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        return {
+            **counters,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "memory_size": memory_size,
+            "disk_size": disk_size,
+            "max_entries": self.max_entries,
+        }
+
+    def clear(self):
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+        conn = self._conn()
+        conn.execute("DELETE FROM cache")
+
+    def close(self):
+        """Flush pending touches and close this thread's connection."""
+        self.flush()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_default: LLMCache | None = None
+_default_lock = threading.Lock()
+
+
+def _cache() -> LLMCache:
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = LLMCache()
+    return _default
+
+
 def get(prompt: str) -> dict[str, Any] | None:
-    h = _hash(prompt)
-    cur = _get_conn().execute("SELECT response FROM cache WHERE hash=?", (h,))
-    row = cur.fetchone()
-    if row:
-        return json.loads(row[0])
-    return None
+    return _cache().get(prompt)
+
+
+def get_many(prompts: Iterable[str]) -> dict[str, dict[str, Any]]:
+    return _cache().get_many(prompts)
 
 
 def set(prompt: str, response: dict[str, Any]):
-    h = _hash(prompt)
-    _get_conn().execute(
-        "INSERT OR REPLACE INTO cache(hash, response) VALUES (?, ?)",
-        (h, json.dumps(response)),
-    )
-    _get_conn().commit()
+    _cache().set(prompt, response)
+
+
+def set_many(
+    items: Mapping[str, dict[str, Any]] | Iterable[tuple[str, dict[str, Any]]],
+):
+    _cache().set_many(items)
+
+
+def stats() -> dict[str, Any]:
+    return _cache().stats()
+
+
+def flush():
+    if _default is not None:
+        _default.flush()
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        flush()
+    except sqlite3.Error as exc:
+        logger.warning(f"Could not flush LLM cache access times: {exc}")
@@ -0,0 +1,412 @@
+"""Streaming record files: NDJSON (optionally gzip/zstd) and legacy JSON.
+
+Scraper output used to be one JSON document per file (an array, or an
+object such as ``{"tweets": [...], "metadata": {...}}``) that every consumer
+``json.load``-ed whole, holding the raw text and every item in memory at
+once. This module reads and writes records one at a time:
+
+* ``iter_records`` yields the items of an NDJSON file (one JSON value per
+  line), a JSON array, or the array under one key of a JSON object. Legacy
+  JSON documents are parsed incrementally in fixed-size chunks, so only the
+  current item is materialised.
+* ``iter_fields`` does the same for several keys of one object in one pass.
+* ``RecordWriter`` / ``write_records`` write NDJSON (``.ndjson``/``.jsonl``)
+  or, for ``.json`` paths, a JSON array that legacy readers still load;
+  ``write_document`` writes an object whose iterator values are streamed
+  as arrays.
+
+``.gz`` and ``.zst`` suffixes (or the gzip/zstd magic bytes, for file
+objects and bytes) select compression; zstd needs the optional
+``zstandard`` package.
+
+    from utils.ndjson import iter_records, write_records
+    for tweet in iter_records("output/twitter_raw.json"):  # array or NDJSON
+        ...
+    write_records("output/twitter_raw.ndjson.gz", tweets)
+
+The module depends only on the standard library so that standalone services
+(migration_service/) can ship a copy; keep ``migration_service/ndjson.py``
+identical to this file.
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import os
+import re
+from collections.abc import Iterable, Iterator, Mapping
+from pathlib import Path
+from typing import IO, Any
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Characters read per chunk when parsing a JSON document incrementally
+CHUNK_SIZE = int(os.getenv("NDJSON_CHUNK_SIZE", str(1 << 16)))
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# What may still follow a number that ends at the end of the buffer
+_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+_decoder = json.JSONDecoder()
+
+
+def _dumps(record: Any) -> str:
+    return json.dumps(record, ensure_ascii=False, default=str)
+
+
+def _split_suffix(path: Path) -> tuple[str, str | None]:
+    """(format suffix, compression) of *path*, e.g. ('.ndjson', 'gzip')."""
+    suffixes = [s.lower() for s in path.suffixes]
+    compression = None
+    if suffixes and suffixes[-1] == ".gz":
+        compression = "gzip"
+    elif suffixes and suffixes[-1] == ".zst":
+        compression = "zstd"
+    if compression:
+        suffixes.pop()
+    return (suffixes[-1] if suffixes else ""), compression
+
+
+def is_ndjson_path(path: str | Path) -> bool:
+    return _split_suffix(Path(path))[0] in NDJSON_SUFFIXES
+
+
+def find_records(directory: str | Path, stem: str) -> Path | None:
+    """The records file for *stem* in *directory*: NDJSON (plain or
+    compressed) if present, else the legacy ``<stem>.json``."""
+    names = [f"{stem}{suffix}" for suffix in NDJSON_SUFFIXES]
+    names += [f"{name}.gz" for name in names] + [f"{name}.zst" for name in names]
+    for name in names + [f"{stem}.json"]:
+        path = Path(directory) / name
+        if path.exists():
+            return path
+    return None
+
+
+def _require_zstd():
+    if not ZSTD_AVAILABLE:
+        raise RuntimeError("zstandard is not installed; cannot read or write .zst")
+
+
+class _GzipReader(gzip.GzipFile):
+    """``GzipFile`` that also closes the file object it reads from."""
+
+    def close(self):
+        fileobj = self.fileobj
+        super().close()
+        if fileobj is not None:
+            fileobj.close()
+
+
+def _decompressed(raw: IO[bytes]) -> IO[bytes]:
+    """*raw*, transparently decompressed if it starts with gzip/zstd magic."""
+    if not hasattr(raw, "peek"):
+        raw = io.BufferedReader(raw)
+    head = raw.peek(4)[:4]
+    if head.startswith(_GZIP_MAGIC):
+        return _GzipReader(fileobj=raw, mode="rb")
+    if head == _ZSTD_MAGIC:
+        _require_zstd()
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+    return raw
+
+
+def open_text(source: str | Path | bytes | IO) -> IO[str]:
+    """A text stream over *source*: a path, bytes, or a binary/text file object
+    (e.g. ``blob.open("rb")``), decompressing gzip/zstd as needed."""
+    if isinstance(source, (str, Path)):
+        source = open(source, "rb")
+    elif isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    if isinstance(source, io.TextIOBase):
+        return source
+    return io.TextIOWrapper(_decompressed(source), encoding="utf-8")
+
+
+class _Scanner:
+    """Incremental tokenizer over a text stream holding a JSON document."""
+
+    def __init__(self, stream: IO[str], chunk_size: int | None = None):
+        self.stream = stream
+        self.chunk_size = chunk_size or CHUNK_SIZE
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        # Grow geometrically so a single huge value is not re-parsed per chunk
+        pending = len(self.buffer) - self.pos
+        chunk = self.stream.read(max(self.chunk_size, pending))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ("" at the end of the stream)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r}, found {found or 'end of data'!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number cut off by the chunk boundary may go on in the next one
+            if (
+                not self.eof
+                and isinstance(value, (int, float))
+                and not isinstance(value, bool)
+                and _NUMBER_TAIL.fullmatch(self.buffer, end)
+                and self._fill()
+            ):
+                continue
+            self.pos = end
+            return value
+
+    def array(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            separator = self.peek()
+            self.pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or ']' in array, found {separator!r}")
+
+    def skip(self):
+        if self.peek() == "[":
+            for _ in self.array():
+                pass
+        else:
+            self.value()
+
+    def fields(self, keys: Iterable[str]) -> Iterator[tuple[str, Any]]:
+        """(key, item) for the arrays under *keys* of the top-level object;
+        a non-array value under one of *keys* is yielded as a single item."""
+        keys = set(keys)
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            name = self.value()
+            self.expect(":")
+            if name not in keys:
+                self.skip()
+            elif self.peek() == "[":
+                for item in self.array():
+                    yield name, item
+            else:
+                yield name, self.value()
+            separator = self.peek()
+            self.pos += 1
+            if separator == "}":
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or '}}' in object, found {separator!r}")
+
+
+def _iter_lines(stream: IO[str]) -> Iterator[Any]:
+    for number, line in enumerate(stream, 1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"Invalid NDJSON on line {number}: {exc}") from exc
+
+
+def iter_fields(
+    source: str | Path | bytes | IO, keys: Iterable[str]
+) -> Iterator[tuple[str, Any]]:
+    """(key, item) for every item of the arrays under *keys* of a JSON object,
+    in file order, in one pass. NDJSON input yields nothing."""
+    with open_text(source) as stream:
+        scanner = _Scanner(stream)
+        if scanner.peek() == "{":
+            yield from scanner.fields(keys)
+
+
+def iter_records(
+    source: str | Path | bytes | IO,
+    key: str | None = None,
+    *,
+    format: str | None = None,
+) -> Iterator[Any]:
+    """Yield the records in *source* one at a time.
+
+    *format* is ``"ndjson"`` or ``"json"``; by default paths ending in
+    ``.ndjson``/``.jsonl`` (optionally compressed) are NDJSON and anything
+    else is sniffed: a JSON array yields its elements, an object yields the
+    elements of the array under *key* (nothing if absent) or, without *key*,
+    is read as NDJSON (one object per line).
+    """
+    if format is None and isinstance(source, (str, Path)) and is_ndjson_path(source):
+        format = "ndjson"
+    with open_text(source) as stream:
+        if format == "ndjson":
+            yield from _iter_lines(stream)
+            return
+        scanner = _Scanner(stream)
+        first = scanner.peek()
+        if first == "[":
+            yield from scanner.array()
+        elif first == "{" and (key is not None or format == "json"):
+            if key is None:
+                yield scanner.value()
+            else:
+                for _, item in scanner.fields([key]):
+                    yield item
+        elif first:
+            # NDJSON: hand the buffered text back to a line reader
+            rest = io.StringIO(scanner.buffer[scanner.pos :])
+            yield from _iter_lines(rest)
+            yield from _iter_lines(stream)
+
+
+class RecordWriter:
+    """Write records to *path* one at a time, atomically on close.
+
+    ``.ndjson``/``.jsonl`` paths get one compact JSON value per line; other
+    paths a JSON array (what legacy readers expect). ``.gz``/``.zst``
+    compress. The file only appears once the writer closes without error.
+
+        with RecordWriter("output/deduplicated/twitter.ndjson.gz") as out:
+            for tweet in tweets:
+                out.write(tweet)
+    """
+
+    def __init__(self, path: str | Path, *, indent: int | None = None):
+        self.path = Path(path)
+        fmt, self.compression = _split_suffix(self.path)
+        self.ndjson = fmt in NDJSON_SUFFIXES
+        self.indent = None if self.ndjson else indent
+        self.count = 0
+        self._tmp = self.path.with_name(self.path.name + ".tmp")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._stream = self._open()
+        if not self.ndjson:
+            self._stream.write("[")
+
+    def _open(self) -> IO[str]:
+        raw = self._file = open(self._tmp, "wb")
+        if self.compression == "gzip":
+            raw = gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6, mtime=0)
+        elif self.compression == "zstd":
+            _require_zstd()
+            raw = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(raw, encoding="utf-8", newline="\n")
+
+    def write(self, record: Any):
+        if self.ndjson:
+            self._stream.write(_dumps(record) + "\n")
+        else:
+            text = json.dumps(
+                record, ensure_ascii=False, default=str, indent=self.indent
+            )
+            if self.indent is not None:
+                text = "\n" + text
+            self._stream.write(("," if self.count else "") + text)
+        self.count += 1
+
+    def write_all(self, records: Iterable[Any]) -> int:
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def close(self):
+        if self._stream.closed:
+            return
+        if not self.ndjson:
+            self._stream.write("\n]" if self.indent is not None and self.count else "]")
+        self._stream.close()
+        self._file.close()  # gzip leaves the file it wraps open
+        os.replace(self._tmp, self.path)
+
+    def abort(self):
+        """Discard everything written; the target file is left untouched."""
+        if not self._stream.closed:
+            self._stream.close()
+            self._file.close()
+        self._tmp.unlink(missing_ok=True)
+
+    def __enter__(self) -> RecordWriter:
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_records(
+    path: str | Path, records: Iterable[Any], *, indent: int | None = None
+) -> int:
+    """Write *records* to *path* (see ``RecordWriter``); returns the count."""
+    with RecordWriter(path, indent=indent) as writer:
+        return writer.write_all(records)
+
+
+def write_document(path: str | Path, fields: Mapping[str, Any]) -> dict[str, int]:
+    """Write a JSON object to *path*, streaming iterator values as arrays.
+
+    Lists, dicts and scalars are written as usual; any other iterable
+    (a generator, ``iter_records(...)``) is consumed one item at a time.
+    Returns the number of items streamed per key.
+    """
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    counts: dict[str, int] = {}
+    try:
+        with open(tmp, "w", encoding="utf-8") as out:
+            out.write("{")
+            for n, (name, value) in enumerate(fields.items()):
+                out.write(("," if n else "") + "\n" + _dumps(name) + ": ")
+                if isinstance(value, (str, bytes, list, dict, Mapping)) or not (
+                    isinstance(value, Iterable)
+                ):
+                    out.write(_dumps(value))
+                    continue
+                out.write("[")
+                counts[name] = 0
+                for item in value:
+                    out.write(("," if counts[name] else "") + "\n" + _dumps(item))
+                    counts[name] += 1
+                out.write("\n]")
+            out.write("\n}\n")
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return counts
@@ -1,102 +1,348 @@
-"""Rate limiting utilities for API calls."""
+"""Rate limiting utilities for API calls.
+
+Limits are enforced with GCRA (the generic cell rate algorithm, a token
+bucket that stores a single "theoretical arrival time" per key). A caller
+that has to wait reserves the next free slot and sleeps exactly until it,
+so waiters are released in the order they arrived and nobody polls.
+
+Each API has one process-wide ``RateLimiter`` (see ``get_limiter``), shared
+by ``api_limiter``, every ``APIRateLimiter()`` and the ``rate_limited``
+decorator. Set ``RATE_LIMIT_BACKEND=sqlite`` to keep the buckets in a local
+SQLite file (``RATE_LIMIT_DB``) instead, so every crawler process on the
+machine draws from the same CoinGecko/NewsAPI/... quota.
+
+    from utils.rate_limiter import api_limiter
+    await api_limiter.wait_and_acquire("coingecko")   # async code
+    api_limiter.wait_sync("coingecko")                 # threads / sync code
+"""
+
+from __future__ import annotations
 
 import asyncio
+import functools
+import math
+import os
+import sqlite3
+import threading
 import time
-from collections import defaultdict
 from collections.abc import Callable
+from pathlib import Path
 from typing import Any
 
 from utils.advanced_logging import get_logger
 
 logger = get_logger(__name__)
 
+# api name -> (calls, period in seconds, burst); burst defaults to calls
+API_LIMITS: dict[str, tuple[int, float, int | None]] = {
+    "openai": (int(os.getenv("OPENAI_CALLS_PER_MINUTE", "60")), 60, None),
+    "twitter": (300, 15 * 60, None),  # 300 calls per 15 minutes
+    "reddit": (60, 60, None),  # 60 calls per minute
+    "telegram": (30, 60, None),  # 30 calls per minute
+    "newsapi": (100, 24 * 3600, None),  # 100 calls per day
+    "coingecko": (50, 60, None),  # 50 calls per minute
+    "dexscreener": (60, 60, None),  # profile/boost endpoints: 60 calls per minute
+    "dexpaprika": (10000, 24 * 3600, 60),  # 10k calls per day, 60 back to back
+}
+
+# Requests allowed in flight at once, on top of the rate limits
+API_CONCURRENCY = {
+    "openai": int(os.getenv("OPENAI_MAX_CONCURRENCY", "8")),
+    "dexscreener": 4,
+    "dexpaprika": 4,
+}
+
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_DB = Path(os.getenv("RATE_LIMIT_DB", "output/rate_limits.sqlite"))
+
+
+def _gcra(
+    tat: float | None,
+    now: float,
+    interval: float,
+    tolerance: float,
+    max_wait: float | None,
+) -> tuple[float, float] | None:
+    """Reserve one slot. Returns (new arrival time, seconds to wait), or None
+    if the wait would exceed *max_wait*."""
+    tat = now if tat is None else max(tat, now)
+    wait = max(0.0, tat - tolerance - now)
+    if max_wait is not None and wait > max_wait:
+        return None
+    return tat + interval, wait
+
+
+class MemoryBackend:
+    """Buckets held in this process."""
+
+    clock = staticmethod(time.monotonic)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tat: dict[str, float] = {}
+
+    def reserve(self, key, interval, tolerance, max_wait):
+        with self._lock:
+            result = _gcra(
+                self._tat.get(key), self.clock(), interval, tolerance, max_wait
+            )
+            if result is None:
+                return None
+            self._tat[key] = result[0]
+            return result
+
+    def peek(self, key):
+        with self._lock:
+            return self._tat.get(key)
+
+    def refund(self, key, reserved_tat, interval):
+        with self._lock:
+            # Only the most recent reservation can be handed back
+            if self._tat.get(key) == reserved_tat:
+                self._tat[key] = reserved_tat - interval
+
+
+class SQLiteBackend:
+    """Buckets in a SQLite file shared by every process on the host.
+
+    Each reservation is a read-modify-write inside ``BEGIN IMMEDIATE``, so
+    processes take slots one at a time and in order. Uses wall-clock time,
+    the only clock processes share.
+    """
+
+    clock = staticmethod(time.time)
+
+    def __init__(self, path: Path | str = RATE_LIMIT_DB):
+        self.path = Path(path)
+        self._local = threading.local()
+        self._pid = os.getpid()
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            self._local = threading.local()
+            self._pid = os.getpid()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tat REAL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self, key, fn):
+        """Run fn(conn, tat) for *key* under the database write lock."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tat FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            result = fn(conn, row[0] if row else None)
+            conn.execute("COMMIT")
+            return result
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def reserve(self, key, interval, tolerance, max_wait):
+        def step(conn, tat):
+            result = _gcra(tat, self.clock(), interval, tolerance, max_wait)
+            if result is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tat) VALUES (?, ?)",
+                    (key, result[0]),
+                )
+            return result
+
+        return self._transaction(key, step)
+
+    def peek(self, key):
+        row = (
+            self._conn()
+            .execute("SELECT tat FROM buckets WHERE key = ?", (key,))
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def refund(self, key, reserved_tat, interval):
+        def step(conn, tat):
+            if tat == reserved_tat:
+                conn.execute(
+                    "UPDATE buckets SET tat = ? WHERE key = ?",
+                    (reserved_tat - interval, key),
+                )
+
+        self._transaction(key, step)
+
+
+def make_backend(kind: str = RATE_LIMIT_BACKEND):
+    if kind == "sqlite":
+        return SQLiteBackend()
+    if kind != "memory":
+        logger.warning(f"Unknown RATE_LIMIT_BACKEND {kind!r}; using memory")
+    return MemoryBackend()
+
 
 class RateLimiter:
-    """Simple rate limiter for API calls."""
+    """GCRA limiter allowing *calls_per_minute* calls per *period* seconds
+    (a minute unless overridden), up to *burst* of them back to back."""
 
-    def __init__(self, calls_per_minute: int = 60):
+    def __init__(
+        self,
+        calls_per_minute: int = 60,
+        period: float = 60.0,
+        burst: int | None = None,
+        name: str = "default",
+        backend: MemoryBackend | SQLiteBackend | None = None,
+    ):
+        if calls_per_minute <= 0:
+            raise ValueError("calls_per_minute must be positive")
         self.calls_per_minute = calls_per_minute
-        self.calls: dict[str, list] = defaultdict(list)
-        self.lock = asyncio.Lock()
+        self.period = period
+        self.burst = max(1, burst or calls_per_minute)
+        self.name = name
+        self.interval = period / calls_per_minute
+        self.tolerance = self.interval * (self.burst - 1)
+        self.backend = backend or MemoryBackend()
 
-    async def acquire(self, key: str = "default") -> bool:
-        """Acquire permission to make an API call."""
-        async with self.lock:
-            now = time.time()
-            minute_ago = now - 60
+    def _key(self, key: str) -> str:
+        return f"{self.name}:{key}"
+
+    def _reserve(self, key: str, max_wait: float | None):
+        return self.backend.reserve(
+            self._key(key), self.interval, self.tolerance, max_wait
+        )
 
-            # Clean old calls
-            self.calls[key] = [
-                call_time for call_time in self.calls[key] if call_time > minute_ago
-            ]
+    def available(self, key: str = "default") -> int:
+        """Calls that could be made right now without waiting (0 to *burst*)."""
+        tat = self.backend.peek(self._key(key))
+        now = self.backend.clock()
+        if tat is None or tat <= now:
+            return self.burst
+        slots = math.floor((self.tolerance - (tat - now)) / self.interval + 1e-9) + 1
+        return max(0, min(self.burst, slots))
 
-            # Check if we can make a call
-            if len(self.calls[key]) < self.calls_per_minute:
-                self.calls[key].append(now)
-                return True
+    def try_acquire(self, key: str = "default") -> bool:
+        """Take a slot if one is free right now."""
+        return self._reserve(key, 0.0) is not None
 
+    def wait_sync(self, key: str = "default", timeout: float = 60.0) -> bool:
+        """Block until a slot is available; False if that is more than *timeout* away."""
+        reservation = self._reserve(key, timeout)
+        if reservation is None:
+            logger.warning(f"Rate limit timeout for key: {self._key(key)}")
             return False
+        if reservation[1] > 0:
+            time.sleep(reservation[1])
+        return True
+
+    async def acquire(self, key: str = "default") -> bool:
+        """Acquire permission to make an API call."""
+        return self.try_acquire(key)
 
     async def wait_and_acquire(
         self, key: str = "default", timeout: float = 60.0
     ) -> bool:
         """Wait for rate limit and acquire permission."""
-        start_time = time.time()
+        reservation = self._reserve(key, timeout)
+        if reservation is None:
+            logger.warning(f"Rate limit timeout for key: {self._key(key)}")
+            return False
+        tat, wait = reservation
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.backend.refund(self._key(key), tat, self.interval)
+                raise
+        return True
 
-        while time.time() - start_time < timeout:
-            if await self.acquire(key):
-                return True
 
-            # Wait a bit before trying again
-            await asyncio.sleep(1)
+_registry: dict[str, RateLimiter] = {}
+_registry_lock = threading.Lock()
+_backend = None
 
-        logger.warning(f"Rate limit timeout for key: {key}")
-        return False
+
+def get_limiter(api_name: str) -> RateLimiter | None:
+    """Process-wide limiter for *api_name*, or None if it has no configured limit."""
+    global _backend
+    limiter = _registry.get(api_name)
+    if limiter is None and api_name in API_LIMITS:
+        with _registry_lock:
+            limiter = _registry.get(api_name)
+            if limiter is None:
+                if _backend is None:
+                    _backend = make_backend()
+                calls, period, burst = API_LIMITS[api_name]
+                limiter = RateLimiter(
+                    calls, period, burst, name=api_name, backend=_backend
+                )
+                _registry[api_name] = limiter
+    return limiter
 
 
 class APIRateLimiter:
-    """Rate limiter for different API endpoints."""
+    """Rate limiter for different API endpoints.
 
-    def __init__(self):
-        self.limiters = {
-            "openai": RateLimiter(60),  # 60 calls per minute
-            "twitter": RateLimiter(300),  # 300 calls per 15 minutes
-            "reddit": RateLimiter(60),  # 60 calls per minute
-            "telegram": RateLimiter(30),  # 30 calls per minute
-            "newsapi": RateLimiter(100),  # 100 calls per day
-            "coingecko": RateLimiter(50),  # 50 calls per minute
-        }
+    Uses the shared per-API limiters unless *limiters* is given (tests,
+    benchmarks).
+    """
 
-    async def acquire(self, api_name: str) -> bool:
-        """Acquire permission for a specific API."""
+    def __init__(self, limiters: dict[str, RateLimiter] | None = None):
+        if limiters is None:
+            limiters = {name: get_limiter(name) for name in API_LIMITS}
+        self.limiters = limiters
+        self.concurrency = dict(API_CONCURRENCY)
+
+    def max_concurrency(self, api_name: str, default: int = 1) -> int:
+        """Maximum number of concurrent in-flight calls for a specific API."""
+        return max(1, self.concurrency.get(api_name, default))
+
+    def _limiter(self, api_name: str) -> RateLimiter | None:
         limiter = self.limiters.get(api_name)
         if not limiter:
             logger.warning(f"No rate limiter configured for API: {api_name}")
-            return True
+        return limiter
 
-        return await limiter.acquire()
+    async def acquire(self, api_name: str) -> bool:
+        """Acquire permission for a specific API."""
+        limiter = self._limiter(api_name)
+        return await limiter.acquire() if limiter else True
 
     async def wait_and_acquire(self, api_name: str, timeout: float = 60.0) -> bool:
         """Wait for rate limit and acquire permission for a specific API."""
-        limiter = self.limiters.get(api_name)
-        if not limiter:
-            logger.warning(f"No rate limiter configured for API: {api_name}")
-            return True
+        limiter = self._limiter(api_name)
+        return await limiter.wait_and_acquire(timeout=timeout) if limiter else True
 
-        return await limiter.wait_and_acquire(timeout=timeout)
+    def wait_sync(self, api_name: str, timeout: float = 60.0) -> bool:
+        """Blocking variant of :meth:`wait_and_acquire` for synchronous code."""
+        limiter = self._limiter(api_name)
+        return limiter.wait_sync(timeout=timeout) if limiter else True
 
 
 def rate_limited(api_name: str, timeout: float = 60.0):
-    """Decorator for rate limiting API calls."""
+    """Decorator for rate limiting API calls (sync or async functions)."""
 
     def decorator(func: Callable) -> Callable:
-        async def wrapper(*args, **kwargs) -> Any:
-            limiter = APIRateLimiter()
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs) -> Any:
+                if not await api_limiter.wait_and_acquire(api_name, timeout):
+                    raise Exception(f"Rate limit exceeded for {api_name}")
+                return await func(*args, **kwargs)
 
-            if not await limiter.wait_and_acquire(api_name, timeout):
-                raise Exception(f"Rate limit exceeded for {api_name}")
+        else:
 
-            return await func(*args, **kwargs)
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs) -> Any:
+                if not api_limiter.wait_sync(api_name, timeout):
+                    raise Exception(f"Rate limit exceeded for {api_name}")
+                return func(*args, **kwargs)
 
         return wrapper
 
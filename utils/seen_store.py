@@ -0,0 +1,442 @@
+"""Persistent store of item keys the crawlers have already emitted.
+
+Each crawler used to start every cycle from nothing: tweets, posts and
+articles emitted hours before were uploaded again, and the migrators
+re-parsed them only for ``ON CONFLICT DO NOTHING`` to throw them away.
+``SeenStore`` remembers item keys (ids, links, content hashes) across
+cycles, restarts and processes:
+
+* the exact record is a SQLite table of 128-bit key hashes with first and
+  last seen times, shared in WAL mode by every process on the host;
+* in front of it sits a rotating Bloom filter, so lookups for new items
+  (the common case) mostly never reach SQLite. The filter is split into
+  generations that each cover ``ttl / generations`` of time, and the oldest
+  is dropped once everything in it has expired, so memory stays at about
+  1.8 bytes per live key (at a 0.1% error rate) instead of a set of
+  strings. Filter hits are confirmed in SQLite, so a false positive costs a
+  query, never a lost item, and ``stats()`` reports the measured
+  false-positive rate next to the expected one;
+* keys expire ``ttl`` after they were last seen (``SEEN_TTL_HOURS``), so an
+  item that keeps showing up stays suppressed and one that has been gone a
+  while can come back.
+
+Keys marked by other processes are read from SQLite into the filter before
+each lookup. A crawler checks, emits what is new, then marks everything it
+saw once the upload has succeeded:
+
+    from utils.seen_store import get_seen_store
+    store = get_seen_store()
+    fresh = store.unseen("reddit", posts, key=lambda p: p["link"])
+    if upload(fresh):
+        store.mark("reddit", [p["link"] for p in posts])
+    store.stats()   # {"false_positive_rate": ..., "entries": ..., ...}
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from utils.advanced_logging import get_logger
+
+logger = get_logger(__name__)
+
+DB_PATH = Path(os.getenv("SEEN_STORE_PATH", "output/seen_items.sqlite"))
+TTL_SECONDS = float(os.getenv("SEEN_TTL_HOURS", "72")) * 3600  # 0 = never expire
+# Keys per filter generation, and the error rate each is sized for
+CAPACITY = int(os.getenv("SEEN_FILTER_CAPACITY", "1000000"))
+ERROR_RATE = float(os.getenv("SEEN_FILTER_ERROR_RATE", "0.001"))
+# Generations spanning one TTL; more means finer expiry and smaller filters
+GENERATIONS = 4
+# Filters kept at most; past this the oldest is dropped early and lookups
+# fall back to SQLite until its keys have expired
+MAX_GENERATIONS = int(os.getenv("SEEN_FILTER_MAX_GENERATIONS", "8"))
+# Marked keys between expiry passes
+EXPIRE_EVERY = 10_000
+# Re-read keys marked this recently when syncing, for writers whose
+# transaction committed after their timestamp was taken
+SYNC_OVERLAP = 60.0
+# SQLite caps bound parameters per statement
+_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    hash BLOB PRIMARY KEY,      -- blake2b-128 of namespace and key
+    namespace TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_seen_last_seen ON seen(last_seen);
+"""
+
+
+def key_hash(namespace: str, key: Any) -> bytes:
+    return hashlib.blake2b(f"{namespace}\0{key}".encode(), digest_size=16).digest()
+
+
+def _as_array(hashes: list[bytes]) -> np.ndarray:
+    """(n, 2) uint64 halves of 128-bit hashes."""
+    return np.frombuffer(b"".join(hashes), dtype="<u8").reshape(-1, 2)
+
+
+def _chunks(seq: list, size: int = _CHUNK):
+    for i in range(0, len(seq), size):
+        yield seq[i : i + size]
+
+
+class BloomFilter:
+    """Bloom filter over 128-bit key hashes, in a packed numpy bit array.
+
+    Sized for *capacity* keys at *error_rate*; positions come from the two
+    hash halves by double hashing, so no further hashing is needed.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(1, capacity)
+        self.size = math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    def _positions(self, hashes: np.ndarray) -> np.ndarray:
+        h1, h2 = hashes[:, :1], hashes[:, 1:] | np.uint64(1)
+        steps = np.arange(self.hashes, dtype=np.uint64)
+        return (h1 + steps * h2) % np.uint64(self.size)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        if not len(hashes):
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(hashes)
+        bits = self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7))
+        return (bits & 1).astype(bool).all(axis=1)
+
+    def add(self, hashes: np.ndarray) -> int:
+        """Add keys not already present; returns how many were added."""
+        hashes = hashes[~self.contains(hashes)]
+        if len(hashes):
+            positions = self._positions(hashes).ravel()
+            masks = np.left_shift(1, positions & np.uint64(7)).astype(np.uint8)
+            np.bitwise_or.at(self.bits, positions >> np.uint64(3), masks)
+            self.count += len(hashes)
+        return len(hashes)
+
+    def error_rate(self) -> float:
+        """Expected false-positive rate at the current fill."""
+        filled = int(np.unpackbits(self.bits).sum()) / self.size
+        return filled**self.hashes
+
+
+@dataclass
+class _Generation:
+    filter: BloomFilter
+    started: float
+    # When the next generation took over; keys in it were last seen by then
+    ended: float | None = None
+
+
+class SeenStore:
+    """Seen keys per namespace: rotating Bloom filter over SQLite (see module doc).
+
+    Thread-safe; processes share the SQLite file.
+    """
+
+    clock = staticmethod(time.time)
+
+    def __init__(
+        self,
+        path: Path | str = DB_PATH,
+        ttl_seconds: float = TTL_SECONDS,
+        capacity: int = CAPACITY,
+        error_rate: float = ERROR_RATE,
+        generations: int = GENERATIONS,
+        max_generations: int = MAX_GENERATIONS,
+    ):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.span = ttl_seconds / generations if ttl_seconds else math.inf
+        self.max_generations = max(1, max_generations)
+
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=30000")
+        self.conn.executescript(_SCHEMA)
+
+        now = self.clock()
+        self._generations = [_Generation(self._new_filter(), now)]
+        # Keys last seen up to this time may be missing from the filters
+        self._dropped_until: float | None = None
+        self._synced_at = now - ttl_seconds if ttl_seconds else -math.inf
+        self._data_version: int | None = None
+        self._marked_since_expire = 0
+        self._counters = {
+            "checks": 0,
+            "seen": 0,
+            "filter_hits": 0,
+            "false_positives": 0,
+            "marked": 0,
+            "expired": 0,
+        }
+        with self._lock:
+            self._sync(now)
+
+    def close(self):
+        self.conn.close()
+
+    # -- filters -------------------------------------------------------------
+
+    def _new_filter(self) -> BloomFilter:
+        return BloomFilter(self.capacity, self.error_rate)
+
+    def _cutoff(self, now: float) -> float:
+        return now - self.ttl_seconds if self.ttl_seconds else -math.inf
+
+    def _covered(self, now: float) -> bool:
+        """Whether every live key is in a filter; caller holds the lock."""
+        return self._dropped_until is None or self._dropped_until < self._cutoff(now)
+
+    def _rotate(self, now: float):
+        """Start a new generation when due and drop expired ones."""
+        current = self._generations[-1]
+        if now - current.started >= self.span or current.filter.count >= self.capacity:
+            current.ended = now
+            self._generations.append(_Generation(self._new_filter(), now))
+        cutoff = self._cutoff(now)
+        while self._generations[0].ended is not None and (
+            self._generations[0].ended < cutoff
+            or len(self._generations) > self.max_generations
+        ):
+            dropped = self._generations.pop(0)
+            if dropped.ended >= cutoff:
+                self._dropped_until = max(
+                    self._dropped_until or dropped.ended, dropped.ended
+                )
+                logger.warning(
+                    "seen store: filter limit reached, checking SQLite for "
+                    "keys seen before "
+                    f"{time.strftime('%H:%M:%S', time.localtime(dropped.ended))}"
+                )
+
+    def _add(
+        self, hashes: list[bytes], now: float, last_seen: list[float] | None = None
+    ):
+        """Add hashes to the current generation; caller holds the lock.
+
+        With *last_seen*, keys already in a generation that lasts at least
+        until their last sighting are skipped.
+        """
+        keys = _as_array(hashes)
+        if last_seen is not None:
+            times = np.asarray(last_seen, dtype=float)
+            known = np.zeros(len(keys), dtype=bool)
+            for generation in self._generations:
+                ended = math.inf if generation.ended is None else generation.ended
+                known |= (times <= ended) & generation.filter.contains(keys)
+            keys = keys[~known]
+        while len(keys):
+            self._rotate(now)
+            current = self._generations[-1].filter
+            room = current.capacity - current.count
+            current.add(keys[:room])
+            keys = keys[room:]
+
+    def _contains(self, hashes: np.ndarray) -> np.ndarray:
+        found = np.zeros(len(hashes), dtype=bool)
+        for generation in self._generations:
+            found |= generation.filter.contains(hashes)
+        return found
+
+    def _sync(self, now: float):
+        """Load keys other processes marked since the last sync into the filter."""
+        # data_version only changes when another connection commits
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            self._synced_at = now
+            return
+        self._data_version = version
+        rows = self.conn.execute(
+            "SELECT hash, last_seen FROM seen WHERE last_seen >= ?",
+            (max(self._synced_at - SYNC_OVERLAP, self._cutoff(now)),),
+        )
+        self._synced_at = now
+        while batch := rows.fetchmany(self.capacity):
+            hashes, last_seen = zip(*batch, strict=True)
+            self._add(list(hashes), now, list(last_seen))
+
+    # -- lookups -------------------------------------------------------------
+
+    def _stored(self, hashes: list[bytes], now: float) -> set[bytes]:
+        """The hashes with a live row in SQLite."""
+        found: set[bytes] = set()
+        cutoff = self._cutoff(now)
+        for chunk in _chunks(hashes):
+            placeholders = ",".join("?" * len(chunk))
+            found.update(
+                row[0]
+                for row in self.conn.execute(
+                    f"SELECT hash FROM seen WHERE hash IN ({placeholders}) "
+                    "AND last_seen >= ?",
+                    [*chunk, cutoff],
+                )
+            )
+        return found
+
+    def seen_many(self, namespace: str, keys: Iterable[Any]) -> list[bool]:
+        """Whether each key was marked in *namespace* within the TTL."""
+        hashes = [key_hash(namespace, key) for key in keys]
+        if not hashes:
+            return []
+        with self._lock:
+            now = self.clock()
+            self._sync(now)
+            self._rotate(now)
+            covered = self._covered(now)
+            hits = self._contains(_as_array(hashes))
+            candidates = (
+                hashes
+                if not covered
+                else [h for h, hit in zip(hashes, hits, strict=True) if hit]
+            )
+            stored = self._stored(list(dict.fromkeys(candidates)), now)
+            result = [h in stored for h in hashes]
+
+            seen = sum(result)
+            self._counters["checks"] += len(hashes)
+            self._counters["seen"] += seen
+            if covered:
+                self._counters["filter_hits"] += int(hits.sum())
+                self._counters["false_positives"] += int(hits.sum()) - seen
+        return result
+
+    def seen(self, namespace: str, key: Any) -> bool:
+        return self.seen_many(namespace, [key])[0]
+
+    def unseen(
+        self,
+        namespace: str,
+        items: Iterable[Any],
+        key: Callable[[Any], Any] | None = None,
+    ) -> list[Any]:
+        """Items whose key is not marked in *namespace*, first of each key only.
+
+        Does not mark them; call ``mark`` once they have been emitted.
+        """
+        items = list(items)
+        keys = [key(item) if key else item for item in items]
+        fresh, batch = [], set()
+        for item, k, seen in zip(
+            items, keys, self.seen_many(namespace, keys), strict=True
+        ):
+            if seen or k in batch:
+                continue
+            batch.add(k)
+            fresh.append(item)
+        return fresh
+
+    # -- writes --------------------------------------------------------------
+
+    def mark(self, namespace: str, keys: Iterable[Any]) -> int:
+        """Record *keys* as seen now (refreshing keys already seen)."""
+        hashes = list(dict.fromkeys(key_hash(namespace, key) for key in keys))
+        if not hashes:
+            return 0
+        with self._lock:
+            now = self.clock()
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.executemany(
+                    "INSERT INTO seen (hash, namespace, first_seen, last_seen) "
+                    "VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(hash) DO UPDATE SET last_seen = excluded.last_seen",
+                    [(h, namespace, now, now) for h in hashes],
+                )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self._add(hashes, now)
+            self._counters["marked"] += len(hashes)
+            self._marked_since_expire += len(hashes)
+            due = self._marked_since_expire >= EXPIRE_EVERY
+        if due:
+            self.expire()
+        return len(hashes)
+
+    def expire(self) -> int:
+        """Delete keys last seen more than the TTL ago; returns how many."""
+        if not self.ttl_seconds:
+            return 0
+        with self._lock:
+            now = self.clock()
+            deleted = self.conn.execute(
+                "DELETE FROM seen WHERE last_seen < ?", (self._cutoff(now),)
+            ).rowcount
+            self._rotate(now)
+            self._marked_since_expire = 0
+            self._counters["expired"] += deleted
+        if deleted:
+            logger.info(f"seen store: expired {deleted} keys")
+        return deleted
+
+    # -- reporting -----------------------------------------------------------
+
+    def stats(self, namespace: str | None = None) -> dict[str, Any]:
+        """Counters since start-up, live entries (in *namespace*, if given)
+        and false-positive rates.
+
+        ``false_positive_rate`` is measured: filter hits that SQLite did not
+        confirm, as a share of the keys that really were new.
+        ``expected_false_positive_rate`` is what the filters' fill predicts.
+        """
+        with self._lock:
+            now = self.clock()
+            counters = dict(self._counters)
+            query = "SELECT COUNT(*) FROM seen WHERE last_seen >= ?"
+            params: list[Any] = [self._cutoff(now)]
+            if namespace is not None:
+                query += " AND namespace = ?"
+                params.append(namespace)
+            entries = self.conn.execute(query, params).fetchone()[0]
+            misses = 1.0
+            for generation in self._generations:
+                misses *= 1 - generation.filter.error_rate()
+            generations = len(self._generations)
+            filter_bytes = sum(g.filter.bits.nbytes for g in self._generations)
+        new = counters["checks"] - counters["seen"]
+        return {
+            **counters,
+            "entries": entries,
+            "false_positive_rate": counters["false_positives"] / new if new else 0.0,
+            "expected_false_positive_rate": 1 - misses,
+            "generations": generations,
+            "filter_bytes": filter_bytes,
+        }
+
+
+_stores: dict[Path, SeenStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_seen_store(path: Path | str = DB_PATH) -> SeenStore:
+    """The process-wide ``SeenStore`` for *path*."""
+    path = Path(path)
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = SeenStore(path)
+        return _stores[path]